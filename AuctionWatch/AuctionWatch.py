@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from typing import Dict, List, Tuple, Set, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Set, Optional
 
 import aiohttp
 import discord
@@ -11,6 +11,10 @@ import xml.etree.ElementTree as ET
 
 log = logging.getLogger("red.wellspring.auctionwatch")
 
+AUCTIONS_URL = "https://www.nationstates.net/cgi-bin/api.cgi?q=cards+auctions"
+DEFAULT_POLL_MINUTES = 5.0
+DM_CONCURRENCY = 4
+
 DEFAULT_GUILD = {
     "cookies": 0,               # total "Gob" cookies given
     "user_agent": "9003",       # NationStates UA header (override with [p]setnsua)
@@ -31,6 +35,163 @@ DEFAULT_USER = {
     "watchlist": []
 }
 
+DEFAULT_GLOBAL = {
+    "poll_minutes": DEFAULT_POLL_MINUTES,  # shared auction feed interval
+}
+
+
+class AuctionFeedError(Exception):
+    """The auctions feed couldn't be fetched or parsed."""
+
+
+class AuctionFeed:
+    """
+    One shared poller for the NationStates card auctions list.
+
+    Requests go through the shared NSApi client (so they count against the one
+    bot-wide rate-limit budget), are conditional (ETag / Last-Modified), and the
+    XML is parsed as it streams in. Each poll hands the auction list to every subscriber, so other
+    cogs (CardsAuctionWatcher) piggyback on AuctionWatch's request instead of
+    making their own. DMs go through a small worker pool so a burst of matches
+    doesn't serialise on Discord round-trips.
+
+    Subscribers are `async callback(auctions) -> Any`, where auctions is a list of
+    {"cardid", "season", "name", "category"} dicts; an optional `interested()`
+    lets the feed skip the request entirely when nobody is watching anything.
+    """
+
+    def __init__(
+        self,
+        client: Callable[[], Any],
+        user_agent: Callable[[], Awaitable[str]],
+        dm_concurrency: int = DM_CONCURRENCY,
+    ):
+        self._client = client
+        self._user_agent = user_agent
+        self._dm_concurrency = dm_concurrency
+        self._subscribers: Dict[str, Tuple[Callable[[List[Dict[str, Any]]], Awaitable[Any]], Optional[Callable[[], bool]]]] = {}
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self.last_auctions: List[Dict[str, Any]] = []
+        self._poll_lock = asyncio.Lock()
+        self._dm_queue: "asyncio.Queue[Tuple[discord.abc.Messageable, Dict[str, Any], asyncio.Future]]" = asyncio.Queue()
+        self._dm_workers: List[asyncio.Task] = []
+        self._closed = False
+
+    # ---- lifecycle ----
+
+    def start(self):
+        if not self._dm_workers and not self._closed:
+            self._dm_workers = [asyncio.create_task(self._dm_worker()) for _ in range(self._dm_concurrency)]
+
+    async def close(self):
+        """Stop the DM workers and fail every DM still queued, so nobody waits on them forever."""
+        self._closed = True
+        for task in self._dm_workers:
+            task.cancel()
+        self._dm_workers = []
+        while not self._dm_queue.empty():
+            _, _, fut = self._dm_queue.get_nowait()
+            if not fut.done():
+                fut.set_exception(AuctionFeedError("auction feed closed before the DM was sent"))
+            self._dm_queue.task_done()
+
+    # ---- subscriptions ----
+
+    def subscribe(
+        self,
+        name: str,
+        callback: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+        interested: Optional[Callable[[], bool]] = None,
+    ):
+        self._subscribers[name] = (callback, interested)
+
+    def unsubscribe(self, name: str):
+        self._subscribers.pop(name, None)
+
+    def _anyone_interested(self) -> bool:
+        return any(interested is None or interested() for _, interested in self._subscribers.values())
+
+    # ---- fetching ----
+
+    async def fetch(self) -> List[Dict[str, Any]]:
+        """Current auctions; reuses the last list on 304 Not Modified."""
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        # The NSApi governor paces this against every other cog's requests
+        stream = self._client().stream(
+            url=AUCTIONS_URL, headers=headers, user_agent=await self._user_agent(), priority="background"
+        )
+        async with stream as resp:
+            if resp.status == 304:
+                auctions = self.last_auctions
+            elif resp.status == 429:
+                raise AuctionFeedError("rate limited by NationStates; the shared client will back off")
+            elif resp.status != 200:
+                raise AuctionFeedError(f"auctions fetch failed with HTTP {resp.status}")
+            else:
+                auctions = await self._parse_stream(resp)
+                self._etag = resp.headers.get("ETag")
+                self._last_modified = resp.headers.get("Last-Modified")
+
+        self.last_auctions = auctions
+        return auctions
+
+    async def _parse_stream(self, resp: aiohttp.ClientResponse) -> List[Dict[str, Any]]:
+        try:
+            return [
+                auction._asdict()
+                async for auction in self._client().iter_records(resp, "auction")
+            ]
+        except ET.ParseError as e:
+            raise AuctionFeedError(f"failed to parse auctions XML: {e}") from e
+
+    async def poll(self) -> Dict[str, Any]:
+        """Fetch once and hand the auctions to every subscriber. Returns {subscriber: result}."""
+        async with self._poll_lock:
+            if not self._subscribers or not self._anyone_interested():
+                return {}
+            auctions = await self.fetch()
+            results: Dict[str, Any] = {}
+            for name, (callback, _) in list(self._subscribers.items()):
+                try:
+                    results[name] = await callback(auctions)
+                except Exception:
+                    log.exception("Auction feed subscriber %s failed", name)
+            return results
+
+    # ---- DM delivery ----
+
+    async def send_dm(self, user: discord.abc.Messageable, **kwargs) -> None:
+        """Queue a DM and wait for it; raises whatever user.send raised."""
+        if self._closed:
+            raise AuctionFeedError("auction feed is closed")
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        await self._dm_queue.put((user, kwargs, fut))
+        await fut
+
+    async def _dm_worker(self):
+        while True:
+            user, kwargs, fut = await self._dm_queue.get()
+            try:
+                await user.send(**kwargs)
+                if not fut.done():
+                    fut.set_result(None)
+            except asyncio.CancelledError:
+                if not fut.done():
+                    fut.set_exception(AuctionFeedError("auction feed closed while the DM was sending"))
+                raise
+            except Exception as e:
+                if not fut.done():
+                    fut.set_exception(e)
+            finally:
+                self._dm_queue.task_done()
+
 
 class GobCookieView(discord.ui.View):
     def __init__(self, cog: "AuctionWatch", *, timeout: Optional[float] = 180):
@@ -96,21 +257,50 @@ class AuctionWatch(commands.Cog):
     """
 
     __author__ = "your_name_here"
-    __version__ = "1.1.0"
+    __version__ = "1.2.0"
 
     def __init__(self, bot: Red):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=1234567890123456, force_registration=True)
         self.config.register_guild(**DEFAULT_GUILD)
         self.config.register_user(**DEFAULT_USER)
+        self.config.register_global(**DEFAULT_GLOBAL)
 
         # Cache of (cardid, season) pairs recently notified to reduce duplicate pings
         self._recent_notified: Dict[Tuple[int, int, int], float] = {}
-        # Start background task
+        # (cardid, season) -> watcher user ids; built at load, kept in step with watchlist add/remove
+        self._watchers: Dict[Tuple[int, int], Set[int]] = {}
+        self.auction_feed = AuctionFeed(self._ns, self._feed_user_agent)
+
+    async def cog_load(self):
+        for user_id, data in (await self.config.all_users()).items():
+            for cid, season in data.get("watchlist", []):
+                self._watchers.setdefault((int(cid), int(season)), set()).add(int(user_id))
+        self.auction_feed.subscribe("AuctionWatch", self._on_auctions, lambda: bool(self._watchers))
+        self.auction_feed.start()
+        self.poll_auctions.change_interval(minutes=await self.config.poll_minutes())
         self.poll_auctions.start()
+        # Let other cogs (CardsAuctionWatcher) subscribe
+        self.bot.dispatch("auction_feed_ready", self.auction_feed)
 
-    def cog_unload(self):
+    async def cog_unload(self):
         self.poll_auctions.cancel()
+        await self.auction_feed.close()
+
+    async def _feed_user_agent(self) -> str:
+        # Use one UA; prefer any guild-configured UA (take from the first guild) or fallback default
+        guilds = self.bot.guilds
+        if guilds:
+            ua = await self.config.guild(guilds[0]).user_agent()
+            if ua:
+                return ua
+        return DEFAULT_GUILD["user_agent"]
+
+    def _ns(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so AuctionWatch can reach NationStates")
+        return cog.client
 
     # ===== Commands =====
 
@@ -129,6 +319,7 @@ class AuctionWatch(commands.Cog):
             return await ctx.send(f"That card (ID {cardid}, S{season}) is already on your watch list.")
         wl.append(pair)
         await self.config.user(ctx.author).watchlist.set(wl)
+        self._watchers.setdefault((pair[0], pair[1]), set()).add(ctx.author.id)
         await ctx.tick()
         await ctx.send(f"Added card **ID {cardid}** (Season **{season}**) to your watch list.")
 
@@ -141,6 +332,11 @@ class AuctionWatch(commands.Cog):
             return await ctx.send(f"I didn't find card (ID {cardid}, S{season}) on your watch list.")
         wl.remove(pair)
         await self.config.user(ctx.author).watchlist.set(wl)
+        watchers = self._watchers.get((pair[0], pair[1]))
+        if watchers is not None:
+            watchers.discard(ctx.author.id)
+            if not watchers:
+                self._watchers.pop((pair[0], pair[1]), None)
         await ctx.tick()
         await ctx.send(f"Removed card **ID {cardid}** (Season **{season}**) from your watch list.")
 
@@ -187,9 +383,18 @@ class AuctionWatch(commands.Cog):
         await ctx.send(summary)
         await self._broadcast_log(f"🧪 **AuctionWatch** manual run: {summary}")
 
+    @checks.admin()
+    @commands.command(name="awsetinterval")
+    async def aw_set_interval(self, ctx: commands.Context, minutes: float):
+        """Set how often the shared auction feed polls NationStates (1–60 minutes)."""
+        minutes = max(1.0, min(float(minutes), 60.0))
+        await self.config.poll_minutes.set(minutes)
+        self.poll_auctions.change_interval(minutes=minutes)
+        await ctx.send(f"⏱️ Auctions will be checked every **{minutes:g}** minutes.")
+
     # ===== Background Task =====
 
-    @tasks.loop(minutes=30.0)
+    @tasks.loop(minutes=DEFAULT_POLL_MINUTES)
     async def poll_auctions(self):
         try:
             processed, matches, dm_attempts, dm_successes = await self._poll_once()
@@ -210,82 +415,36 @@ class AuctionWatch(commands.Cog):
 
     async def _poll_once(self) -> Tuple[int, int, int, int]:
         """
-        Fetch the auctions XML, parse it, and DM watchers.
+        Poll the shared auction feed (which also serves any other subscribers).
 
         Returns:
             processed_auctions, match_count, dm_attempts, dm_successes
         """
-        # Build a set of all watched (cardid, season) for quick membership checks
-        all_watchers: Dict[Tuple[int, int], List[int]] = {}
-        for user_id, data in (await self.config.all_users()).items():
-            for cid, season in data.get("watchlist", []):
-                key = (int(cid), int(season))
-                all_watchers.setdefault(key, []).append(int(user_id))
-
-        if not all_watchers:
-            return 0, 0, 0, 0
-
-        # Fetch auctions
-        url = "https://www.nationstates.net/cgi-bin/api.cgi?q=cards+auctions"
-
-        # Use one UA; prefer any guild-configured UA (take from the first guild) or fallback default
-        guilds = self.bot.guilds
-        user_agent = DEFAULT_GUILD["user_agent"]
-        if guilds:
-            ua = await self.config.guild(guilds[0]).user_agent()
-            if ua:
-                user_agent = ua
-
-        headers = {"User-Agent": user_agent}
-
-        text = None
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    log.warning("Auctions fetch failed: HTTP %s", resp.status)
-                    await self._broadcast_log(f"⚠️ **AuctionWatch**: Auctions fetch failed with HTTP `{resp.status}`.")
-                    return 0, 0, 0, 0
-                text = await resp.text()
-
-                # Rate limiting handling from user's policy
-                try:
-                    if "Ratelimit-Remaining" in resp.headers:
-                        remaining = int(resp.headers["Ratelimit-Remaining"]) - 10
-                        reset_time = int(resp.headers.get("Ratelimit-Reset", "1"))
-                        wait_time = (reset_time / remaining) if remaining > 0 else reset_time
-                        await asyncio.sleep(max(0.0, wait_time))
-                except Exception:
-                    pass
-
-        if not text:
-            await self._broadcast_log("⚠️ **AuctionWatch**: Auctions response was empty.")
-            return 0, 0, 0, 0
-
         try:
-            root = ET.fromstring(text)
-        except ET.ParseError:
-            log.exception("Failed to parse auctions XML")
-            await self._broadcast_log("❌ **AuctionWatch**: Failed to parse auctions XML.")
+            results = await self.auction_feed.poll()
+        except (AuctionFeedError, RuntimeError) as e:
+            log.warning("Auctions fetch failed: %s", e)
+            await self._broadcast_log(f"⚠️ **AuctionWatch**: {e}.")
             return 0, 0, 0, 0
+        except aiohttp.ClientError as e:
+            log.warning("Auctions fetch failed: %r", e)
+            await self._broadcast_log(f"⚠️ **AuctionWatch**: Auctions fetch failed: `{e!r}`.")
+            return 0, 0, 0, 0
+        return results.get("AuctionWatch", (0, 0, 0, 0))
 
-        auctions = root.findall(".//AUCTION")
+    async def _on_auctions(self, auctions: List[Dict[str, Any]]) -> Tuple[int, int, int, int]:
+        """Feed subscriber: match auctions against the watcher index and DM watchers."""
         now = asyncio.get_event_loop().time()
         processed = 0
         matches = 0
-        dm_attempts = 0
-        dm_successes = 0
+        jobs = []
         
         for a in auctions:
-            try:
-                cardid = int((a.findtext("CARDID") or "0").strip())
-                season = int((a.findtext("SEASON") or "0").strip())
-                cardname = (a.findtext("NAME") or "Unknown Card").strip()
-                rarity = (a.findtext("CATEGORY") or "Unknown Card").strip()
-            except Exception:
-                continue
+            cardid, season = a["cardid"], a["season"]
+            cardname, rarity = a["name"], a["category"]
         
             processed += 1
-            watchers = all_watchers.get((cardid, season), [])
+            watchers = self._watchers.get((cardid, season))
             if not watchers:
                 continue
         
@@ -307,37 +466,20 @@ class AuctionWatch(commands.Cog):
         )
             view = GobCookieView(self)
         
-            for uid in watchers:
+            for uid in list(watchers):
                 # Per-user, per-card dedupe (3 hours)
                 k = (uid, cardid, season)
                 last = self._recent_notified.get(k)
                 if last and (now - last) < (3 * 60 * 60):
                     # Skip this user; they were notified about this card recently
                     continue
-        
-                user = self.bot.get_user(uid) or await self.bot.fetch_user(uid)
-                if not user:
-                    # Still record the timestamp so we don't hammer the API on missing users
-                    self._recent_notified[k] = now
-                    continue
-        
-                try:
-                    dm_attempts += 1
-                    await user.send(embed=embed, view=view)
-                    dm_successes += 1
-                    self._recent_notified[k] = now
-                    continue
-                    await self._log_for_user(user, f"📨 **AuctionWatch**: DM sent to <@{uid}> for card **{cardid} (S{season})**.")
-                except discord.Forbidden:
-                    msg = f"📵 **AuctionWatch**: Could not DM <@{uid}> for card **{cardid} (S{season})** (DMs disabled?)."
-                    log.info(msg)
-                    await self._log_for_user(user, msg)
-                except Exception as e:
-                    log.exception("Error DMing user %s", uid)
-                    await self._log_for_user(user, f"❗ **AuctionWatch**: Error DMing <@{uid}> for card **{cardid} (S{season})**: `{e!r}`")
-                finally:
-                    # Mark as notified (even on failure) to avoid retry spam for 3 hours
-                    self._recent_notified[k] = now
+                # Mark as notified up front (even on failure) to avoid retry spam for 3 hours
+                self._recent_notified[k] = now
+                jobs.append(self._notify(uid, cardid, season, embed, view))
+
+        results = await asyncio.gather(*jobs)
+        dm_attempts = sum(1 for r in results if r is not None)
+        dm_successes = sum(1 for r in results if r)
         
         # Clean old entries from recent cache (older than 6 hours)
         cutoff = now - (6 * 60 * 60)
@@ -347,6 +489,26 @@ class AuctionWatch(commands.Cog):
         
         return processed, matches, dm_attempts, dm_successes
 
+    async def _notify(self, uid: int, cardid: int, season: int, embed: discord.Embed, view: discord.ui.View) -> Optional[bool]:
+        """DM one watcher through the feed's DM queue. None = no user, else whether the DM went through."""
+        user = self.bot.get_user(uid)
+        if not user:
+            try:
+                user = await self.bot.fetch_user(uid)
+            except discord.HTTPException:
+                return None
+        try:
+            await self.auction_feed.send_dm(user, embed=embed, view=view)
+            return True
+        except discord.Forbidden:
+            msg = f"📵 **AuctionWatch**: Could not DM <@{uid}> for card **{cardid} (S{season})** (DMs disabled?)."
+            log.info(msg)
+            await self._log_for_user(user, msg)
+        except Exception as e:
+            log.exception("Error DMing user %s", uid)
+            await self._log_for_user(user, f"❗ **AuctionWatch**: Error DMing <@{uid}> for card **{cardid} (S{season})**: `{e!r}`")
+        return False
+
 
     @checks.admin()
     @commands.command(name="startauctions")
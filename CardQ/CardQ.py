@@ -1,40 +1,303 @@
 import discord
 from redbot.core import commands
-import aiohttp
-import tempfile
+from redbot.core.data_manager import cog_data_path
+import asyncio
+import csv
+import gzip
+import io
+import sqlite3
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DUMP_URL = "https://www.nationstates.net/pages/cardlist_S{season}.xml.gz"
+IMPORT_BATCH = 1000  # cards per executemany
+SEARCH_LIMIT = 50000
+
+# search_cards key -> cards column (compared case-insensitively through the NOCASE indexes)
+SEARCH_COLUMNS = {
+    "name": "name",
+    "type": "type",
+    "motto": "motto",
+    "category": "category",
+    "region": "region",
+    "flag": "flag",
+    "rarity": "card_category",
+    "card_category": "card_category",
+}
+
+
+class CardDB:
+    """
+    Local copy of the NationStates card dumps, one set of rows per season.
+
+    import_dump() streams a (gzipped) cardlist dump with iterparse and writes
+    it in executemany batches, so a full season never sits in memory. Lookups
+    go through NOCASE indexes on name/region/category/rarity and the badge
+    table; free text goes through an FTS5 index over name, motto and
+    description when this SQLite build has FTS5.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS cards (
+            season INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            name TEXT COLLATE NOCASE,
+            type TEXT COLLATE NOCASE,
+            motto TEXT,
+            category TEXT COLLATE NOCASE,
+            region TEXT COLLATE NOCASE,
+            flag TEXT,
+            card_category TEXT COLLATE NOCASE,
+            description TEXT,
+            PRIMARY KEY (season, id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS badges (
+            season INTEGER NOT NULL,
+            card_id INTEGER NOT NULL,
+            badge TEXT COLLATE NOCASE
+        )""",
+        """CREATE TABLE IF NOT EXISTS trophies (
+            season INTEGER NOT NULL,
+            card_id INTEGER NOT NULL,
+            type TEXT,
+            value TEXT
+        )""",
+        "CREATE INDEX IF NOT EXISTS cards_name ON cards (name)",
+        "CREATE INDEX IF NOT EXISTS cards_region ON cards (region, season)",
+        "CREATE INDEX IF NOT EXISTS cards_category ON cards (category, season)",
+        "CREATE INDEX IF NOT EXISTS cards_rarity ON cards (card_category, season)",
+        "CREATE INDEX IF NOT EXISTS badges_badge ON badges (badge, season)",
+        "CREATE INDEX IF NOT EXISTS badges_card ON badges (season, card_id)",
+        "CREATE INDEX IF NOT EXISTS trophies_card ON trophies (season, card_id)",
+    )
+    FTS = (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5("
+        "name, motto, description, content='cards', content_rowid='rowid')"
+    )
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        for stmt in self.SCHEMA:
+            self.db.execute(stmt)
+        try:
+            self.db.execute(self.FTS)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False  # SQLite built without FTS5: text search falls back to LIKE
+        self.db.commit()
+        self._lock = asyncio.Lock()
+
+    def close(self):
+        self.db.close()
+
+    # ---- import ----
+
+    @staticmethod
+    def _iter_dump(path: Path) -> Iterator[Tuple[tuple, List[str], List[Tuple[str, str]]]]:
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rb") as fh:
+            for _, elem in ET.iterparse(fh):
+                if elem.tag == "SET":
+                    elem.clear()
+                if elem.tag != "CARD":
+                    continue
+                text = lambda tag: elem.findtext(tag)  # noqa: E731
+                card = (
+                    int(text("ID")), text("NAME"), text("TYPE"), text("MOTTO"), text("CATEGORY"),
+                    text("REGION"), text("FLAG"), text("CARDCATEGORY"), text("DESCRIPTION"),
+                )
+                badges = [b.text for b in elem.iterfind("BADGES/BADGE") if b.text]
+                trophies = [(t.get("type"), t.text) for t in elem.iterfind("TROPHIES/TROPHY")]
+                yield card, badges, trophies
+                # Cards are finished once seen; drop their contents so memory stays flat
+                elem.clear()
+
+    def import_dump(self, path: Path, season: int) -> int:
+        """Replace one season with the cards in `path` (blocking; run it in a thread)."""
+        # Own connection: readers keep using self.db (WAL) while the import runs
+        db = sqlite3.connect(str(self.path))
+        with db:
+            db.execute("DELETE FROM cards WHERE season = ?", (season,))
+            db.execute("DELETE FROM badges WHERE season = ?", (season,))
+            db.execute("DELETE FROM trophies WHERE season = ?", (season,))
+            cards, badges, trophies = [], [], []
+            total = 0
+            for card, card_badges, card_trophies in self._iter_dump(Path(path)):
+                cards.append((season,) + card)
+                badges.extend((season, card[0], b) for b in card_badges)
+                trophies.extend((season, card[0], t, v) for t, v in card_trophies)
+                if len(cards) >= IMPORT_BATCH:
+                    total += self._flush(db, cards, badges, trophies)
+            total += self._flush(db, cards, badges, trophies)
+            if self.fts:
+                db.execute("INSERT INTO cards_fts(cards_fts) VALUES ('rebuild')")
+        db.execute("ANALYZE")
+        db.close()
+        return total
+
+    @staticmethod
+    def _flush(db: sqlite3.Connection, cards: list, badges: list, trophies: list) -> int:
+        db.executemany("INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", cards)
+        db.executemany("INSERT INTO badges VALUES (?, ?, ?)", badges)
+        db.executemany("INSERT INTO trophies VALUES (?, ?, ?, ?)", trophies)
+        n = len(cards)
+        cards.clear()
+        badges.clear()
+        trophies.clear()
+        return n
+
+    # ---- queries ----
+
+    def seasons(self) -> Dict[int, int]:
+        return dict(self.db.execute("SELECT season, COUNT(*) FROM cards GROUP BY season ORDER BY season"))
+
+    def has_season(self, season: int) -> bool:
+        return self.db.execute("SELECT 1 FROM cards WHERE season = ? LIMIT 1", (season,)).fetchone() is not None
+
+    def card(self, card_id: int, season: int) -> Optional[sqlite3.Row]:
+        return self.db.execute(
+            "SELECT * FROM cards WHERE season = ? AND id = ?", (season, card_id)
+        ).fetchone()
+
+    def search(self, season: int, filters: Dict[str, str], limit: int = SEARCH_LIMIT) -> List[sqlite3.Row]:
+        """
+        AND together `filters`: column keys from SEARCH_COLUMNS (exact, case-insensitive;
+        `*` wildcards), `badge`, and `text` (FTS5 query over name/motto/description).
+        Raises KeyError on an unknown key.
+        """
+        sql = ["SELECT c.id, c.name FROM cards c"]
+        where = ["c.season = ?"]
+        params: list = [season]
+        for key, value in filters.items():
+            if key in SEARCH_COLUMNS:
+                col = SEARCH_COLUMNS[key]
+                if "*" in value:
+                    where.append(f"c.{col} LIKE ?")
+                    params.append(value.replace("*", "%"))
+                else:
+                    where.append(f"c.{col} = ?")
+                    params.append(value.replace("_", " ") if col == "region" else value)
+            elif key in ("badge", "badges"):
+                where.append("EXISTS (SELECT 1 FROM badges b WHERE b.season = c.season AND b.card_id = c.id AND b.badge = ?)")
+                params.append(value)
+            elif key in ("text", "q"):
+                if self.fts:
+                    sql.append("JOIN cards_fts f ON f.rowid = c.rowid")
+                    where.append("cards_fts MATCH ?")
+                    params.append(value)
+                else:
+                    where.append("(c.name LIKE ? OR c.motto LIKE ? OR c.description LIKE ?)")
+                    params.extend([f"%{value}%"] * 3)
+            else:
+                raise KeyError(key)
+        sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY c.id LIMIT ?")
+        params.append(limit)
+        return self.db.execute(" ".join(sql), params).fetchall()
+
+
+def rows_to_csv(rows, season: int) -> io.BytesIO:
+    """Card id, name and deck link per row, built in memory for discord.File."""
+    text = io.StringIO()
+    writer = csv.writer(text)
+    for row in rows:
+        writer.writerow([row["id"], row["name"], f"www.nationstates.net/page=deck/card={row['id']}/season={season}"])
+    return io.BytesIO(text.getvalue().encode("utf-8"))
+
 
 class CardQ(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        
-    @commands.cooldown(1, 60, commands.BucketType.user)
+        self.data_path = cog_data_path(self)
+        self.db = CardDB(self.data_path / "cards.sqlite3")
+
+    def cog_unload(self):
+        self.db.close()
+
+    def _ns(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so CardQ can download card dumps.")
+        return cog.client
+
+    @commands.cooldown(1, 5, commands.BucketType.user)
     @commands.command()
     async def search_cards(self, ctx, season: int, *search_params):
-        await ctx.send("Searching for that, if you need help check out my documation here https://api.nsupc.dev/cards/v1")
-        base_url = "https://api.nsupc.dev/cards/v1"
-        params="&".join(search_params)
-        query_params = f"season={season}&{params}"
-        search_url = f"{base_url}?{query_params}"
-        await ctx.send(search_url)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(search_url) as response:
-                data = await response.json()
-                status = data.get("status")
-                if status == "success":
-                    # Process the response data as needed
-                    card_list = []
-                    for card_id, card_name in data["nations"].items():
-                        card_link = f"www.nationstates.net/page=deck/card={card_id}/season={season}"
-                        card_list.append(f"{card_id},{card_name},{card_link}")
-
-                    with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp_file:
-                        tmp_file.write("\n".join(card_list))
-                        tmp_file_path = tmp_file.name
-
-                    file = discord.File(tmp_file_path, filename="card_list.csv")
-                    await ctx.send( f"{ctx.author.mention} Enjoy I dug it from the salt mine just for you!",file=file)
-                else:
-                    # Send the raw data to the user
-                    await ctx.send(data)
-                    
+        """
+        Search the local card database, e.g. `search_cards 3 region=the_north_pacific rarity=legendary`.
+
+        Keys: name, type, motto, category, region, flag, rarity, badge, text (full-text over
+        name/motto/description). Values are case-insensitive; `*` is a wildcard.
+        """
+        filters = {}
+        for param in " ".join(search_params).replace("&", " ").split():
+            key, sep, value = param.partition("=")
+            if not sep or not value:
+                return await ctx.send(f"`{param}` should look like `key=value`.")
+            filters[key.lower()] = value
+        if not self.db.has_season(season):
+            return await ctx.send(f"Season {season} has not been imported yet. An owner can run `cardq import {season}`.")
+
+        try:
+            rows = self.db.search(season, filters)
+        except KeyError as e:
+            return await ctx.send(
+                f"Unknown search key `{e.args[0]}`. Use: {', '.join(sorted(SEARCH_COLUMNS) + ['badge', 'text'])}."
+            )
+        except sqlite3.OperationalError as e:
+            return await ctx.send(f"Bad search: {e}")
+
+        if not rows:
+            return await ctx.send("No cards found matching the specified criteria.")
+        file = discord.File(rows_to_csv(rows, season), filename="card_list.csv")
+        await ctx.send(f"{ctx.author.mention} Enjoy I dug {len(rows)} card(s) from the salt mine just for you!", file=file)
+
+    @commands.group()
+    @commands.is_owner()
+    async def cardq(self, ctx):
+        """Manage the local card database."""
+
+    @cardq.command(name="import")
+    async def cardq_import(self, ctx, season: int):
+        """
+        (Re)build one season from its card dump. Attach a cardlist .xml/.xml.gz,
+        or leave it off to download the dump from NationStates.
+        """
+        async with self.db._lock:
+            dump = self.data_path / f"cardlist_S{season}.xml.gz"
+            if ctx.message.attachments:
+                attachment = ctx.message.attachments[0]
+                if not attachment.filename.endswith(".gz"):
+                    dump = dump.with_suffix("")
+                await attachment.save(dump)
+            else:
+                await ctx.send(f"Downloading the season {season} card dump…")
+                async with self._ns().stream(url=DUMP_URL.format(season=season)) as resp:
+                    if resp.status != 200:
+                        return await ctx.send(f"Download failed: HTTP {resp.status}.")
+                    with open(dump, "wb") as fh:
+                        async for chunk in resp.content.iter_chunked(1 << 16):
+                            fh.write(chunk)
+
+            await ctx.send("Importing…")
+            try:
+                total = await asyncio.to_thread(self.db.import_dump, dump, season)
+            except (ET.ParseError, OSError, ValueError) as e:
+                return await ctx.send(f"Import failed: `{type(e).__name__}: {e}`")
+            finally:
+                dump.unlink(missing_ok=True)
+        await ctx.send(f"Imported {total} season {season} cards.")
+
+    @cardq.command(name="status")
+    async def cardq_status(self, ctx):
+        """Show which seasons are in the local card database."""
+        seasons = self.db.seasons()
+        if not seasons:
+            return await ctx.send("No seasons imported yet.")
+        lines = [f"Season {s}: {n} cards" for s, n in seasons.items()]
+        lines.append(f"Full-text search: {'FTS5' if self.db.fts else 'unavailable (LIKE fallback)'}")
+        await ctx.send("\n".join(lines))
@@ -1,9 +1,7 @@
 import asyncio
 import logging
-from typing import Dict, List, Optional
-import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Set, Tuple
 import time
-import aiohttp
 import discord
 from redbot.core import commands, Config
 from redbot.core.bot import Red
@@ -11,23 +9,18 @@ from datetime import datetime, timezone
 
 log = logging.getLogger("red.cards_auction_pinger")
 
-NS_BASE = "https://www.nationstates.net/cgi-bin/api.cgi"
-
-def parse_int(s: Optional[str], default: int = 0) -> int:
-    try:
-        return int(s) if s is not None else default
-    except Exception:
-        return default
+FEED_NAME = "CardsAuctionWatcher"
 
 class CardsAuctionWatcher(commands.Cog):
     """
-    Minimal watcher: fetch auctions once per cycle.
+    Minimal watcher: subscribes to AuctionWatch's shared auction feed, so the
+    auctions list is fetched once for both cogs.
     If a watched card (cardid:season) is present, DM watchers with a single embed.
     Rate-limit per (user, card) to once every cooldown window (default 3 hours).
     """
 
     __author__ = "you"
-    __version__ = "0.1.0"
+    __version__ = "0.2.0"
 
     def __init__(self, bot: Red):
         self.bot = bot
@@ -47,60 +40,54 @@ class CardsAuctionWatcher(commands.Cog):
             last_notified={},        # Dict[str, int] (unix ts) per key
         )
 
-        self._session: Optional[aiohttp.ClientSession] = None
-        self._task: Optional[asyncio.Task] = None
+        # In-memory mirror of watch_index, updated on watch/unwatch
+        self._watch_index: Dict[str, Set[int]] = {}
 
     # -------- lifecycle --------
 
     async def cog_load(self):
-        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
+        self._watch_index = {k: set(v) for k, v in (await self.config.watch_index()).items() if v}
         if await self.config.enabled():
-            await self._ensure_task()
+            self._attach()
 
     async def cog_unload(self):
-        if self._task and not self._task.done():
-            self._task.cancel()
-        if self._session and not self._session.closed:
-            await self._session.close()
-
-    async def _ensure_task(self):
-        if self._task and not self._task.done():
-            return
-        self._task = self.bot.loop.create_task(self._runner())
-
-    async def _runner(self):
-        while True:
-            try:
-                if not await self.config.enabled():
-                    await asyncio.sleep(30)
-                    continue
-
-                await self._run_once()
-                minutes = await self.config.interval_minutes()
-                await asyncio.sleep(max(1, minutes) * 60)
-
-            except asyncio.CancelledError:
-                break
-            except Exception:
-                log.exception("CardsAuctionPinger loop error")
-                await asyncio.sleep(30)
+        self._detach()
+
+    def _feed(self):
+        aw = self.bot.get_cog("AuctionWatch")
+        return getattr(aw, "auction_feed", None)
+
+    def _attach(self) -> bool:
+        feed = self._feed()
+        if feed is None:
+            log.warning("AuctionWatch isn't loaded; waiting for its auction feed.")
+            return False
+        feed.subscribe(FEED_NAME, self._on_auctions, lambda: bool(self._watch_index))
+        return True
+
+    def _detach(self):
+        feed = self._feed()
+        if feed is not None:
+            feed.unsubscribe(FEED_NAME)
+
+    @commands.Cog.listener()
+    async def on_auction_feed_ready(self, feed):
+        # AuctionWatch (re)loaded after us
+        if await self.config.enabled():
+            self._attach()
 
     # -------- core logic --------
 
-    async def _run_once(self):
-        ua = await self.config.user_agent()
-        auctions = await self._fetch_current_auctions(user_agent=ua)
-        if not auctions:
-            return
-
+    async def _on_auctions(self, auctions: List[Dict[str, Any]]):
         # Build a map from watch key -> (name, category) present this cycle
         present: Dict[str, Dict[str, str]] = {}
         for a in auctions:
+            if not (a["cardid"] and a["season"]):
+                continue
             key = self._key(a["cardid"], a["season"])
             present[key] = {"name": a.get("name") or "Unknown", "category": a.get("category") or "Unknown"}
 
-        # Get index: key -> [user_ids]
-        watch_index = await self.config.watch_index()
+        watch_index = self._watch_index
         if not watch_index:
             return
 
@@ -108,92 +95,60 @@ class CardsAuctionWatcher(commands.Cog):
         cooldown = await self.config.cooldown_seconds()
         now = int(time.time())
 
-        for key, meta in present.items():
-            user_ids: List[int] = watch_index.get(key, [])
-            if not user_ids:
-                continue
+        # One job per user, so each user's cooldown map is read and written once.
+        per_user: Dict[int, List[str]] = {}
+        for key in present:
+            for uid in watch_index.get(key, ()):
+                per_user.setdefault(uid, []).append(key)
+        # DMs are rate-limited by the feed's worker pool
+        await asyncio.gather(*(self._ping(uid, keys, present, cooldown, now) for uid, keys in per_user.items()))
+
+    async def _ping(self, uid: int, keys: List[str], present: Dict[str, Dict[str, str]], cooldown: int, now: int):
+        try:
+            user = self.bot.get_user(uid) or await self.bot.fetch_user(uid)
+        except Exception:
+            user = None
+        if not user:
+            return
 
-            for uid in list(user_ids):
-                try:
-                    user = self.bot.get_user(uid) or await self.bot.fetch_user(uid)
-                except Exception:
-                    user = None
-                if not user:
-                    continue
-
-                # Check per-user cooldown for this key
-                last_map = await self.config.user(user).last_notified()
-                last_ts = int(last_map.get(key, 0))
-                if now - last_ts < cooldown:
-                    continue  # still on cooldown for this (user, card)
-
-                # DM embed
-                cardid, season = key.split(":")
-                await self._send_dm(user, int(cardid), int(season), meta["name"], meta["category"])
-
-                # Update cooldown timestamp
+        # Keep the (user, card) pairs that are off cooldown and stamp them
+        async with self.config.user(user).last_notified() as last_map:
+            due = [key for key in keys if now - int(last_map.get(key, 0)) >= cooldown]
+            for key in due:
                 last_map[key] = now
-                await self.config.user(user).last_notified.set(last_map)
+        if not due:
+            return
 
-    async def _fetch_current_auctions(self, user_agent: str) -> List[Dict]:
-        url = f"{NS_BASE}?q=cards+auctions"
-        headers = {"User-Agent": user_agent}
-        text = await self._fetch_with_rate_limit(url, headers)
-        try:
-            root = ET.fromstring(text)
-        except ET.ParseError:
-            log.exception("Auctions XML parse error")
-            return []
-
-        auctions: List[Dict] = []
-        node = root.find("AUCTIONS")
-        if node is None:
-            return auctions
-
-        for a in node.findall("AUCTION"):
-            cardid = parse_int((a.findtext("CARDID") or "").strip(), 0)
-            category = (a.findtext("CATEGORY") or "").strip() or "unknown"
-            name = (a.findtext("NAME") or "").strip() or "Unknown"
-            season = parse_int((a.findtext("SEASON") or "").strip(), 0)
-            if cardid and season:
-                auctions.append({"cardid": cardid, "season": season, "name": name, "category": category})
-        return auctions
-
-    async def _fetch_with_rate_limit(self, url: str, headers: Dict[str, str]) -> str:
-        # NationStates rate limit strategy as requested
-        assert self._session is not None
-        async with self._session.get(url, headers=headers) as resp:
-            text = await resp.text()
-            rl_remaining = resp.headers.get("Ratelimit-Remaining")
-            rl_reset = resp.headers.get("Ratelimit-Reset")
-            try:
-                if rl_remaining is not None and rl_reset is not None:
-                    remaining = int(rl_remaining)
-                    remaining -= 10
-                    reset_time = int(rl_reset)
-                    wait_time = reset_time / remaining if remaining > 0 else reset_time
-                    wait_time = max(0, min(wait_time, 5))
-                    if wait_time > 0:
-                        await asyncio.sleep(wait_time)
-            except Exception:
-                pass
-            return text
+        cards = []
+        for key in due:
+            cardid, season = key.split(":")
+            cards.append((int(cardid), int(season), present[key]["name"], present[key]["category"]))
+        await self._send_dm(user, cards)
 
     # -------- DM helper --------
 
-    async def _send_dm(self, user: discord.User, cardid: int, season: int, name: str, category: str):
-        embed = discord.Embed(
-            title=f"Auction: Card {cardid} (S{season}) — {name}",
-            description="This card is currently on the auction list.",
-            timestamp=datetime.now(tz=timezone.utc),
-        )
-        embed.add_field(name="Category", value=category, inline=True)
-        embed.url = self._card_url(cardid, season)
-        try:
-            await user.send(embed=embed)
-        except Exception:
-            # Can't DM this user (privacy settings, etc.)
-            pass
+    async def _send_dm(self, user: discord.User, cards: List[Tuple[int, int, str, str]]):
+        """DM one embed per (cardid, season, name, category), up to 10 per message."""
+        embeds = []
+        for cardid, season, name, category in cards:
+            embed = discord.Embed(
+                title=f"Auction: Card {cardid} (S{season}) — {name}",
+                description="This card is currently on the auction list.",
+                timestamp=datetime.now(tz=timezone.utc),
+            )
+            embed.add_field(name="Category", value=category, inline=True)
+            embed.url = self._card_url(cardid, season)
+            embeds.append(embed)
+        feed = self._feed()
+        for i in range(0, len(embeds), 10):
+            try:
+                if feed is not None:
+                    await feed.send_dm(user, embeds=embeds[i:i + 10])
+                else:
+                    await user.send(embeds=embeds[i:i + 10])
+            except Exception:
+                # Can't DM this user (privacy settings, etc.)
+                return
 
     # -------- commands --------
 
@@ -201,42 +156,44 @@ class CardsAuctionWatcher(commands.Cog):
     async def cap_group(self, ctx: commands.Context):
         """Cards Auction Pinger (minimal)."""
         enabled = await self.config.enabled()
-        interval = await self.config.interval_minutes()
         cooldown = await self.config.cooldown_seconds()
-        ua = await self.config.user_agent()
+        feed = "connected (AuctionWatch)" if self._feed() is not None else "waiting for AuctionWatch"
         await ctx.send(
             "**Cards Auction Pinger**\n"
             f"Enabled: `{enabled}`\n"
-            f"Interval: `{interval}` minutes\n"
-            f"Cooldown: `{cooldown//3600}h`\n"
-            f"User-Agent: `{ua}`"
+            f"Feed: `{feed}`\n"
+            f"Cooldown: `{cooldown//3600}h`"
         )
 
     @cap_group.command(name="start")
     @commands.is_owner()
     async def cap_start(self, ctx: commands.Context):
         await self.config.enabled.set(True)
-        await self._ensure_task()
-        await ctx.send("Started the minimal auction pinger.")
+        if self._attach():
+            await ctx.send("Started the minimal auction pinger.")
+        else:
+            await ctx.send("Enabled; pings will start once AuctionWatch is loaded (it owns the shared auction feed).")
 
     @cap_group.command(name="stop")
     @commands.is_owner()
     async def cap_stop(self, ctx: commands.Context):
         await self.config.enabled.set(False)
+        self._detach()
         await ctx.send("Stopped the minimal auction pinger.")
 
     @cap_group.command(name="setua")
     @commands.is_owner()
     async def cap_setua(self, ctx: commands.Context, *, user_agent: str):
         await self.config.user_agent.set(user_agent)
-        await ctx.send(f"User-Agent set to `{user_agent}`.")
+        await ctx.send(
+            f"User-Agent set to `{user_agent}`. Note: auctions are fetched by AuctionWatch's shared feed, "
+            "which uses its own `[p]setnsua`."
+        )
 
     @cap_group.command(name="setinterval")
     @commands.is_owner()
     async def cap_setinterval(self, ctx: commands.Context, minutes: int):
-        minutes = max(5, min(minutes, 240))
-        await self.config.interval_minutes.set(minutes)
-        await ctx.send(f"Polling interval set to {minutes} minutes.")
+        await ctx.send("Polling is shared with AuctionWatch now; use `[p]awsetinterval` to change it.")
 
     @cap_group.command(name="setcooldown")
     @commands.is_owner()
@@ -260,6 +217,7 @@ class CardsAuctionWatcher(commands.Cog):
         if ctx.author.id not in idx[key]:
             idx[key].append(ctx.author.id)
             await self.config.watch_index.set(idx)
+        self._watch_index.setdefault(key, set()).add(ctx.author.id)
 
         await ctx.send(f"Watching card `{cardid}` (S{season}).")
 
@@ -277,6 +235,11 @@ class CardsAuctionWatcher(commands.Cog):
             if not idx[key]:
                 idx.pop(key, None)
             await self.config.watch_index.set(idx)
+        watchers = self._watch_index.get(key)
+        if watchers is not None:
+            watchers.discard(ctx.author.id)
+            if not watchers:
+                self._watch_index.pop(key, None)
 
         await ctx.send(f"Stopped watching card `{cardid}` (S{season}).")
 
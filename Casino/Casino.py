@@ -41,13 +41,21 @@ class Casino(commands.Cog):
         )
 
 
+    def _nexus(self):
+        cog = self.bot.get_cog("NexusExchange")
+        if not cog:
+            raise RuntimeError("NexusExchange cog not found. Please load it so the Casino can use Wellcoins.")
+        return cog
+
     async def get_balance(self, user: discord.Member):
-        return await self.config.user(user).master_balance()
+        return await self._nexus().get_balance(user)
 
     async def update_balance(self, user: discord.Member, amount: int):
-        balance = await self.get_balance(user)
-        new_balance = max(0, balance + amount * .99)  # Prevent negative balance
-        await self.config.user(user).master_balance.set(new_balance)
+        nexus = self._nexus()
+        try:
+            new_balance = await nexus.modify_wellcoins(user, amount * .99, reason="casino")
+        except ValueError:
+            new_balance = await nexus.set_wellcoins(user, 0, reason="casino")  # Prevent negative balance
         await self._decrease_regional_debt(amount * .01)
         return new_balance
 
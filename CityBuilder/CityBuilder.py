@@ -3,7 +3,6 @@ import asyncio
 import math
 from typing import Dict, Optional, Tuple, Callable, List, Set
 import io
-import aiohttp
 import discord
 from discord import ui
 from redbot.core import commands, Config
@@ -683,7 +682,6 @@ TICK_SECONDS = 3600  # hourly ticks
 
 # ====== NationStates config ======
 NS_USER_AGENT = "9005"
-NS_BASE = "https://www.nationstates.net/cgi-bin/api.cgi"
 
 # Default composite: 46 + a few companions (tweak freely)
 DEFAULT_SCALES = [46, 1, 10, 39]
@@ -1490,9 +1488,9 @@ def _xml_get_scales_scores(xml: str) -> dict:
     return out
 
 
-async def ns_fetch_currency_and_scales(nation_name: str, scales: Optional[list] = None) -> Tuple[str, dict, str]:
+async def ns_fetch_currency_and_scales(client, nation_name: str, scales: Optional[list] = None) -> Tuple[str, dict, str]:
     """
-    Robust fetch:
+    Robust fetch (all requests go through the shared NSApi client):
       1) q=currency+census with mode/scale as separate params
       2) q=currency+census;mode=score;scale=...
       3) Fallback: q=currency  AND  q=census;mode=score;scale=... (two requests)
@@ -1501,23 +1499,10 @@ async def ns_fetch_currency_and_scales(nation_name: str, scales: Optional[list]
     nation = normalize_nation(nation_name)
     scales = scales or DEFAULT_SCALES
     scale_str = "+".join(str(s) for s in scales)
-    headers = {"User-Agent": NS_USER_AGENT}
 
     async def fetch(params: dict) -> str:
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(NS_BASE, params=params) as resp:
-                # gentle pacing
-                remaining = resp.headers.get("Ratelimit-Remaining")
-                reset_time = resp.headers.get("Ratelimit-Reset")
-                if remaining is not None and reset_time is not None:
-                    try:
-                        remaining_i = max(1, int(remaining) - 10)
-                        reset_i = int(reset_time)
-                        wait = reset_i / remaining_i if remaining_i > 0 else reset_i
-                        await asyncio.sleep(wait)
-                    except Exception:
-                        pass
-                return await resp.text()
+        resp = await client.get(params, user_agent=NS_USER_AGENT)
+        return resp.text()
 
     # --- Try #1: separate params for mode/scale ---
     params1 = {"nation": nation, "q": "currency+census", "mode": "score", "scale": scale_str}
@@ -1773,7 +1758,7 @@ class SetupNationModal(discord.ui.Modal, title="🌍 Link Your NationStates Nati
       # 2) Do your slow work in try/except
       try:
           # Fetch currency + census (add a timeout on the HTTP layer if you can)
-          currency, scores, xml_text = await ns_fetch_currency_and_scales(nation_input, DEFAULT_SCALES)
+          currency, scores, xml_text = await ns_fetch_currency_and_scales(self.cog._ns(), nation_input, DEFAULT_SCALES)
   
           # Existence check
           if not _xml_has_nation_block(xml_text):
@@ -2154,6 +2139,117 @@ class CancelConfirmBtn(ui.Button):
         await interaction.response.send_message("❎ Cancelled.", ephemeral=True)
 
 
+# ====== Planner graph ======
+class ProductionGraph:
+    """
+    Compiled, read-only view of the static BUILDINGS catalog for the planner.
+
+    Built once at cog_load: the producer index (with the chosen producer of each
+    resource), resources in topological order (inputs before outputs), the
+    buildings needed per 1 unit/tick of every resource, and rendered planner pages
+    keyed by (kind, tier, name). The catalog never changes at runtime, so nothing
+    here is ever invalidated.
+    """
+
+    def __init__(self, buildings: Dict[str, Dict]):
+        self.buildings = buildings
+
+        # resource -> [(building_name, qty_out, building_tier), ...]
+        self.producer_index: Dict[str, List[Tuple[str, int, int]]] = {}
+        for bname, meta in buildings.items():
+            produces = meta.get("produces") or {}
+            tier = int(meta.get("tier", 0) or 0)
+            for res_name, qty in (produces.items() if isinstance(produces, dict) else []):
+                self.producer_index.setdefault(str(res_name), []).append((bname, int(qty or 1), tier))
+
+        # Prefer lowest tier; if tie, prefer higher output
+        self.producer: Dict[str, Tuple[str, int, int]] = {}
+        for res_name, candidates in self.producer_index.items():
+            bname, qty, tier = sorted(candidates, key=lambda x: (x[2] if x[2] is not None else 9999, -(x[1] or 0)))[0]
+            self.producer[res_name] = (bname, int(qty or 1), int(tier or 0))
+
+        self.order = self._topological_order()
+        self.requirements: Dict[str, Dict[str, float]] = {
+            res: self._accumulate(res, 1.0) for res in self.order
+        }
+        self.upkeep: Dict[str, float] = {
+            bname: float(meta.get("upkeep", 0) or 0) for bname, meta in buildings.items()
+        }
+        self.pages: Dict[Tuple[str, int, str], str] = {}
+        self.trees: Dict[Tuple[str, str], List[str]] = {}
+
+    def _inputs_of(self, res_name: str) -> Dict[str, int]:
+        chosen = self.producer.get(res_name)
+        if chosen is None:
+            return {}
+        inputs = (self.buildings.get(chosen[0]) or {}).get("inputs") or {}
+        return inputs if isinstance(inputs, dict) else {}
+
+    def _topological_order(self) -> List[str]:
+        """Every known resource, each after the inputs of its chosen producer (cycles are cut)."""
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+        resources = set(self.producer_index)
+        for meta in self.buildings.values():
+            resources.update(str(r) for r in (meta.get("inputs") or {}))
+
+        for root in sorted(resources):
+            if state.get(root):
+                continue
+            stack = [(root, iter(self._inputs_of(root)))]
+            state[root] = 1
+            while stack:
+                res, it = stack[-1]
+                child = next(it, None)
+                if child is None:
+                    stack.pop()
+                    state[res] = 2
+                    order.append(res)
+                elif not state.get(str(child)):
+                    state[str(child)] = 1
+                    stack.append((str(child), iter(self._inputs_of(str(child)))))
+        return order
+
+    def _accumulate(self, res_name: str, qty_needed: float) -> Dict[str, float]:
+        """
+        {building_name: count} needed to produce `qty_needed` of `res_name` per tick.
+        Base resources (no producer) are ignored; each building's inputs are expanded once.
+        """
+        totals: Dict[str, float] = {}
+        seen: Set[Tuple[str, str]] = set()
+        stack = [(res_name, qty_needed)]
+        while stack:
+            res, qty = stack.pop()
+            if qty <= 0:
+                continue
+            chosen = self.producer.get(res)
+            if chosen is None:
+                continue
+            bname, out_per_tick, _tier = chosen
+            if out_per_tick <= 0:
+                continue
+            needed_buildings = math.ceil(qty / float(out_per_tick))
+            totals[bname] = totals.get(bname, 0.0) + needed_buildings
+
+            key = ("building", bname.lower())
+            if key in seen:
+                continue
+            seen.add(key)
+            inputs = (self.buildings.get(bname) or {}).get("inputs") or {}
+            # Reversed so inputs are expanded in declaration order, depth-first
+            for in_res, in_qty in reversed(list(inputs.items() if isinstance(inputs, dict) else [])):
+                stack.append((str(in_res), float(in_qty) * needed_buildings))
+        return totals
+
+    def buildings_for(self, res_name: str, qty_per_tick: float = 1.0) -> Dict[str, float]:
+        if qty_per_tick == 1.0 and res_name in self.requirements:
+            return dict(self.requirements[res_name])
+        return self._accumulate(res_name, float(qty_per_tick))
+
+    def sum_upkeep(self, building_counts: Dict[str, float]) -> float:
+        return sum(self.upkeep.get(bname, 0.0) * float(cnt) for bname, cnt in building_counts.items())
+
+
 # ====== Cog ======
 class CityBuilder(commands.Cog):
     """
@@ -2182,9 +2278,12 @@ class CityBuilder(commands.Cog):
             team=None,              # "Team Celestial Nexus" / "Team Drowned World" / "Team Iron Empire"
         )
         self.next_tick_at: Optional[int] = None
-        self._producer_index = self._build_producer_index()
+        self._graph: Optional[ProductionGraph] = None
 
     async def cog_load(self):
+        # Compile the static production catalog once; the planner menus render from it
+        self._graph = ProductionGraph(BUILDINGS)
+        self._warm_planner_cache()
         # Start background tick after the bot is ready to load cogs
         # (safer than doing it in __init__)
         self.task = asyncio.create_task(self.resource_tick())
@@ -2195,6 +2294,12 @@ class CityBuilder(commands.Cog):
         if task:
             task.cancel()
 
+    def _ns(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so CityBuilder can reach NationStates.")
+        return cog.client
+
     @commands.command(name="cityrates", aliases=["rates", "conversionrates"])    
     async def city_rates(self, ctx: commands.Context):
         """
@@ -2242,19 +2347,17 @@ class CityBuilder(commands.Cog):
         for embed in embeds[1:]:
             await ctx.send(embed=embed)
 
-    def _build_producer_index(self):
-        """
-        Map resource -> list of (building_name, qty_out, building_tier).
-        Uses BUILDINGS[*]['produces'].
-        """
-        index = {}
-        buildings = getattr(self, "BUILDINGS", globals().get("BUILDINGS", {})) or {}
-        for bname, meta in buildings.items():
-            produces = meta.get("produces") or {}
-            tier = int(meta.get("tier", 0) or 0)
-            for res_name, qty in (produces.items() if isinstance(produces, dict) else []):
-                index.setdefault(str(res_name), []).append((bname, int(qty or 1), tier))
-        return index
+    @property
+    def graph(self) -> ProductionGraph:
+        """Compiled production catalog (built at cog_load; built on demand if used earlier)."""
+        if self._graph is None:
+            self._graph = ProductionGraph(BUILDINGS)
+        return self._graph
+
+    @property
+    def _producer_index(self) -> Dict[str, List[Tuple[str, int, int]]]:
+        """resource -> list of (building_name, qty_out, building_tier)."""
+        return self.graph.producer_index
 
     def _resource_tier(self, res_name: str) -> int:
         # Prefer explicit tier if present on RESOURCES
@@ -2313,89 +2416,18 @@ class CityBuilder(commands.Cog):
         or None if no producer exists.
         Strategy: prefer lowest tier; if tie, prefer higher output.
         """
-        candidates = self._producer_index.get(res_name, [])
-        if not candidates:
-            return None
-        # candidates: list of (bname, qty_out, tier)
-        # sort by (tier asc, output desc)
-        bname, qty, tier = sorted(candidates, key=lambda x: (x[2] if x[2] is not None else 9999, -(x[1] or 0)))[0]
-        return (bname, int(qty or 1), int(tier or 0))
+        return self.graph.producer.get(res_name)
 
     def _compute_per_tick_buildings(self, res_name: str, qty_per_tick: float = 1.0) -> Dict[str, float]:
         """
         Return {building_name: count_needed} to produce `qty_per_tick` of `res_name` each tick.
         """
-        totals: Dict[str, float] = {}
-        self._accumulate_buildings_for_resource(res_name, float(qty_per_tick), totals)
-        return totals
+        return self.graph.buildings_for(res_name, qty_per_tick)
 
     def _sum_upkeep(self, building_counts: Dict[str, float]) -> float:
         """Sum upkeep across all buildings given their counts."""
-        b_tbl = getattr(self, "BUILDINGS", globals().get("BUILDINGS", {})) or {}
-        total = 0.0
-        for bname, cnt in building_counts.items():
-            upkeep = float(b_tbl.get(bname, {}).get("upkeep", 0) or 0)
-            total += upkeep * float(cnt)
-        return total
+        return self.graph.sum_upkeep(building_counts)
 
-    def _accumulate_buildings_for_resource(self,res_name: str,qty_needed: float,totals: Dict[str, float],seen: Optional[Set[Tuple[str, str]]] = None,):
-        """
-        Add required buildings into `totals` to produce `qty_needed` of `res_name` per tick.
-        Base resources (no producer) are ignored.
-        """
-        if qty_needed <= 0:
-            return
-        if seen is None:
-            seen = set()
-    
-        chosen = self._choose_producer(res_name)
-        if chosen is None:
-            # No producer → treat as base input; ignore for building counts.
-            return
-    
-        bname, out_per_tick, _tier = chosen
-        if out_per_tick <= 0:
-            # Avoid divide-by-zero; treat as impossible
-            return
-    
-        # How many buildings are needed to cover qty_needed per tick?
-        needed_buildings = math.ceil(qty_needed / float(out_per_tick))
-        totals[bname] = totals.get(bname, 0.0) + needed_buildings
-    
-        # Recurse into this building's input resources
-        b_tbl = getattr(self, "BUILDINGS", globals().get("BUILDINGS", {})) or {}
-        meta = b_tbl.get(bname, {}) or {}
-        inputs = meta.get("inputs") or {}
-        key = ("building", bname.lower())
-        if key in seen:
-            return
-        seen.add(key)
-    
-        for in_res, in_qty_per_build in (inputs.items() if isinstance(inputs, dict) else []):
-            # total required per tick = (qty per building per tick) * (number of buildings)
-            self._accumulate_buildings_for_resource(
-                str(in_res),
-                float(in_qty_per_build) * needed_buildings,
-                totals,
-                seen,
-            )
-    
-        def _all_tiers(self) -> list[int]:
-            """Return a sorted list of all tiers seen in BUILDINGS/RESOURCES."""
-            tiers = set()
-            for meta in getattr(self, "BUILDINGS", globals().get("BUILDINGS", {})).values():
-                try:
-                    tiers.add(int(meta.get("tier", 0)))
-                except Exception:
-                    pass
-            for meta in getattr(self, "RESOURCES", globals().get("RESOURCES", {})).values():
-                try:
-                    tiers.add(int(meta.get("tier", 0)))
-                except Exception:
-                    pass
-            tiers = {t for t in tiers if t > 0}
-            return sorted(tiers) or [1]
-    
     def _items_by_tier(self, kind: str, tier: int) -> list[str]:
         """Return item names by kind ('building' or 'resource') and tier."""
         if kind == "building":
@@ -2440,6 +2472,11 @@ class CityBuilder(commands.Cog):
         return children
     
     def _planner_tree_lines(self,kind: str,name: str,depth: int = 0,seen: Optional[Set[Tuple[str, str]]] = None) -> List[str]:
+        if depth == 0 and seen is None:
+            key = (kind, name.lower())
+            if key not in self.graph.trees:
+                self.graph.trees[key] = self._planner_tree_lines(kind, name, 0, set())
+            return list(self.graph.trees[key])
         if seen is None:
             seen = set()
         key = (kind, name.lower())
@@ -2480,42 +2517,51 @@ class CityBuilder(commands.Cog):
             )
     
         # --------- COMPACT OUTPUT ONLY: buildings + total upkeep ----------
-        title = f"🗺️ Plan: {item}"
-    
-        if kind == "resource":
-            counts = self._compute_per_tick_buildings(item, 1.0)
+        e = discord.Embed(title=f"🗺️ Plan: {item}", description=self._planner_page(kind, tier, item))
+        e.set_footer(text=f"{'Resource' if kind == 'resource' else 'Building'} · Tier {tier}")
+        return e
+
+    def _planner_page(self, kind: str, tier: int, item: str) -> str:
+        """Planner description for one item, rendered once per (kind, tier, name)."""
+        key = (kind, int(tier), item)
+        page = self.graph.pages.get(key)
+        if page is not None:
+            return page
+
+        def _section(res_name: str) -> Tuple[str, float]:
+            counts = self._compute_per_tick_buildings(res_name, 1.0)
             total_upkeep = self._sum_upkeep(counts)
             if counts:
                 lines = "\n".join(f"• **{b}** ×{int(math.ceil(c))}" for b, c in sorted(counts.items(), key=lambda x: x[0].lower()))
             else:
                 lines = "— (No buildings required; base resource)"
-            desc = f"**Buildings needed to produce 1 × {item} per tick**\n{lines}\n\n**Total upkeep:** {total_upkeep:.0f}"
-            e = discord.Embed(title=title, description=desc)
-            e.set_footer(text=f"Resource · Tier {tier}")
-            return e
-    
-        # kind == "building"
-        b_tbl = getattr(self, "BUILDINGS", globals().get("BUILDINGS", {})) or {}
-        meta = b_tbl.get(item, {}) or {}
-        produces = meta.get("produces") or {}
-        if isinstance(produces, dict) and produces:
-            sections: List[str] = []
-            # Show a compact section for **each** output, normalized to 1 per tick
-            for out_res in sorted(produces.keys(), key=str.lower):
-                counts = self._compute_per_tick_buildings(str(out_res), 1.0)
-                total_upkeep = self._sum_upkeep(counts)
-                if counts:
-                    lines = "\n".join(f"• **{b}** ×{int(math.ceil(c))}" for b, c in sorted(counts.items(), key=lambda x: x[0].lower()))
-                else:
-                    lines = "— (No buildings required; base resource)"
-                sections.append(f"**1 × {out_res} per tick**\n{lines}\n**Total upkeep:** {total_upkeep:.0f}")
-            desc = "\n\n".join(sections)
+            return lines, total_upkeep
+
+        if kind == "resource":
+            lines, total_upkeep = _section(item)
+            page = f"**Buildings needed to produce 1 × {item} per tick**\n{lines}\n\n**Total upkeep:** {total_upkeep:.0f}"
         else:
-            desc = "_No output mapping found for this building._"
-    
-        e = discord.Embed(title=title, description=desc)
-        e.set_footer(text=f"Building · Tier {tier}")
-        return e
+            meta = BUILDINGS.get(item, {}) or {}
+            produces = meta.get("produces") or {}
+            if isinstance(produces, dict) and produces:
+                sections: List[str] = []
+                # Show a compact section for **each** output, normalized to 1 per tick
+                for out_res in sorted(produces.keys(), key=str.lower):
+                    lines, total_upkeep = _section(str(out_res))
+                    sections.append(f"**1 × {out_res} per tick**\n{lines}\n**Total upkeep:** {total_upkeep:.0f}")
+                page = "\n\n".join(sections)
+            else:
+                page = "_No output mapping found for this building._"
+
+        self.graph.pages[key] = page
+        return page
+
+    def _warm_planner_cache(self) -> None:
+        """Render every planner page reachable from the tier menus."""
+        for tier in self._all_tiers():
+            for kind in ("building", "resource"):
+                for item in self._items_by_tier(kind, tier):
+                    self._planner_page(kind, tier, item)
 
 
 
@@ -3206,20 +3252,26 @@ class CityBuilder(commands.Cog):
     def _get_building_count_sync(self, data: dict, name: str) -> int:
         return int((data.get("buildings") or {}).get(name, {}).get("count", 0))
     
-    async def _worker_capacity(self, user: discord.abc.User) -> int:
-        d = await self.config.user(user).all()
-        houses = self._get_building_count_sync(d, "house")
+    def _worker_capacity_sync(self, data: dict) -> int:
+        houses = self._get_building_count_sync(data, "house")
         cap_per = int(BUILDINGS["house"].get("capacity", 1))
         return houses * cap_per
-    
-    async def _get_staffing(self, user: discord.abc.User) -> Dict[str, int]:
+
+    async def _worker_capacity(self, user: discord.abc.User) -> int:
         d = await self.config.user(user).all()
-        st: Dict[str, int] = {k: int(v) for k, v in (d.get("staffing") or {}).items()}
+        return self._worker_capacity_sync(d)
+    
+    def _get_staffing_sync(self, data: dict) -> Dict[str, int]:
+        st: Dict[str, int] = {k: int(v) for k, v in (data.get("staffing") or {}).items()}
         # ensure keys for all buildings
-        bld = d.get("buildings") or {}
+        bld = data.get("buildings") or {}
         for b in bld.keys():
             st.setdefault(b, 0)
         return st
+
+    async def _get_staffing(self, user: discord.abc.User) -> Dict[str, int]:
+        d = await self.config.user(user).all()
+        return self._get_staffing_sync(d)
     
     async def _set_staffing(self, user: discord.abc.User, st: Dict[str, int]) -> None:
         # sanitize negative values
@@ -3229,7 +3281,13 @@ class CityBuilder(commands.Cog):
     async def _reconcile_staffing(self, user: discord.abc.User) -> None:
         """Clamp assignments to existing buildings, capacity, and worker counts."""
         d = await self.config.user(user).all()
-        st = await self._get_staffing(user)
+        st, unassigned = self._reconcile_staffing_sync(d)
+        await self._set_staffing(user, st)
+        await self.config.user(user).workers_unassigned.set(unassigned)
+
+    def _reconcile_staffing_sync(self, d: dict) -> Tuple[Dict[str, int], int]:
+        """Pure version of _reconcile_staffing: returns (clean staffing, workers_unassigned)."""
+        st = self._get_staffing_sync(d)
         bld = d.get("buildings") or {}
     
         # Remove staffing for buildings the user no longer owns
@@ -3243,7 +3301,7 @@ class CityBuilder(commands.Cog):
         # Sum assigned, clamp to workers_hired and capacity
         assigned = sum(st.values())
         hired = int(d.get("workers_hired") or 0)
-        cap = await self._worker_capacity(user)
+        cap = self._worker_capacity_sync(d)
         max_assignable = min(hired, cap)
         if assigned > max_assignable:
             # Unassign extras in arbitrary order
@@ -3257,8 +3315,7 @@ class CityBuilder(commands.Cog):
         # Fix workers_unassigned accordingly
         assigned = sum(st.values())
         unassigned = max(0, hired - assigned)
-        await self._set_staffing(user, st)
-        await self.config.user(user).workers_unassigned.set(unassigned)
+        return {k: max(0, int(v)) for k, v in st.items()}, unassigned
 
 
     async def _get_wallet_wc(self, user: discord.abc.User) -> float:
@@ -3357,7 +3414,7 @@ class CityBuilder(commands.Cog):
             return await ctx.send("❌ No nation linked yet. Run `$city` and complete setup first.")
     
         try:
-            currency, scores, xml_text = await ns_fetch_currency_and_scales(target_nation, DEFAULT_SCALES)
+            currency, scores, xml_text = await ns_fetch_currency_and_scales(self._ns(), target_nation, DEFAULT_SCALES)
             rate, details = compute_currency_rate(scores)
         except Exception as e:
             return await ctx.send(f"❌ Failed to fetch from NationStates.\n`{e}`")
@@ -3524,124 +3581,124 @@ class CityBuilder(commands.Cog):
             await asyncio.sleep(TICK_SECONDS)
 
     async def process_all_ticks(self):
+        """
+        Tick every city in one pass: a single all_users() read, every city's
+        production computed in memory, then every changed city written back
+        together. Nothing awaits between the read and the writes being queued.
+        """
         all_users = await self.config.all_users()
-        for user_id in all_users:
-            user = self.bot.get_user(user_id)
-            if user:
-                await self.process_tick(user)
-    
+        updated: Dict[int, dict] = {}
+        for user_id, d in all_users.items():
+            if not d.get("buildings") or not self.bot.get_user(int(user_id)):
+                continue
+            changes = self._tick_city(d)
+            if changes and any(d.get(k) != v for k, v in changes.items()):
+                d.update(changes)
+                updated[int(user_id)] = d
+        if updated:
+            await asyncio.gather(*(self.config.user_from_id(uid).set(d) for uid, d in updated.items()))
+
     async def process_tick(self, user: discord.abc.User):
+        """Tick a single city (same engine as process_all_ticks)."""
+        async with self.config.user(user).all() as d:
+            changes = self._tick_city(d)
+            if changes:
+                d.update(changes)
+
+    def _tick_city(self, d: dict) -> Optional[dict]:
         """
-        Pay-as-you-go production:
-        - Sort staffed building *units* by descending tier.
-        - For each unit, compute marginal WC cost (its upkeep + 1 worker's marginal wage incl. housing overflow).
-        - Convert that marginal WC to local; if treasury can cover it and inputs exist, run the unit:
-            * Deduct local funds
-            * Consume inputs
-            * Add outputs
-            * Count that worker as 'used' (affects next unit's marginal wage via overflow)
-        - Stop when funds or inputs run out.
+        Pay-as-you-go production for one city's data, returning the fields to write back:
+        - Staffed buildings run in descending tier order, aggregated per building.
+        - Each unit costs its upkeep + 1 worker's marginal wage (incl. housing overflow),
+          converted to local currency. Below housing capacity that cost is flat, so a
+          whole building's units are paid for in one step; past capacity they're paid
+          one at a time as the overflow multiplier grows.
+        - A building runs as many units as inputs and treasury allow. If the treasury
+          can't cover the next unit, the tick stops; missing inputs only skip that building.
+        Money is handled in integer cents so repeated payments don't drift.
         """
-        d = await self.config.user(user).all()
-        bld = d.get("buildings", {})
+        bld = d.get("buildings") or {}
         if not bld:
-            return
+            return None
     
         # Ensure staffing consistency
-        await self._reconcile_staffing(user)
-        st = await self._get_staffing(user)
-    
-        # Snapshot inventory + treasury (local)
-        new_resources = dict(d.get("resources", {}))
-        bank_local = trunc2(float(d.get("bank", 0.0)))
+        st, unassigned = self._reconcile_staffing_sync(d)
+        changes = {"staffing": st, "workers_unassigned": unassigned}
     
-        # Quick exit: nothing staffed
-        any_staffed = any(min(int((bld.get(b) or {}).get("count", 0)), int(st.get(b, 0))) > 0 for b in bld.keys())
-        if not any_staffed:
-            return
-    
-        # Capacity affects wage overflow
-        cap = await self._worker_capacity(user)
-    
-        # --- Build a flat list of staffed building *units* with their tier/name ---
-        # Each element is (tier:int, name:str)
-        units: list[tuple[int, str]] = []
+        # Staffed building groups, highest tier first
+        groups: list[tuple[int, str, int]] = []
         for bname, info in bld.items():
             if bname not in BUILDINGS:
                 continue
-            cnt = int(info.get("count", 0))
-            staffed = min(cnt, int(st.get(bname, 0)))
-            if staffed <= 0:
-                continue
-            tier = int(BUILDINGS[bname].get("tier", 0))
-            units.extend((tier, bname) for _ in range(staffed))
-    
-        # Highest tier first
-        units.sort(key=lambda t: (-t[0], t[1]))
+            staffed = min(int(info.get("count", 0)), int(st.get(bname, 0)))
+            if staffed > 0:
+                groups.append((int(BUILDINGS[bname].get("tier", 0)), bname, staffed))
+        if not groups:
+            return changes
+        groups.sort(key=lambda t: (-t[0], t[1]))
+    
+        # Snapshot inventory + treasury (local, in cents)
+        new_resources = dict(d.get("resources") or {})
+        bank_cents = round(trunc2(float(d.get("bank", 0.0))) * 100)
+        rate = float(d.get("wc_to_local_rate") or 1.0)
+        cap = self._worker_capacity_sync(d)
     
-        # Helper to get marginal wage (WC) of adding the Nth paid worker
-        def _marginal_wage_wc(n_workers_before: int) -> float:
-            # total(n) - total(n-1), using the same overflow schedule as your global wage function
+        def _unit_cents(upkeep_wc: float, n_workers_before: int) -> int:
+            # total(n) - total(n-1), using the same overflow schedule as the global wage function
             before = self._compute_wages_wc_from_numbers(n_workers_before, cap)
             after = self._compute_wages_wc_from_numbers(n_workers_before + 1, cap)
-            return trunc2(after - before)
+            unit_wc = trunc2(upkeep_wc + trunc2(after - before))
+            return round(trunc2(trunc2(unit_wc) * rate) * 100)
     
         used_workers = 0  # number of workers we actually fund this tick
     
-        # For each staffed unit in priority order, attempt to fund and run it
-        for tier, bname in units:
+        for tier, bname, staffed in groups:
             meta = BUILDINGS[bname]
-            # Per-unit upkeep in WC
             upkeep_wc = trunc2(float(meta.get("upkeep", 0.0)))
+            inputs = {k: int(v) for k, v in (meta.get("inputs") or {}).items() if int(v) > 0}
     
-            # Marginal wage (WC) for adding this worker
-            wage_wc = _marginal_wage_wc(used_workers)
-    
-            # Total marginal WC for this unit
-            unit_wc = trunc2(upkeep_wc + wage_wc)
-    
-            # Convert to local to compare against treasury
-            unit_local = await self._wc_to_local(user, unit_wc)
-            if bank_local + 1e-9 < unit_local:
-                # Not enough funds to run more units; stop early
-                break
-    
-            # Check if we have inputs to run ONE unit
-            inputs = {k: int(v) for k, v in (meta.get("inputs") or {}).items()}
-            can_run = True
+            # Units we have inputs for
+            runnable = staffed
             for res, need in inputs.items():
-                if need <= 0:
-                    continue
-                if int(new_resources.get(res, 0)) < need:
-                    can_run = False
+                runnable = min(runnable, int(new_resources.get(res, 0)) // need)
+    
+            # Units we can pay for
+            ran = 0
+            out_of_funds = False
+            while ran < runnable:
+                cost = _unit_cents(upkeep_wc, used_workers)
+                if used_workers < cap:
+                    batch = min(runnable - ran, cap - used_workers)
+                    if cost > 0:
+                        batch = min(batch, bank_cents // cost)
+                else:
+                    batch = 1 if bank_cents >= cost else 0
+                if batch <= 0:
+                    out_of_funds = True
                     break
-            if not can_run:
-                # Skip this unit; maybe lower-tier units can still run
-                continue
-    
-            # PAY for this unit
-            bank_local = trunc2(bank_local - unit_local)
-    
-            # CONSUME inputs
-            for res, need in inputs.items():
-                if need <= 0:
-                    continue
-                new_resources[res] = int(new_resources.get(res, 0)) - need
-                if new_resources[res] < 0:
-                    new_resources[res] = 0  # safety
-    
-            # PRODUCE outputs
-            for res, amt in (meta.get("produces") or {}).items():
-                if amt <= 0:
-                    continue
-                new_resources[res] = int(new_resources.get(res, 0)) + int(amt)
+                bank_cents -= batch * cost
+                used_workers += batch
+                ran += batch
+    
+            if ran:
+                # CONSUME inputs
+                for res, need in inputs.items():
+                    new_resources[res] = max(0, int(new_resources.get(res, 0)) - need * ran)
+                # PRODUCE outputs
+                for res, amt in (meta.get("produces") or {}).items():
+                    if amt <= 0:
+                        continue
+                    new_resources[res] = int(new_resources.get(res, 0)) + int(amt) * ran
     
-            # Count this worker as funded/used
-            used_workers += 1
+            if out_of_funds:
+                break
+            # Remaining units lack inputs; the tick still stops if they couldn't have been paid for
+            if ran < staffed and bank_cents < _unit_cents(upkeep_wc, used_workers):
+                break
     
-        # Save final inventory and treasury
-        await self.config.user(user).resources.set(new_resources)
-        await self.config.user(user).bank.set(bank_local)
+        changes["resources"] = new_resources
+        changes["bank"] = bank_cents / 100.0
+        return changes
 
 
 
@@ -3827,7 +3884,7 @@ class RecalcRateBtn(ui.Button):
             return await interaction.response.send_message("You need to link a Nation first. Use `$city` and run setup.", ephemeral=True)
 
         try:
-            currency, scores, xml_text = await ns_fetch_currency_and_scales(nation)
+            currency, scores, xml_text = await ns_fetch_currency_and_scales(cog._ns(), nation)
             rate, details = compute_currency_rate(scores)
             # save
             await cog.config.user(interaction.user).ns_currency.set(currency)
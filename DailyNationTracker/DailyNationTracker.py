@@ -1,7 +1,5 @@
 import discord
 from discord.ext import commands, tasks
-import aiohttp
-import xml.etree.ElementTree as ET
 import json
 import os
 from datetime import datetime
@@ -22,6 +20,12 @@ class DailyNationTracker(commands.Cog):
     def cog_unload(self):
         self.daily_task.cancel()
 
+    def _ns(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so DailyNationTracker can reach NationStates.")
+        return cog.client
+
     def load_data(self):
         if os.path.exists(self.data_file):
             with open(self.data_file, "r") as f:
@@ -74,16 +78,12 @@ class DailyNationTracker(commands.Cog):
             await channel.send("Daily loop done!")
 
     async def get_nations(self):
-        headers = {"User-Agent": "9005"}  # Preset header
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.api_url, headers=headers) as resp:
-                if resp.status != 200:
-                    print("Failed to fetch data")
-                    return []
-                text = await resp.text()
-                root = ET.fromstring(text)
-                nations_str = root.find("NATIONS").text
-                return nations_str.split(":")
+        ns = self._ns()
+        async with ns.stream(url=self.api_url, user_agent="9005", priority="background") as resp:
+            if resp.status != 200:
+                print("Failed to fetch data")
+                return []
+            return [n.name async for n in ns.iter_records(resp, "nation")]
 
     async def send_tg_links(self, threshold, template_id):
         nations_to_tg = [n for n, d in self.nation_data.items() if d["days"] == threshold]
@@ -195,37 +195,30 @@ class DailyNationTracker(commands.Cog):
     async def importcensusdays(self, ctx):
         """Import days from census rank scale 80. Uses rank score as days (rounded down)."""
         await ctx.send("Starting import of census data...")
-        headers = {"User-Agent": "9005"}
         start = 1
         total_imported = 0
-
-        async with aiohttp.ClientSession() as session:
-            while True:
-                url = f"https://www.nationstates.net/cgi-bin/api.cgi?region=the_wellspring&q=censusranks;scale=80&start={start}"
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status != 200:
-                        await ctx.send(f"Failed to fetch census data at start={start}.")
-                        break
-                    text = await resp.text()
-                    root = ET.fromstring(text)
-                    nations = root.findall(".//NATION")
-
-                    if not nations:
-                        break
-
-                    for nation in nations:
-                        name = nation.find("NAME").text
-                        score = float(nation.find("SCORE").text)
-                        self.nation_data[name] = {"first_seen": "imported", "days": int(score)}
-                        total_imported += 1
-
-                    start += len(nations)
-
-                    remaining = int(resp.headers.get("X-Ratelimit-Remaining", 100))
-                    reset_time = int(resp.headers.get("X-Ratelimit-Reset", 10))
-                    if remaining < 20:
-                        await ctx.send(f"Sleeping for {reset_time} seconds due to rate limiting...")
-                        await asyncio.sleep(reset_time)
+        ns = self._ns()
+
+        # Bulk pull: background lane, NSApi paces it against everything else
+        while True:
+            url = f"https://www.nationstates.net/cgi-bin/api.cgi?region=the_wellspring&q=censusranks;scale=80&start={start}"
+            resp = await ns.get(url=url, user_agent="9005", priority="background", ttl=0)
+            if resp.status != 200:
+                await ctx.send(f"Failed to fetch census data at start={start}.")
+                break
+            root = resp.xml()
+            nations = root.findall(".//NATION")
+
+            if not nations:
+                break
+
+            for nation in nations:
+                name = nation.find("NAME").text
+                score = float(nation.find("SCORE").text)
+                self.nation_data[name] = {"first_seen": "imported", "days": int(score)}
+                total_imported += 1
+
+            start += len(nations)
 
         self.save_data()
         await ctx.send(f"Import complete. Total nations updated: {total_imported}.")
@@ -45,11 +45,18 @@ class DisForumDaBest(commands.Cog):
             edit_threads={},
             edit_counts={}
         )
+        self.watched = {}  # guild_id: watched forum id, so other threads skip Config
+
+    async def cog_load(self):
+        for guild_id, data in (await self.config.all_guilds()).items():
+            if data.get("watched_forum"):
+                self.watched[guild_id] = data["watched_forum"]
 
     @commands.command()
     @commands.guild_only()
     async def set_forum_watch(self, ctx, forum: discord.ForumChannel):
         await self.config.guild(ctx.guild).watched_forum.set(forum.id)
+        self.watched[ctx.guild.id] = forum.id
         await ctx.send(f"Set watched forum to: {forum.name}")
 
     @commands.command()
@@ -58,6 +65,14 @@ class DisForumDaBest(commands.Cog):
         await self.config.guild(ctx.guild).mod_locker.set(forum.id)
         await ctx.send(f"Set mod locker to: {forum.name}")
 
+    def message_routes(self):
+        """Filters for MessageRouter: only posts in the watched forum's threads."""
+        return [{
+            "handler": self.on_message,
+            "threads": True,
+            "check": lambda m: m.channel.parent_id == self.watched.get(m.guild.id),
+        }]
+
     @commands.Cog.listener()
     async def on_message(self, message):
         if message.author.bot or not isinstance(message.channel, discord.Thread):
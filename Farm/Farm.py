@@ -1121,6 +1121,10 @@ class Farm(commands.Cog):
             f"{author.mention} paid {humanize_number(amount)} gold to {member.mention}!"
         )
     
+    def message_routes(self):
+        """Filters for MessageRouter: every non-bot guild message."""
+        return [{"handler": self.on_message}]
+
     @commands.Cog.listener()
     async def on_message(self, message: Message):
         if message.author.bot or message.guild is None:
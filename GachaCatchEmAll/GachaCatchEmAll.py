@@ -2,14 +2,19 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import os
 import random
 import re
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple, Union, Callable
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union, Callable
 
 import discord
 from redbot.core import commands, Config, checks
+from redbot.core.data_manager import cog_data_path
 import aiohttp
 
 import io
@@ -32,6 +37,8 @@ ALL_BADGES = [f"gym{i}" for i in range(1, 9)]
 
 
 POKEAPI_BASE = "https://pokeapi.co/api/v2"
+SPECIES_REFRESH_SECONDS = 7 * 24 * 3600  # re-check PokéAPI for new species/moves weekly
+SPECIES_RETRY_SECONDS = 600              # wait after a failed or incomplete build
 
 def is_admin():
     async def predicate(ctx: commands.Context):
@@ -280,11 +287,20 @@ def _extract_known_move_names(move_list: List[str]) -> List[str]:
         names.append(nm)
     return names
 
-async def _pick_random_damage_move_of_type(type_name: str, avoid: List[str]) -> Optional[Tuple[str, str, str, int]]:
+async def _pick_random_damage_move_of_type(
+    type_name: str, avoid: List[str], index: Optional["SpeciesIndex"] = None
+) -> Optional[Tuple[str, str, str, int]]:
     """
     Returns (name, type, style, power) or None. Avoids 'avoid' names if possible.
+    Uses the species index's damage moves when it has this type.
     """
     import random
+    local = index.damage_moves(type_name) if index else []
+    if local:
+        fresh = [m for m in local if m["name"] not in avoid]
+        m = random.choice(fresh or local)
+        return (m["name"], m["type"], m["class"], int(m["power"]))
+
     pool = await _pokeapi_moves_for_type(type_name)
     if not pool:
         return None
@@ -391,7 +407,7 @@ async def _do_tutor_once(cog, ctx: commands.Context, uid: str, *, invoked_by_id:
 
     taught = None
     for t in rng_types:
-        taught = await _pick_random_damage_move_of_type(t, avoid=known_names)
+        taught = await _pick_random_damage_move_of_type(t, avoid=known_names, index=cog.species)
         if taught:
             break
 
@@ -482,6 +498,321 @@ class MoveTutorView(discord.ui.View):
 
 
 
+class SpeciesIndex:
+    """
+    On-disk PokéAPI mirror: every species (id, name, types, base stats/BST, sprite),
+    Pokédex ids per type, and damage moves per type. Built once in the background,
+    topped up incrementally after that, and bulk-importable from a local JSON dump,
+    so encounters, catches, NPC teams and move pools never wait on PokéAPI.
+    """
+
+    SAVE_EVERY = 100  # persist progress every N new records while building
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.species: Dict[int, Dict[str, Any]] = {}
+        self.type_ids: Dict[str, List[int]] = {}
+        self.type_moves: Dict[str, List[Dict[str, Any]]] = {}
+        self.moves: Dict[str, Dict[str, Any]] = {}
+        self.status_moves: Set[str] = set()  # checked, not damage moves: don't refetch
+        self.built_at: Optional[int] = None
+        self._dirty = False
+        self._refresh_lock = asyncio.Lock()
+        self._save_lock = asyncio.Lock()
+
+    # ---- persistence ----
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                self._load_dict(json.load(fh))
+        except (OSError, ValueError) as e:
+            print(f"[GachaCatchEmAll] species index unreadable, rebuilding: {e}")
+
+    def _load_dict(self, data: Dict[str, Any]) -> None:
+        for entry in (data.get("species") or []):
+            self.ingest_pokemon(entry)
+        for t, ids in (data.get("type_ids") or {}).items():
+            self.type_ids[t] = sorted({int(i) for i in ids})
+        for t, moves in (data.get("type_moves") or {}).items():
+            for mv in moves:
+                self.ingest_move(mv)
+        self.status_moves.update(data.get("status_moves") or [])
+        self.built_at = data.get("built_at") or self.built_at
+        self._reindex_moves()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        # Copies, so a build can keep mutating the index while this is written out.
+        return {
+            "built_at": self.built_at,
+            "species": [self.species[pid] for pid in sorted(self.species)],
+            "type_ids": {t: list(ids) for t, ids in self.type_ids.items()},
+            "type_moves": {t: list(ms) for t, ms in self.type_moves.items()},
+            "status_moves": sorted(self.status_moves),
+        }
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, self.path)
+
+    async def save(self) -> None:
+        """Snapshot the index on the loop, then write it to a temp file and rename it in a worker thread."""
+        async with self._save_lock:
+            data = self._snapshot()
+            self._dirty = False
+            try:
+                await asyncio.to_thread(self._write, data)
+            except OSError:
+                self._dirty = True
+                raise
+
+    def import_dump(self, path: str) -> Tuple[int, int]:
+        """
+        Load a local JSON dump: either this index's own format, or a list of raw
+        PokéAPI /pokemon (and /move) objects. Returns (species, moves) now indexed.
+        """
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        if isinstance(data, dict) and ("species" in data or "type_moves" in data):
+            self._load_dict(data)
+        else:
+            for obj in (data if isinstance(data, list) else [data]):
+                if not isinstance(obj, dict):
+                    continue
+                if "damage_class" in obj:
+                    self.ingest_move(obj)
+                else:
+                    self.ingest_pokemon(obj)
+            self._reindex_moves()
+        self._index_types(self.species.values())
+        self.built_at = self.built_at or int(time.time())
+        self._dirty = True
+        return len(self.species), len(self.moves)
+
+    def _index_types(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """Merge each species' own types into type_ids, so ids_for_type works without /type calls."""
+        by_type = {t: set(ids) for t, ids in self.type_ids.items()}
+        for entry in entries:
+            for t in entry.get("types") or []:
+                by_type.setdefault(t, set()).add(entry["id"])
+        self.type_ids = {t: sorted(ids) for t, ids in by_type.items()}
+
+    # ---- normalisation ----
+
+    @staticmethod
+    def _sprite_of(raw: Dict[str, Any]) -> Optional[str]:
+        sprites = raw.get("sprites") or {}
+        return (
+            ((sprites.get("other") or {}).get("official-artwork") or {}).get("front_default")
+            or sprites.get("front_default")
+        )
+
+    def ingest_pokemon(self, raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Index a PokéAPI /pokemon object (or an already-compact entry)."""
+        try:
+            pid = int(raw["id"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if "bst" in raw:
+            entry = {
+                "id": pid,
+                "name": str(raw.get("name", "unknown")),
+                "types": [str(t) for t in raw.get("types") or []],
+                "stats": {str(k): int(v) for k, v in (raw.get("stats") or {}).items()},
+                "bst": int(raw["bst"]),
+                "sprite": raw.get("sprite"),
+            }
+        else:
+            stats = {s["stat"]["name"]: int(s["base_stat"]) for s in raw.get("stats", [])}
+            entry = {
+                "id": pid,
+                "name": str(raw.get("name", "unknown")),
+                "types": [t["type"]["name"] for t in sorted(raw.get("types", []), key=lambda t: t.get("slot", 0))],
+                "stats": stats,
+                "bst": sum(stats.values()),
+                "sprite": self._sprite_of(raw),
+            }
+        self.species[pid] = entry
+        self._dirty = True
+        return entry
+
+    def ingest_move(self, raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Index a PokéAPI /move object (or a compact move); only damage moves are kept."""
+        name = str(raw.get("name") or "").strip().lower()
+        if not name:
+            return None
+        dc = raw.get("damage_class")
+        style = (dc.get("name") if isinstance(dc, dict) else dc) or raw.get("class") or "status"
+        mtype = raw.get("type")
+        mtype = (mtype.get("name") if isinstance(mtype, dict) else mtype) or "normal"
+        power = raw.get("power")
+        if style not in ("physical", "special") or not power or int(power) <= 0:
+            return None
+        move = {
+            "name": name,
+            "type": str(mtype),
+            "class": style,
+            "power": int(power),
+            "accuracy": raw.get("accuracy"),
+            "pp": raw.get("pp"),
+        }
+        self.moves[name] = move
+        self._dirty = True
+        return move
+
+    def _reindex_moves(self) -> None:
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for move in self.moves.values():
+            by_type.setdefault(move["type"], []).append(move)
+        self.type_moves = {t: sorted(ms, key=lambda m: m["name"]) for t, ms in by_type.items()}
+
+    # ---- lookups ----
+
+    @property
+    def ready(self) -> bool:
+        """True once a full build (or an import) has completed; partial builds keep the live fallback."""
+        return self.built_at is not None and bool(self.species)
+
+    def get(self, pid: int) -> Optional[Dict[str, Any]]:
+        return self.species.get(int(pid))
+
+    def encounter_ids(self) -> List[int]:
+        """Species that can actually be shown (have a sprite)."""
+        return [pid for pid, e in self.species.items() if e.get("sprite")]
+
+    def ids_for_type(self, type_name: str) -> List[int]:
+        return self.type_ids.get(type_name.lower().strip(), [])
+
+    def damage_moves(self, type_name: str) -> List[Dict[str, Any]]:
+        return self.type_moves.get(type_name.lower().strip(), [])
+
+    def move(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.moves.get(_slugify_move_name(name or ""))
+
+    @staticmethod
+    def as_pokeapi(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """The subset of the PokéAPI /pokemon shape the cog reads (types, stats, sprites, name)."""
+        return {
+            "id": entry["id"],
+            "name": entry["name"],
+            "types": [{"slot": i + 1, "type": {"name": t}} for i, t in enumerate(entry["types"])],
+            "stats": [{"base_stat": v, "stat": {"name": k}} for k, v in entry["stats"].items()],
+            "sprites": {
+                "front_default": entry.get("sprite"),
+                "other": {"official-artwork": {"front_default": entry.get("sprite")}},
+            },
+        }
+
+    @staticmethod
+    def move_details(move: Dict[str, Any]) -> Dict[str, Any]:
+        """Same shape as GachaCatchEmAll._get_move_details."""
+        return {
+            "name": move["name"],
+            "power": move["power"],
+            "accuracy": move.get("accuracy"),
+            "pp": move.get("pp"),
+            "type": {"name": move["type"]},
+            "damage_class": {"name": move["class"]},
+        }
+
+    # ---- building ----
+
+    @staticmethod
+    def _id_from_url(url: str) -> Optional[int]:
+        # URLs look like https://pokeapi.co/api/v2/pokemon/25/
+        try:
+            return int(url.rstrip("/").split("/")[-1])
+        except (ValueError, AttributeError):
+            return None
+
+    async def refresh(self, session: aiohttp.ClientSession, concurrency: int = 8) -> Tuple[int, int, int]:
+        """
+        Fetch whatever PokéAPI has that the index doesn't: new species, type
+        memberships, and damage moves. Returns (new species, new moves,
+        failed species/type fetches).
+
+        Raises RuntimeError without touching the index if PokéAPI won't give
+        the species or type listing. A first build with failed fetches keeps
+        its progress but is not marked built, so `ready` stays False.
+        """
+        async with self._refresh_lock:
+            sem = asyncio.Semaphore(concurrency)
+            added = {"species": 0, "moves": 0, "unsaved": 0}
+            failed = 0
+
+            async def get_json(url: str) -> Optional[Dict[str, Any]]:
+                async with sem:
+                    try:
+                        async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as resp:
+                            if resp.status != 200:
+                                return None
+                            return await resp.json()
+                    except (aiohttp.ClientError, asyncio.TimeoutError):
+                        return None
+
+            async def bump(kind: str) -> None:
+                added[kind] += 1
+                added["unsaved"] += 1
+                if added["unsaved"] >= self.SAVE_EVERY:
+                    added["unsaved"] = 0
+                    await self.save()
+
+            async def fetch_species(pid: int) -> None:
+                nonlocal failed
+                raw = await get_json(f"{POKEAPI_BASE}/pokemon/{pid}")
+                if raw is None:
+                    failed += 1
+                elif self.ingest_pokemon(raw):
+                    await bump("species")
+
+            async def fetch_move(name: str) -> None:
+                raw = await get_json(f"{POKEAPI_BASE}/move/{name}")
+                if not raw:
+                    return
+                if self.ingest_move(raw):
+                    await bump("moves")
+                else:
+                    self.status_moves.add(name)
+
+            listing = await get_json(f"{POKEAPI_BASE}/pokemon?limit=20000")
+            if listing is None:
+                raise RuntimeError("PokéAPI species listing unavailable")
+            types = await get_json(f"{POKEAPI_BASE}/type?limit=100")
+            if types is None:
+                raise RuntimeError("PokéAPI type listing unavailable")
+
+            missing = []
+            for item in listing.get("results", []):
+                pid = self._id_from_url(item.get("url", ""))
+                if pid and pid not in self.species:
+                    missing.append(pid)
+            await asyncio.gather(*(fetch_species(pid) for pid in missing))
+
+            type_names = [t["name"] for t in types.get("results", []) if t.get("name")]
+            type_data = await asyncio.gather(*(get_json(f"{POKEAPI_BASE}/type/{t}") for t in type_names))
+            wanted_moves = set()
+            for t, data in zip(type_names, type_data):
+                if not data:
+                    failed += 1
+                    continue
+                ids = {self._id_from_url(p.get("pokemon", {}).get("url", "")) for p in data.get("pokemon", [])}
+                self.type_ids[t] = sorted(i for i in ids if i)
+                wanted_moves.update(m["name"] for m in data.get("moves", []) if isinstance(m, dict) and m.get("name"))
+            known = set(self.moves) | self.status_moves
+            await asyncio.gather(*(fetch_move(m) for m in sorted(wanted_moves - known)))
+
+            self._reindex_moves()
+            # A top-up of a built index always moves on; an incomplete first build doesn't count.
+            if not failed or self.built_at is not None:
+                self.built_at = int(time.time())
+            await self.save()
+            return added["species"], added["moves"], failed
+
+
 class GachaCatchEmAll(commands.Cog):
     """Pokémon encounter & multi-throw gacha using Wellcoins + PokéAPI."""
 
@@ -527,9 +858,10 @@ class GachaCatchEmAll(commands.Cog):
         self._type_moves_cache: Dict[str, List[str]] = {}   # type -> move names
         self._move_cache: Dict[str, Dict[str, Any]] = {}    # move name -> move json (power/type/etc)
         self._session: Optional[aiohttp.ClientSession] = None
-        self._pokemon_list: Optional[List[Dict[str, Any]]] = None  # list of {name, url}
-        self._pokemon_cache: Dict[int, Dict[str, Any]] = {}  # id -> pokemon data
+        self._pokemon_list: Optional[List[Dict[str, Any]]] = None  # list of {name, url}, live fallback only
         self._list_lock = asyncio.Lock()
+        self.species = SpeciesIndex(cog_data_path(self) / "species_index.json")
+        self._species_task: Optional[asyncio.Task] = None
 
 
 
@@ -1275,9 +1607,44 @@ class GachaCatchEmAll(commands.Cog):
         if user:
             await self.config.user(user).clear()
 
-    def cog_unload(self):
+    async def cog_load(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.species.load)
+        self._species_task = asyncio.create_task(self._species_refresher())
+
+    async def cog_unload(self):
+        if self._species_task:
+            self._species_task.cancel()
+        if self.species._dirty:
+            try:
+                await self.species.save()
+            except OSError as e:
+                print(f"[GachaCatchEmAll] couldn't save species index: {e}")
         if self._session and not self._session.closed:
-            asyncio.create_task(self._session.close())
+            await self._session.close()
+
+    async def _species_refresher(self):
+        """Build the species index on first load, then top it up weekly."""
+        while True:
+            built_at = self.species.built_at or 0
+            wait = built_at + SPECIES_REFRESH_SECONDS - time.time()
+            if self.species.ready and wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            try:
+                new_species, new_moves, failed = await self.species.refresh(await self._get_session())
+                print(
+                    f"[GachaCatchEmAll] species index: +{new_species} species, +{new_moves} moves"
+                    + (f", {failed} fetches failed" if failed else "")
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[GachaCatchEmAll] species index refresh failed: {e}")
+                await asyncio.sleep(SPECIES_RETRY_SECONDS)
+                continue
+            if not self.species.ready:
+                # First build came back incomplete; retry later instead of straight away.
+                await asyncio.sleep(SPECIES_RETRY_SECONDS)
 
     async def _get_session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
@@ -1484,6 +1851,9 @@ class GachaCatchEmAll(commands.Cog):
         PokeAPI /type/{type} has 'moves'. We cache the list of move names by type.
         """
         t = type_name.lower().strip()
+        local = self.species.damage_moves(t)
+        if local:
+            return [m["name"] for m in local]
         if t in self._type_moves_cache:
             return self._type_moves_cache[t]
         data = await self._fetch_json(f"{POKEAPI_BASE}/type/{t}")
@@ -1503,7 +1873,7 @@ class GachaCatchEmAll(commands.Cog):
             "damage_class": {"name": "physical"}
           }
     
-        Lookup order: in-memory -> local DB -> PokéAPI (then save to DB).
+        Lookup order: in-memory -> species index -> local DB -> PokéAPI (then save to DB).
         """
         key = (move_name or "").strip().lower()
         if not key:
@@ -1513,6 +1883,10 @@ class GachaCatchEmAll(commands.Cog):
         # 1) In-memory cache
         if key in self._move_cache:
             return self._move_cache[key]
+
+        indexed = self.species.move(key)
+        if indexed:
+            return self.species.move_details(indexed)
     
         # 2) Local persistent DB
         try:
@@ -1709,6 +2083,9 @@ class GachaCatchEmAll(commands.Cog):
         Returns a list of Pokédex IDs (ints). Filters out forms without numeric IDs.
         """
         type_name = type_name.lower().strip()
+        local = self.species.ids_for_type(type_name)
+        if local:
+            return local
         if type_name in self._type_cache:
             return self._type_cache[type_name]
     
@@ -1793,16 +2170,23 @@ class GachaCatchEmAll(commands.Cog):
             return None
 
     async def _get_pokemon(self, poke_id: int) -> Dict[str, Any]:
-        if poke_id in self._pokemon_cache:
-            return self._pokemon_cache[poke_id]
+        entry = self.species.get(poke_id)
+        if entry:
+            return SpeciesIndex.as_pokeapi(entry)
         data = await self._fetch_json(f"{POKEAPI_BASE}/pokemon/{poke_id}")
-        self._pokemon_cache[poke_id] = data
+        self.species.ingest_pokemon(data)  # saved with the next index refresh/unload
         return data
     
     async def _random_encounter(self, ball_key: str, allowed_ids: Optional[List[int]] = None) -> Tuple[Dict[str, Any], int, int]:
         """Roll a random Pokémon, optionally restricted to allowed_ids, biased by base stat totals depending on ball.
         Returns (pokemon_data, poke_id, bst)
         """
+        if self.species.ready:
+            rolled = self._random_encounter_local(ball_key, allowed_ids)
+            if rolled is not None:
+                return rolled
+
+        # Index still building: sample live from PokéAPI
         await self._ensure_pokemon_list()
         assert self._pokemon_list is not None
     
@@ -1861,22 +2245,44 @@ class GachaCatchEmAll(commands.Cog):
     
         # Weighting by ball
         bias = BALL_TUNING[ball_key]["weight_bias"]
-        weights: List[int] = []
-        for _, pdata, bst in triples:
-            if bias < 0:
-                w = max(1, 800 - bst)
-            elif bias == 0:
-                w = max(1, 100 + abs(500 - bst) // 5)
-            elif bias == 1:
-                w = max(1, bst)
-            else:
-                w = max(1, bst * bst // 50)
-            weights.append(w)
+        weights = [self._ball_weight(bias, bst) for _, _, bst in triples]
     
         idx = random.choices(range(len(triples)), weights=weights, k=1)[0]
         pid, pdata, bst = triples[idx]
         return pdata, pid, bst
 
+    @staticmethod
+    def _ball_weight(bias: int, bst: int) -> int:
+        if bias < 0:
+            return max(1, 800 - bst)
+        if bias == 0:
+            return max(1, 100 + abs(500 - bst) // 5)
+        if bias == 1:
+            return max(1, bst)
+        return max(1, bst * bst // 50)
+
+    def _random_encounter_local(
+        self, ball_key: str, allowed_ids: Optional[List[int]] = None
+    ) -> Optional[Tuple[Dict[str, Any], int, int]]:
+        """
+        _random_encounter against the species index: same sampling and ball
+        weighting, no network. None when the index has nothing to offer for
+        allowed_ids, so the caller samples live instead.
+        """
+        if allowed_ids:
+            candidates = [pid for pid in allowed_ids if (self.species.get(pid) or {}).get("sprite")]
+        else:
+            candidates = self.species.encounter_ids()
+        if not candidates:
+            return None
+
+        sample_sizes = {"pokeball": 8, "greatball": 10, "ultraball": 12, "masterball": 14}
+        ids = random.sample(candidates, k=min(sample_sizes.get(ball_key, 10), len(candidates)))
+        bias = BALL_TUNING[ball_key]["weight_bias"]
+        entries = [self.species.get(pid) for pid in ids]
+        entry = random.choices(entries, weights=[self._ball_weight(bias, e["bst"]) for e in entries], k=1)[0]
+        return SpeciesIndex.as_pokeapi(entry), entry["id"], entry["bst"]
+
 
     @staticmethod
     def _compute_catch_chance(ball_key: str, bst: int) -> float:
@@ -3451,6 +3857,44 @@ class GachaCatchEmAll(commands.Cog):
 
         await ctx.reply(f"🧹 Reset Poké data for {wiped} users.")
 
+    @gachaadmin.command(name="species")
+    @checks.admin()
+    async def gacha_species(self, ctx: commands.Context, action: str = "status", *, path: Optional[str] = None):
+        """Species index: `status`, `refresh` (top up from PokéAPI now), or `import <path>` (local JSON dump).
+        Example: `[p]gachaadmin species import /data/pokeapi_dump.json`"""
+        action = action.lower()
+        if action == "import":
+            if not path or not os.path.isfile(path):
+                await ctx.reply("Give a path to a JSON dump on the bot host.")
+                return
+            try:
+                n_species, n_moves = await asyncio.get_running_loop().run_in_executor(
+                    None, self.species.import_dump, path
+                )
+                await self.species.save()
+            except (OSError, ValueError) as e:
+                await ctx.reply(f"Import failed: {e}")
+                return
+            await ctx.reply(f"📥 Species index now holds **{n_species}** species and **{n_moves}** damage moves.")
+            return
+        if action == "refresh":
+            try:
+                async with ctx.typing():
+                    new_species, new_moves, failed = await self.species.refresh(await self._get_session())
+            except RuntimeError as e:
+                await ctx.reply(f"Refresh failed: {e}")
+                return
+            await ctx.reply(
+                f"🔄 Added **{new_species}** species and **{new_moves}** damage moves."
+                + (f" {failed} fetches failed; run it again later." if failed else "")
+            )
+            return
+        built = f"<t:{self.species.built_at}:R>" if self.species.built_at else "never"
+        await ctx.reply(
+            f"📚 Species index: **{len(self.species.species)}** species, "
+            f"**{len(self.species.type_ids)}** types, **{len(self.species.moves)}** damage moves · last built {built}"
+        )
+
     @gachaadmin.command(name="setcosts")
     @checks.admin()
     async def gacha_setcosts(
@@ -162,7 +162,7 @@ class CheckGoldButton(Button):
     async def callback(self, interaction: discord.Interaction):
         try:
             user_id = interaction.user
-            gold = await self.cog.config_gold.user(user_id).master_balance()
+            gold = await self.cog._nexus().get_balance(user_id)
             await interaction.response.send_message(f"You have {gold:,.2f} Wellcoins.", ephemeral=True)
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {e}", ephemeral=True)
@@ -1007,7 +1007,6 @@ class Hungar(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(None, identifier=1234567890)
-        self.config_gold = Config.get_conf(None, identifier=345678654456, force_registration=False)
         self.config.register_guild(
             districts={},
             players={},
@@ -1042,6 +1041,16 @@ class Hungar(commands.Cog):
     def cog_unload(self):
         self.check_trigger_loop.cancel()
 
+    # --------- Economy helpers (NexusExchange) ---------
+
+    def _nexus(self):
+        cog = self.bot.get_cog("NexusExchange")
+        if not cog:
+            raise RuntimeError(
+                "NexusExchange cog not found. Please load it so the Hunger Games can use Wellcoins."
+            )
+        return cog
+
     def get_upcoming_saturday_hours(self):
         # Target Saturday in your local timezone (e.g., 'America/Chicago' for Central Time)
         tz = ZoneInfo("America/Chicago") 
@@ -1295,7 +1304,7 @@ class Hungar(commands.Cog):
             await interaction.response.send_message("❌ That tribute isn't alive or doesn't exist.", ephemeral=True)
             return
 
-        user_gold = await self.config_gold.user(user).master_balance()
+        user_gold = await self._nexus().get_balance(user)
 
         if amount.lower() == "all":
             bet_amount = user_gold
@@ -1312,7 +1321,13 @@ class Hungar(commands.Cog):
             return
 
         # Deduct and record the bet
-        await self.config_gold.user(user).master_balance.set(user_gold - bet_amount)
+        try:
+            await self._nexus().take_wellcoins(user, bet_amount, force=False)
+        except ValueError:
+            await interaction.response.send_message(
+                f"❌ You don't have enough Wellcoins. Your balance: {await self._nexus().get_balance(user)}", ephemeral=True
+            )
+            return
         user_bets = await self.config.user(user).bets()
 
         if tribute in user_bets:
@@ -1384,9 +1399,7 @@ class Hungar(commands.Cog):
             await ctx.author.add_roles(role)
         
         # Award 100 gold to the player in user config
-        user_gold = await self.config_gold.user(ctx.author).master_balance()
-        user_gold += 100
-        await self.config_gold.user(ctx.author).master_balance.set(user_gold)
+        await self._nexus().add_wellcoins(ctx.author, 100)
     
 
         # Assign random district and stats
@@ -1923,11 +1936,12 @@ class Hungar(commands.Cog):
         # Distribute winnings to users (double only if they bet the actual winner)
         for user_id, user_data in all_users.items():
             bets = user_data.get("bets", {})
-            user_balance = await self.config_gold.user_from_id(user_id).master_balance()
+            winnings = 0
             for t_id, b in bets.items():
                 if winner_id is not None and t_id == winner_id:
-                    user_balance += int(b.get("amount", 0)) * 2
-            await self.config_gold.user_from_id(user_id).master_balance.set(user_balance)
+                    winnings += int(b.get("amount", 0)) * 2
+            if winnings:
+                await self._nexus().add_wellcoins(discord.Object(id=int(user_id)), winnings)
             await self.config.user_from_id(user_id).bets.set({})  # clear bets
     
         # Give bonus to winner (only if there is a human, non-NPC winner)
@@ -1937,9 +1951,7 @@ class Hungar(commands.Cog):
             and not winner.get("is_npc", False)
             and isinstance(winner_id, str) and winner_id.isdigit()
         ):
-            wb = await self.config_gold.user_from_id(int(winner_id)).master_balance()
-            wb += winner_bonus
-            await self.config_gold.user_from_id(int(winner_id)).master_balance.set(wb)
+            await self._nexus().add_wellcoins(discord.Object(id=int(winner_id)), winner_bonus)
             await ctx.send(f"💰 {winner['name']} receives **{winner_bonus} Wellcoins** (half of the pot)!")
     
         # Update kill counts for non-NPCs
@@ -2407,7 +2419,7 @@ class Hungar(commands.Cog):
             
         for user_id, user_data in all_users.items():
             bets = user_data.get("bets", {})
-            user_gold = await self.config_gold.user_from_id(user_id).master_balance()
+            earnings = 0
     
             day_counter = config.get("day_counter", 0)
     
@@ -2416,9 +2428,10 @@ class Hungar(commands.Cog):
                         
                     daily_return = max(int(bet_data["amount"] * min(0.01 * day_counter/4, 0.20)),1)  
                     bet_data["daily_earnings"] += daily_return
-                    user_gold += daily_return
+                    earnings += daily_return
             
-            await self.config_gold.user_from_id(user_id).master_balance.set(user_gold)
+            if earnings:
+                await self._nexus().add_wellcoins(discord.Object(id=int(user_id)), earnings)
             await self.config.user_from_id(user_id).bets.set(bets)
 
 
@@ -2469,7 +2482,7 @@ class Hungar(commands.Cog):
     @hunger.command()
     async def check_wellcoins(self, ctx):
         """Check your current wellcoins."""
-        user_gold = await self.config_gold.user(ctx.author).master_balance()
+        user_gold = await self._nexus().get_balance(ctx.author)
         await ctx.send(f"{ctx.author.mention}, you currently have {user_gold} Wellcoins.")
 
     @hunger.command()
@@ -2707,14 +2720,20 @@ class Hungar(commands.Cog):
     
             cost = calc_sponsor_cost(day=day, score=ri["score"], rank=ri["rank"], bet_share=ri["bet_share"])
     
-            user_gold = await self.config_gold.user(user).master_balance()
+            user_gold = await self._nexus().get_balance(user)
             if user_gold < cost:
                 await interaction.response.send_message(
                     f"❌ You need at least {cost} Wellcoins to sponsor someone. Your balance: {user_gold}", ephemeral=True
                 )
                 return
     
-            await self.config_gold.user(user).master_balance.set(user_gold - cost)
+            try:
+                await self._nexus().take_wellcoins(user, cost, force=False)
+            except ValueError:
+                await interaction.response.send_message(
+                    f"❌ You need at least {cost} Wellcoins to sponsor someone. Your balance: {await self._nexus().get_balance(user)}", ephemeral=True
+                )
+                return
     
             # Apply random boost
             tribute_data = players[tribute]
@@ -420,14 +420,21 @@ class Kingdom(commands.Cog):
     async def update_completed_personal_projects(self, user, completed_projects):
         await self.config.user(user).completed_personal_projectz.set(completed_projects)
         
+    def _nexus(self):
+        cog = self.bot.get_cog("NexusExchange")
+        if not cog:
+            raise RuntimeError("NexusExchange cog not found. Please load it so the Kingdom can use Wellcoins.")
+        return cog
+
     async def get_balance(self, user: discord.Member):
-        return await self.config.user(user).master_balance()
+        return await self._nexus().get_balance(user)
     
     async def update_balance(self, user: discord.Member, amount: int):
-        balance = await self.get_balance(user)
-        new_balance = max(0, balance + amount)
-        await self.config.user(user).master_balance.set(new_balance)
-        return new_balance
+        nexus = self._nexus()
+        try:
+            return await nexus.modify_wellcoins(user, amount, reason="kingdom")
+        except ValueError:
+            return await nexus.set_wellcoins(user, 0, reason="kingdom")
     
     async def get_projects(self, guild):
         return await self.config.guild(guild).projects()
@@ -1,7 +1,4 @@
-from collections import defaultdict
 import time
-import xml.etree.ElementTree as ET
-import aiohttp
 import discord
 from redbot.core import Config, commands
 
@@ -20,92 +17,26 @@ class MarketMovers(commands.Cog):
         }
         self.config.register_global(**default_global)
 
+    def _trades(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so MarketMovers can read card trades.")
+        return cog.trades
+
     async def update_leaderboard_cache(self):
         hard_stop = await self.config.hard_stop_time()
         nations = await self.config.target_nations()
         
-        unique_participation_set = set()
-        current_beforetime = int(time.time())
-        base_url = "https://www.nationstates.net/cgi-bin/api.cgi?q=cards+trades"
-        user_agent = "MarketMoversBot (Contact: your-email@example.com)"
-        
-        headers = {"User-Agent": user_agent}
+        # Top up the shared trade archive (one API call once it's warm) and make
+        # sure it reaches back to the hard stop; scoring is then one indexed query.
+        archive = self._trades()
+        await archive.sync(floor=hard_stop, priority="interactive")
+        if hard_stop > 0:
+            await archive.backfill(hard_stop, priority="interactive")
         
-        async with aiohttp.ClientSession() as session:
-            page_count = 0
-            while page_count < 25:  # Safety cap
-                page_count += 1
-                url = f"{base_url};limit=1000;beforetime={current_beforetime}"
-                
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status == 429:
-                        await asyncio.sleep(15)
-                        continue
-                    if resp.status != 200:
-                        break
-                    
-                    xml_data = await resp.text()
-                
-                try:
-                    root = ET.fromstring(xml_data)
-                except ET.ParseError:
-                    break
-                
-                trades = root.findall(".//TRADE")
-                if not trades:
-                    break
-                
-                oldest_timestamp = None
-                
-                for trade in trades:
-                    ts_el = trade.find("TIMESTAMP")
-                    if ts_el is None or not ts_el.text:
-                        continue
-                    try:
-                        timestamp = int(ts_el.text.strip())
-                    except ValueError:
-                        continue
-                    
-                    if oldest_timestamp is None or timestamp < oldest_timestamp:
-                        oldest_timestamp = timestamp
-                        
-                    if hard_stop > 0 and timestamp < hard_stop:
-                        continue
-                        
-                    price_el = trade.find("PRICE")
-                    if price_el is None or not price_el.text or not price_el.text.strip():
-                        continue
-                    try:
-                        if float(price_el.text.strip()) <= 0:
-                            continue
-                    except ValueError:
-                        continue
-                        
-                    card_id = trade.find("CARDID")
-                    season = trade.find("SEASON")
-                    buyer = trade.find("BUYER")
-                    seller = trade.find("SELLER")
-                    
-                    c_id = card_id.text.strip() if card_id is not None and card_id.text else "unknown"
-                    s_id = season.text.strip() if season is not None and season.text else "1"
-                    
-                    if buyer is not None and buyer.text:
-                        unique_participation_set.add((buyer.text.strip().lower(), c_id, s_id))
-                    if seller is not None and seller.text:
-                        unique_participation_set.add((seller.text.strip().lower(), c_id, s_id))
-                    
-                if not oldest_timestamp or oldest_timestamp >= current_beforetime:
-                    break
-                if hard_stop > 0 and oldest_timestamp <= hard_stop:
-                    break
-                current_beforetime = oldest_timestamp
-                
-        # Calculate scores
-        tallies = defaultdict(int)
-        for player, _, _ in unique_participation_set:
-            tallies[player] += 1
-            
-        scores = {n: tallies[n.strip().lower()] for n in nations}
+        # Unique (nation, card, season) paid trades, bought or sold
+        tallies = await archive.participation(nations, since=hard_stop)
+        scores = {n: tallies.get(n.strip().lower().replace(" ", "_"), 0) for n in nations}
         sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
         
         # Save cache and timestamp
@@ -0,0 +1,284 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional
+
+import discord
+from redbot.core import commands
+
+log = logging.getLogger("red.wellspring.messagerouter")
+
+Handler = Callable[[discord.Message], Awaitable[Any]]
+
+# Handlers slower than this are logged as they happen, not just counted.
+SLOW_HANDLER = 0.5
+
+
+class Route:
+    """
+    One handler plus the filters a message has to pass to reach it.
+
+    Filters are plain id sets so matching never awaits. A route is filed in
+    the routing table under the narrowest filter it has (channels, then
+    thread parents, then guilds); everything else is checked in matches().
+    """
+
+    __slots__ = ("cog", "name", "handler", "guilds", "channels", "parents",
+                 "authors", "bots", "dms", "threads", "check")
+
+    def __init__(
+        self,
+        cog: commands.Cog,
+        handler: Handler,
+        *,
+        guilds: Optional[Iterable[int]] = None,
+        channels: Optional[Iterable[int]] = None,
+        parents: Optional[Iterable[int]] = None,
+        authors: Optional[Iterable[int]] = None,
+        bots: bool = False,
+        dms: bool = False,
+        threads: Optional[bool] = None,
+        check: Optional[Callable[[discord.Message], bool]] = None,
+    ):
+        self.cog = cog
+        self.name = f"{cog.qualified_name}.{getattr(handler, '__name__', 'handler')}"
+        self.handler = handler
+        self.guilds: Optional[FrozenSet[int]] = frozenset(guilds) if guilds is not None else None
+        self.channels: Optional[FrozenSet[int]] = frozenset(channels) if channels is not None else None
+        self.parents: Optional[FrozenSet[int]] = frozenset(parents) if parents is not None else None
+        self.authors: Optional[FrozenSet[int]] = frozenset(authors) if authors is not None else None
+        self.bots = bots            # deliver bot and webhook messages too
+        self.dms = dms              # deliver messages outside guilds
+        self.threads = threads      # True: threads only, False: no threads, None: either
+        self.check = check          # last, cheapest-to-skip sync predicate
+
+    def matches(self, message: discord.Message) -> bool:
+        if message.author.bot and not self.bots:
+            return False
+        guild = message.guild
+        if guild is None:
+            if not self.dms:
+                return False
+        elif self.guilds is not None and guild.id not in self.guilds:
+            return False
+        channel = message.channel
+        if self.channels is not None and channel.id not in self.channels:
+            return False
+        in_thread = isinstance(channel, discord.Thread)
+        if self.threads is not None and in_thread != self.threads:
+            return False
+        if self.parents is not None and (not in_thread or channel.parent_id not in self.parents):
+            return False
+        if self.authors is not None and message.author.id not in self.authors:
+            return False
+        return self.check is None or bool(self.check(message))
+
+
+class RouteStats:
+    __slots__ = ("calls", "errors", "total", "worst")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, elapsed: float, failed: bool):
+        self.calls += 1
+        self.errors += failed
+        self.total += elapsed
+        self.worst = max(self.worst, elapsed)
+
+
+class MessageRouter(commands.Cog):
+    """
+    One on_message listener for every cog that opts in.
+
+    A cog opts in by defining message_routes(), returning a list of dicts
+    with a "handler" coroutine and any Route filters (guilds, channels,
+    parents, authors, bots, dms, threads, check). While the router is
+    loaded it takes over that cog's own on_message listeners, so a message
+    only reaches the handlers whose filters it passes, and each handler's
+    latency is recorded. Unloading the router hands the listeners back.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._routes: Dict[str, List[Route]] = {}          # cog name -> routes
+        self._detached: Dict[str, List[Callable]] = {}     # cog name -> listeners we removed
+        self._by_channel: Dict[int, List[Route]] = {}
+        self._by_parent: Dict[int, List[Route]] = {}
+        self._by_guild: Dict[int, List[Route]] = {}
+        self._anywhere: List[Route] = []
+        self.stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+        self.messages = 0
+        self.delivered = 0
+
+    async def cog_load(self):
+        for cog in list(self.bot.cogs.values()):
+            self.register(cog)
+
+    async def cog_unload(self):
+        for name in list(self._routes):
+            self.unregister(name)
+
+    @commands.Cog.listener()
+    async def on_cog_add(self, cog: commands.Cog):
+        self.register(cog)
+
+    @commands.Cog.listener()
+    async def on_cog_remove(self, cog: commands.Cog):
+        self.unregister(cog.qualified_name)
+
+    # ---- routing table ----
+
+    def register(self, cog: commands.Cog) -> int:
+        """Adopt a cog's message_routes(); returns how many routes it added."""
+        factory = getattr(cog, "message_routes", None)
+        if cog is self or not callable(factory):
+            return 0
+        name = cog.qualified_name
+        self.unregister(name)
+        routes = [Route(cog, **dict(spec)) for spec in factory()]
+        self._routes[name] = routes
+        detached = [fn for event, fn in cog.get_listeners() if event == "on_message"]
+        for fn in detached:
+            self.bot.remove_listener(fn, "on_message")
+        self._detached[name] = detached
+        self._compile()
+        log.info("MessageRouter: %s routed through %d route(s)", name, len(routes))
+        return len(routes)
+
+    def unregister(self, name: str):
+        """Drop a cog's routes and give back any listeners taken from it."""
+        if self._routes.pop(name, None) is None:
+            return
+        cog = self.bot.get_cog(name)
+        for fn in self._detached.pop(name, []):
+            # Only restore listeners of a cog that is still loaded.
+            if cog is not None and getattr(fn, "__self__", None) is cog:
+                self.bot.add_listener(fn, "on_message")
+        self._compile()
+
+    def _compile(self):
+        by_channel: Dict[int, List[Route]] = defaultdict(list)
+        by_parent: Dict[int, List[Route]] = defaultdict(list)
+        by_guild: Dict[int, List[Route]] = defaultdict(list)
+        anywhere: List[Route] = []
+        for routes in self._routes.values():
+            for route in routes:
+                if route.channels is not None:
+                    for cid in route.channels:
+                        by_channel[cid].append(route)
+                elif route.parents is not None:
+                    for pid in route.parents:
+                        by_parent[pid].append(route)
+                elif route.guilds is not None:
+                    for gid in route.guilds:
+                        by_guild[gid].append(route)
+                else:
+                    anywhere.append(route)
+        self._by_channel = dict(by_channel)
+        self._by_parent = dict(by_parent)
+        self._by_guild = dict(by_guild)
+        self._anywhere = anywhere
+
+    def candidates(self, message: discord.Message) -> List[Route]:
+        channel = message.channel
+        found = list(self._by_channel.get(channel.id, ()))
+        parent_id = getattr(channel, "parent_id", None)
+        if parent_id is not None:
+            found.extend(self._by_parent.get(parent_id, ()))
+        if message.guild is not None:
+            found.extend(self._by_guild.get(message.guild.id, ()))
+        found.extend(self._anywhere)
+        return [route for route in found if route.matches(message)]
+
+    # ---- dispatch ----
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        self.messages += 1
+        try:
+            routes = self.candidates(message)
+        except Exception:
+            log.exception("MessageRouter: route matching failed")
+            return
+        if not routes:
+            return
+        stale = {r.cog.qualified_name for r in routes if self.bot.cogs.get(r.cog.qualified_name) is not r.cog}
+        if stale:
+            # The cog went away without a cog_remove event reaching us.
+            for name in stale:
+                self.unregister(name)
+            routes = [r for r in routes if r.cog.qualified_name not in stale]
+            if not routes:
+                return
+        self.delivered += len(routes)
+        # Handlers ran as independent listeners before; keep one from holding up another.
+        await asyncio.gather(*(self._run(route, message) for route in routes))
+
+    async def _run(self, route: Route, message: discord.Message):
+        start = time.perf_counter()
+        failed = False
+        try:
+            await route.handler(message)
+        except Exception:
+            failed = True
+            log.exception("MessageRouter: %s failed on message %s", route.name, message.id)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats[route.name].add(elapsed, failed)
+            if elapsed > SLOW_HANDLER:
+                log.warning("MessageRouter: %s took %.2fs", route.name, elapsed)
+
+    # ---- commands ----
+
+    @commands.group()
+    @commands.is_owner()
+    async def msgrouter(self, ctx: commands.Context):
+        """Shared on_message dispatch."""
+
+    @msgrouter.command(name="routes")
+    async def msgrouter_routes(self, ctx: commands.Context):
+        """List every routed handler and its filters."""
+        if not self._routes:
+            return await ctx.send("No cogs are routed through the message router.")
+        lines = []
+        for routes in self._routes.values():
+            for route in routes:
+                filters = [
+                    f"{label}={len(ids)}"
+                    for label, ids in (("guilds", route.guilds), ("channels", route.channels),
+                                       ("parents", route.parents), ("authors", route.authors))
+                    if ids is not None
+                ]
+                if route.threads is not None:
+                    filters.append("threads" if route.threads else "no threads")
+                if route.bots:
+                    filters.append("bots")
+                if route.check is not None:
+                    filters.append("check")
+                lines.append(f"{route.name}: {', '.join(filters) or 'all guild messages'}")
+        await ctx.send("```\n" + "\n".join(lines)[:1900] + "\n```")
+
+    @msgrouter.command(name="stats")
+    async def msgrouter_stats(self, ctx: commands.Context):
+        """Per-handler call counts and latency since load."""
+        lines = [f"Messages seen: {self.messages} | handler calls: {self.delivered}"]
+        ranked = sorted(self.stats.items(), key=lambda kv: kv[1].total, reverse=True)
+        for name, s in ranked:
+            avg = s.total / s.calls * 1000 if s.calls else 0.0
+            lines.append(
+                f"{name}: {s.calls} calls, avg {avg:.1f} ms, max {s.worst * 1000:.0f} ms, "
+                f"total {s.total:.1f} s, {s.errors} errors"
+            )
+        await ctx.send("```\n" + "\n".join(lines)[:1900] + "\n```")
+
+    @msgrouter.command(name="reset")
+    async def msgrouter_reset(self, ctx: commands.Context):
+        """Clear the latency counters."""
+        self.stats.clear()
+        self.messages = self.delivered = 0
+        await ctx.send("Message router stats cleared.")
@@ -0,0 +1,5 @@
+from .MessageRouter import MessageRouter
+
+
+async def setup(bot):
+    await bot.add_cog(MessageRouter(bot))
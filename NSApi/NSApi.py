@@ -0,0 +1,777 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+import aiohttp
+import xml.etree.ElementTree as ET
+from redbot.core import commands, Config
+from redbot.core.data_manager import cog_data_path
+
+log = logging.getLogger("red.wellspring.nsapi")
+
+API_URL = "https://www.nationstates.net/cgi-bin/api.cgi"
+DEFAULT_UA = "9003"
+
+# NationStates allows 50 requests per 30 seconds per IP. We keep 10 in reserve
+# for anything running outside this bot and spend the rest through a bucket that
+# never exceeds the budget in any 30 second window, even without headers.
+RATE_LIMIT = 50
+RATE_WINDOW = 30.0
+RATE_RESERVE = 10
+
+DEFAULT_TTL = 10.0
+CACHE_MAX_ENTRIES = 256
+MAX_CONNECTIONS = 8
+MAX_RETRIES = 2
+
+# Lower runs first. Cogs pass the lane name so they don't need to import this module.
+LANES = {"interactive": 0, "background": 1}
+
+# Requests carrying these are per-nation and must never be shared or cached.
+PRIVATE_HEADERS = {"x-password", "x-pin", "x-autologin"}
+
+STREAM_CHUNK = 16384
+
+TRADES_PAGE = 1000       # NS caps cards+trades at 1000 rows per call
+TRADES_MAX_PAGES = 25
+TRADES_MAX_AGE = 60.0    # a sync within this many seconds is reused by the next caller
+
+
+def _int_header(headers: Mapping[str, str], *names: str) -> Optional[int]:
+    for name in names:
+        raw = headers.get(name)
+        if raw is None:
+            continue
+        try:
+            return int(float(raw))
+        except ValueError:
+            continue
+    return None
+
+
+# ---- streamed records ----
+
+class Trade(NamedTuple):
+    cardid: int
+    season: int
+    buyer: str
+    seller: str
+    category: str
+    price: Optional[float]  # None when the trade had a blank price (a gift)
+    timestamp: int
+
+
+class Auction(NamedTuple):
+    cardid: int
+    season: int
+    name: str
+    category: str
+
+
+class CensusPoint(NamedTuple):
+    scale: int
+    timestamp: int
+    score: float
+
+
+class Nation(NamedTuple):
+    name: str
+
+
+def _text(elem: ET.Element, tag: str) -> str:
+    return (elem.findtext(tag) or "").strip()
+
+
+def _int(raw: str) -> Optional[int]:
+    try:
+        return int(raw)
+    except ValueError:
+        return None
+
+
+def _build_trade(elem: ET.Element, stack: List[ET.Element]) -> Iterator[Trade]:
+    cardid, season = _int(_text(elem, "CARDID")), _int(_text(elem, "SEASON"))
+    if cardid is None or season is None:
+        return
+    price_raw = _text(elem, "PRICE")
+    try:
+        price = float(price_raw) if price_raw else None
+    except ValueError:
+        price = None
+    yield Trade(
+        cardid,
+        season,
+        _text(elem, "BUYER"),
+        _text(elem, "SELLER"),
+        _text(elem, "CATEGORY").lower(),
+        price,
+        _int(_text(elem, "TIMESTAMP")) or 0,
+    )
+
+
+def _build_auction(elem: ET.Element, stack: List[ET.Element]) -> Iterator[Auction]:
+    cardid, season = _int(_text(elem, "CARDID")), _int(_text(elem, "SEASON"))
+    if cardid is None or season is None:
+        return
+    yield Auction(cardid, season, _text(elem, "NAME") or "Unknown Card", _text(elem, "CATEGORY") or "Unknown Card")
+
+
+def _build_census_point(elem: ET.Element, stack: List[ET.Element]) -> Iterator[CensusPoint]:
+    scale = next((_int(e.get("id", "")) for e in reversed(stack) if e.tag == "SCALE"), None)
+    ts = _int(_text(elem, "TIMESTAMP"))
+    try:
+        score = float(_text(elem, "SCORE"))
+    except ValueError:
+        return
+    if scale is not None and ts is not None:
+        yield CensusPoint(scale, ts, score)
+
+
+def _build_nations(elem: ET.Element, stack: List[ET.Element]) -> Iterator[Nation]:
+    # Region lists are ':'-separated, WA member lists ','-separated
+    for name in (elem.text or "").replace(",", ":").split(":"):
+        name = name.strip()
+        if name:
+            yield Nation(name)
+
+
+RECORD_KINDS: Dict[str, Tuple[str, Callable[[ET.Element, List[ET.Element]], Iterator[Any]]]] = {
+    "trade": ("TRADE", _build_trade),
+    "auction": ("AUCTION", _build_auction),
+    "census": ("POINT", _build_census_point),
+    "nation": ("NATIONS", _build_nations),
+}
+
+
+class RecordParser:
+    """
+    Incremental XML -> records. Feed it bytes as they arrive; each finished
+    record element is turned into a typed record and then detached from its
+    parent, so memory stays flat no matter how long the document is.
+    """
+
+    def __init__(self, kind: str):
+        self.tag, self._build = RECORD_KINDS[kind]
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack: List[ET.Element] = []
+
+    def feed(self, data: bytes) -> List[Any]:
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> List[Any]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[Any]:
+        out: List[Any] = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._stack.append(elem)
+                continue
+            self._stack.pop()
+            if elem.tag != self.tag:
+                continue
+            out.extend(self._build(elem, self._stack))
+            if self._stack:
+                self._stack[-1].remove(elem)
+            else:
+                elem.clear()
+        return out
+
+
+def parse_records(data: bytes, kind: str) -> List[Any]:
+    """Parse an in-memory document (fixtures, cached bodies)."""
+    parser = RecordParser(kind)
+    out = parser.feed(data)
+    out.extend(parser.close())
+    return out
+
+
+class NSResponse:
+    """A fully read API response. Safe to share between coalesced callers."""
+
+    __slots__ = ("status", "headers", "body", "cached")
+
+    def __init__(self, status: int, headers: Mapping[str, str], body: bytes, cached: bool = False):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.cached = cached
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def xml(self) -> ET.Element:
+        return ET.fromstring(self.body)
+
+    def records(self, kind: str) -> List[Any]:
+        return parse_records(self.body, kind)
+
+
+class RateGovernor:
+    """
+    Token bucket for the shared NS budget.
+
+    Burst and refill are both half the usable budget, so bursts plus refill stay
+    under `limit - reserve` per window. Ratelimit-Remaining on every response pulls
+    the bucket down to what the server actually has left (other processes on the
+    same IP count too), and Ratelimit-Reset / Retry-After block it until the window
+    turns over.
+    """
+
+    def __init__(self, limit: int = RATE_LIMIT, window: float = RATE_WINDOW, reserve: int = RATE_RESERVE):
+        self.reserve = reserve
+        self.window = window
+        self.capacity = max(1.0, (limit - reserve) / 2)
+        self.rate = self.capacity / window
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self._stamp = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def delay(self) -> float:
+        """Seconds until a token can be taken."""
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def take(self):
+        self._refill(time.monotonic())
+        self.tokens -= 1
+
+    def observe(self, status: int, headers: Mapping[str, str]):
+        now = time.monotonic()
+        self._refill(now)
+        remaining = _int_header(headers, "Ratelimit-Remaining", "X-Ratelimit-Remaining")
+        reset = _int_header(headers, "Ratelimit-Reset", "X-Ratelimit-Reset")
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining - self.reserve))
+            if remaining <= self.reserve and reset is not None:
+                self.blocked_until = max(self.blocked_until, now + reset)
+        if status == 429:
+            retry = _int_header(headers, "Retry-After", "X-Retry-After")
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, now + (retry if retry is not None else self.window))
+
+
+class NSClient:
+    """
+    The one NationStates API client for the whole bot.
+
+    Every request waits for a token from the shared RateGovernor. Waiters are
+    served by lane ("interactive" before "background"), then in arrival order.
+    Identical public GETs that are already in flight share the same request, and
+    successful ones are cached for `ttl` seconds. POSTs and anything carrying a
+    password/pin header always go to the network on their own.
+    """
+
+    def __init__(self, user_agent: str = DEFAULT_UA, governor: Optional[RateGovernor] = None):
+        self.user_agent = user_agent
+        self.governor = governor or RateGovernor()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._waiting: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self._cache: Dict[Tuple, Tuple[float, NSResponse]] = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "rate_limited": 0}
+
+    # ---- lifecycle ----
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS),
+                timeout=aiohttp.ClientTimeout(total=60),
+            )
+        return self._session
+
+    async def close(self):
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for _, _, fut in self._waiting:
+            if not fut.done():
+                fut.cancel()
+        self._waiting = []
+        self._cache.clear()
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    # ---- scheduling ----
+
+    async def _acquire(self, priority: str):
+        lane = LANES.get(priority, LANES["background"])
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (lane, next(self._seq), fut))
+        self._wake.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await fut
+
+    async def _dispatch(self):
+        while True:
+            while not self._waiting:
+                self._wake.clear()
+                await self._wake.wait()
+            # Drop waiters whose callers gave up
+            while self._waiting and self._waiting[0][2].done():
+                heapq.heappop(self._waiting)
+            if not self._waiting:
+                continue
+            wait = self.governor.delay()
+            if wait > 0:
+                # Re-check the head after sleeping; an interactive request may have arrived.
+                await asyncio.sleep(wait)
+                continue
+            _, _, fut = heapq.heappop(self._waiting)
+            self.governor.take()
+            fut.set_result(None)
+
+    # ---- requests ----
+
+    def _headers(self, headers: Optional[Mapping[str, str]], user_agent: Optional[str]) -> Dict[str, str]:
+        out = {"User-Agent": user_agent or self.user_agent}
+        if headers:
+            out.update(headers)
+        return out
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        data: Optional[Mapping[str, Any]],
+        headers: Dict[str, str],
+        priority: str,
+    ) -> NSResponse:
+        session = self._ensure_session()
+        for attempt in range(MAX_RETRIES + 1):
+            await self._acquire(priority)
+            self.stats["requests"] += 1
+            async with session.request(method, url, params=params, data=data, headers=headers) as resp:
+                self.governor.observe(resp.status, resp.headers)
+                body = await resp.read()
+                if resp.status == 429:
+                    self.stats["rate_limited"] += 1
+                    if attempt < MAX_RETRIES:
+                        continue
+                return NSResponse(resp.status, resp.headers, body)
+
+    async def get(
+        self,
+        params: Optional[Mapping[str, Any]] = None,
+        *,
+        url: str = API_URL,
+        headers: Optional[Mapping[str, str]] = None,
+        user_agent: Optional[str] = None,
+        priority: str = "interactive",
+        ttl: float = DEFAULT_TTL,
+    ) -> NSResponse:
+        """GET through the governor. Pass ttl=0 to skip the cache (still coalesced)."""
+        merged = self._headers(headers, user_agent)
+        if any(h.lower() in PRIVATE_HEADERS for h in merged):
+            return await self._send("GET", url, params, None, merged, priority)
+
+        key = (
+            url,
+            tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())),
+            tuple(sorted((k.lower(), v) for k, v in merged.items() if k.lower() != "user-agent")),
+        )
+        now = time.monotonic()
+        hit = self._cache.get(key)
+        if hit and hit[0] > now:
+            self.stats["cache_hits"] += 1
+            return NSResponse(hit[1].status, hit[1].headers, hit[1].body, cached=True)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            # Run the request as its own task so one caller being cancelled
+            # doesn't fail everyone else waiting on the same URL.
+            task = asyncio.create_task(self._send("GET", url, params, None, merged, priority))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._settle(k, t, ttl))
+        return await asyncio.shield(task)
+
+    def _settle(self, key: Tuple, task: asyncio.Task, ttl: float):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        resp = task.result()
+        if ttl > 0 and resp.ok:
+            now = time.monotonic()
+            if len(self._cache) >= CACHE_MAX_ENTRIES:
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            self._cache[key] = (now + ttl, resp)
+
+    async def post(
+        self,
+        data: Mapping[str, Any],
+        *,
+        url: str = API_URL,
+        headers: Optional[Mapping[str, str]] = None,
+        user_agent: Optional[str] = None,
+        priority: str = "interactive",
+    ) -> NSResponse:
+        """POST through the governor (private commands). Never cached or shared."""
+        return await self._send("POST", url, None, data, self._headers(headers, user_agent), priority)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        params: Optional[Mapping[str, Any]] = None,
+        *,
+        url: str = API_URL,
+        headers: Optional[Mapping[str, str]] = None,
+        user_agent: Optional[str] = None,
+        priority: str = "background",
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """GET through the governor and yield the live response for incremental parsing."""
+        session = self._ensure_session()
+        merged = self._headers(headers, user_agent)
+        for attempt in range(MAX_RETRIES + 1):
+            await self._acquire(priority)
+            self.stats["requests"] += 1
+            async with session.get(url, params=params, headers=merged) as resp:
+                self.governor.observe(resp.status, resp.headers)
+                if resp.status == 429:
+                    self.stats["rate_limited"] += 1
+                    if attempt < MAX_RETRIES:
+                        continue
+                yield resp
+                return
+
+    @staticmethod
+    async def iter_records(resp: aiohttp.ClientResponse, kind: str) -> AsyncIterator[Any]:
+        """
+        Yield typed records ("trade", "auction", "census", "nation") from a
+        `stream()` response while it downloads. Raises ET.ParseError on bad XML.
+        """
+        parser = RecordParser(kind)
+        async for chunk in resp.content.iter_chunked(STREAM_CHUNK):
+            for record in parser.feed(chunk):
+                yield record
+        for record in parser.close():
+            yield record
+
+    parse_records = staticmethod(parse_records)
+
+    def clear_cache(self):
+        self._cache.clear()
+
+
+def _norm(name: str) -> str:
+    return name.strip().lower().replace(" ", "_")
+
+
+class TradeArchive:
+    """
+    Local SQLite copy of the global card trades feed.
+
+    sync() only asks for trades newer than the newest one stored (one call in
+    steady state, paging back only if more than a page arrived in between);
+    backfill() extends the archive further into the past. A sync that stops
+    before reaching the stored trades (HTTP error, page cap, exception)
+    records the span it never fetched in `gaps`, and later syncs fill it. Nation names are
+    stored normalised. Readers query by buyer, seller, card or time through
+    the indexes instead of re-downloading and re-parsing pages.
+
+    Every SQLite call runs on a single worker thread that owns the
+    connection, so inserts and queries never block the event loop.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS trades (
+            timestamp INTEGER NOT NULL,
+            cardid INTEGER NOT NULL,
+            season INTEGER NOT NULL,
+            buyer TEXT NOT NULL,
+            seller TEXT NOT NULL,
+            category TEXT NOT NULL,
+            price REAL,
+            UNIQUE (timestamp, cardid, season, buyer, seller)
+        )""",
+        "CREATE INDEX IF NOT EXISTS trades_timestamp ON trades (timestamp)",
+        "CREATE INDEX IF NOT EXISTS trades_buyer ON trades (buyer, timestamp)",
+        "CREATE INDEX IF NOT EXISTS trades_seller ON trades (seller, timestamp)",
+        "CREATE INDEX IF NOT EXISTS trades_card ON trades (cardid, season)",
+        """CREATE TABLE IF NOT EXISTS gaps (
+            since INTEGER NOT NULL,
+            before INTEGER NOT NULL,
+            PRIMARY KEY (since, before)
+        )""",
+    )
+
+    def __init__(self, path: Path, client: NSClient):
+        self.path = Path(path)
+        self.client = client
+        self.db: Optional[sqlite3.Connection] = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nsapi-trades")
+        # Queued first, so every later call runs against an opened db.
+        self._ready = self._pool.submit(self._open)
+        self._lock = asyncio.Lock()
+        self._synced_at = 0.0
+
+    async def run(self, fn, *args):
+        """Run ``fn(*args)`` on the database thread."""
+        await asyncio.wrap_future(self._ready)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    def close(self):
+        self._pool.submit(self._close)
+        self._pool.shutdown(wait=False)
+
+    def _open(self):
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        for stmt in self.SCHEMA:
+            self.db.execute(stmt)
+        self.db.commit()
+
+    def _close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    # ---- ingest ----
+
+    async def high_water(self) -> int:
+        return await self.run(self._scalar, "SELECT COALESCE(MAX(timestamp), 0) FROM trades")
+
+    async def low_water(self) -> int:
+        return await self.run(self._scalar, "SELECT COALESCE(MIN(timestamp), 0) FROM trades")
+
+    async def count(self) -> int:
+        return await self.run(self._scalar, "SELECT COUNT(*) FROM trades")
+
+    def _scalar(self, sql: str) -> int:
+        return self.db.execute(sql).fetchone()[0]
+
+    async def add(self, trades: Iterable[Trade]) -> int:
+        return await self.run(self._add, list(trades))
+
+    def _add(self, trades: List[Trade]) -> int:
+        before = self.db.total_changes
+        self.db.executemany(
+            "INSERT OR IGNORE INTO trades VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (t.timestamp, t.cardid, t.season, _norm(t.buyer), _norm(t.seller), t.category, t.price)
+                for t in trades
+            ),
+        )
+        self.db.commit()
+        return self.db.total_changes - before
+
+    def _gaps(self) -> List[Tuple[int, int]]:
+        return self.db.execute("SELECT since, before FROM gaps ORDER BY before DESC").fetchall()
+
+    def _set_gap(self, since: int, before: int, add: bool):
+        if add:
+            self.db.execute("INSERT OR IGNORE INTO gaps VALUES (?, ?)", (since, before))
+        else:
+            self.db.execute("DELETE FROM gaps WHERE since = ? AND before = ?", (since, before))
+        self.db.commit()
+
+    async def _walk(self, since: int, before: Optional[int], max_pages: int, priority: str,
+                    *, track_gap: bool = False) -> Tuple[int, int]:
+        """
+        Page backwards from `before` (or now) until reaching `since`.
+        Returns (rows added, pages fetched). With track_gap, a walk that stops
+        short records the span between `since` and the oldest page it saved.
+        """
+        added = pages = 0
+        reached = False
+        try:
+            while pages < max_pages:
+                params = {"q": "cards+trades", "limit": str(TRADES_PAGE)}
+                if since:
+                    params["sincetime"] = str(since)
+                if before:
+                    params["beforetime"] = str(before)
+                page: List[Trade] = []
+                async with self.client.stream(params, priority=priority) as resp:
+                    if resp.status != 200:
+                        log.warning("Trade archive: cards+trades returned HTTP %s", resp.status)
+                        break
+                    async for trade in self.client.iter_records(resp, "trade"):
+                        page.append(trade)
+                pages += 1
+                added += await self.add(page)
+                if len(page) < TRADES_PAGE:
+                    reached = True
+                    break
+                oldest = min(t.timestamp for t in page)
+                if oldest <= since or (before and oldest >= before):
+                    reached = True
+                    break
+                before = oldest
+            else:
+                if since:
+                    log.warning("Trade archive: stopped after %s pages before reaching %s", max_pages, since)
+        finally:
+            # Nothing saved above `since` yet (before is None) means there is no hole to remember.
+            if track_gap and since and before and not reached:
+                await self.run(self._set_gap, since, before, True)
+        return added, pages
+
+    async def sync(self, *, floor: int = 0, max_pages: int = TRADES_MAX_PAGES,
+                   max_age: float = TRADES_MAX_AGE, priority: str = "background") -> int:
+        """
+        Fetch trades newer than the high-water mark, then fill any gaps left by
+        earlier syncs, within one `max_pages` budget. An empty archive starts
+        from `floor` (0 = as far back as max_pages reaches). Returns rows added.
+        """
+        async with self._lock:
+            if time.monotonic() - self._synced_at < max_age:
+                return 0
+            added, pages = await self._walk(max(await self.high_water(), floor), None, max_pages, priority,
+                                            track_gap=True)
+            for since, before in await self.run(self._gaps):
+                if pages >= max_pages:
+                    break
+                # Dropped first; the walk re-records whatever part it does not reach.
+                await self.run(self._set_gap, since, before, False)
+                more, used = await self._walk(since, before, max_pages - pages, priority, track_gap=True)
+                added += more
+                pages += used
+                if not used:
+                    break  # the feed is failing; the gaps stay recorded for next time
+            self._synced_at = time.monotonic()
+            return added
+
+    async def backfill(self, floor: int, *, max_pages: int = TRADES_MAX_PAGES, priority: str = "background") -> int:
+        """Extend the archive back to `floor` (a unix timestamp)."""
+        async with self._lock:
+            low = await self.low_water()
+            if low and low <= floor:
+                return 0
+            added, _ = await self._walk(floor, low or None, max_pages, priority)
+            return added
+
+    # ---- queries ----
+
+    async def gifts_to(self, buyer: str, since: int = 0) -> List[sqlite3.Row]:
+        """Trades into `buyer` with a blank or zero price, oldest first."""
+        return await self.run(self._gifts_to, _norm(buyer), since)
+
+    def _gifts_to(self, buyer: str, since: int) -> List[sqlite3.Row]:
+        return self.db.execute(
+            "SELECT * FROM trades WHERE buyer = ? AND timestamp > ? AND (price IS NULL OR price = 0) "
+            "ORDER BY timestamp",
+            (buyer, since),
+        ).fetchall()
+
+    async def gift_counts_by_seller(self, buyer: str) -> Dict[str, Tuple[int, int]]:
+        """seller -> (non-legendary, legendary) gift counts into `buyer`."""
+        return await self.run(self._gift_counts_by_seller, _norm(buyer))
+
+    def _gift_counts_by_seller(self, buyer: str) -> Dict[str, Tuple[int, int]]:
+        rows = self.db.execute(
+            "SELECT seller, SUM(category != 'legendary'), SUM(category = 'legendary') FROM trades "
+            "WHERE buyer = ? AND (price IS NULL OR price = 0) GROUP BY seller",
+            (buyer,),
+        )
+        return {seller: (int(non), int(leg)) for seller, non, leg in rows}
+
+    async def participation(self, nations: Iterable[str], since: int = 0) -> Dict[str, int]:
+        """Distinct cards each nation bought or sold for a positive price since `since`."""
+        names = sorted({_norm(n) for n in nations})
+        if not names:
+            return {}
+        return await self.run(self._participation, names, since)
+
+    def _participation(self, names: List[str], since: int) -> Dict[str, int]:
+        marks = ",".join("?" * len(names))
+        rows = self.db.execute(
+            f"""SELECT nation, COUNT(*) FROM (
+                    SELECT buyer AS nation, cardid, season FROM trades
+                    WHERE buyer IN ({marks}) AND price > 0 AND timestamp >= ?
+                    UNION
+                    SELECT seller, cardid, season FROM trades
+                    WHERE seller IN ({marks}) AND price > 0 AND timestamp >= ?
+                ) GROUP BY nation""",
+            (*names, since, *names, since),
+        )
+        return {nation: count for nation, count in rows}
+
+
+class NSApi(commands.Cog):
+    """Shared NationStates API client: one session and one rate-limit budget for every cog."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = Config.get_conf(self, identifier=0x9005_0A91, force_registration=True)
+        self.config.register_global(user_agent=DEFAULT_UA)
+        self.client = NSClient(DEFAULT_UA)
+        self.trades = TradeArchive(cog_data_path(self) / "card_trades.sqlite3", self.client)
+
+    async def cog_load(self):
+        self.client.user_agent = await self.config.user_agent()
+
+    async def cog_unload(self):
+        await self.client.close()
+        self.trades.close()
+
+    @commands.group()
+    @commands.is_owner()
+    async def nsapi(self, ctx: commands.Context):
+        """Shared NationStates API client."""
+
+    @nsapi.command(name="status")
+    async def nsapi_status(self, ctx: commands.Context):
+        """Show the rate-limit bucket, queue and cache counters."""
+        gov = self.client.governor
+        wait = gov.delay()
+        s = self.client.stats
+        trades, newest = await self.trades.count(), await self.trades.high_water()
+        await ctx.send(
+            f"User-Agent: `{self.client.user_agent}`\n"
+            f"Tokens: {gov.tokens:.1f}/{gov.capacity:.0f} (next in {wait:.1f}s)\n"
+            f"Queued: {len(self._waiting_live())} | In flight (shared): {len(self.client._inflight)} | "
+            f"Cached: {len(self.client._cache)}\n"
+            f"Requests: {s['requests']} | Cache hits: {s['cache_hits']} | "
+            f"Coalesced: {s['coalesced']} | 429s: {s['rate_limited']}\n"
+            f"Trade archive: {trades} trades"
+            + (f", newest <t:{newest}:R>" if newest else "")
+        )
+
+    def _waiting_live(self) -> List[Tuple[int, int, asyncio.Future]]:
+        return [w for w in self.client._waiting if not w[2].done()]
+
+    @nsapi.command(name="setua")
+    async def nsapi_setua(self, ctx: commands.Context, *, user_agent: str):
+        """Set the default User-Agent (cogs with their own UA setting still send theirs)."""
+        user_agent = user_agent.strip()
+        if not user_agent:
+            return await ctx.send("User-Agent cannot be empty.")
+        await self.config.user_agent.set(user_agent)
+        self.client.user_agent = user_agent
+        await ctx.send(f"User-Agent set to:\n`{user_agent}`")
+
+    @nsapi.command(name="clearcache")
+    async def nsapi_clearcache(self, ctx: commands.Context):
+        """Drop all cached responses."""
+        self.client.clear_cache()
+        await ctx.send("NS response cache cleared.")
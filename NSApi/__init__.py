@@ -0,0 +1,5 @@
+from .NSApi import NSApi
+
+
+async def setup(bot):
+    await bot.add_cog(NSApi(bot))
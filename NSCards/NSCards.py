@@ -1,9 +1,5 @@
 import discord
-import aiohttp
-import asyncio
 import random
-import time
-import xml.etree.ElementTree as ET
 from redbot.core import commands
 
 class CardPaginator(discord.ui.View):
@@ -25,38 +21,12 @@ class CardPaginator(discord.ui.View):
         self.current_page = (self.current_page + 1) % len(self.pages)
         await self.update_page(interaction)
 
-class NSThrottler:
-    def __init__(self):
-        self.remaining = 50
-        self.retry_after = 0
-        self.last_request = 0
-        self.lock = asyncio.Lock()
-
-    async def throttle(self):
-        async with self.lock:
-            now = time.time()
-            if self.retry_after > 0:
-                await asyncio.sleep(self.retry_after)
-                self.retry_after = 0
-            if self.remaining < 5:
-                delay = max(0, 1.0 - (now - self.last_request))
-                await asyncio.sleep(delay)
-            self.last_request = time.time()
-
-    def update(self, headers):
-        rem = headers.get("X-Ratelimit-Remaining")
-        if rem: self.remaining = int(rem)
-        ret = headers.get("Retry-After") or headers.get("X-Retry-After")
-        if ret: self.retry_after = int(ret)
-
 class NSCards(commands.Cog):
     """NationStates Card Poker with Buttons."""
 
     def __init__(self, bot):
         self.bot = bot
-        self.session = aiohttp.ClientSession()
-        self.headers = {"User-Agent": "RedBot Cog - CardPokerButtons v8.0 - Used by [YourNation]"}
-        self.throttler = NSThrottler()
+        self.user_agent = "RedBot Cog - CardPokerButtons v8.0 - Used by [YourNation]"
         self.rarity_data = {
             "common": {"c": 0x929292, "e": "⚪"},
             "uncommon": {"c": 0x47b547, "e": "🟢"},
@@ -66,19 +36,23 @@ class NSCards(commands.Cog):
             "legendary": {"c": 0xffd700, "e": "🟡"}
         }
 
-    def cog_unload(self):
-        self.bot.loop.create_task(self.session.close())
+    def _ns(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so NSCards can reach NationStates.")
+        return cog.client
+
+    def _cards(self):
+        # Optional: without CardQ every card is looked up through the API
+        cog = self.bot.get_cog("CardQ")
+        return cog.db if cog else None
 
     async def fetch_xml(self, url):
-        await self.throttler.throttle()
-        async with self.session.get(url, headers=self.headers) as response:
-            self.throttler.update(response.headers)
-            if response.status == 429:
-                await asyncio.sleep(int(response.headers.get("Retry-After", 5)))
-                return await self.fetch_xml(url)
-            if response.status != 200:
-                return None
-            return ET.fromstring(await response.text())
+        # NSApi paces this and retries 429s itself
+        response = await self._ns().get(url=url, user_agent=self.user_agent)
+        if response.status != 200:
+            return None
+        return response.xml()
 
     @commands.command()
     async def draw(self, ctx):
@@ -91,6 +65,7 @@ class NSCards(commands.Cog):
                 return await ctx.send("Could not access deck 9005.")
 
             sampled = random.sample(root.findall(".//CARD"), 5)
+            cards = self._cards()
             card_pages = []
             overview_lines = []
 
@@ -98,15 +73,24 @@ class NSCards(commands.Cog):
                 cid = card_data.find("CARDID").text
                 season = card_data.find("SEASON").text
                 
-                info_url = f"https://www.nationstates.net/cgi-bin/api.cgi?q=card+info+owners;cardid={cid};season={season}"
-                card_root = await self.fetch_xml(info_url)
-                if card_root is None: continue
-
-                name = card_root.find(".//NAME").text or "Unknown"
-                cat = (card_root.find(".//CATEGORY").text or "common").lower()
-                mv = card_root.find(".//MARKET_VALUE").text or "0.00"
-                flag_path = card_root.find(".//FLAG").text or ""
-                owners = len(card_root.findall(".//OWNER"))
+                local = cards.card(int(cid), int(season)) if cards else None
+                if local is not None:
+                    # Static fields from the local card database, live ones from the deck entry
+                    name = local["name"] or "Unknown"
+                    cat = (card_data.findtext("CATEGORY") or local["card_category"] or "common").lower()
+                    mv = card_data.findtext("MARKET_VALUE") or "0.00"
+                    flag_path = local["flag"] or ""
+                    third = ("Region", f"🗺️ {local['region'] or 'Unknown'}")
+                else:
+                    info_url = f"https://www.nationstates.net/cgi-bin/api.cgi?q=card+info+owners;cardid={cid};season={season}"
+                    card_root = await self.fetch_xml(info_url)
+                    if card_root is None: continue
+
+                    name = card_root.find(".//NAME").text or "Unknown"
+                    cat = (card_root.find(".//CATEGORY").text or "common").lower()
+                    mv = card_root.find(".//MARKET_VALUE").text or "0.00"
+                    flag_path = card_root.find(".//FLAG").text or ""
+                    third = ("Owners", f"👥 {len(card_root.findall('.//OWNER'))}")
 
                 data = self.rarity_data.get(cat, self.rarity_data["common"])
                 link = f"https://www.nationstates.net/page=deck/card={cid}/season={season}"
@@ -118,8 +102,8 @@ class NSCards(commands.Cog):
                 embed.set_image(url=f"https://www.nationstates.net/images/cards/s{season}/{cid}.jpg")
                 embed.add_field(name="Category", value=f"{data['e']} {cat.capitalize()}", inline=True)
                 embed.add_field(name="MV", value=f"🪙 {mv}", inline=True)
-                embed.add_field(name="Owners", value=f"👥 {owners}", inline=True)
-                embed.set_footer(text=f"Card {i}/5 | Limit: {self.throttler.remaining}")
+                embed.add_field(name=third[0], value=third[1], inline=True)
+                embed.set_footer(text=f"Card {i}/5 | Limit: {self._ns().governor.tokens:.0f}")
                 card_pages.append(embed)
 
             overview_embed = discord.Embed(
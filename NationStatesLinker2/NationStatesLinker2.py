@@ -2,22 +2,25 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 from typing import Dict, Set, Iterable, List, Tuple
 import re
 
-import aiohttp
 import discord
 import xml.etree.ElementTree as ET
 from redbot.core import commands, Config
 from discord.ext import tasks
 
+log = logging.getLogger("red.nslinker2")
+
 # ==========================
 # Constants
 # ==========================
-API_URL = "https://www.nationstates.net/cgi-bin/api.cgi"
 VERIFY_URL = "https://www.nationstates.net/page=verify_login"
 DEFAULT_UA = "RedbotNSLinker/3.0 (contact: 9003)"
 NATION_MAX_LEN = 40
+REGION_NATIONS_TTL = 120.0  # seconds a region's nation list is reused across member syncs
+ROLE_EDIT_INTERVAL = 0.5  # seconds between queued member role edits
 
 
 # ==========================
@@ -65,18 +68,58 @@ class NationStatesLinker2(commands.Cog):
         log_channel_id=None,
         target_nation=None,              # normalized nation name
         trade_last_timestamp=0,          # int unix timestamp
+        # Legacy counters, no longer written: leaderboards are queried from the NSApi trade archive
         trade_stats={},                  # seller -> {"legendary": int, "nonlegendary": int}
-    
-        # FIX: region_norm -> {"legendary": int, "nonlegendary": int}
-        trade_region_stats={},
+        trade_region_stats={},           # region_norm -> {"legendary": int, "nonlegendary": int}
     )
 
 
+        # user_id -> linked nations, and the reverse nation -> user_id index.
+        # Loaded once from all_users() and kept current by every command that edits links.
+        self._links: Dict[int, Set[str]] = {}
+        self._owners: Dict[str, int] = {}
+        self._links_ready = asyncio.Event()
+
+        # Paced role edits: (member, to_add, to_remove, reason)
+        self._role_queue: asyncio.Queue = asyncio.Queue()
+        self._role_worker = None
+
         self.daily_sync.start()
         self.bot.add_view(self.VerifyView(self))
 
+    async def cog_load(self):
+        for user_id, data in (await self.config.all_users()).items():
+            self._set_links(user_id, data.get("linked_nations") or [])
+        self._links_ready.set()
+        self._role_worker = asyncio.create_task(self._role_edit_worker())
+
     def cog_unload(self):
         self.daily_sync.cancel()
+        if self._role_worker:
+            self._role_worker.cancel()
+
+    # ==========================
+    # Link Index
+    # ==========================
+    def _set_links(self, user_id: int, nations: Iterable[str]):
+        """Replace a user's entry in the in-memory link index."""
+        for n in self._links.pop(user_id, ()):
+            if self._owners.get(n) == user_id:
+                del self._owners[n]
+        linked = {nn for nn in (normalize(n) for n in nations if n) if nn}
+        if linked:
+            self._links[user_id] = linked
+            for n in linked:
+                self._owners[n] = user_id
+
+    def linked_for(self, user_id: int) -> Set[str]:
+        return set(self._links.get(user_id, ()))
+
+    def _ns(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so NationStatesLinker2 can reach NationStates.")
+        return cog.client
 
     # ==========================
     # API Helpers
@@ -85,143 +128,45 @@ class NationStatesLinker2(commands.Cog):
     async def build_nation_to_member_index(self, guild: discord.Guild) -> Dict[str, discord.Member]:
         """
         Build a mapping of linked nation -> Discord member for THIS guild.
-        If multiple members share a nation (shouldn't happen), last one wins.
+        If multiple members share a nation (shouldn't happen), the last link wins.
         """
+        await self._links_ready.wait()
         out: Dict[str, discord.Member] = {}
-        for m in guild.members:
-            if m.bot:
-                continue
-            try:
-                ln = await self.config.user(m).linked_nations()
-            except Exception:
-                continue
-            for n in ln or []:
-                nn = normalize(n)
-                if nn:
-                    out[nn] = m
+        for nation, user_id in self._owners.items():
+            m = guild.get_member(user_id)
+            if m is not None and not m.bot:
+                out[nation] = m
         return out
 
 
     # ==========================
     # Trades Processing
     # ==========================
-    async def fetch_recent_trades(self,session: aiohttp.ClientSession,limit: int = 1000, sincetime: int | None = None,) -> str:
-        """
-        Fetch trades XML for all cards using:
-          q=cards+trades
-          limit=...
-          sincetime=... (optional)
-        """
-        params = {
-            "q": "cards+trades",
-            "limit": str(int(limit)),
-        }
-        if sincetime and int(sincetime) > 0:
-            params["sincetime"] = str(int(sincetime))
-    
-        async with session.get(API_URL, params=params) as resp:
-            text = await resp.text()
-            await self._respect_rate_limit(resp.headers)
-            return text
-
-
-    def parse_trades_xml(self, xml_text: str) -> List[dict]:
-        """
-        Parses the trades response into a list of dicts.
-        Defensive: fields vary across API versions and shards; we treat missing tags gracefully.
-        Expected tags commonly include:
-          TRADE/CARDID, TRADE/SEASON, TRADE/BUYER, TRADE/SELLER, TRADE/PRICE, TRADE/TIMESTAMP
-          and sometimes CATEGORY or RARITY.
-        """
-        trades: List[dict] = []
-        try:
-            root = ET.fromstring(xml_text)
-        except ET.ParseError:
-            return trades
-
-        # The trades entries are typically under <TRADES><TRADE>...</TRADE></TRADES>
-        for t in root.findall(".//TRADE"):
-            def get_text(tag: str) -> str:
-                el = t.find(tag)
-                return (el.text or "").strip() if el is not None else ""
-
-            cardid = get_text("CARDID")
-            season = get_text("SEASON")
-            buyer = normalize(get_text("BUYER")) if get_text("BUYER") else ""
-            seller = normalize(get_text("SELLER")) if get_text("SELLER") else ""
-            price_raw = get_text("PRICE")
-            timestamp_raw = get_text("TIMESTAMP")
-
-            category = get_text("CATEGORY")
-
-            # Normalize timestamp/price
-            try:
-                ts = int(timestamp_raw) if timestamp_raw else 0
-            except ValueError:
-                ts = 0
-
-            # price can be blank or numeric
-            price_blank = (price_raw == "")
-
-            price_val = 0
-            if not price_blank:
-                try:
-                    price_val = int(price_raw)
-                except ValueError:
-                    price_val = 0
-
-            trades.append(
-                {
-                    "cardid": cardid,
-                    "season": season,
-                    "buyer": buyer,
-                    "seller": seller,
-                    "price_blank": price_blank,
-                    "price": price_val,
-                    "timestamp": ts,
-                    "category": category.strip().lower(),
-                    "rarity": category.strip().lower(),
-                }
-            )
-
-        return trades
-
-    def trade_is_legendary(self, trade: dict) -> bool:
-        """
-        Determine legendary-ness as robustly as possible across possible tags.
-        """
-        # Some APIs/clients use rarity; some use category; sometimes numeric categories exist.
-        if trade.get("rarity") == "legendary":
-            return True
-        if trade.get("category") == "legendary":
-            return True
-        return False
+    def _trades(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so NationStatesLinker2 can read card trades.")
+        return cog.trades
 
     async def build_linked_nations_for_guild(self, guild: discord.Guild) -> Set[str]:
         """
         Build a set of all linked nations for members of THIS guild.
         This is used to decide whether a seller is "in the linked nations list".
         """
+        await self._links_ready.wait()
         linked: Set[str] = set()
-        for m in guild.members:
-            if m.bot:
-                continue
-            try:
-                ln = await self.config.user(m).linked_nations()
-            except Exception:
-                continue
-            for n in ln or []:
-                nn = normalize(n)
-                if nn:
-                    linked.add(nn)
+        for user_id, nations in self._links.items():
+            m = guild.get_member(user_id)
+            if m is not None and not m.bot:
+                linked |= nations
         return linked
 
-    async def process_trade_records_for_guild(self, guild: discord.Guild):
+    async def process_trade_records_for_guild(self, guild: discord.Guild, priority: str = "interactive"):
         """
         Process the cards trades feed:
           - find trades where buyer = target_nation and (PRICE blank or 0)
-          - if seller not in linked nations, alert + update seller leaderboard
-          - credit region(s) for qualifying inbound trades when seller maps to a member with region role(s)
+          - if seller not in linked nations, alert
+        Leaderboards and region credits are queried from the trade archive on demand.
         """
         gconf = self.config.guild(guild)
         target = await gconf.target_nation()
@@ -234,82 +179,32 @@ class NationStatesLinker2(commands.Cog):
             return
     
         last_ts = await gconf.trade_last_timestamp()
-        last_ts=0
-    
-        headers = {"User-Agent": await self.config.user_agent()}
-    
-        # Lookups
-        linked_nations = await self.build_linked_nations_for_guild(guild)
-        nation_to_member = await self.build_nation_to_member_index(guild)
-        regions_map = await gconf.regions()  # region_norm -> role_id
-    
-        async with aiohttp.ClientSession(headers=headers) as session:
-            xml_text = await self.fetch_recent_trades(session, limit=1000, sincetime=last_ts)
     
-        trades = self.parse_trades_xml(xml_text)
+        # Top up the shared archive (one API call in steady state), then only
+        # look at gifts into the target since this guild's cursor.
+        archive = self._trades()
+        await archive.sync(priority=priority)
+        trades = await archive.gifts_to(target, since=last_ts)
         if not trades:
             return
     
+        linked_nations = await self.build_linked_nations_for_guild(guild)
         max_ts = last_ts
         alerts: List[str] = []
     
-        async with gconf.trade_stats() as stats:
-            async with gconf.trade_region_stats() as region_stats:
-                for tr in trades:
-                    ts = tr.get("timestamp", 0)
-                    if ts and ts > max_ts:
-                        max_ts = ts
-    
-                    if tr.get("buyer") != target:
-                        continue
-    
-                    # PRICE blank or 0
-                    if not (tr.get("price_blank") or tr.get("price", 0) == 0):
-                        continue
-    
-                    seller = tr.get("seller") or ""
-                    if not seller:
-                        continue
-    
-                    # -------------------------
-                    # Region crediting (for any qualifying inbound trade we can attribute)
-                    # -------------------------
-                    member = nation_to_member.get(seller)
-                    if member and regions_map:
-                        is_leg = self.trade_is_legendary(tr)
-                        for region_norm, role_id in regions_map.items():
-                            role = guild.get_role(role_id)
-                            if role and role in member.roles:
-                                entry = region_stats.get(region_norm, {"legendary": 0, "nonlegendary": 0})
-                                if is_leg:
-                                    entry["legendary"] = int(entry.get("legendary", 0)) + 1
-                                else:
-                                    entry["nonlegendary"] = int(entry.get("nonlegendary", 0)) + 1
-                                region_stats[region_norm] = entry
-    
-                    # -------------------------
-                    # Existing: unlinked seller alerts + seller leaderboard
-                    # -------------------------
-                    if seller not in linked_nations:
-                        cardid = tr.get("cardid") or ""
-                        season = tr.get("season") or ""
-                        if not cardid or not season:
-                            continue
-    
-                        url = f"https://www.nationstates.net/page=deck/card={cardid}/season={season}/trades_history=1"
-                        price_display = "blank" if tr.get("price_blank") else str(tr.get("price", 0))
+        for tr in trades:
+            max_ts = max(max_ts, tr["timestamp"])
+            seller = tr["seller"]
+            if not seller or seller in linked_nations:
+                continue
     
-                        alerts.append(
-                            f"- Unlinked seller **{display(seller)}** sold to **{display(target)}** "
-                            f"at price **{price_display}**: {url}"
-                        )
+            url = f"https://www.nationstates.net/page=deck/card={tr['cardid']}/season={tr['season']}/trades_history=1"
+            price_display = "blank" if tr["price"] is None else str(tr["price"])
     
-                        entry = stats.get(seller, {"legendary": 0, "nonlegendary": 0})
-                        if self.trade_is_legendary(tr):
-                            entry["legendary"] = int(entry.get("legendary", 0)) + 1
-                        else:
-                            entry["nonlegendary"] = int(entry.get("nonlegendary", 0)) + 1
-                        stats[seller] = entry
+            alerts.append(
+                f"- Unlinked seller **{display(seller)}** sold to **{display(target)}** "
+                f"at price **{price_display}**: {url}"
+            )
     
         # Persist cursor forward
         if max_ts > last_ts:
@@ -329,141 +224,182 @@ class NationStatesLinker2(commands.Cog):
                 await log_channel.send(chunk, allowed_mentions=discord.AllowedMentions.none())
 
 
-    async def _respect_rate_limit(self, headers):
-        try:
-            r = int(headers.get("Ratelimit-Remaining", 1)) - 10
-            reset = int(headers.get("Ratelimit-Reset", 0))
-            r = max(1, r)
-            await asyncio.sleep(reset / r if r else reset)
-        except Exception:
-            pass
-
-    async def fetch_region_nations(self, session: aiohttp.ClientSession, region: str) -> Set[str]:
+    async def fetch_region_nations(self, region: str, priority: str = "interactive") -> Set[str]:
         params = {"region": region, "q": "nations"}
-        async with session.get(API_URL, params=params) as resp:
-            text = await resp.text()
-            await self._respect_rate_limit(resp.headers)
+        resp = await self._ns().get(
+            params, user_agent=await self.config.user_agent(), priority=priority, ttl=REGION_NATIONS_TTL
+        )
 
         nations = set()
         try:
-            root = ET.fromstring(text)
-            el = root.find("NATIONS")
-            if el is not None and el.text:
-                for n in el.text.replace(",", ":").split(":"):
-                    nn = normalize(n)
-                    if nn:
-                        nations.add(nn)
+            # Parsed from the (possibly cached) body so repeat syncs share it
+            for n in resp.records("nation"):
+                nations.add(normalize(n.name))
         except ET.ParseError:
             pass
         return nations
 
     async def verify_with_ns(self, nation: str, checksum: str) -> bool:
         params = {"a": "verify", "nation": normalize(nation), "checksum": checksum}
-        headers = {"User-Agent": await self.config.user_agent()}
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(API_URL, params=params) as resp:
-                await self._respect_rate_limit(resp.headers)
-                return (await resp.text()).strip() == "1"
+        resp = await self._ns().get(params, user_agent=await self.config.user_agent(), ttl=0)
+        return resp.text().strip() == "1"
 
     # ==========================
     # Region Data Builder
     # ==========================
-    async def build_region_data_for_guild(self, guild: discord.Guild) -> Dict[str, Set[str]]:
+    async def build_region_data_for_guild(self, guild: discord.Guild, priority: str = "interactive") -> Dict[str, Set[str]]:
         gconf = self.config.guild(guild)
         regions = await gconf.regions()
         if not regions:
             return {}
 
-        headers = {"User-Agent": await self.config.user_agent()}
         region_data: Dict[str, Set[str]] = {}
-
-        async with aiohttp.ClientSession(headers=headers) as session:
-            for region_norm in regions.keys():
-                region_data[region_norm] = await self.fetch_region_nations(session, region_norm)
+        for region_norm in regions.keys():
+            region_data[region_norm] = await self.fetch_region_nations(region_norm, priority=priority)
 
         return region_data
 
     # ==========================
     # Role Sync Logic
     # ==========================
-    async def sync_member(self, member: discord.Member, region_data: Dict[str, Set[str]]):
-        guild = member.guild
+    async def _sync_roles(self, guild: discord.Guild) -> Tuple:
+        """Resolve the guild's configured roles once: (access, visitor, verified, {region: role})."""
         gconf = self.config.guild(guild)
-
         access = guild.get_role(await gconf.access_role_id())
         visitor = guild.get_role(await gconf.visitor_role_id())
         verified = guild.get_role(await gconf.verified_role_id())
-
-        linked = {normalize(n) for n in await self.config.user(member).linked_nations() if n}
+        region_roles = {}
+        for region, role_id in (await gconf.regions()).items():
+            role = guild.get_role(role_id)
+            if role:
+                region_roles[region] = role
+        return access, visitor, verified, region_roles
+
+    def plan_member(
+        self, member: discord.Member, roles: Tuple, region_data: Dict[str, Set[str]]
+    ) -> Tuple[List[discord.Role], List[discord.Role]]:
+        """Work out (to_add, to_remove) for one member without touching Discord."""
+        access, visitor, verified, region_roles = roles
+        held = set(member.roles)
+        linked = self._links.get(member.id, set())
 
         # RULE: No mask/roles unless you link a nation
         if not linked:
-            to_remove = []
-            if access and access in member.roles:
-                to_remove.append(access)
-            if visitor and visitor in member.roles:
-                to_remove.append(visitor)
-
-            regions = await gconf.regions()
-            for _, role_id in regions.items():
-                role = guild.get_role(role_id)
-                if role and role in member.roles:
-                    to_remove.append(role)
-
-            if verified and verified in member.roles:
-                # Optional: keep verified only if you want "verified" to imply "has linked at least once".
-                # If you want verified removed when no linked nations exist, keep this line.
-                to_remove.append(verified)
+            # Verified is dropped too: it only stands while a linked nation exists.
+            to_remove = [r for r in (access, visitor, *region_roles.values(), verified) if r and r in held]
+            return [], to_remove
 
-            if to_remove:
-                await member.remove_roles(*to_remove, reason="NS unlink/no-linked cleanup")
-            return
-
-        qualifies = set()
-        for region, nations in region_data.items():
-            if linked & nations:
-                qualifies.add(region)
+        qualifies = {region for region, nations in region_data.items() if linked & nations}
 
         to_add, to_remove = [], []
 
         # If they have linked nations, ensure verified role exists (successful verification is what adds linked nations)
-        if verified and verified not in member.roles:
+        if verified and verified not in held:
             to_add.append(verified)
 
         if qualifies:
             # In-region: Access + region role(s), no visitor
-            if access and access not in member.roles:
+            if access and access not in held:
                 to_add.append(access)
-            if visitor and visitor in member.roles:
+            if visitor and visitor in held:
                 to_remove.append(visitor)
         else:
             # Not in-region: Visitor only, no access or region roles
-            if visitor and visitor not in member.roles:
+            if visitor and visitor not in held:
                 to_add.append(visitor)
-            if access and access in member.roles:
+            if access and access in held:
                 to_remove.append(access)
 
-        regions = await gconf.regions()
-        for region, role_id in regions.items():
-            role = guild.get_role(role_id)
-            if not role:
+        for region, role in region_roles.items():
+            # Only the region roles they qualify for (none when out of region)
+            if region in qualifies and role not in held:
+                to_add.append(role)
+            if region not in qualifies and role in held:
+                to_remove.append(role)
+
+        return to_add, to_remove
+
+    async def plan_guild_sync(self, guild: discord.Guild, region_data: Dict[str, Set[str]]) -> List[Tuple]:
+        """Diff every member of the guild up front; only members needing changes are returned."""
+        await self._links_ready.wait()
+        roles = await self._sync_roles(guild)
+        plan = []
+        for m in guild.members:
+            if m.bot:
                 continue
+            to_add, to_remove = self.plan_member(m, roles, region_data)
+            if to_add or to_remove:
+                plan.append((m, to_add, to_remove))
+        return plan
+
+    async def apply_role_edit(self, member: discord.Member, to_add, to_remove, reason: str):
+        """One edit per member: add and remove in a single roles update."""
+        drop = set(to_remove)
+        roles = [r for r in member.roles if not r.is_default() and r not in drop]
+        roles += [r for r in to_add if r not in roles]
+        await member.edit(roles=roles, reason=reason)
+
+    async def _role_edit_worker(self):
+        while True:
+            member, to_add, to_remove, reason = await self._role_queue.get()
+            try:
+                # Re-read the member so edits queued earlier in the pass are not undone
+                member = member.guild.get_member(member.id) or member
+                await self.apply_role_edit(member, to_add, to_remove, reason)
+            except (discord.Forbidden, discord.NotFound):
+                pass
+            except discord.HTTPException as e:
+                log.warning("Role edit failed for %s in %s: %s", member, member.guild, e)
+            except Exception:
+                # Keep the worker alive; a dead worker would strand queued plans.
+                log.exception("Role edit crashed for %s in %s", member, member.guild)
+            finally:
+                self._role_queue.task_done()
+            await asyncio.sleep(ROLE_EDIT_INTERVAL)
 
-            if qualifies:
-                # Add only the region roles they qualify for
-                if region in qualifies and role not in member.roles:
-                    to_add.append(role)
-                if region not in qualifies and role in member.roles:
-                    to_remove.append(role)
-            else:
-                # If they qualify for none, remove all region roles
-                if role in member.roles:
-                    to_remove.append(role)
+    async def queue_role_plan(self, plan: List[Tuple], reason: str = "NS region sync") -> int:
+        """
+        Queue a guild plan on the paced worker and wait for it to drain.
 
-        if to_add:
-            await member.add_roles(*to_add, reason="NS region sync")
-        if to_remove:
-            await member.remove_roles(*to_remove, reason="NS region sync")
+        Returns how many edits went through the worker. If the worker is not
+        running (or stops mid-plan, e.g. on unload) the rest is dropped and
+        logged instead of waiting forever.
+        """
+        if not plan:
+            return 0
+        worker = self._role_worker
+        if worker is None or worker.done():
+            log.warning("Role edit worker is not running; skipped %d role edit(s)", len(plan))
+            return 0
+        for member, to_add, to_remove in plan:
+            self._role_queue.put_nowait((member, to_add, to_remove, reason))
+        drained = asyncio.ensure_future(self._role_queue.join())
+        try:
+            await asyncio.wait({drained, worker}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not drained.done():
+                drained.cancel()
+        if drained.done() and not drained.cancelled():
+            return len(plan)
+        dropped = 0
+        while not self._role_queue.empty():
+            self._role_queue.get_nowait()
+            self._role_queue.task_done()
+            dropped += 1
+        log.warning("Role edit worker stopped; dropped %d queued role edit(s)", dropped)
+        return len(plan) - dropped
+
+    async def sync_guild(self, guild: discord.Guild, priority: str = "interactive") -> int:
+        region_data = await self.build_region_data_for_guild(guild, priority=priority)
+        plan = await self.plan_guild_sync(guild, region_data)
+        return await self.queue_role_plan(plan)
+
+    async def sync_member(self, member: discord.Member, region_data: Dict[str, Set[str]]):
+        await self._links_ready.wait()
+        roles = await self._sync_roles(member.guild)
+        to_add, to_remove = self.plan_member(member, roles, region_data)
+        if to_add or to_remove:
+            await self.apply_role_edit(member, to_add, to_remove, reason="NS region sync")
 
     async def run_member_sync(self, member: discord.Member):
         """Fetch current region memberships and sync a single member immediately."""
@@ -483,12 +419,8 @@ class NationStatesLinker2(commands.Cog):
             if not regions:
                 continue
 
-            region_data = await self.build_region_data_for_guild(guild)
-
-            for m in guild.members:
-                if not m.bot:
-                    await self.sync_member(m, region_data)
-            await self.process_trade_records_for_guild(guild)
+            await self.sync_guild(guild, priority="background")
+            await self.process_trade_records_for_guild(guild, priority="background")
 
     # ==========================
     # Commands
@@ -517,20 +449,27 @@ class NationStatesLinker2(commands.Cog):
         Show two leaderboards:
           - Non-legendary count
           - Legendary count
-        Counts are for flagged trades (buyer==target_nation and price blank/0 and seller not linked).
+        Counts are for flagged trades (buyer==target_nation and price blank/0 and seller not linked),
+        read from the shared trade archive.
         """
         gconf = self.config.guild(ctx.guild)
         target = await gconf.target_nation()
-        stats = await gconf.trade_stats()
 
         if not target:
             return await ctx.send("No target nation configured. Set it with `nslset targetnation <nation>`.")
+
+        linked = await self.build_linked_nations_for_guild(ctx.guild)
+        stats = {
+            seller: counts
+            for seller, counts in (await self._trades().gift_counts_by_seller(target)).items()
+            if seller not in linked
+        }
         if not stats:
             return await ctx.send("No trade alerts have been recorded yet.")
 
         # Build sorted lists
-        nonleg = sorted(((k, int(v.get("nonlegendary", 0))) for k, v in stats.items()), key=lambda x: x[1], reverse=True)
-        leg = sorted(((k, int(v.get("legendary", 0))) for k, v in stats.items()), key=lambda x: x[1], reverse=True)
+        nonleg = sorted(((k, v[0]) for k, v in stats.items()), key=lambda x: x[1], reverse=True)
+        leg = sorted(((k, v[1]) for k, v in stats.items()), key=lambda x: x[1], reverse=True)
 
         # Trim to top N
         top_n = 15
@@ -564,21 +503,32 @@ class NationStatesLinker2(commands.Cog):
         gconf = self.config.guild(ctx.guild)
         target = await gconf.target_nation()
         regions_map = await gconf.regions()
-        region_stats = await gconf.trade_region_stats()
     
         if not target:
             return await ctx.send("No target nation configured.")
         if not regions_map:
             return await ctx.send("No regions configured.")
+    
+        # Credit each seller's archived gifts to the regions its member currently holds
+        nation_to_member = await self.build_nation_to_member_index(ctx.guild)
+        region_roles = {r: ctx.guild.get_role(role_id) for r, role_id in regions_map.items()}
+        region_stats: Dict[str, List[int]] = {}
+        for seller, (non, leg) in (await self._trades().gift_counts_by_seller(target)).items():
+            member = nation_to_member.get(seller)
+            if member is None:
+                continue
+            for region_norm, role in region_roles.items():
+                if role and role in member.roles:
+                    entry = region_stats.setdefault(region_norm, [0, 0])
+                    entry[0] += non
+                    entry[1] += leg
         if not region_stats:
             return await ctx.send("No region trade credits recorded yet.")
     
         # Build display list in configured region order
         rows = []
         for region_norm in regions_map.keys():
-            entry = region_stats.get(region_norm, {"legendary": 0, "nonlegendary": 0})
-            leg = int(entry.get("legendary", 0))
-            non = int(entry.get("nonlegendary", 0))
+            non, leg = region_stats.get(region_norm, (0, 0))
             total = leg + non
             if total > 0:
                 rows.append((region_norm, total, non, leg))
@@ -654,8 +604,8 @@ class NationStatesLinker2(commands.Cog):
             page = 1
 
         # -------- Load linked nations for target --------
-        linked = [normalize(n) for n in await self.config.user(target).linked_nations()]
-        linked = sorted({n for n in linked if n})
+        await self._links_ready.wait()
+        linked = sorted(self.linked_for(target.id))
 
         if not linked:
             if target.id == ctx.author.id:
@@ -713,6 +663,7 @@ class NationStatesLinker2(commands.Cog):
             if n in ln:
                 ln.remove(n)
                 changed = True
+            self._set_links(ctx.author.id, ln)
 
         if changed:
             await ctx.send(f"Unlinked {display(n)}")
@@ -757,6 +708,7 @@ class NationStatesLinker2(commands.Cog):
                 ln.append(nn)
                 existing.add(nn)
                 added.append(nn)
+            self._set_links(ctx.author.id, ln)
 
         # Feedback
         msg_parts = []
@@ -809,6 +761,7 @@ class NationStatesLinker2(commands.Cog):
             async with self.config.user(ctx.author).linked_nations() as ln:
                 count = len(ln)
                 ln.clear()
+                self._set_links(ctx.author.id, ln)
 
             await ctx.send(f"Unlinked **{count}** nation(s). (All cleared.)")
 
@@ -854,6 +807,7 @@ class NationStatesLinker2(commands.Cog):
                     removed.append(nn)
                 else:
                     not_linked.append(nn)
+            self._set_links(ctx.author.id, ln)
 
         # Build response (avoid Discord 2k limit)
         parts = []
@@ -933,16 +887,13 @@ class NationStatesLinker2(commands.Cog):
     async def nslupdate(self, ctx):
         await ctx.send("Running sync...")
         # Trigger one full pass (don’t call the task function directly)
+        changed = 0
         for guild in self.bot.guilds:
             regions = await self.config.guild(guild).regions()
             if not regions:
                 continue
-            region_data = await self.build_region_data_for_guild(guild)
-            for m in guild.members:
-                if not m.bot:
-                    await self.sync_member(m, region_data)
-                    await asyncio.sleep(0.1)
-        await ctx.send("Done.")
+            changed += await self.sync_guild(guild)
+        await ctx.send(f"Done. Updated roles for {changed} member(s).")
 
     # ==========================
     # UI
@@ -991,6 +942,7 @@ class NationStatesLinker2(commands.Cog):
             async with self.cog.config.user(interaction.user).linked_nations() as ln:
                 if nation_norm not in ln:
                     ln.append(nation_norm)
+                self.cog._set_links(interaction.user.id, ln)
 
             await interaction.response.send_message(
                 f"Linked **[{display(nation_norm)}](https://www.nationstates.net/nation={nation_norm})**",
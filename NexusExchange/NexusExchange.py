@@ -19,7 +19,8 @@ import json
 from redbot.core.utils.chat_formatting import humanize_number
 import math
 from collections import defaultdict
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from redbot.core.data_manager import cog_data_path
 
 from redbot.core import commands, Config
 import json
@@ -83,25 +84,14 @@ class VerifyNationModal(discord.ui.Modal, title="Verify your NationStates nation
                 nations.append(formatted_nation)
 
         # --- Step 3: Fetch residents from API to determine residency ---
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.cog.API_URL, headers={"User-Agent": self.cog.USER_AGENT}) as response:
-                if response.status != 200:
-                    await interaction.response.send_message(
-                        "⚠️ Verified, but I couldn't retrieve residents to set roles. Try again later.",
-                        ephemeral=True
-                    )
-                    return
-
-                xml_data = await response.text()
-
-        start_tag, end_tag = "<NATIONS>", "</NATIONS>"
-        start_index = xml_data.find(start_tag)
-        end_index = xml_data.find(end_tag)
-        residents = []
-        if start_index != -1 and end_index != -1:
-            start_index += len(start_tag)
-            resident_list_raw = xml_data[start_index:end_index].split(":")
-            residents = [n.strip().lower() for n in resident_list_raw if n]
+        resident_list = await self.cog.fetch_nations(priority="interactive")
+        if resident_list is None:
+            await interaction.response.send_message(
+                "⚠️ Verified, but I couldn't retrieve residents to set roles. Try again later.",
+                ephemeral=True
+            )
+            return
+        residents = {n.lower() for n in resident_list}
 
         # --- Step 4: Role assignment on your guild ---
         guild = interaction.client.get_guild(1098644885797609492)  # Your server ID
@@ -165,6 +155,260 @@ class VerifyButton(discord.ui.View):
 
 
 
+class WellcoinLedger:
+    """
+    Write-behind cache for every user's master_balance.
+
+    Balances are loaded from Config once, mutated in memory under a per-user
+    lock, and written back in one batch by flush(). Every change is also
+    appended to a JSONL journal so payouts can be audited after the fact.
+    """
+
+    def __init__(self, config: Config, journal_path_factory):
+        self.config = config
+        self._journal_path_factory = journal_path_factory
+        self._balances: Dict[int, float] = {}
+        self._dirty: Set[int] = set()
+        self._journal: List[dict] = []
+        self._locks = defaultdict(asyncio.Lock)
+        self._flush_lock = asyncio.Lock()
+
+    @staticmethod
+    def _truncate(value: float) -> float:
+        return int(float(value) * 100) / 100.0
+
+    async def _load(self, user_id: int) -> float:
+        if user_id not in self._balances:
+            bal = await self.config.user_from_id(user_id).master_balance()
+            # Another coroutine may have loaded (and changed) it while we awaited.
+            self._balances.setdefault(user_id, float(bal or 0))
+        return self._balances[user_id]
+
+    def _record(self, user_id: int, delta: float, new_bal: float, reason: Optional[str]):
+        self._balances[user_id] = new_bal
+        self._dirty.add(user_id)
+        self._journal.append(
+            {"ts": time.time(), "user": user_id, "delta": delta, "balance": new_bal, "reason": reason}
+        )
+
+    async def balance(self, user_id: int) -> float:
+        return await self._load(user_id)
+
+    async def modify(self, user_id: int, delta: float, *, force: bool = False, reason: Optional[str] = None) -> float:
+        """Apply `delta` to one balance. Raises ValueError on insufficient funds unless force=True."""
+        delta = self._truncate(delta)
+        async with self._locks[user_id]:
+            bal = await self._load(user_id)
+            if delta < 0 and not force and bal < -delta:
+                raise ValueError(
+                    f"Insufficient funds: tried to remove {-delta}, only {bal} available."
+                )
+            new_bal = self._truncate(bal + delta)
+            self._record(user_id, delta, new_bal, reason)
+            return new_bal
+
+    async def set_balance(self, user_id: int, value: float, *, reason: Optional[str] = None) -> float:
+        """Overwrite a balance outright (admin tools, loan processing)."""
+        async with self._locks[user_id]:
+            bal = await self._load(user_id)
+            new_bal = float(value)
+            self._record(user_id, new_bal - bal, new_bal, reason)
+            return new_bal
+
+    async def modify_bulk(
+        self,
+        deltas: Dict[int, float],
+        *,
+        force: bool = False,
+        reason: Optional[str] = None,
+        snapshot: Optional[Dict[int, dict]] = None,
+    ) -> Tuple[Dict[int, float], Dict[int, str]]:
+        """
+        Apply many deltas at once. Balances that are not cached yet are seeded
+        from `snapshot` (or one all_users() read), then every delta is applied
+        in a single synchronous pass so no other change can interleave.
+
+        Returns (applied, failed): new balance per user id, and an error
+        message per user id that was skipped. One bad entry never aborts the batch.
+        """
+        applied: Dict[int, float] = {}
+        failed: Dict[int, str] = {}
+        cleaned: Dict[int, float] = {}
+        for raw_id, raw_delta in deltas.items():
+            try:
+                cleaned[int(raw_id)] = self._truncate(raw_delta)
+            except (TypeError, ValueError):
+                failed[raw_id] = f"Invalid entry: {raw_id!r} -> {raw_delta!r}"
+
+        missing = [uid for uid in cleaned if uid not in self._balances]
+        if missing:
+            if snapshot is None and len(missing) > 1:
+                snapshot = await self.config.all_users()
+            for uid in missing:
+                if snapshot is not None:
+                    bal = snapshot.get(uid, {}).get("master_balance", 0)
+                else:
+                    bal = await self.config.user_from_id(uid).master_balance()
+                self._balances.setdefault(uid, float(bal or 0))
+
+        for uid, delta in cleaned.items():
+            if not delta:
+                continue
+            bal = self._balances[uid]
+            if delta < 0 and not force and bal < -delta:
+                failed[uid] = f"Insufficient funds: tried to remove {-delta}, only {bal} available."
+                continue
+            new_bal = self._truncate(bal + delta)
+            self._record(uid, delta, new_bal, reason)
+            applied[uid] = new_bal
+        return applied, failed
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._balances
+
+    def forget(self, user_id: int):
+        """Drop a cached balance after its Config entry was cleared or replaced elsewhere."""
+        self._balances.pop(user_id, None)
+        self._dirty.discard(user_id)
+
+    def reset(self):
+        """Drop every cached balance and pending write (after a Config wipe)."""
+        self._balances.clear()
+        self._dirty.clear()
+
+    async def flush(self):
+        """Persist every dirty balance and append pending journal entries."""
+        async with self._flush_lock:
+            dirty, self._dirty = self._dirty, set()
+            entries, self._journal = self._journal, []
+            for user_id in dirty:
+                if user_id not in self._balances:
+                    continue
+                try:
+                    await self.config.user_from_id(user_id).master_balance.set(self._balances[user_id])
+                except Exception as e:
+                    # Keep it dirty so the next flush retries.
+                    self._dirty.add(user_id)
+                    print(f"[WellcoinLedger] flush failed for {user_id}: {e}")
+            if entries:
+                path = self._journal_path_factory()
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self._append_journal, path, entries)
+
+    @staticmethod
+    def _append_journal(path, entries: List[dict]):
+        with open(path, "a", encoding="utf-8") as fh:
+            for entry in entries:
+                fh.write(json.dumps(entry) + "\n")
+
+
+# Channels that post an ad every N messages, and the guild counter they use.
+AD_CHANNELS = {
+    1098668923345448970: ("Message_count_spam", 100),
+    1098644885797609495: ("Message_count", 50),
+}
+REWARD_GUILD = 1098644885797609492
+
+
+class ChatRewards:
+    """
+    In-memory state for the chat reward hot path.
+
+    Guild settings are read from Config once and cached until a chatrewards
+    command changes them. Cooldowns are checked against memory, and XP,
+    last-message times and the ad counters accumulate here until flush()
+    writes them back in one batch (coins already go through the ledger).
+    """
+
+    SETTINGS = (
+        "min_message_length",
+        "xp_per_message",
+        "coins_per_message",
+        "message_cooldown",
+        "blacklisted_channels",
+    )
+    COUNTERS = ("Message_count", "Message_count_spam")
+
+    def __init__(self, config: Config):
+        self.config = config
+        self._settings: Dict[int, dict] = {}
+        self._counters: Dict[Tuple[int, str], int] = {}
+        self._dirty_counters: Set[Tuple[int, str]] = set()
+        self._last: Dict[int, float] = {}
+        self._dirty_times: Set[int] = set()
+        self._xp: Dict[int, int] = defaultdict(int)
+        self._flush_lock = asyncio.Lock()
+
+    async def settings(self, guild: discord.Guild) -> dict:
+        settings = self._settings.get(guild.id)
+        if settings is None:
+            data = await self.config.guild(guild).all()
+            settings = {key: data[key] for key in self.SETTINGS}
+            settings["blacklisted_channels"] = set(settings["blacklisted_channels"])
+            self._settings[guild.id] = settings
+            for key in self.COUNTERS:
+                # Counters outlive settings invalidation, so never reseed a live one.
+                self._counters.setdefault((guild.id, key), data[key])
+        return settings
+
+    def invalidate(self, guild: discord.Guild):
+        """Forget cached settings after a chatrewards command changed them."""
+        self._settings.pop(guild.id, None)
+
+    async def bump(self, guild: discord.Guild, key: str) -> int:
+        """Increment a guild message counter; returns the value before the increment."""
+        await self.settings(guild)
+        count = self._counters[(guild.id, key)]
+        self._counters[(guild.id, key)] = count + 1
+        self._dirty_counters.add((guild.id, key))
+        return count
+
+    async def on_cooldown(self, user: discord.abc.User, cooldown: float, now: float) -> bool:
+        if user.id not in self._last:
+            last = await self.config.user(user).last_message_time()
+            self._last.setdefault(user.id, float(last or 0))
+        return now - self._last[user.id] < cooldown
+
+    def stamp(self, user_id: int, now: float):
+        self._last[user_id] = now
+        self._dirty_times.add(user_id)
+
+    def add_xp(self, user_id: int, amount: int):
+        self._xp[user_id] += amount
+
+    def pending_xp(self, user_id: int) -> int:
+        return self._xp.get(user_id, 0)
+
+    async def flush(self):
+        """Write accumulated XP deltas, last-message times and counters."""
+        async with self._flush_lock:
+            xp, self._xp = self._xp, defaultdict(int)
+            times, self._dirty_times = self._dirty_times, set()
+            counters, self._dirty_counters = self._dirty_counters, set()
+            for user_id, delta in xp.items():
+                try:
+                    value = self.config.user_from_id(user_id).xp
+                    # Applied as a delta so XP penalties written meanwhile are kept.
+                    await value.set(await value() + delta)
+                except Exception as e:
+                    self._xp[user_id] += delta
+                    print(f"[ChatRewards] xp flush failed for {user_id}: {e}")
+            for user_id in times:
+                try:
+                    await self.config.user_from_id(user_id).last_message_time.set(self._last[user_id])
+                except Exception as e:
+                    self._dirty_times.add(user_id)
+                    print(f"[ChatRewards] cooldown flush failed for {user_id}: {e}")
+            for guild_id, key in counters:
+                try:
+                    await self.config.guild_from_id(guild_id).get_attr(key).set(
+                        self._counters[(guild_id, key)]
+                    )
+                except Exception as e:
+                    self._dirty_counters.add((guild_id, key))
+                    print(f"[ChatRewards] counter flush failed for {guild_id}/{key}: {e}")
+
+
 class NexusExchange(commands.Cog):
     """A Master Currency Exchange Cog for The Wellspring"""
 
@@ -227,16 +471,38 @@ class NexusExchange(commands.Cog):
         welcome_channel=None   # Optional: allow setting a specific channel
     )
 
-            # NEW: lightweight per-user locks to prevent race conditions
-        self._balance_locks = defaultdict(asyncio.Lock)
+        # Every cog that touches master_balance goes through this ledger;
+        # it also owns the per-user locks that prevent race conditions.
+        self.ledger = WellcoinLedger(
+            self.config, lambda: cog_data_path(self) / "wellcoin_journal.jsonl"
+        )
+        self.rewards = ChatRewards(self.config)
+        self.ads: List[str] = []
+        self.ads_missing = "No ads found."
+
+    async def cog_load(self):
+        self.ads, self.ads_missing = await asyncio.get_running_loop().run_in_executor(
+            None, self._load_ads
+        )
+        if not self.ledger_flush.is_running():
+            self.ledger_flush.start()
+
+    @tasks.loop(seconds=5)
+    async def ledger_flush(self):
+        await self.ledger.flush()
+        await self.rewards.flush()
 
     # ---------- PUBLIC API (usable from other cogs) ----------
 
     async def get_balance(self, user: discord.abc.User) -> int:
         """Return the user's current Wellcoin balance."""
-        return await self.config.user(user).master_balance()
+        return await self.ledger.balance(user.id)
+
+    async def get_xp(self, user: discord.abc.User) -> int:
+        """Return the user's XP, including chat XP not yet flushed to Config."""
+        return await self.config.user(user).xp() + self.rewards.pending_xp(user.id)
 
-    async def modify_wellcoins(self,user: discord.abc.User,delta: float,*,force: bool = False) -> float:
+    async def modify_wellcoins(self,user: discord.abc.User,delta: float,*,force: bool = False, reason: Optional[str] = None) -> float:
         """
         Modify a user's Wellcoin balance by `delta`.
         Supports floats, truncated to 2 decimal places.
@@ -246,6 +512,9 @@ class NexusExchange(commands.Cog):
         - If force=False: balance must have enough coins, otherwise raises ValueError.
         - If force=True: balance may go negative.
 
+        The change lands in the in-memory ledger and is written to Config on
+        the next flush (every few seconds, and on unload).
+
         Returns the NEW balance (float).
         """
         try:
@@ -253,29 +522,49 @@ class NexusExchange(commands.Cog):
         except (TypeError, ValueError):
             raise ValueError("delta must be a number")
 
-        #Truncate (not round) to 2 decimals
-        delta = int(delta * 100) / 100.0
+        return await self.ledger.modify(user.id, delta, force=force, reason=reason)
 
-        lock = self._balance_locks[user.id]
-        async with lock:
-            data = await self.config.user(user).all()
-            bal = float(data.get("master_balance", 0))
+    async def modify_wellcoins_bulk(
+        self,
+        deltas: Optional[Dict[int, float]] = None,
+        *,
+        all_users: Optional[Callable[[int, dict], float]] = None,
+        force: bool = False,
+        reason: Optional[str] = None,
+    ) -> Tuple[Dict[int, float], Dict[int, str]]:
+        """
+        Apply `{user_id: delta}` for many users in one pass and one flush.
 
-            if delta < 0 and not force:
-                if bal < -delta:  # not enough balance
-                    raise ValueError(
-                        f"Insufficient funds: tried to remove {-delta}, only {bal} available."
-                    )
-                new_bal = bal + delta
-            else:
-                new_bal = bal + delta
+        all_users mode: pass a callable `(user_id, user_data) -> delta` instead
+        of `deltas` and it is evaluated against every stored user (interest runs).
+        Zero/None deltas are skipped.
+
+        Returns (applied, failed) keyed by user id; failures (bad ids,
+        insufficient funds when force=False) are reported, not raised.
+        """
+        snapshot = None
+        if all_users is not None:
+            await self.ledger.flush()
+            snapshot = await self.config.all_users()
+            deltas = {}
+            for user_id, data in snapshot.items():
+                delta = all_users(user_id, data)
+                if delta:
+                    deltas[user_id] = delta
+        if not deltas:
+            return {}, {}
+
+        applied, failed = await self.ledger.modify_bulk(deltas, force=force, reason=reason, snapshot=snapshot)
+        await self.ledger.flush()
+        return applied, failed
+
+    async def set_wellcoins(self, user: discord.abc.User, amount: float, *, reason: Optional[str] = None) -> float:
+        """
+        Overwrite a user's Wellcoin balance. Meant for admin tooling; prefer
+        modify_wellcoins for anything that is really a delta.
+        """
+        return await self.ledger.set_balance(user.id, amount, reason=reason)
 
-            #Truncate stored balance to 2 decimals
-            new_bal = int(new_bal * 100) / 100.0
-            data["master_balance"] = new_bal
-            await self.config.user(user).set(data)
-            return new_bal
-            
     async def add_wellcoins(self, user: discord.abc.User, amount: float) -> int:
         """
         Convenience: add `amount` Wellcoins to user.
@@ -360,20 +649,19 @@ class NexusExchange(commands.Cog):
 
 
     
-    async def fetch_nations(self):
-        """Fetch nations from the NationStates API asynchronously."""
-        headers = {"User-Agent": self.USER_AGENT}
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.API_URL, headers=headers) as response:
-                if response.status != 200:
-                    return []
+    def _ns(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so NexusExchange can reach NationStates.")
+        return cog.client
 
-                xml_data = await response.text()
-                start_tag, end_tag = "<NATIONS>", "</NATIONS>"
-                start_index = xml_data.find(start_tag) + len(start_tag)
-                end_index = xml_data.find(end_tag)
-                nations = xml_data[start_index:end_index].split(":")
-                return [n for n in nations if n]
+    async def fetch_nations(self, priority: str = "background") -> Optional[List[str]]:
+        """Region residents, streamed and parsed as they download. None if the API call failed."""
+        ns = self._ns()
+        async with ns.stream(url=self.API_URL, user_agent=self.USER_AGENT, priority=priority) as response:
+            if response.status != 200:
+                return None
+            return [n.name async for n in ns.iter_records(response, "nation")]
 
     
     async def update_nation_days(self):
@@ -404,14 +692,17 @@ class NexusExchange(commands.Cog):
         """Deposit WellCoins into your bank."""
         user = ctx.author
         user_data = self.config.user(user)
-        balance = await user_data.master_balance()
+        balance = await self.get_balance(user)
 
         if deposit <= 0:
             return await ctx.send("❌ You must deposit a positive amount.")
         if deposit > balance:
             return await ctx.send(f"❌ You only have {balance:,.2f} {await self.config.guild(ctx.guild).master_currency_name()} available.")
 
-        await user_data.master_balance.set(balance - deposit)
+        try:
+            await self.modify_wellcoins(user, -deposit, reason="bank_deposit")
+        except ValueError:
+            return await ctx.send(f"❌ You only have {await self.get_balance(user):,.2f} {await self.config.guild(ctx.guild).master_currency_name()} available.")
         current_bank = await user_data.bank_total()
         await user_data.bank_total.set(current_bank + deposit)
 
@@ -539,6 +830,7 @@ class NexusExchange(commands.Cog):
 
     async def fetch_bank_data(self):
         """Fetches all users' bank balances and linked nations."""
+        await self.ledger.flush()
         all_users = await self.config.all_users()
         bank_list = []
 
@@ -552,23 +844,27 @@ class NexusExchange(commands.Cog):
 
         return sorted(bank_list, key=lambda x: x[1], reverse=True)
 
-    def get_random_ad(self):
-        """Fetches a random ad from the ad folder."""
-
-            # Get the absolute path to the ads folder
+    @staticmethod
+    def _load_ads() -> Tuple[List[str], str]:
+        """Read every ad text once; returns (ads, message to use when there are none)."""
         base_dir = os.path.dirname(os.path.abspath(__file__))  # Get the script's directory
         ads_folder = os.path.join(base_dir, "ads")  # Assume ads is in the same folder as the script
-        
+
         if not os.path.exists(ads_folder):
-            return "No ads found."
+            return [], "No ads found."
 
-        files = [f for f in os.listdir(ads_folder) if f.endswith(".txt")]
-        if not files:
-            return "No ad files available."
+        ads = []
+        for name in sorted(os.listdir(ads_folder)):
+            if name.endswith(".txt"):
+                with open(os.path.join(ads_folder, name), "r", encoding="utf-8") as f:
+                    ads.append(f.read())
+        return ads, "No ad files available."
 
-        chosen_file = random.choice(files)
-        with open(os.path.join(ads_folder, chosen_file), "r", encoding="utf-8") as f:
-            return f.read()
+    def get_random_ad(self):
+        """Picks a random ad from the preloaded ad folder."""
+        if not self.ads:
+            return self.ads_missing
+        return random.choice(self.ads)
 
     @commands.command()
     @commands.admin_or_permissions(manage_guild=True)
@@ -730,9 +1026,12 @@ class NexusExchange(commands.Cog):
 
 
     
-    def cog_unload(self):
+    async def cog_unload(self):
         if self.daily_task.is_running():
             self.daily_task.cancel()
+        self.ledger_flush.cancel()
+        await self.ledger.flush()
+        await self.rewards.flush()
             
     async def fetch_endorsements(self):
         """Fetches the list of nations endorsing well-spring_jack"""
@@ -765,14 +1064,13 @@ class NexusExchange(commands.Cog):
 
         # Get all users from config
         all_users = await self.config.all_users()
-        paid_users = 0
-
-        for user_id, data in all_users.items():
-            linked_nations = data.get("linked_nations", [])
-            if any(nation in endorsers for nation in linked_nations):
-                new_balance = data["master_balance"] + 10
-                await self.config.user_from_id(user_id).master_balance.set(new_balance)
-                paid_users += 1
+        rewards = {
+            user_id: 10
+            for user_id, data in all_users.items()
+            if any(nation in endorsers for nation in data.get("linked_nations", []))
+        }
+        applied, _ = await self.modify_wellcoins_bulk(rewards, reason="endorsement")
+        paid_users = len(applied)
 
         await ctx.send(f"✅ Paid 10 WellCoins to {paid_users} users who endorsed {WAD}!")
 
@@ -843,12 +1141,12 @@ class NexusExchange(commands.Cog):
                     user_post_counts[user_id] += 1
     
     
-        # Reward users based on post count
-        for user_id, post_count in user_post_counts.items():
-            reward = 50 if post_count >= 2 else 20  # 50 for 2+ posts, 20 for 1 post
-            user_data = await self.config.user_from_id(user_id).all()
-            new_balance = user_data["master_balance"] + reward
-            await self.config.user_from_id(user_id).master_balance.set(new_balance)
+        # Reward users based on post count (50 for 2+ posts, 20 for 1 post)
+        rewards = {
+            user_id: 50 if post_count >= 2 else 20
+            for user_id, post_count in user_post_counts.items()
+        }
+        await self.modify_wellcoins_bulk(rewards, reason="rmb_post")
     
         return scan, len(user_post_counts)
 
@@ -861,12 +1159,11 @@ class NexusExchange(commands.Cog):
         updated = 0
         all_users = await self.config.all_users()
         for user_id in all_users:
-            user = discord.Object(id=user_id)
-            balance = await self.config.user(user).master_balance()
-            if balance is not None:
-                truncated = math.floor(balance * 100) / 100
-                await self.config.user(user).master_balance.set(truncated)
-                updated += 1
+            balance = await self.ledger.balance(int(user_id))
+            truncated = math.floor(balance * 100) / 100
+            if truncated != balance:
+                await self.ledger.set_balance(int(user_id), truncated, reason="truncate")
+            updated += 1
         await ctx.send(f"✅ Truncated balances for {updated} users to 2 decimal places.")
 
 
@@ -876,9 +1173,9 @@ class NexusExchange(commands.Cog):
         user_conf = self.config.user(ctx.author)
         loan = await user_conf.loan_amount()
         days = await user_conf.loan_days()
-        xp = await user_conf.xp()
+        xp = await self.get_xp(ctx.author)
         bank = await user_conf.bank_total()
-        wallet = await user_conf.master_balance()
+        wallet = await self.get_balance(ctx.author)
     
         if loan <= 0:
             return await ctx.send("🎉 You currently have no outstanding loans.")
@@ -928,18 +1225,16 @@ class NexusExchange(commands.Cog):
             return await ctx.send("❌ You must withdraw a positive amount.")
     
         bank_balance = await user_data.bank_total()
-        wallet = await user_data.master_balance()
     
         if amount > bank_balance:
             return await ctx.send(f"❌ You only have `{bank_balance:,.2f}` WellCoins in your bank account.")
     
-        await user_data.master_balance.set(wallet + amount)
         current_bank = await user_data.bank_total()
         await user_data.bank_total.set(current_bank - amount)
+        new_wallet_balance = await self.modify_wellcoins(user, amount, reason="bank_withdraw")
 
     
         currency = await guild_data.master_currency_name()
-        new_wallet_balance = await user_data.master_balance()
 
         await ctx.send(f"🏧 You withdrew `{amount:,.2f}` {currency} from your bank account.\n💰 New on-hand balance: `{new_wallet_balance:,.2f}` {currency}.")
 
@@ -1040,15 +1335,14 @@ class NexusExchange(commands.Cog):
         """
 
         BASE_DAILY_RATE = .01
-        all_users = await self.config.all_users()
-        updated_users = 0
+        new_banks = {}
         total_interest_paid = 0
 
-        for user_id, data in all_users.items():
+        def interest(user_id, data):
+            nonlocal total_interest_paid
             bank = int(data.get("bank_total", 0))
-            master = int(data.get("master_balance", 0))
             if bank <= 0:
-                continue
+                return 0
 
             # --- Tiers ---
             tier1_principal = min(bank, 50_000)  # compound tier
@@ -1064,15 +1358,15 @@ class NexusExchange(commands.Cog):
                 t1_interest = 1
 
             # Apply: Tier1 compounds into bank_total
-            new_bank = bank + t1_interest
+            new_banks[user_id] = bank + t1_interest
+            total_interest_paid += (t1_interest + t2_interest)
             # Apply: Tier2 pays out into master_balance
-            new_master = master + t2_interest
+            return t2_interest
 
+        await self.modify_wellcoins_bulk(all_users=interest, reason="bank_interest")
+        for user_id, new_bank in new_banks.items():
             await self.config.user_from_id(user_id).bank_total.set(new_bank)
-            await self.config.user_from_id(user_id).master_balance.set(new_master)
-
-            updated_users += 1
-            total_interest_paid += (t1_interest + t2_interest)
+        updated_users = len(new_banks)
 
         await channel.send(
             f"🏦 Applied daily interest to `{updated_users}` accounts.\n"
@@ -1094,6 +1388,7 @@ class NexusExchange(commands.Cog):
             member = guild.get_member(user_id)
             if member is None:
                 await self.config.user(discord.Object(id=user_id)).clear()
+                self.ledger.forget(int(user_id))
                 removed += 1
 
         await ctx.send(f"✅ Cleared config for {removed} users who are no longer in this server.")
@@ -1105,7 +1400,7 @@ class NexusExchange(commands.Cog):
         user = ctx.author
         data = self.config.user(user)
         loan = await data.loan_amount()
-        balance = await data.master_balance()
+        balance = await self.get_balance(user)
     
         if loan <= 0:
             return await ctx.send("🎉 You don't have a loan to repay.")
@@ -1117,7 +1412,10 @@ class NexusExchange(commands.Cog):
             return await ctx.send("❌ You don't have that much on hand.")
     
         payment = min(amount, loan)
-        await data.master_balance.set(balance - payment)
+        try:
+            await self.modify_wellcoins(user, -payment, reason="loan_repayment")
+        except ValueError:
+            return await ctx.send("❌ You don't have that much on hand.")
         await data.loan_amount.set(loan - payment)
     
         await ctx.send(f"✅ You repaid `{payment}` WellCoins. Remaining loan: `{loan - payment}`.")
@@ -1136,7 +1434,7 @@ class NexusExchange(commands.Cog):
         repay_amount = new_loan - loan
     
         bank = await user_conf.bank_total()
-        wallet = await user_conf.master_balance()
+        wallet = start_wallet = await self.ledger.balance(user_id)
         xp = await user_conf.xp()
     
         auto_paid = 0
@@ -1174,7 +1472,8 @@ class NexusExchange(commands.Cog):
     
         # Update values
         await user_conf.bank_total.set(bank)
-        await user_conf.master_balance.set(wallet)
+        if wallet != start_wallet:
+            await self.ledger.modify(user_id, wallet - start_wallet, force=True, reason="loan_autopay")
         await user_conf.loan_amount.set(new_loan)
         await user_conf.loan_days.set(days)
     
@@ -1225,14 +1524,14 @@ class NexusExchange(commands.Cog):
             return await ctx.send("❌ You can't borrow more than 100,000 wellcoins per the law")
         
 
-        if amount > await data.xp() / 10 :
-            return await ctx.send(f"❌ You can't borrow more than a 10th of your exp (Max Loan: {await data.xp() / 10} or 100,000 wellcoins whatever is lower.")
+        if amount > await self.get_xp(ctx.author) / 10 :
+            return await ctx.send(f"❌ You can't borrow more than a 10th of your exp (Max Loan: {await self.get_xp(ctx.author) / 10} or 100,000 wellcoins whatever is lower.")
         
 
         if amount < 0:
             return await ctx.send("❌ You must borrow a positive amount.")
 
-        current_balance = await data.master_balance()
+        current_balance = await self.get_balance(user)
         if current_balance <= 0:
             return await ctx.send("❌ You must have a posative balance to take out a loan from the bank")
         
@@ -1243,8 +1542,7 @@ class NexusExchange(commands.Cog):
     
         await data.loan_amount.set(int(amount*1.05+1))
         await data.loan_days.set(0)
-        current_balance = await data.master_balance()
-        await data.master_balance.set(current_balance + amount)
+        await self.modify_wellcoins(user, amount, reason="loan")
     
         await ctx.send(f"💸 You took a loan of `{amount}` WellCoins. Interest is 5% daily. Repay it soon!")
 
@@ -1516,26 +1814,13 @@ Helpful Resources:
     
         await ctx.send(f"✅ {gained_role} users gained the Wanderer Role.\n❌ {lost_role} users lost the Wanderer Role.")
 
-
-        # Parse XML to get endorsed nations
-        root = ET.fromstring(xml_data)
-        endorsements_text = root.find(".//ENDORSEMENTS").text
-        endorsers = set(endorsements_text.split(",")) if endorsements_text else set()
-
-        if not endorsers:
-            await ctx.send("No endorsers found.")
-            return
-    
-        # Get all users from config
-        all_users = await self.config.all_users()
-        paid_users = 0
-    
-        for user_id, data in all_users.items():
-            linked_nations = data.get("linked_nations", [])
-            if any(nation in endorsers for nation in linked_nations):
-                new_balance = data["master_balance"] + 10
-                await self.config.user_from_id(user_id).master_balance.set(new_balance)
-                paid_users += 1
+        # Endorsement payout: every user with an endorsing nation, one ledger pass
+        rewards = {
+            int(user_id): 10
+            for user_id, data in all_users.items()
+            if any(nation in endorsers for nation in data.get("linked_nations", []))
+        }
+        await self.modify_wellcoins_bulk(rewards, reason="endorsement")
 
     @commands.guild_only()
     @commands.command()
@@ -1549,7 +1834,7 @@ Helpful Resources:
                 continue
             
             # Get values from config
-            master_bal = await self.config.user(member).master_balance()
+            master_bal = await self.get_balance(member)
             bank_total = await self.config.user(member).bank_total()
             
             total_wealth = master_bal + bank_total
@@ -1610,6 +1895,7 @@ Helpful Resources:
     async def reward_users(self, user_votes, vote_9006_council1, vote_9006_council2):
         """Rewards users who voted the same as 'WAD' in either or both councils"""
         all_users = await self.config.all_users()
+        rewards = {}
 
         for user_id, data in all_users.items():
             linked_nations = data.get("linked_nations", [])
@@ -1635,8 +1921,9 @@ Helpful Resources:
                 reward = 0  # No match, no reward
 
             if reward > 0:
-                new_balance = data["master_balance"] + reward
-                await self.config.user_from_id(user_id).master_balance.set(new_balance)
+                rewards[user_id] = reward
+
+        await self.modify_wellcoins_bulk(rewards, reason="wa_vote")
 
     @commands.command()
     @commands.admin()
@@ -1730,7 +2017,7 @@ Helpful Resources:
             return
     
         # Fetch user's current WellCoin balance
-        user_balance = await self.config.user(ctx.author).master_balance()
+        user_balance = await self.get_balance(ctx.author)
     
         if wellcoins_to_spend > user_balance:
             await ctx.send(f"❌ You only have `{user_balance}` WellCoins. Try again with a smaller amount.")
@@ -1744,7 +2031,11 @@ Helpful Resources:
         user_gold_balance = await gold_config.user(ctx.author).get_raw("gold", default=0)
     
         # Update balances
-        await self.config.user(ctx.author).master_balance.set(user_balance - wellcoins_to_spend)
+        try:
+            await self.modify_wellcoins(ctx.author, -wellcoins_to_spend, reason="buy_gold")
+        except ValueError:
+            await ctx.send(f"❌ You only have `{await self.get_balance(ctx.author)}` WellCoins. Try again with a smaller amount.")
+            return
         await gold_config.user(ctx.author).set_raw("gold", value=user_gold_balance + gold_earned)
     
         await ctx.send(f"✅ You have converted `{wellcoins_to_spend}` WellCoins into `{gold_earned}` Gold! Your new Gold balance: `{user_gold_balance + gold_earned}`.")
@@ -1796,7 +2087,7 @@ Helpful Resources:
 
 
             # Fetch the user's current WellCoin balance
-        user_balance = await self.config.user(ctx.author).master_balance()
+        user_balance = await self.get_balance(ctx.author)
     
         # Check if the user has at least 10 WellCoins
         lootbox_cost = 10
@@ -1910,10 +2201,10 @@ Helpful Resources:
                         if execute_response.status == 200:
                             await ctx.send(embed=embed)
                          # Deduct the cost from the user's balance
-                            await self.config.user(ctx.author).master_balance.set(user_balance - lootbox_cost)
+                            new_balance = await self.modify_wellcoins(ctx.author, -lootbox_cost, force=True, reason="lootbox")
                         
                             # Confirm purchase
-                            await ctx.send(f"✅ You bought a lootbox for `{lootbox_cost}` WellCoins! Your new balance: `{user_balance - lootbox_cost}` WellCoins.")
+                            await ctx.send(f"✅ You bought a lootbox for `{lootbox_cost}` WellCoins! Your new balance: `{new_balance}` WellCoins.")
                         else:
                             await ctx.send("Failed to execute the gift.")
 
@@ -1933,7 +2224,7 @@ Helpful Resources:
             return
             
             # Fetch the user's current WellCoin balance
-        user_balance = await self.config.user(ctx.author).master_balance()
+        user_balance = await self.get_balance(ctx.author)
     
         # Check if the user has at least 10 WellCoins
         lootbox_cost = 500
@@ -2032,10 +2323,10 @@ Helpful Resources:
                         if execute_response.status == 200:
                             await ctx.send(embed=embed)
                          # Deduct the cost from the user's balance
-                            await self.config.user(ctx.author).master_balance.set(user_balance - lootbox_cost)
+                            new_balance = await self.modify_wellcoins(ctx.author, -lootbox_cost, force=True, reason="card_request")
                         
                             # Confirm purchase
-                            await ctx.send(f"✅ You bought card ID {id} for `{lootbox_cost}` WellCoins! Your new balance: `{user_balance - lootbox_cost}` WellCoins.")
+                            await ctx.send(f"✅ You bought card ID {id} for `{lootbox_cost}` WellCoins! Your new balance: `{new_balance}` WellCoins.")
                         else:
                             await ctx.send(execute_response.text)
                             await ctx.send("Failed to execute the gift.")
@@ -2052,10 +2343,10 @@ Helpful Resources:
         guild_data = self.config.guild(ctx.guild)
         
         if currency_name is None:
-            balance = await user_data.master_balance()
+            balance = await self.get_balance(member)
             bank = await user_data.bank_total()
             currency = await guild_data.master_currency_name()
-            xp = await user_data.xp()
+            xp = await self.get_xp(member)
         
             msg = (
                 f"**Balance for {member.display_name}:**\n"
@@ -2119,80 +2410,71 @@ Helpful Resources:
         return colors.get(category.upper(), 0xFFFFFF)  # Default to white if not found
 
 
+    def message_routes(self):
+        """Filters for MessageRouter; on_message below covers both when it isn't loaded."""
+        return [
+            {"handler": self.count_ad_message, "channels": AD_CHANNELS, "bots": True},
+            {"handler": self.reward_chat, "guilds": {REWARD_GUILD}},
+        ]
+
     @commands.Cog.listener()
     async def on_message(self, message):
         """Reward users for chatting."""
+        await self.count_ad_message(message)
+        await self.reward_chat(message)
 
-        if len(message.content.strip()) < await self.config.guild(message.guild).min_message_length():
+    async def count_ad_message(self, message):
+        """Count messages in the ad channels and post an ad every so often."""
+        guild = message.guild
+        channel = message.channel
+        if not guild or channel.id not in AD_CHANNELS:
+            return
+
+        settings = await self.rewards.settings(guild)
+        if len(message.content.strip()) < settings["min_message_length"]:
             return  # Ignore low-effort messages
-         
-        if message.channel.id == 1098668923345448970:
-            guild = message.guild
-            count = await self.config.guild(guild).Message_count_spam()
-            await self.config.guild(guild).Message_count_spam.set(count+1)
-            if count % 100 == 0:
-                ad_text = self.get_random_ad()
-                if ad_text:
-                    try:
-                        await message.channel.send(ad_text)
-                    except discord.Forbidden:
-                        print(f"Missing permissions to send messages in {channel.id}")
-            
-        if message.channel.id == 1098644885797609495:
-            guild = message.guild
-            count = await self.config.guild(guild).Message_count()
-            await self.config.guild(guild).Message_count.set(count+1)
-            if count % 50 == 0:
-                ad_text = self.get_random_ad()
-                if ad_text:
-                    try:
-                        await message.channel.send(ad_text)
-                         #end of daily Loops stuff
-                    except discord.Forbidden:
-                        print(f"Missing permissions to send messages in {channel.id}")
-        
-        if message.author.bot or not message.guild:
+
+        key, every = AD_CHANNELS[channel.id]
+        count = await self.rewards.bump(guild, key)
+        if count % every == 0:
+            ad_text = self.get_random_ad()
+            if ad_text:
+                try:
+                    await channel.send(ad_text)
+                except discord.Forbidden:
+                    print(f"Missing permissions to send messages in {channel.id}")
+
+    async def reward_chat(self, message):
+        """Grant XP and WellCoins for a chat message, once per cooldown."""
+        guild = message.guild
+        if message.author.bot or not guild:
             return  # Ignore bot messages and DMs
 
-        if message.guild.id != 1098644885797609492:
+        if guild.id != REWARD_GUILD:
             return  # Ignore messages from other servers
 
-        if len(message.content.strip()) < await self.config.guild(message.guild).min_message_length():
+        settings = await self.rewards.settings(guild)
+        if len(message.content.strip()) < settings["min_message_length"]:
             return  # Ignore low-effort messages
-        
-        
+
         user = message.author
-        guild = message.guild
         channel = message.channel
-        # Fetch config settings
-        xp_per_message = await self.config.guild(guild).xp_per_message()
-        coins_per_message = await self.config.guild(guild).coins_per_message()
-        cooldown_time = await self.config.guild(guild).message_cooldown()
-        blacklisted_channels = await self.config.guild(guild).blacklisted_channels()
-        
-
-        # Check cooldown
-        last_message_time = await self.config.user(user).last_message_time()
         current_time = datetime.utcnow().timestamp()
-        
-        if current_time - last_message_time < cooldown_time:
+        if await self.rewards.on_cooldown(user, settings["message_cooldown"], current_time):
             return  # On cooldown, no rewards
-        
+
         # Grant XP (always given)
-        user_xp = await self.config.user(user).xp()
-        await self.config.user(user).xp.set(user_xp + xp_per_message)
+        self.rewards.add_xp(user.id, settings["xp_per_message"])
 
-        
         # Grant WellCoins if the channel is NOT blacklisted
-        if channel.id not in blacklisted_channels:
-            user_balance = await self.config.user(user).master_balance()
-            await self.config.user(user).master_balance.set(user_balance + coins_per_message)
+        if channel.id not in settings["blacklisted_channels"]:
+            await self.modify_wellcoins(user, settings["coins_per_message"], reason="chat")
             # 10% chance to add a green check mark reaction
             if random.random() < 0.10:
-                await message.add_reaction("💰")          
+                await message.add_reaction("💰")
             # Update last message time
-            await self.config.user(user).last_message_time.set(current_time)
-    
+            self.rewards.stamp(user.id, current_time)
+
     @commands.guild_only()
     @commands.admin()
     @commands.group()
@@ -2204,18 +2486,21 @@ Helpful Resources:
     async def setxp(self, ctx, xp: int):
         """Set the amount of XP gained per message."""
         await self.config.guild(ctx.guild).xp_per_message.set(xp)
+        self.rewards.invalidate(ctx.guild)
         await ctx.send(f"XP per message set to {xp}.")
     
     @chatrewards.command()
     async def setcoins(self, ctx, coins: int):
         """Set the amount of WellCoins gained per valid message."""
         await self.config.guild(ctx.guild).coins_per_message.set(coins)
+        self.rewards.invalidate(ctx.guild)
         await ctx.send(f"WellCoins per message set to {coins}.")
     
     @chatrewards.command()
     async def setcooldown(self, ctx, seconds: int):
         """Set the cooldown time in seconds before users can earn again."""
         await self.config.guild(ctx.guild).message_cooldown.set(seconds)
+        self.rewards.invalidate(ctx.guild)
         await ctx.send(f"Message reward cooldown set to {seconds} seconds.")
     
     @chatrewards.command()
@@ -2227,6 +2512,7 @@ Helpful Resources:
                 await ctx.send(f"{channel.mention} has been blacklisted from earning WellCoins.")
             else:
                 await ctx.send(f"{channel.mention} is already blacklisted.")
+        self.rewards.invalidate(ctx.guild)
     
     @chatrewards.command()
     async def unblacklist(self, ctx, channel: discord.TextChannel):
@@ -2237,6 +2523,7 @@ Helpful Resources:
                 await ctx.send(f"{channel.mention} has been removed from the blacklist.")
             else:
                 await ctx.send(f"{channel.mention} is not blacklisted.")
+        self.rewards.invalidate(ctx.guild)
     
     @chatrewards.command()
     async def viewsettings(self, ctx):
@@ -2253,6 +2540,7 @@ Helpful Resources:
     async def setminlength(self, ctx, length: int):
         """Set the minimum message length required to earn rewards."""
         await self.config.guild(ctx.guild).min_message_length.set(length)
+        self.rewards.invalidate(ctx.guild)
         await ctx.send(f"Minimum message length set to {length} characters.")
 
     @commands.command(name="adminsetnation")
@@ -2285,20 +2573,11 @@ Helpful Resources:
                 nations.append(formatted_nation)
 
         # 4) Pull current resident list from your region’s API.
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                self.API_URL, headers={"User-Agent": self.USER_AGENT}
-            ) as response:
-                if response.status != 200:
-                    await ctx.send("Failed to retrieve residents. Try again later.")
-                    return
-
-                xml_data = await response.text()
-                start_tag, end_tag = "<NATIONS>", "</NATIONS>"
-                start_index = xml_data.find(start_tag) + len(start_tag)
-                end_index = xml_data.find(end_tag)
-                residents_raw = xml_data[start_index:end_index].split(":")
-                residents = [n.strip().lower() for n in residents_raw if n]
+        resident_list = await self.fetch_nations(priority="interactive")
+        if resident_list is None:
+            await ctx.send("Failed to retrieve residents. Try again later.")
+            return
+        residents = {n.lower() for n in resident_list}
 
         # 5) Role IDs – reuse the same ones you hard-coded earlier.
         guild = ctx.guild  # must be run in the verification server
@@ -2378,7 +2657,7 @@ Helpful Resources:
             await ctx.send("❌ Amount must be greater than zero.")
             return
 
-        sender_balance = await self.config.user(ctx.author).master_balance()
+        sender_balance = await self.get_balance(ctx.author)
         if sender_balance < amount:
             await ctx.send(f"❌ You do not have enough WellCoins to complete this transaction. You only have {sender_balance} WellCoins")
             return
@@ -2387,9 +2666,12 @@ Helpful Resources:
             await ctx.send("❌ You can't pay yourself!")
             return
 
-        recipient_balance = await self.config.user(recipient).master_balance()
-        await self.config.user(ctx.author).master_balance.set(sender_balance - amount)
-        await self.config.user(recipient).master_balance.set(recipient_balance + amount)
+        try:
+            await self.modify_wellcoins(ctx.author, -amount, reason=f"pay:{recipient.id}")
+        except ValueError:
+            await ctx.send(f"❌ You do not have enough WellCoins to complete this transaction. You only have {await self.get_balance(ctx.author)} WellCoins")
+            return
+        await self.modify_wellcoins(recipient, amount, reason=f"pay:{ctx.author.id}")
 
         await ctx.send(f"✅ {ctx.author.mention} has sent `{amount}` WellCoins to {recipient.mention}!")
 
@@ -2403,8 +2685,7 @@ Helpful Resources:
             await ctx.send("❌ Amount must be greater than zero.")
             return
 
-        user_balance = await self.config.user(user).master_balance()
-        await self.config.user(user).master_balance.set(user_balance + amount)
+        await self.modify_wellcoins(user, amount, reason="govpay")
         await ctx.send(f"🏛️ Gob The great has issued `{amount}` WellCoins to {user.mention}!")
 
     @commands.guild_only()
@@ -2417,7 +2698,7 @@ Helpful Resources:
             return
     
         # Get current balances
-        user_wallet = await self.config.user(user).master_balance()
+        user_wallet = await self.get_balance(user)
         user_bank = await self.config.user(user).bank_total()
     
         total_funds = user_wallet + user_bank
@@ -2430,13 +2711,13 @@ Helpful Resources:
             else:
                 remaining_fine = amount - user_bank
                 await self.config.user(user).bank_total.set(0)
-                await self.config.user(user).master_balance.set(user_wallet - remaining_fine)
+                await self.modify_wellcoins(user, -remaining_fine, force=True, reason="fine")
             await ctx.send(f"🚨 {user.mention} has been fined `{amount}` WellCoins by Gob on behalf of the government!")
         else:
             # Not enough funds, set wallet negative for the difference
             remaining = amount - total_funds
             await self.config.user(user).bank_total.set(0)
-            await self.config.user(user).master_balance.set(-remaining)
+            await self.set_wellcoins(user, -remaining, reason="fine")
             await ctx.send(
                 f"🚨 {user.mention} has been fined `{amount}` WellCoins by Gob on behalf of the government! "
                 f"They didn’t have enough, so their balance is now negative `{remaining}` WellCoins."
@@ -2614,15 +2895,14 @@ Helpful Resources:
             return
     
         user = ctx.author
-        user_data = self.config.user(user)
         guild_data = self.config.guild(ctx.guild)
     
-        balance = await user_data.master_balance()
-        if balance < amount:
+        try:
+            await self.modify_wellcoins(user, -amount, reason="donation")
+        except ValueError:
             await ctx.send("You don't have enough WellCoins. Check you balance with $balance")
             return
-    
-        await user_data.master_balance.set(balance - amount)
+
         school_fund = await guild_data.School_fund()
         await guild_data.School_fund.set(school_fund + amount)
     
@@ -2637,7 +2917,6 @@ Helpful Resources:
             return
     
         guild_data = self.config.guild(ctx.guild)
-        user_data = self.config.user(member)
     
         school_fund = await guild_data.School_fund()
         if school_fund < amount:
@@ -2645,8 +2924,7 @@ Helpful Resources:
             return
     
         await guild_data.School_fund.set(school_fund - amount)
-        balance = await user_data.master_balance()
-        await user_data.master_balance.set(balance + amount)
+        await self.modify_wellcoins(member, amount, reason="fund_payout")
     
         await ctx.send(f"{member.mention} has received {amount} WellCoins from the school fund.")
 
@@ -2690,15 +2968,14 @@ Helpful Resources:
             return
     
         user = ctx.author
-        user_data = self.config.user(user)
         guild_data = self.config.guild(ctx.guild)
     
-        balance = await user_data.master_balance()
-        if balance < amount:
+        try:
+            await self.modify_wellcoins(user, -amount, reason="donation")
+        except ValueError:
             await ctx.send("You don't have enough WellCoins. Check you balance with $balance")
             return
-    
-        await user_data.master_balance.set(balance - amount)
+
         school_fund = await guild_data.scholarship_fund()
         await guild_data.scholarship_fund.set(school_fund + amount)
     
@@ -2713,7 +2990,6 @@ Helpful Resources:
             return
     
         guild_data = self.config.guild(ctx.guild)
-        user_data = self.config.user(member)
     
         school_fund = await guild_data.scholarship_fund()
         if school_fund < amount:
@@ -2721,8 +2997,7 @@ Helpful Resources:
             return
     
         await guild_data.scholarship_fund.set(school_fund - amount)
-        balance = await user_data.master_balance()
-        await user_data.master_balance.set(balance + amount)
+        await self.modify_wellcoins(member, amount, reason="fund_payout")
     
         await ctx.send(f"{member.mention} has received {amount} WellCoins from the scholarship fund.")
 
@@ -2748,6 +3023,7 @@ Helpful Resources:
     @commands.command(name="dumpuserdata")
     async def dump_user_data(self, ctx, user: commands.UserConverter):
         """Dump all user config data across cogs into a JSON file."""
+        await self.ledger.flush()
         data = {}
 
         for cogname, cog in self.bot.cogs.items():
@@ -2791,6 +3067,7 @@ Helpful Resources:
                 try:
                     await cog.config.user_from_id(user.id).set(cogdata)
                     updated_cogs.append(cogname)
+                    self.ledger.forget(user.id)
                 except Exception as e:
                     await ctx.send(f"⚠️ Failed to update `{cogname}`: {e}")
 
@@ -2814,6 +3091,7 @@ Helpful Resources:
         if fmt not in {"csv", "json"}:
             return await ctx.send("❌ Invalid format. Use `csv` or `json`.")
     
+        await self.ledger.flush()
         users = await self.config.all_users()
         # users is a dict: { "user_id": { "master_balance": <num>, ... }, ... }
     
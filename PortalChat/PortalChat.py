@@ -1,15 +1,168 @@
 from __future__ import annotations
 import asyncio
-from typing import Dict, List, Optional
+import io
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set
 import discord
 from discord import AllowedMentions
 from redbot.core import commands, Config, checks
 from redbot.core.bot import Red
+from redbot.core.data_manager import cog_data_path
 import aiohttp
 from discord.ext import tasks
 from datetime import datetime, timedelta
 
 
+MAP_BUCKET_SECONDS = 3600  # mappings expire one hour-bucket at a time
+WEBHOOK_CONCURRENCY = 1     # in-flight sends per destination webhook (1 keeps each channel in order)
+WEBHOOK_429_RETRIES = 2     # extra attempts when a send still comes back 429
+FAILURE_DIGEST_MINUTES = 10
+
+
+class MapEntry(NamedTuple):
+    c: int            # counterpart channel id
+    m: int            # counterpart message id
+    w: Optional[str]  # webhook that created the destination message
+
+
+class MappingStore:
+    """
+    SQLite table of relayed message id -> counterpart, one row per direction.
+
+    Lookups and inserts go through the primary key, so relaying a message no
+    longer rewrites the whole map. Each row carries the hour bucket it was
+    written in; expiry and the size cap delete whole buckets through their
+    index, oldest first, using an in-memory count per bucket instead of a scan.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS mapping (
+            message_id INTEGER PRIMARY KEY,
+            counterpart_channel_id INTEGER NOT NULL,
+            counterpart_message_id INTEGER NOT NULL,
+            webhook_url TEXT,
+            bucket INTEGER NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS mapping_bucket ON mapping (bucket)",
+    )
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        for stmt in self.SCHEMA:
+            self.db.execute(stmt)
+        self.db.commit()
+        self._buckets: Dict[int, int] = dict(
+            self.db.execute("SELECT bucket, COUNT(*) FROM mapping GROUP BY bucket").fetchall()
+        )
+
+    def close(self):
+        self.db.close()
+
+    def __len__(self) -> int:
+        return sum(self._buckets.values())
+
+    @staticmethod
+    def _bucket(ts: Optional[int] = None) -> int:
+        if ts is None:
+            ts = int(datetime.utcnow().timestamp())
+        return ts // MAP_BUCKET_SECONDS
+
+    def get(self, message_id: int) -> Optional[MapEntry]:
+        row = self.db.execute(
+            "SELECT counterpart_channel_id, counterpart_message_id, webhook_url FROM mapping WHERE message_id = ?",
+            (int(message_id),),
+        ).fetchone()
+        return MapEntry(*row) if row else None
+
+    def _forget(self, message_ids) -> int:
+        dropped = 0
+        for mid in message_ids:
+            row = self.db.execute("SELECT bucket FROM mapping WHERE message_id = ?", (int(mid),)).fetchone()
+            if row:
+                self.db.execute("DELETE FROM mapping WHERE message_id = ?", (int(mid),))
+                self._buckets[row[0]] -= 1
+                if not self._buckets[row[0]]:
+                    del self._buckets[row[0]]
+                dropped += 1
+        return dropped
+
+    def put_pair(
+        self,
+        a_id: int, a_channel_id: int,
+        b_id: int, b_channel_id: int,
+        webhook_url: Optional[str],
+        ts: Optional[int] = None,
+    ) -> None:
+        """Record a <-> b in both directions."""
+        bucket = self._bucket(ts)
+        self._forget((a_id, b_id))
+        self.db.executemany(
+            "INSERT INTO mapping VALUES (?, ?, ?, ?, ?)",
+            (
+                (int(a_id), int(b_channel_id), int(b_id), webhook_url, bucket),
+                (int(b_id), int(a_channel_id), int(a_id), webhook_url, bucket),
+            ),
+        )
+        self.db.commit()
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 2
+
+    def set_webhook(self, message_id: int, webhook_url: str) -> None:
+        self.db.execute(
+            "UPDATE mapping SET webhook_url = ? WHERE message_id = ?", (webhook_url, int(message_id))
+        )
+        self.db.commit()
+
+    def pop_pair(self, message_id: int) -> Optional[MapEntry]:
+        """Remove a message's entry and its counterpart's reverse entry; returns the counterpart."""
+        val = self.get(message_id)
+        if val:
+            self._forget((message_id, val.m))
+            self.db.commit()
+        return val
+
+    def _drop_buckets(self, buckets: List[int]) -> int:
+        dropped = 0
+        for b in buckets:
+            self.db.execute("DELETE FROM mapping WHERE bucket = ?", (b,))
+            dropped += self._buckets.pop(b, 0)
+        self.db.commit()
+        return dropped
+
+    def expire(self, cutoff_ts: int) -> int:
+        """Drop every bucket that ended before cutoff_ts."""
+        cutoff = self._bucket(cutoff_ts)
+        return self._drop_buckets([b for b in self._buckets if b < cutoff])
+
+    def trim(self, max_rows: int) -> int:
+        """Over the cap, drop oldest buckets until ~20% under it (never the current bucket)."""
+        size = len(self)
+        if size <= max_rows:
+            return 0
+        target = max_rows - max(1, max_rows // 5)
+        current = self._bucket()
+        drop = []
+        for b in sorted(self._buckets):
+            if size <= target or b >= current:
+                break
+            drop.append(b)
+            size -= self._buckets[b]
+        return self._drop_buckets(drop)
+
+    def import_legacy(self, mapping: Dict[str, dict]) -> int:
+        """Move the old Config mapping dict into the table (tuple entries had no ts and are dropped)."""
+        rows = []
+        for k, v in mapping.items():
+            if isinstance(v, dict) and "c" in v and "m" in v:
+                rows.append((int(k), int(v["c"]), int(v["m"]), v.get("w"), self._bucket(int(v.get("ts", 0)))))
+        self.db.executemany("INSERT OR REPLACE INTO mapping VALUES (?, ?, ?, ?, ?)", rows)
+        self.db.commit()
+        self._buckets = dict(self.db.execute("SELECT bucket, COUNT(*) FROM mapping GROUP BY bucket").fetchall())
+        return len(rows)
+
 
 class PortalChat(commands.Cog):
     """
@@ -25,9 +178,15 @@ class PortalChat(commands.Cog):
     def __init__(self, bot: Red) -> None:
         self.bot = bot
         self.config = Config.get_conf(self, identifier=0xC0FFEE10, force_registration=True)
-        # mapping: message_id -> {"c": counterpart_channel_id, "m": counterpart_message_id, "ts": unix_timestamp}
+        # mapping: legacy message_id -> {"c", "m", "w", "ts"} dict, imported into the store on load
         self.config.register_global(links=[], mapping={}, max_age_days=7, max_map=5000)
         self._lock = asyncio.Lock()
+        self.store = MappingStore(cog_data_path(self) / "mapping.sqlite3")
+        # Fan-out state: one semaphore per webhook URL, and relay failures
+        # grouped by (source channel id, error) until the next digest
+        self._webhook_limits: Dict[str, asyncio.Semaphore] = {}
+        self._failures: Dict[tuple, int] = {}
+        self._sources: Set[int] = set()
         self.session: aiohttp.ClientSession | None = aiohttp.ClientSession()
         # Edit debug + dry-run (so you can test publicly without editing live webhook messages)
         self.edit_debug: bool = False
@@ -35,9 +194,17 @@ class PortalChat(commands.Cog):
         # start periodic cleanup
         try:
             self._purge_old_mappings.start()
+            self._failure_digest.start()
         except RuntimeError:
             pass
 
+    async def cog_load(self) -> None:
+        self._remember_sources(await self._get_links())
+        legacy = await self.config.mapping()
+        if legacy:
+            self.store.import_legacy(legacy)
+            await self.config.mapping.clear()
+
     async def _delete_counterpart_message(
         self,
         src_channel_id: int,
@@ -116,19 +283,9 @@ class PortalChat(commands.Cog):
         Save a <-> mapping for message IDs, including the webhook URL used to create the
         destination message so we can later edit/delete via the webhook API.
         """
-        now_ts = int(datetime.utcnow().timestamp())
-        async with self._lock:
-            mapping = await self.config.mapping()
-            mapping[str(a_msg.id)] = {"c": b_msg.channel.id, "m": b_msg.id, "w": webhook_url, "ts": now_ts}
-            mapping[str(b_msg.id)] = {"c": a_msg.channel.id, "m": a_msg.id, "w": webhook_url, "ts": now_ts}
-            # size-based prune using config cap
-            max_map = await self.config.max_map()
-            if len(mapping) > max_map:
-                items = sorted(mapping.items(), key=lambda kv: kv[1].get("ts", 0) if isinstance(kv[1], dict) else 0)
-                drop = max(1, len(items) // 5)  # drop oldest ~20%
-                for k, _ in items[:drop]:
-                    mapping.pop(k, None)
-            await self.config.mapping.set(mapping)
+        self.store.put_pair(a_msg.id, a_msg.channel.id, b_msg.id, b_msg.channel.id, webhook_url)
+        # size-based prune using config cap
+        self.store.trim(await self.config.max_map())
 
     async def _resolve_webhook_for_pair(self, src_channel_id: int, dest_channel_id: int) -> Optional[str]:
         """
@@ -167,34 +324,19 @@ class PortalChat(commands.Cog):
         """
         # Ignore system/Guildless cases are fine; we only rely on IDs here.
         try:
-            async with self._lock:
-                mapping = await self.config.mapping()
-                val = mapping.pop(str(payload.message_id), None)
-
-                # Nothing to mirror
-                if not val:
-                    await self.config.mapping.set(mapping)
-                    return
-
-                # Prepare to also drop the counterpart's reverse entry
-                try:
-                    counterpart_key = str(val["m"] if isinstance(val, dict) else val[1])
-                    mapping.pop(counterpart_key, None)
-                except Exception:
-                    pass
+            # Drops the counterpart's reverse entry too
+            val = self.store.pop_pair(payload.message_id)
 
-                await self.config.mapping.set(mapping)
+            # Nothing to mirror
+            if not val:
+                return
 
             # With mapping removed, we can safely delete the counterpart (no loops)
-            dest_channel_id = val["c"] if isinstance(val, dict) else val[0]
-            dest_message_id = val["m"] if isinstance(val, dict) else val[1]
-            wh_url = val.get("w") if isinstance(val, dict) else None
-
             await self._delete_counterpart_message(
                 src_channel_id=payload.channel_id,
-                dest_channel_id=dest_channel_id,
-                dest_message_id=dest_message_id,
-                wh_url=wh_url,
+                dest_channel_id=val.c,
+                dest_message_id=val.m,
+                wh_url=val.w,
             )
 
         except Exception:
@@ -205,6 +347,25 @@ class PortalChat(commands.Cog):
 
     async def _set_links(self, links: List[dict]) -> None:
         await self.config.links.set(links)
+        self._remember_sources(links)
+
+    def _remember_sources(self, links: List[dict]) -> None:
+        # Linked source channels, so MessageRouter can skip every other channel without Config
+        self._sources = {l.get("source_channel_id") for l in links}
+        # Forget the semaphores of webhooks no link uses any more
+        urls = {l.get("webhook_url") for l in links}
+        self._webhook_limits = {u: sem for u, sem in self._webhook_limits.items() if u in urls}
+
+    def message_routes(self):
+        """Filters for MessageRouter: user messages in a linked source text channel."""
+        return [{
+            "handler": self.relay_message,
+            "check": lambda m: (
+                m.webhook_id is None
+                and isinstance(m.channel, discord.TextChannel)
+                and m.channel.id in self._sources
+            ),
+        }]
 
     async def _find_links_from_source(self, source_id: int) -> List[dict]:
         return [l for l in await self._get_links() if l.get("source_channel_id") == source_id]
@@ -221,15 +382,31 @@ class PortalChat(commands.Cog):
         if self.session is None or self.session.closed:
             self.session = aiohttp.ClientSession()
         wh = discord.Webhook.from_url(webhook_url, session=self.session)
-        return await wh.send(
-            content=content,
-            username=username,
-            avatar_url=avatar_url,
-            files=files or [],
-            embeds=embeds or [],
-            allowed_mentions=AllowedMentions.none(),
-            wait=True,
-        )
+        limit = self._webhook_limits.setdefault(webhook_url, asyncio.Semaphore(WEBHOOK_CONCURRENCY))
+        async with limit:
+            for attempt in range(WEBHOOK_429_RETRIES + 1):
+                try:
+                    return await wh.send(
+                        content=content,
+                        username=username,
+                        avatar_url=avatar_url,
+                        files=files or [],
+                        embeds=embeds or [],
+                        allowed_mentions=AllowedMentions.none(),
+                        wait=True,
+                    )
+                except discord.HTTPException as e:
+                    if e.status != 429 or attempt == WEBHOOK_429_RETRIES:
+                        raise
+                    retry_after = 1.0
+                    try:
+                        retry_after = float(e.response.headers.get("Retry-After", retry_after))
+                    except Exception:
+                        pass
+                    await asyncio.sleep(retry_after)
+                    # File streams were consumed by the failed attempt
+                    for f in files or []:
+                        f.reset()
 
     def _is_bot_user(self, guild_id: Optional[int], user_id: int) -> bool:
         if user_id == self.bot.user.id:
@@ -261,7 +438,8 @@ class PortalChat(commands.Cog):
 
         content = message.content or None
 
-        files: List[discord.File] = []
+        # (bytes, filename, spoiler) downloaded once and wrapped per destination
+        blobs: List[tuple] = []
         embeds: List[discord.Embed] = []
 
         try:
@@ -312,12 +490,12 @@ class PortalChat(commands.Cog):
                     # Inline autoplay GIF via embed (CDN URL) instead of re-upload
                     embeds.append(discord.Embed().set_image(url=attachment.url))
                 else:
-                    files.append(await attachment.to_file(spoiler=is_spoiler))
+                    blobs.append((await attachment.read(), attachment.filename, bool(is_spoiler)))
         except Exception:
             pass
 
 
-        if not content and not files and not embeds:
+        if not content and not blobs and not embeds:
             return
 
         avatar_url = str(message.author.display_avatar.url) if message.author.display_avatar else None
@@ -325,27 +503,25 @@ class PortalChat(commands.Cog):
         if len(username) > 32:
             username = username[:32]
 
-        for link in links:
-            webhook_url = link.get("webhook_url")
-            if not webhook_url:
-                continue
+        async def deliver(webhook_url: str):
             try:
                 relayed_msg = await self._send_via_webhook(
                     webhook_url=webhook_url,
                     content=content,
                     username=username,
                     avatar_url=avatar_url,
-                    files=files.copy() if files else None,
+                    files=[discord.File(io.BytesIO(data), filename=name, spoiler=spoiler)
+                           for data, name, spoiler in blobs] or None,
                     embeds=embeds.copy() if embeds else None,
                 )
                 if relayed_msg:
                     await self._save_bidirectional_mapping(message, relayed_msg, webhook_url)
             except Exception as e:
-                owner = (await self.bot.application_info()).owner
-                try:
-                    await owner.send(f"❌ Failed to send message to webhook in {message.channel.mention}: {type(e).__name__}: {e}")
-                except Exception:
-                    pass
+                key = (message.channel.id, f"{type(e).__name__}: {e}")
+                self._failures[key] = self._failures.get(key, 0) + 1
+
+        # All destinations at once; each webhook's semaphore keeps its own channel in order
+        await asyncio.gather(*(deliver(l["webhook_url"]) for l in links if l.get("webhook_url")))
 
     # -----------------------------
     # Edit mirroring (source -> destination webhook)
@@ -370,8 +546,7 @@ class PortalChat(commands.Cog):
                     pass
             return
 
-        mapping = await self.config.mapping()
-        val = mapping.get(str(after.id))
+        val = self.store.get(after.id)
         if not val:
             if owner and self.edit_debug:
                 try:
@@ -380,23 +555,15 @@ class PortalChat(commands.Cog):
                     pass
             return
 
-        wh_url = val.get("w") if isinstance(val, dict) else None
+        wh_url = val.w
         if not wh_url:
             # Try to re-hydrate the webhook URL from links based on destination channel
-            dest_channel_id = val["c"] if isinstance(val, dict) else val[0]
-            wh_url = await self._resolve_webhook_for_pair(after.channel.id, dest_channel_id)
+            wh_url = await self._resolve_webhook_for_pair(after.channel.id, val.c)
         
             if wh_url:
                 # Save back into mapping for future edits
                 try:
-                    async with self._lock:
-                        mapping = await self.config.mapping()
-                        entry = mapping.get(str(after.id), {})
-                        if isinstance(entry, dict):
-                            entry["w"] = wh_url
-                            entry["ts"] = int(datetime.utcnow().timestamp())
-                            mapping[str(after.id)] = entry
-                            await self.config.mapping.set(mapping)
+                    self.store.set_webhook(after.id, wh_url)
                     if owner and self.edit_debug:
                         try:
                             await owner.send(f"📝 EDIT: rehydrated webhook URL for source msg {after.id}")
@@ -430,7 +597,7 @@ class PortalChat(commands.Cog):
                 await owner.send("".join([
                         "🧪 EDIT DEBUG (dry-run=" + str(self.edit_dry_run) + ")",
                         f"source: #{after.channel} / msg {after.id}",
-                        f"dest:   msg {val['m']}",
+                        f"dest:   msg {val.m}",
                         f"embeds: {len(new_embeds)}",
                         f"content preview: {preview}",
                         f"webhook: {wh_url[:60]}...",
@@ -448,11 +615,11 @@ class PortalChat(commands.Cog):
             if self.session is None or self.session.closed:
                 self.session = aiohttp.ClientSession()
             wh = discord.Webhook.from_url(wh_url, session=self.session)
-            await wh.edit_message(val["m"], content=new_content, embeds=new_embeds or [])
+            await wh.edit_message(val.m, content=new_content, embeds=new_embeds or [])
         except Exception as e:
             if owner and self.edit_debug:
                 try:
-                    await owner.send(f"❌ EDIT: failed to edit dest msg {val['m']} for source {after.id}: {type(e).__name__}: {e}")
+                    await owner.send(f"❌ EDIT: failed to edit dest msg {val.m} for source {after.id}: {type(e).__name__}: {e}")
                 except Exception:
                     pass
 
@@ -464,12 +631,11 @@ class PortalChat(commands.Cog):
         # Ignore any bot reactions to avoid loops across multiple bots
         if self._is_bot_user(payload.guild_id, payload.user_id):
             return
-        mapping = await self.config.mapping()
-        val = mapping.get(str(payload.message_id))
+        val = self.store.get(payload.message_id)
         if not val:
             return
-        dest_channel = self.bot.get_channel(val["c"]) if isinstance(val, dict) else self.bot.get_channel(val[0])
-        dest_msg_id = val["m"] if isinstance(val, dict) else val[1]
+        dest_channel = self.bot.get_channel(val.c)
+        dest_msg_id = val.m
         if not dest_channel:
             return
         try:
@@ -485,12 +651,11 @@ class PortalChat(commands.Cog):
         # Ignore bot-originated removals (rare, but keep symmetry)
         if self._is_bot_user(payload.guild_id, payload.user_id):
             return
-        mapping = await self.config.mapping()
-        val = mapping.get(str(payload.message_id))
+        val = self.store.get(payload.message_id)
         if not val:
             return
-        dest_channel = self.bot.get_channel(val["c"]) if isinstance(val, dict) else self.bot.get_channel(val[0])
-        dest_msg_id = val["m"] if isinstance(val, dict) else val[1]
+        dest_channel = self.bot.get_channel(val.c)
+        dest_msg_id = val.m
         if not dest_channel:
             return
         try:
@@ -594,19 +759,9 @@ class PortalChat(commands.Cog):
     @tasks.loop(minutes=30)
     async def _purge_old_mappings(self):
         try:
-            mapping = await self.config.mapping()
-            if not mapping:
-                return
             max_age_days = await self.config.max_age_days()
             cutoff = int((datetime.utcnow() - timedelta(days=max_age_days)).timestamp())
-            # keep dict entries newer than cutoff; drop old tuple entries (no ts)
-            new_map = {}
-            for k, v in mapping.items():
-                if isinstance(v, dict):
-                    if v.get("ts", 0) >= cutoff:
-                        new_map[k] = v
-                # tuples are treated as stale and dropped
-            await self.config.mapping.set(new_map)
+            self.store.expire(cutoff)
         except Exception:
             pass
 
@@ -614,14 +769,38 @@ class PortalChat(commands.Cog):
     async def _before_purge(self):
         await self.bot.wait_until_ready()
 
+    @tasks.loop(minutes=FAILURE_DIGEST_MINUTES)
+    async def _failure_digest(self):
+        """DM the owner one summary of relay failures instead of one DM per failed send."""
+        if not self._failures:
+            return
+        failures, self._failures = self._failures, {}
+        lines = [
+            f"• <#{channel_id}> ×{count}: {error[:200]}"
+            for (channel_id, error), count in sorted(failures.items(), key=lambda kv: -kv[1])
+        ]
+        msg = f"❌ Portal relay failures (last {FAILURE_DIGEST_MINUTES} min):\n" + "\n".join(lines)
+        try:
+            owner = (await self.bot.application_info()).owner
+            await owner.send(msg[:1990])
+        except Exception:
+            pass
+
+    @_failure_digest.before_loop
+    async def _before_digest(self):
+        await self.bot.wait_until_ready()
+
     def cog_unload(self):
         if hasattr(self, "_purge_old_mappings") and self._purge_old_mappings.is_running():
             self._purge_old_mappings.cancel()
+        if hasattr(self, "_failure_digest") and self._failure_digest.is_running():
+            self._failure_digest.cancel()
         if self.session and not self.session.closed:
             try:
                 asyncio.create_task(self.session.close())
             except Exception:
                 pass
+        self.store.close()
 
 
 async def setup(bot: Red) -> None:
@@ -1,7 +1,217 @@
 from redbot.core import commands, Config
+from redbot.core.data_manager import cog_data_path
 import discord
+import asyncio
 from collections import defaultdict, Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 import io
+import json
+import random
+import sqlite3
+import time
+
+BENCH_MAX_BALLOTS = 50_000  # rcvbench caps; the bench runs in a worker thread
+BENCH_MAX_CANDIDATES = 20
+PROTECTED = "nay"  # never eliminated, even with the fewest votes
+
+
+class BallotBox:
+    """
+    Ballots live in their own SQLite table, one row per (guild, election, voter),
+    so casting a vote is a single upsert instead of rewriting the guild's
+    election blob. Identical ballots are grouped by SQL for the tally.
+    """
+
+    def __init__(self, path: Path):
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS ballots (
+                guild_id INTEGER NOT NULL,
+                election TEXT NOT NULL,
+                voter TEXT NOT NULL,
+                choices TEXT NOT NULL,
+                PRIMARY KEY (guild_id, election, voter)
+            )"""
+        )
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def cast(self, guild_id: int, election: str, voter: str, choices: List[str]) -> None:
+        """Record (or overwrite) one voter's ballot."""
+        self.db.execute(
+            "INSERT OR REPLACE INTO ballots VALUES (?, ?, ?, ?)",
+            (guild_id, election, voter, json.dumps(choices)),
+        )
+        self.db.commit()
+
+    def cast_many(self, guild_id: int, election: str, votes: Dict[str, List[str]]) -> None:
+        self.db.executemany(
+            "INSERT OR REPLACE INTO ballots VALUES (?, ?, ?, ?)",
+            ((guild_id, election, voter, json.dumps(choices)) for voter, choices in votes.items()),
+        )
+        self.db.commit()
+
+    def count(self, guild_id: int, election: str) -> int:
+        return self.db.execute(
+            "SELECT COUNT(*) FROM ballots WHERE guild_id = ? AND election = ?", (guild_id, election)
+        ).fetchone()[0]
+
+    def ballots(self, guild_id: int, election: str) -> List[Tuple[str, List[str]]]:
+        rows = self.db.execute(
+            "SELECT voter, choices FROM ballots WHERE guild_id = ? AND election = ? ORDER BY rowid",
+            (guild_id, election),
+        )
+        return [(voter, json.loads(choices)) for voter, choices in rows]
+
+    def grouped(self, guild_id: int, election: str) -> Dict[Tuple[str, ...], int]:
+        """Distinct ballot -> how many voters cast it, in order of first appearance."""
+        rows = self.db.execute(
+            "SELECT choices, COUNT(*) FROM ballots WHERE guild_id = ? AND election = ? "
+            "GROUP BY choices ORDER BY MIN(rowid)",
+            (guild_id, election),
+        )
+        return {tuple(json.loads(choices)): n for choices, n in rows}
+
+    def clear(self, guild_id: int, election: str) -> None:
+        self.db.execute("DELETE FROM ballots WHERE guild_id = ? AND election = ?", (guild_id, election))
+        self.db.commit()
+
+
+class RunoffResult(NamedTuple):
+    rounds: List[Dict[str, int]]   # continuing candidates' votes, one dict per round
+    eliminated: List[List[str]]    # candidates dropped after each round
+    winner: Optional[str]
+    method: str                    # "majority", "first-round", "tiebreak" or "tied"
+
+
+def instant_runoff(groups: Dict[Tuple[str, ...], int], candidates: Iterable[str]) -> RunoffResult:
+    """
+    Instant-runoff over grouped ballots.
+
+    Each distinct ballot sits in the bucket of its highest-ranked continuing
+    candidate together with its weight. Eliminating a candidate only moves the
+    ballots in that candidate's bucket to their next continuing choice, so
+    every ballot is read front to back at most once over the whole count.
+    The rules match the old tally: zero-first-round candidates drop out up
+    front, all lowest candidates go at once, "nay" is never eliminated, and a
+    count that stops changing falls back to the first-round tiebreak.
+    """
+    first_round: Counter = Counter()
+    for ballot, n in groups.items():
+        if ballot:
+            first_round[ballot[0]] += n
+
+    continuing = {c for c in candidates if first_round[c] > 0 or c == PROTECTED}
+    buckets: Dict[str, list] = defaultdict(list)
+    tally: Counter = Counter()
+
+    def place(ballot: Tuple[str, ...], start: int, n: int) -> None:
+        for i in range(start, len(ballot)):
+            if ballot[i] in continuing:
+                buckets[ballot[i]].append((ballot, i, n))
+                tally[ballot[i]] += n
+                return
+        # exhausted: no continuing choice left on this ballot
+
+    for ballot, n in groups.items():
+        place(ballot, 0, n)
+
+    rounds: List[Dict[str, int]] = []
+    eliminated: List[List[str]] = []
+    while True:
+        current = {c: n for c, n in tally.items() if n > 0}
+        if rounds and rounds[-1] == current:
+            break
+        rounds.append(current)
+        if not current:
+            break
+
+        total = sum(current.values())
+        for candidate, count in current.items():
+            if count > total / 2:
+                return RunoffResult(rounds, eliminated, candidate, "majority")
+
+        low = min(current.values())
+        out = sorted(c for c, n in current.items() if n == low and c != PROTECTED)
+        eliminated.append(out)
+        continuing.difference_update(out)
+        for c in out:
+            tally.pop(c, None)
+            for ballot, pos, n in buckets.pop(c, ()):
+                place(ballot, pos + 1, n)
+
+        if not continuing:
+            break
+
+    # Tiebreaker: most first-round votes, then the later rounds in order
+    ranked = sorted(first_round.items(), key=lambda x: x[1], reverse=True)
+    if not ranked:
+        return RunoffResult(rounds, eliminated, None, "tied")
+    top_votes = ranked[0][1]
+    top = [c for c, n in ranked if n == top_votes]
+    if len(top) == 1:
+        return RunoffResult(rounds, eliminated, top[0], "first-round")
+
+    for round_result in rounds[1:]:
+        for candidate in top:
+            if candidate in round_result:
+                top_votes = round_result[candidate]
+                break
+        if top_votes:
+            top = [c for c in top if round_result.get(c, 0) == top_votes]
+        if len(top) == 1:
+            return RunoffResult(rounds, eliminated, top[0], "tiebreak")
+
+    return RunoffResult(rounds, eliminated, None, "tied")
+
+
+def format_report(name: str, ballots: int, result: RunoffResult) -> str:
+    lines = [f"**Election '{name.capitalize()}' — {ballots} ballot(s)**"]
+    for i, round_result in enumerate(result.rounds, start=1):
+        standings = " · ".join(
+            f"{c.capitalize()} {n}" for c, n in sorted(round_result.items(), key=lambda x: (-x[1], x[0]))
+        )
+        line = f"**Round {i}:** {standings or 'no continuing votes'}"
+        if i <= len(result.eliminated) and result.eliminated[i - 1]:
+            line += " — eliminated " + ", ".join(c.capitalize() for c in result.eliminated[i - 1])
+        lines.append(line)
+
+    winner = result.winner.capitalize() if result.winner else None
+    if result.method == "majority":
+        lines.append(f"🏆 **{winner} wins with a majority!**")
+    elif result.method == "first-round":
+        lines.append(f"🏆 **{winner} wins based on first-round votes! In the Tie breaker round**")
+    elif result.method == "tiebreak":
+        lines.append(f"🏆 **{winner} wins based on further round tiebreakers!**")
+    else:
+        lines.append("⚠️ **Election remains tied after all rounds. No winner determined.**")
+    return "\n".join(lines)
+
+
+def _bench_runoff(ballots: int, candidates: int, seed: int) -> Tuple[Counter, RunoffResult, float]:
+    """Build synthetic ballot groups and time instant_runoff on them (ms); runs off the event loop."""
+    rng = random.Random(seed)
+    names = [f"c{i}" for i in range(1, candidates + 1)]
+    weights = [1 / (i + 1) for i in range(len(names))]  # a few front-runners, long tail
+
+    groups: Counter = Counter()
+    for _ in range(ballots):
+        ranked = []
+        pool, w = names[:], weights[:]
+        for _ in range(rng.randint(1, len(names))):
+            pick = rng.choices(range(len(pool)), weights=w)[0]
+            ranked.append(pool.pop(pick))
+            w.pop(pick)
+        groups[tuple(ranked)] += 1
+
+    started = time.perf_counter()
+    result = instant_runoff(groups, names)
+    return groups, result, (time.perf_counter() - started) * 1000
+
 
 class RCV(commands.Cog):
     """A cog for running Ranked Choice Voting elections."""
@@ -9,7 +219,24 @@ class RCV(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=1983746508234, force_registration=True)
+        # elections: name -> {"candidates": [...], "status": "open"}; ballots are in self.box
         self.config.register_guild(elections={})
+        self.box = BallotBox(cog_data_path(self) / "ballots.sqlite3")
+
+    async def cog_load(self):
+        # Move ballots still embedded in the election blob into the ballot box
+        for guild_id, data in (await self.config.all_guilds()).items():
+            elections = data.get("elections") or {}
+            if not any("votes" in e for e in elections.values()):
+                continue
+            for name, election in elections.items():
+                votes = election.pop("votes", None)
+                if votes:
+                    self.box.cast_many(guild_id, name, votes)
+            await self.config.guild_from_id(guild_id).elections.set(elections)
+
+    def cog_unload(self):
+        self.box.close()
 
     @commands.guild_only()
     @commands.command()
@@ -18,198 +245,136 @@ class RCV(commands.Cog):
         if not candidates:
             return await ctx.send("You must provide at least two candidates.")
 
-        elections = await self.config.guild(ctx.guild).elections()
         election_name = election_name.lower()
-
-        if election_name in elections:
-            return await ctx.send(f"An election named '{election_name}' is already running.")
-
         candidates = [c.lower() for c in candidates]
 
-        elections[election_name] = {
-            "candidates": candidates,
-            "votes": {},
-            "status": "open"
-        }
-        await self.config.guild(ctx.guild).elections.set(elections)
+        async with self.config.guild(ctx.guild).elections() as elections:
+            if election_name in elections:
+                return await ctx.send(f"An election named '{election_name}' is already running.")
+            elections[election_name] = {
+                "candidates": candidates,
+                "status": "open"
+            }
+        # Drop anything left behind by an earlier election of the same name
+        self.box.clear(ctx.guild.id, election_name)
 
         candidate_list = "\n".join(f"- {c.capitalize()}" for c in candidates)
         await ctx.send(f"Election '{election_name.capitalize()}' started! Candidates:\n{candidate_list}\nUse `$vote {election_name} <ranked choices>` to vote.")
 
-    @commands.guild_only()
-    @commands.command()
-    async def vote(self, ctx, election_name: str, *choices: str):
-        """Vote in a ranked choice election by listing candidates in order of preference."""
+    async def _open_election(self, ctx, election_name: str, choices, noun: str):
+        """Validate a ballot against an open election; returns the cleaned choices or None."""
         elections = await self.config.guild(ctx.guild).elections()
-        election_name = election_name.lower()
-
-        if election_name not in elections:
-            return await ctx.send("No such election exists.")
-
-        election = elections[election_name]
+        election = elections.get(election_name)
+        if election is None:
+            await ctx.send("No such election exists.")
+            return None
         if election["status"] != "open":
-            return await ctx.send("This election has ended.")
+            await ctx.send("This election has ended.")
+            return None
 
         candidates = set(election["candidates"])
         choices = [c.lower() for c in choices]
 
         if not set(choices).issubset(candidates):
-            return await ctx.send("Invalid vote! Your choices must be from the listed candidates.")
+            await ctx.send(f"Invalid {noun}! Your choices must be from the listed candidates.")
+            return None
 
         if len(choices) != len(set(choices)):
-            return await ctx.send("Duplicate candidates detected! Ensure each choice is unique.")
+            await ctx.send("Duplicate candidates detected! Ensure each choice is unique.")
+            return None
+        return choices
 
-        election["votes"][str(ctx.author.id)] = choices  # Overwrites previous vote
-        await self.config.guild(ctx.guild).elections.set(elections)
+    @commands.guild_only()
+    @commands.command()
+    async def vote(self, ctx, election_name: str, *choices: str):
+        """Vote in a ranked choice election by listing candidates in order of preference."""
+        election_name = election_name.lower()
+        choices = await self._open_election(ctx, election_name, choices, "vote")
+        if choices is None:
+            return
+
+        self.box.cast(ctx.guild.id, election_name, str(ctx.author.id), choices)  # Overwrites previous vote
         await ctx.send(f"Your vote for '{election_name.capitalize()}' has been recorded!")
 
     @commands.guild_only()
     @commands.command()
     async def cancel_election(self, ctx, election_name: str):
         """Cancel an ongoing election."""
-        elections = await self.config.guild(ctx.guild).elections()
         election_name = election_name.lower()
 
-        if election_name not in elections:
-            return await ctx.send("No such election exists.")
-
-        del elections[election_name]
-        await self.config.guild(ctx.guild).elections.set(elections)
+        async with self.config.guild(ctx.guild).elections() as elections:
+            if election_name not in elections:
+                return await ctx.send("No such election exists.")
+            del elections[election_name]
+        self.box.clear(ctx.guild.id, election_name)
         await ctx.send(f"Election '{election_name.capitalize()}' has been canceled.")
 
     @commands.guild_only()
     @commands.command()
     async def add_test_ballot(self, ctx, election_name: str, *choices: str):
         """Add a test ballot manually to an election."""
-        elections = await self.config.guild(ctx.guild).elections()
         election_name = election_name.lower()
-
-        if election_name not in elections:
-            return await ctx.send("No such election exists.")
-
-        election = elections[election_name]
-        if election["status"] != "open":
-            return await ctx.send("This election has ended.")
-
-        candidates = set(election["candidates"])
-        choices = [c.lower() for c in choices]
-
-        if not set(choices).issubset(candidates):
-            return await ctx.send("Invalid ballot! Your choices must be from the listed candidates.")
-
-        if len(choices) != len(set(choices)):
-            return await ctx.send("Duplicate candidates detected! Ensure each choice is unique.")
+        choices = await self._open_election(ctx, election_name, choices, "ballot")
+        if choices is None:
+            return
 
         # Use a special ID for test ballots to avoid conflicts with real voters
-        test_voter_id = f"test_{len(election['votes']) + 1}"
-        election["votes"][test_voter_id] = choices  # Adds test ballot
+        test_voter_id = f"test_{self.box.count(ctx.guild.id, election_name) + 1}"
+        self.box.cast(ctx.guild.id, election_name, test_voter_id, choices)  # Adds test ballot
 
-        await self.config.guild(ctx.guild).elections.set(elections)
         await ctx.send(f"✅ Test ballot added for '{election_name.capitalize()}': {', '.join(choices)}")
 
     @commands.guild_only()
     @commands.command()
     async def tally(self, ctx, election_name: str):
         """Tally votes and determine the winner using Ranked Choice Voting."""
-        elections = await self.config.guild(ctx.guild).elections()
         election_name = election_name.lower()
 
-        if election_name not in elections:
-            return await ctx.send("No such election exists.")
-        
-        election = elections.get(election_name, {})
-        if election.get("status") != "open":
-            return await ctx.send("This election has already been tallied.")
-
-        votes = election.get("votes", {})
-        if not votes:
-            return await ctx.send("No votes have been cast in this election.")
-
-        election["status"] = "closed"
-        await self.config.guild(ctx.guild).elections.set(elections)
-
-        candidates = set(election.get("candidates", []))
-        first_round_votes = Counter(v[0] for v in votes.values() if v)
-        
-        # Remove candidates with 0 votes in the first round, but ensure 'ney' is not eliminated
-        candidates -= {cand for cand in candidates if first_round_votes[cand] == 0 and cand != "nay"}
-
-        rounds = []
-        last_round = None
-        
-        while True:
-            round_results = Counter()
-            
-            for ballot in votes.values():
-                for choice in ballot:
-                    if choice in candidates:
-                        round_results[choice] += 1
-                        break  # Only count the highest-ranked valid candidate
-            
-            total_votes = sum(round_results.values())
-            rounds.append(dict(round_results))
-            
-            # Check if the last round is identical to the previous round, if so, trigger tiebreaker
-            if last_round and last_round == round_results:
-                break
-            last_round = round_results.copy()
-            
-            # Announce current round results
-            result_text = "\n".join(f"{cand.capitalize()}: {count}" for cand, count in round_results.items())
-            await ctx.send(f"**Round {len(rounds)} Results:**\n{result_text}")
-            
-            # Check if a candidate has a majority
-            for candidate, count in round_results.items():
-                if count > total_votes / 2:
-                    elections.pop(election_name, None)  # Remove election safely
-                    await self.config.guild(ctx.guild).elections.set(elections)
-                    return await ctx.send(f"🏆 **{candidate.capitalize()} wins with a majority!**")
-            
-            # Find the lowest vote-getters, but ensure 'ney' is not eliminated
-            min_votes = min(round_results.values())
-            lowest_candidates = {cand for cand, count in round_results.items() if count == min_votes and cand != "nay"}
-            
-            # Eliminate lowest-ranked candidates
-            candidates -= lowest_candidates
-            
-            # If no candidates remain, backtrack to first-round results
-            if not candidates:
-                break
-        
-        # Initiate tiebreaker
-        remaining_candidates = sorted(first_round_votes.items(), key=lambda x: x[1], reverse=True)
-        top_votes = remaining_candidates[0][1]
-        top_candidates = [cand for cand, count in remaining_candidates if count == top_votes]
-
-        # Create a file with all votes before initiating tiebreaker
-        all_votes_text = "\n".join(f"{voter}: {', '.join(choices)}" for voter, choices in votes.items())
-        vote_file = io.BytesIO(all_votes_text.encode("utf-8"))
-        vote_file.name = f"{election_name}_votes.txt"
-        await ctx.send("📜 **All Votes:**", file=discord.File(vote_file))
-        
-        if len(top_candidates) == 1:
+        async with self.config.guild(ctx.guild).elections() as elections:
+            if election_name not in elections:
+                return await ctx.send("No such election exists.")
+
+            election = elections[election_name]
+            if election.get("status") != "open":
+                return await ctx.send("This election has already been tallied.")
+
+            ballots = self.box.count(ctx.guild.id, election_name)
+            if not ballots:
+                return await ctx.send("No votes have been cast in this election.")
+
+            election["status"] = "closed"
+
+        result = instant_runoff(self.box.grouped(ctx.guild.id, election_name), election.get("candidates", []))
+        report = format_report(election_name, ballots, result)
+
+        files = []
+        if result.method != "majority":
+            # Publish every ballot whenever the count goes to a tiebreaker
+            all_votes_text = "\n".join(
+                f"{voter}: {', '.join(choices)}" for voter, choices in self.box.ballots(ctx.guild.id, election_name)
+            )
+            files.append(discord.File(io.BytesIO(all_votes_text.encode("utf-8")), filename=f"{election_name}_votes.txt"))
+        if len(report) > 1900:
+            # Long runoffs: headline here, the full round-by-round report as a file
+            files.insert(0, discord.File(io.BytesIO(report.encode("utf-8")), filename=f"{election_name}_rounds.txt"))
+            report = report.splitlines()[-1]
+        await ctx.send(report, files=files)
+
+        async with self.config.guild(ctx.guild).elections() as elections:
             elections.pop(election_name, None)  # Remove election safely
-            await self.config.guild(ctx.guild).elections.set(elections)
-            return await ctx.send(f"🏆 **{top_candidates[0].capitalize()} wins based on first-round votes! In the Tie breaker round**")
-        
-        for round_number, round_result in enumerate(rounds[1:], start=2):
-            for candidate in top_candidates:
-                if candidate in round_result:
-                    top_votes = round_result[candidate]
-                    break
-            
-            if top_votes:
-                top_candidates = [cand for cand in top_candidates if round_result.get(cand, 0) == top_votes]
-            
-            if len(top_candidates) == 1:
-                elections.pop(election_name, None)  # Remove election safely
-                await self.config.guild(ctx.guild).elections.set(elections)
-                return await ctx.send(f"🏆 **{top_candidates[0].capitalize()} wins based on further round tiebreakers!**")
-        
-        elections.pop(election_name, None)  # Remove election safely
-        await self.config.guild(ctx.guild).elections.set(elections)
-        return await ctx.send("⚠️ **Election remains tied after all rounds. No winner determined.**")
-
-
-
+        self.box.clear(ctx.guild.id, election_name)
 
+    @commands.is_owner()
+    @commands.command()
+    async def rcvbench(self, ctx, ballots: int = 10000, candidates: int = 8, seed: int = 1):
+        """Tally synthetic ballots in memory and report how long the count took."""
+        ballots = max(1, min(ballots, BENCH_MAX_BALLOTS))
+        candidates = max(2, min(candidates, BENCH_MAX_CANDIDATES))
+        async with ctx.typing():
+            groups, result, elapsed = await asyncio.to_thread(_bench_runoff, ballots, candidates, seed)
+
+        await ctx.send(
+            f"{ballots} ballots ({len(groups)} distinct) over {candidates} candidates: "
+            f"{len(result.rounds)} round(s) in {elapsed:.1f} ms — "
+            f"winner {result.winner or 'none'} ({result.method})."
+        )
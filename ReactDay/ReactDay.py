@@ -10,6 +10,14 @@ class ReactDay(commands.Cog):
         self.config = Config.get_conf(self, identifier=123456789)
         self.config.register_guild(react_users={})  # Stores user_id: {"emoji": str, "expires": timestamp}
         self.recently_reacted = {}  # Stores user_id: last_reacted_timestamp
+        self.react_ids = {}  # guild_id: set of user ids in react_users, so other messages skip Config
+
+    async def cog_load(self):
+        for guild_id, data in (await self.config.all_guilds()).items():
+            self.react_ids[guild_id] = {int(uid) for uid in data.get("react_users", {})}
+
+    def _remember(self, guild, guild_data):
+        self.react_ids[guild.id] = {int(uid) for uid in guild_data}
 
     @commands.guild_only()
     @commands.admin_or_permissions(manage_messages=True)
@@ -31,6 +39,7 @@ class ReactDay(commands.Cog):
             expiration = (datetime.datetime.utcnow() + datetime.timedelta(days=1)).timestamp()
             guild_data[str(member.id)] = {"emoji": emoji, "expires": expiration}
             await self.config.guild(ctx.guild).react_users.set(guild_data)
+            self._remember(ctx.guild, guild_data)
 
             await ctx.send(f"✅ {member.mention} will have {emoji} added to their messages for the next 24 hours.")
 
@@ -41,6 +50,7 @@ class ReactDay(commands.Cog):
             if str(member.id) in guild_data:
                 del guild_data[str(member.id)]
                 await self.config.guild(ctx.guild).react_users.set(guild_data)
+                self._remember(ctx.guild, guild_data)
                 await ctx.send(f"❌ Stopped reacting to messages from {member.mention}.")
             else:
                 await ctx.send("That user is not in the list.")
@@ -58,6 +68,10 @@ class ReactDay(commands.Cog):
         else:
             await ctx.send("Invalid action. Use `add`, `remove`, or `list`.")
 
+    def message_routes(self):
+        """Filters for MessageRouter: only messages from users in the react list."""
+        return [{"handler": self.on_message, "check": lambda m: m.author.id in self.react_ids.get(m.guild.id, ())}]
+
     @commands.Cog.listener()
     async def on_message(self, message):
         """Automatically adds a reaction to messages from users in the list, once per minute."""
@@ -75,6 +89,7 @@ class ReactDay(commands.Cog):
             if current_time > data["expires"]:
                 del guild_data[user_id]
                 await self.config.guild(message.guild).react_users.set(guild_data)
+                self._remember(message.guild, guild_data)
                 return
             
             # Check if the user has received a reaction in the last minute
@@ -164,7 +164,6 @@ class RogueLiteNation(commands.Cog):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=789456123789, force_registration=True)
         self.config.register_guild(skill_tree={})
-        self.shared_config = Config.get_conf(None, identifier=345678654456, force_registration=True)
 
         self.config.register_user(
             nation=None,
@@ -197,7 +196,12 @@ class RogueLiteNation(commands.Cog):
             "money": [18, 19, 16, 10, 23, 20, 1, 79, 22, 13, 76, 12, 11, 24, 15, 25, 14, 21]
         }
 
-    
+    def _nexus(self):
+        cog = self.bot.get_cog("NexusExchange")
+        if not cog:
+            raise RuntimeError("NexusExchange cog not found. Please load it so RogueLiteNation can use Wellcoins.")
+        return cog
+
     async def has_skill(self, user: discord.User, path: str) -> bool:
         """
         Check if a user has a specific skill unlocked.
@@ -292,7 +296,7 @@ class RogueLiteNation(commands.Cog):
 
         embed.add_field(name="Gems", value=str(int(base['gems'] + bonus.get('gems', 0))), inline=False)
 
-        wellcoins = await self.shared_config.user(ctx.author).master_balance()
+        wellcoins = await self._nexus().get_balance(ctx.author)
         embed.add_field(name="Wellcoins", value=str(wellcoins), inline=False)
 
         await ctx.send(embed=embed)
@@ -402,11 +406,11 @@ class RogueLiteNation(commands.Cog):
         total_cost = amount * rate
         user = ctx.author
 
-        wallet = await self.shared_config.user(user).master_balance()
-        if wallet < total_cost:
+        try:
+            await self._nexus().take_wellcoins(user, total_cost, force=False)
+        except ValueError:
             return await ctx.send("Not enough Wellcoins!")
 
-        await self.shared_config.user(user).master_balance.set(wallet - total_cost)
         bonus = await self.config.user(user).bonus_stats()
         bonus["gems"] += amount
         await self.config.user(user).bonus_stats.set(bonus)
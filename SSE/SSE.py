@@ -8,6 +8,14 @@ from aiohttp_sse_client import client as sse_client
 
 log = logging.getLogger("red.nsevents")
 
+SSE_BUCKETS = ("rmb", "move", "founding", "cte", "vote", "resolution", "member")
+
+NATION_TAG = re.compile(r"@@(.[^@]+)@@")
+REGION_TAG = re.compile(r"%%(.[^%]+)%%")
+BOLD_TAG = re.compile(r"\[b\](.*?)\[/b\]", re.I)
+QUOTE_TAG = re.compile(r"\[quote=.*?\](.*?)\[/quote\]", re.S | re.I)
+LINK_LABEL = re.compile(r"\[(.*?)\]\(")
+
 class SSE(commands.Cog):
     """NationStates SSE Watcher with Region Filtering"""
 
@@ -21,29 +29,68 @@ class SSE(commands.Cog):
         }
         self.config.register_global(**default_global)
         self.task = None
-        self.url = "https://www.nationstates.net/api/rmb+moves+founding+cte+vote+resolution+member"
+        self.url = "https://www.nationstates.net/api/" + "+".join(SSE_BUCKETS)
+        # Compiled (pattern, region bucket or None, template) per rule, and the
+        # output channel; reloaded whenever the nset commands change them.
+        self._rules = []
+        self._channel_id = None
 
     def cog_unload(self):
         if self.task:
             self.task.cancel()
 
     async def cog_load(self):
+        await self._load_settings()
+        await self.start_listener()
+
+    async def _load_settings(self):
+        self._channel_id = await self.config.channel_id()
+        compiled = []
+        for rule in await self.config.rules():
+            try:
+                pattern = re.compile(rule["regex"], re.IGNORECASE)
+            except re.error as e:
+                log.warning("Skipping SSE rule with a bad regex %r: %s", rule.get("regex"), e)
+                continue
+            region = rule.get("region")
+            bucket = f"region:{region.lower().replace(' ', '_')}" if region else None
+            compiled.append((pattern, bucket, rule["template"]))
+        self._rules = compiled
+
+    def sse_subscription(self) -> dict:
+        """Let SSEHub feed us from its shared connection instead of our own."""
+        return {"buckets": SSE_BUCKETS, "handler": self.handle_sse_event}
+
+    async def handle_sse_event(self, event):
+        await self.process_event(event.data)
+
+    async def start_listener(self):
+        if self.task and not self.task.done():
+            return
+        hub = self.bot.get_cog("SSEHub")
+        if hub is not None and await hub.register(self):
+            return
         self.task = asyncio.create_task(self.sse_listener())
 
+    async def stop_listener(self):
+        if self.task:
+            self.task.cancel()
+        self.task = None
+
     def clean_ns_text(self, text: str) -> str:
         """Hyperlinks nations/regions and cleans BBCode."""
         if not text: return ""
         # Nations/Regions to Markdown Links
-        text = re.sub(r"@@(.[^@]+)@@", r"[\1](https://www.nationstates.net/nation=\1)", text)
-        text = re.sub(r"%%(.[^%]+)%%", r"[\1](https://www.nationstates.net/region=\1)", text)
+        text = NATION_TAG.sub(r"[\1](https://www.nationstates.net/nation=\1)", text)
+        text = REGION_TAG.sub(r"[\1](https://www.nationstates.net/region=\1)", text)
         
         # BBCode cleaning
-        text = re.sub(r"\[b\](.*?)\[/b\]", r"**\1**", text, flags=re.I)
-        text = re.sub(r"\[quote=.*?\](.*?)\[/quote\]", r"> \1", text, flags=re.S | re.I)
+        text = BOLD_TAG.sub(r"**\1**", text)
+        text = QUOTE_TAG.sub(r"> \1", text)
         
         # Clean underscores in display names only (not URLs)
         # This is a bit tricky, so we just replace underscores in the bracketed labels
-        text = re.sub(r"\[(.*?)\]\(", lambda m: f"[{m.group(1).replace('_', ' ')}](", text)
+        text = LINK_LABEL.sub(lambda m: f"[{m.group(1).replace('_', ' ')}](", text)
         return text
 
     async def sse_listener(self):
@@ -63,29 +110,25 @@ class SSE(commands.Cog):
                 await asyncio.sleep(10)
 
     async def process_event(self, data: dict):
-        chan_id = await self.config.channel_id()
-        channel = self.bot.get_channel(chan_id)
+        if not self._rules:
+            return
+        channel = self.bot.get_channel(self._channel_id) if self._channel_id else None
         if not channel: return
 
         raw_str = data.get("str", "")
         buckets = data.get("buckets", [])
-        rules = await self.config.rules()
 
-        for rule in rules:
+        for pattern, target_bucket, t in self._rules:
             # Check Regex first
-            if not re.search(rule["regex"], raw_str, re.IGNORECASE):
+            if not pattern.search(raw_str):
                 continue
             
             # Check Region Filter (if specified in rule)
-            filter_region = rule.get("region")
-            if filter_region:
-                # Format check: "The North Pacific" -> "region:the_north_pacific"
-                target_bucket = f"region:{filter_region.lower().replace(' ', '_')}"
-                if target_bucket not in buckets:
-                    continue
+            # Format check: "The North Pacific" -> "region:the_north_pacific"
+            if target_bucket and target_bucket not in buckets:
+                continue
 
             # Build Embed
-            t = rule["template"]
             clean_str = self.clean_ns_text(raw_str)
             rmb_msg = self.clean_ns_text(data.get("rmbMessage", ""))
 
@@ -112,11 +155,16 @@ class SSE(commands.Cog):
         Add a rule with a region filter. Use 'None' for no region filter.
         Example: [p]nset addrule "founded" "The North Pacific" {"title": "New TNP Nation", "color": 3066993}
         """
+        try:
+            re.compile(regex, re.IGNORECASE)
+        except re.error as e:
+            return await ctx.send(f"Invalid regex: {e}")
         try:
             template = json.loads(template_json)
             region_val = None if region.lower() == "none" else region
             async with self.config.rules() as rules:
                 rules.append({"regex": regex, "region": region_val, "template": template})
+            await self._load_settings()
             await ctx.send(f"Rule added for region: {region_val or 'Any'}")
         except json.JSONDecodeError:
             await ctx.send("Invalid JSON template.")
@@ -125,6 +173,7 @@ class SSE(commands.Cog):
     async def clear(self, ctx):
         """Clear all rules."""
         await self.config.rules.set([])
+        await self._load_settings()
         await ctx.send("Rules cleared.")
 
     @nset.command()
@@ -137,4 +186,5 @@ class SSE(commands.Cog):
     async def channel(self, ctx, channel: discord.TextChannel):
         """Set output channel."""
         await self.config.channel_id.set(channel.id)
+        await self._load_settings()
         await ctx.send(f"Target set to {channel.mention}")
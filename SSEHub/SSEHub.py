@@ -0,0 +1,412 @@
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import aiohttp
+from redbot.core import commands, Config
+from redbot.core.data_manager import cog_data_path
+
+log = logging.getLogger("red.wellspring.ssehub")
+
+SSE_BASE = "https://www.nationstates.net/api/"
+DEFAULT_UA = "9003"
+
+# A connection that has been silent this long is dropped and reopened.
+IDLE_TIMEOUT = 3600
+MAX_BACKOFF = 60
+
+# Each subscriber gets a bounded queue. When it is full the reader waits up to
+# PUBLISH_TIMEOUT for room (which stops it reading the socket) before the event
+# is dropped for that subscriber alone.
+DEFAULT_QUEUE = 500
+PUBLISH_TIMEOUT = 5.0
+
+
+class SSEEvent:
+    """One NationStates SSE event, decoded once and shared by every subscriber."""
+
+    __slots__ = ("id", "time", "text", "html", "rmb_message", "buckets", "data", "received")
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.id = str(data.get("id") or "")
+        self.time = data.get("time")
+        self.text = data.get("str") or ""
+        self.html = data.get("htmlStr") or ""
+        self.rmb_message = data.get("rmbMessage") or ""
+        self.buckets: FrozenSet[str] = frozenset(data.get("buckets") or ())
+        self.received = time.time()
+
+    @classmethod
+    def parse(cls, payload: str) -> Optional["SSEEvent"]:
+        try:
+            data = json.loads(payload)
+        except json.JSONDecodeError:
+            return None
+        return cls(data) if isinstance(data, dict) else None
+
+    @property
+    def kinds(self) -> FrozenSet[str]:
+        """Activity buckets (founding, move, rmb, ...) without the nation:/region: ones."""
+        return frozenset(b for b in self.buckets if ":" not in b)
+
+    def region_bucket(self, region: str) -> bool:
+        return f"region:{region.lower().replace(' ', '_')}" in self.buckets
+
+
+Handler = Callable[[SSEEvent], Awaitable[Any]]
+
+
+class Subscription:
+    __slots__ = ("cog", "name", "buckets", "handler", "queue", "task",
+                 "delivered", "dropped", "errors", "total", "worst")
+
+    def __init__(self, cog: commands.Cog, handler: Handler, buckets: Iterable[str], maxsize: int = DEFAULT_QUEUE):
+        self.cog = cog
+        self.name = cog.qualified_name
+        self.handler = handler
+        self.buckets: FrozenSet[str] = frozenset(b.strip().lower() for b in buckets if b.strip())
+        self.queue: "asyncio.Queue[SSEEvent]" = asyncio.Queue(maxsize=maxsize)
+        self.task: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def wants(self, event: SSEEvent) -> bool:
+        """True if the event is in one of our buckets (events without buckets go to everyone)."""
+        return not event.buckets or not self.buckets or bool(event.buckets & self.buckets)
+
+
+class SSEHub(commands.Cog):
+    """
+    One NationStates SSE connection for every cog that opts in.
+
+    A cog opts in by defining sse_subscription(), returning a dict with a
+    "handler" coroutine taking an SSEEvent, the "buckets" it needs and an
+    optional queue "maxsize". The hub connects once with the union of all
+    subscribed buckets, decodes each event once and hands the same SSEEvent
+    to every subscriber through its own bounded queue. While the hub feeds
+    a cog it stops that cog's own listener (stop_listener/start_listener),
+    and hands it back when the hub unloads.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = Config.get_conf(self, identifier=0x9005_05E1, force_registration=True)
+        self.config.register_global(user_agent=None)
+        self.subs: Dict[str, Subscription] = {}
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.reader: Optional[asyncio.Task] = None
+        self.buckets: FrozenSet[str] = frozenset()
+        self.connected = False
+        self.last_event_at: Optional[float] = None
+        self.events = 0
+        self.bad_events = 0
+        self.reconnects = 0
+        self._record = None  # open file handle while recording
+        self.closing = False
+
+    async def cog_load(self):
+        for cog in list(self.bot.cogs.values()):
+            await self.register(cog)
+
+    async def cog_unload(self):
+        self.closing = True
+        for name in list(self.subs):
+            await self.unregister(name, restore=True)
+        await self._stop_reader()
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self._stop_recording()
+
+    @commands.Cog.listener()
+    async def on_cog_add(self, cog: commands.Cog):
+        await self.register(cog)
+
+    @commands.Cog.listener()
+    async def on_cog_remove(self, cog: commands.Cog):
+        await self.unregister(cog.qualified_name, restore=False)
+
+    # ---- subscriptions ----
+
+    def is_feeding(self, cog: commands.Cog) -> bool:
+        sub = self.subs.get(cog.qualified_name)
+        return sub is not None and sub.cog is cog
+
+    async def register(self, cog: commands.Cog) -> bool:
+        """
+        Adopt a cog's sse_subscription(); returns True if it is now fed by the hub.
+
+        Safe to call again for a cog already fed, so a cog's own
+        start_listener can hand itself over before opening a connection.
+        """
+        factory = getattr(cog, "sse_subscription", None)
+        if self.closing or cog is self or not callable(factory):
+            return False
+        if self.is_feeding(cog):
+            return True
+        spec = dict(factory())
+        await self.unregister(cog.qualified_name, restore=False)
+        sub = Subscription(cog, spec["handler"], spec.get("buckets", ()), spec.get("maxsize", DEFAULT_QUEUE))
+        sub.task = asyncio.create_task(self._consume(sub), name=f"SSEHub_{sub.name}")
+        self.subs[sub.name] = sub
+        # Subscribed first so a start_listener racing this sees is_feeding().
+        stop = getattr(cog, "stop_listener", None)
+        if callable(stop):
+            try:
+                await stop()
+            except Exception:
+                log.exception("SSEHub: could not stop %s's own listener", sub.name)
+        log.info("SSEHub: feeding %s (%s)", sub.name, "+".join(sorted(sub.buckets)) or "no buckets")
+        await self._sync_reader()
+        return True
+
+    async def unregister(self, name: str, *, restore: bool):
+        """Drop a subscriber; with restore, let a still-loaded cog reopen its own listener."""
+        sub = self.subs.pop(name, None)
+        if sub is None:
+            return
+        if sub.task:
+            sub.task.cancel()
+        if restore and self.bot.get_cog(name) is sub.cog:
+            start = getattr(sub.cog, "start_listener", None)
+            if callable(start):
+                try:
+                    await start()
+                except Exception:
+                    log.exception("SSEHub: could not restart %s's own listener", name)
+        await self._sync_reader()
+
+    async def _consume(self, sub: Subscription):
+        while True:
+            event = await sub.queue.get()
+            start = time.perf_counter()
+            try:
+                await sub.handler(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                sub.errors += 1
+                log.exception("SSEHub: %s failed on event %s", sub.name, event.id)
+            finally:
+                elapsed = time.perf_counter() - start
+                sub.delivered += 1
+                sub.total += elapsed
+                sub.worst = max(sub.worst, elapsed)
+                sub.queue.task_done()
+
+    async def publish(self, event: SSEEvent, only: Optional[Set[str]] = None):
+        """Queue one event for each subscriber whose buckets match it (limited to `only` if given)."""
+        targets = [s for s in self.subs.values() if (only is None or s.name in only) and s.wants(event)]
+        full = []
+        for sub in targets:
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                full.append(sub)
+        if full:
+            await asyncio.gather(*(self._put_slow(sub, event) for sub in full))
+
+    async def _put_slow(self, sub: Subscription, event: SSEEvent):
+        try:
+            await asyncio.wait_for(sub.queue.put(event), PUBLISH_TIMEOUT)
+        except asyncio.TimeoutError:
+            sub.dropped += 1
+            if sub.dropped == 1 or sub.dropped % 100 == 0:
+                log.warning("SSEHub: %s is not keeping up; %d event(s) dropped", sub.name, sub.dropped)
+
+    # ---- connection ----
+
+    async def _sync_reader(self):
+        """(Re)open the connection when the union of subscribed buckets changes."""
+        if self.closing:
+            return await self._stop_reader()
+        wanted = frozenset().union(*(s.buckets for s in self.subs.values()))
+        if wanted == self.buckets and (self.reader is not None or not wanted):
+            return
+        await self._stop_reader()
+        self.buckets = wanted
+        if wanted:
+            self.reader = asyncio.create_task(self._run_reader(wanted), name="SSEHub_Reader")
+
+    async def _stop_reader(self):
+        if self.reader and not self.reader.done():
+            self.reader.cancel()
+            try:
+                await self.reader
+            except asyncio.CancelledError:
+                pass
+        self.reader = None
+        self.connected = False
+
+    async def _user_agent(self) -> str:
+        ua = await self.config.user_agent()
+        if ua:
+            return ua
+        nsapi = self.bot.get_cog("NSApi")
+        return nsapi.client.user_agent if nsapi else DEFAULT_UA
+
+    async def _run_reader(self, buckets: FrozenSet[str]):
+        url = SSE_BASE + "+".join(sorted(buckets))
+        backoff = 3
+        while True:
+            try:
+                if self.session is None or self.session.closed:
+                    self.session = aiohttp.ClientSession(
+                        timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=IDLE_TIMEOUT)
+                    )
+                headers = {"User-Agent": await self._user_agent()}
+                log.info("SSEHub: connecting to %s", url)
+                async with self.session.get(url, headers=headers) as resp:
+                    resp.raise_for_status()
+                    self.connected = True
+                    backoff = 3
+                    data: List[str] = []
+                    async for raw_line in resp.content:
+                        line = raw_line.decode("utf-8", errors="ignore").rstrip("\r\n")
+                        if line.startswith("data:"):
+                            data.append(line[5:].lstrip())
+                        elif not line and data:
+                            await self._ingest("\n".join(data))
+                            data = []
+            except asyncio.CancelledError:
+                raise
+            except (asyncio.TimeoutError, aiohttp.ClientPayloadError, aiohttp.ClientOSError, ConnectionResetError) as e:
+                # Idle timeout or a dropped stream: reopen straight away.
+                log.debug("SSEHub: stream closed (%r); reconnecting", e)
+                backoff = 3
+            except Exception:
+                log.exception("SSEHub: connection error")
+            finally:
+                self.connected = False
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    async def _ingest(self, payload: str, only: Optional[Set[str]] = None):
+        if self._record is not None:
+            self._record.write(payload + "\n")
+        event = SSEEvent.parse(payload)
+        if event is None:
+            self.bad_events += 1
+            return
+        self.events += 1
+        self.last_event_at = event.received
+        await self.publish(event, only)
+
+    # ---- record / replay ----
+
+    def _data_file(self, name: str) -> Path:
+        path = Path(name)
+        return path if path.is_absolute() else cog_data_path(self) / path
+
+    def _stop_recording(self):
+        if self._record is not None:
+            self._record.close()
+            self._record = None
+
+    async def replay(self, path: Path, rate: float = 0.0, only: Optional[Set[str]] = None) -> Tuple[int, float]:
+        """
+        Publish a recorded file (one JSON event per line, "data:" prefix
+        optional) through the normal decode and fan-out path.
+
+        `rate` caps events per second (0 = as fast as subscribers drain).
+        `only` limits delivery to the named subscribers; an empty set
+        measures decode and fan-out alone. Returns (events, seconds), timed
+        until every targeted queue is empty.
+        """
+        lines = await asyncio.to_thread(path.read_text, encoding="utf-8")
+        gap = 1.0 / rate if rate > 0 else 0.0
+        count = 0
+        start = time.perf_counter()
+        for line in lines.splitlines():
+            line = line.strip()
+            if line.startswith("data:"):
+                line = line[5:].lstrip()
+            if not line:
+                continue
+            await self._ingest(line, only)
+            count += 1
+            if gap:
+                await asyncio.sleep(gap)
+            elif count % 200 == 0:
+                await asyncio.sleep(0)
+        await asyncio.gather(*(s.queue.join() for s in self.subs.values() if only is None or s.name in only))
+        return count, time.perf_counter() - start
+
+    # ---- commands ----
+
+    @commands.group()
+    @commands.is_owner()
+    async def ssehub(self, ctx: commands.Context):
+        """Shared NationStates SSE connection."""
+
+    @ssehub.command(name="status")
+    async def ssehub_status(self, ctx: commands.Context):
+        """Connection state and per-subscriber counters."""
+        state = "connected" if self.connected else ("connecting" if self.reader else "idle")
+        last = f"<t:{int(self.last_event_at)}:R>" if self.last_event_at else "never"
+        lines = [
+            f"Feed: {state} | buckets: {'+'.join(sorted(self.buckets)) or '-'}",
+            f"Events: {self.events} | undecodable: {self.bad_events} | reconnects: {self.reconnects} | last: {last}",
+        ]
+        if self._record is not None:
+            lines.append(f"Recording to `{self._record.name}`")
+        for sub in self.subs.values():
+            avg = sub.total / sub.delivered * 1000 if sub.delivered else 0.0
+            lines.append(
+                f"- {sub.name}: queued {sub.queue.qsize()}/{sub.queue.maxsize}, handled {sub.delivered}, "
+                f"avg {avg:.1f} ms, max {sub.worst * 1000:.0f} ms, dropped {sub.dropped}, errors {sub.errors}"
+            )
+        if not self.subs:
+            lines.append("No cogs are subscribed.")
+        await ctx.send("\n".join(lines)[:1900])
+
+    @ssehub.command(name="setua")
+    async def ssehub_setua(self, ctx: commands.Context, *, user_agent: str = None):
+        """Set the User-Agent for the shared connection (blank = NSApi's)."""
+        await self.config.user_agent.set(user_agent.strip() if user_agent else None)
+        await self._stop_reader()
+        await self._sync_reader()
+        await ctx.send("User-Agent updated; feed reconnected.")
+
+    @ssehub.command(name="record")
+    async def ssehub_record(self, ctx: commands.Context, filename: str = None):
+        """Append every live event to a file in the cog data folder; run again without a name to stop."""
+        if filename is None:
+            if self._record is None:
+                return await ctx.send("Not recording.")
+            name = self._record.name
+            self._stop_recording()
+            return await ctx.send(f"Stopped recording to `{name}`.")
+        self._stop_recording()
+        self._record = open(self._data_file(filename), "a", encoding="utf-8", buffering=1)
+        await ctx.send(f"Recording live events to `{self._record.name}`.")
+
+    @ssehub.command(name="replay")
+    async def ssehub_replay(self, ctx: commands.Context, filename: str, rate: float = 0.0, *subscribers: str):
+        """
+        Feed a recorded event file through the hub and report throughput.
+
+        Only the named subscribers receive the events; with none named the
+        replay measures decode and fan-out without side effects.
+        """
+        path = self._data_file(filename)
+        if not path.is_file():
+            return await ctx.send(f"No such file: `{path}`")
+        only = {s.qualified_name for s in map(self.bot.get_cog, subscribers) if s is not None}
+        unknown = [s for s in subscribers if self.bot.get_cog(s) is None]
+        if unknown:
+            return await ctx.send(f"Not loaded: {', '.join(unknown)}")
+        async with ctx.typing():
+            count, elapsed = await self.replay(path, rate, only)
+        per_sec = count / elapsed if elapsed else 0.0
+        await ctx.send(
+            f"Replayed {count} events to {', '.join(sorted(only)) or 'no subscribers'} "
+            f"in {elapsed:.2f}s ({per_sec:.0f} events/s)."
+        )
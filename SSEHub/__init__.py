@@ -0,0 +1,5 @@
+from .SSEHub import SSEHub
+
+
+async def setup(bot):
+    await bot.add_cog(SSEHub(bot))
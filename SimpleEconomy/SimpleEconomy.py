@@ -30,12 +30,20 @@ class SimpleEconomy(commands.Cog):
     self.config.register_guild(**default_guild)
     self.config_gold.register_user(**default_user)
 
+  def _nexus(self):
+    cog = self.bot.get_cog("NexusExchange")
+    if not cog:
+      raise RuntimeError("NexusExchange cog not found. Please load it so SimpleEconomy can use balances.")
+    return cog
+
   async def get_user_balance(self, guild: discord.Guild, user: discord.abc.User) -> float:
-    """Helper to fetch balance, falling back to guild starting balance if uninitialized."""
-    bal = await self.config_gold.user(user).master_balance()
-    if bal is None:
-      bal = await self.config.guild(guild).starting_balance()
-    return bal
+    """Helper to fetch balance, seeding the guild starting balance if uninitialized."""
+    nexus = self._nexus()
+    if user.id not in nexus.ledger and await self.config_gold.user(user).master_balance() is None:
+      starting = await self.config.guild(guild).starting_balance()
+      if starting:
+        return await nexus.modify_wellcoins(user, starting, reason="starting_balance")
+    return await nexus.get_balance(user)
 
   @commands.Cog.listener()
   async def on_message_without_command(self, message: discord.Message):
@@ -55,11 +63,11 @@ class SimpleEconomy(commands.Cog):
     if message.channel.id in blacklisted:
       return
 
-    # Fetch payout amount and add to the user's config master_balance
+    # Fetch payout amount and add to the user's master_balance via NexusExchange
     amount = await self.config.guild(guild).payout_amount()
     if amount > 0:
-      current_bal = await self.get_user_balance(guild, author)
-      await self.config_gold.user(author).master_balance.set(current_bal + amount)
+      await self.get_user_balance(guild, author)
+      await self._nexus().modify_wellcoins(author, amount, reason="chat")
 
   # --- Balance Command ---
 
@@ -134,7 +142,7 @@ class SimpleEconomy(commands.Cog):
     if amount < 0:
       await ctx.send("Balance cannot be negative.")
       return
-    await self.config_gold.user(target).master_balance.set(amount)
+    await self._nexus().set_wellcoins(target, amount, reason="setbal")
     await ctx.send(
         f"Set **{target.display_name}'s** master_balance to **{amount} gold**."
     )
@@ -154,8 +162,8 @@ class SimpleEconomy(commands.Cog):
         for member in ctx.guild.members:
           if member.bot:
             continue
-          current_bal = await self.get_user_balance(ctx.guild, member)
-          await self.config_gold.user(member).master_balance.set(current_bal + amount)
+          await self.get_user_balance(ctx.guild, member)
+          await self._nexus().modify_wellcoins(member, amount, reason="seconset_pay")
       await ctx.send(f"Successfully paid **{amount} gold** to all non-bot members in the server!")
     else:
       converter = commands.MemberConverter()
@@ -165,8 +173,8 @@ class SimpleEconomy(commands.Cog):
         await ctx.send("Could not find that member. Use a mention/ID or type `all`.")
         return
 
-      current_bal = await self.get_user_balance(ctx.guild, member)
-      await self.config_gold.user(member).master_balance.set(current_bal + amount)
+      await self.get_user_balance(ctx.guild, member)
+      await self._nexus().modify_wellcoins(member, amount, reason="seconset_pay")
       await ctx.send(f"Successfully paid **{amount} gold** to **{member.display_name}**.")
 
   @seconset.command(name="resetall")
@@ -214,6 +222,7 @@ class SimpleEconomy(commands.Cog):
       async with ctx.typing():
         await self.config.clear_all()
         await self.config_gold.clear_all()
+        self._nexus().ledger.reset()
       await ctx.send("🚨 **Reset Complete:** All configurations and user balances for this cog have been successfully wiped.")
     else:
       await ctx.send("Reset operation cancelled.")
@@ -1850,6 +1850,10 @@ Helpful Resources:
 
 
 
+    def message_routes(self):
+        """Filters for MessageRouter: guild messages, bots included for the ad counters."""
+        return [{"handler": self.on_message, "bots": True}]
+
     @commands.Cog.listener()
     async def on_message(self, message):
         """Reward users for chatting."""
@@ -3,17 +3,71 @@ from redbot.core import commands, Config
 from discord.ext import tasks
 import random
 import matplotlib.pyplot as plt
+import numpy as np
 import io
 from discord import File
 from discord import app_commands
 from discord.ui import View, Button
 from discord import Interaction
-import aiohttp
 import xml.etree.ElementTree as ET
 import datetime
 import csv
 import json
-from typing import Optional
+import os
+import re
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import math
+from redbot.core.data_manager import cog_data_path
+
+HISTORY_MAX_POINTS = 24 * 365 * 2
+
+CENSUS_REGION = "the_wellspring"
+CENSUS_SCALES = [
+    1, 4, 5, 6, 7, 10, 17, 20, 26, 32, 33,
+    36, 40, 45, 46, 47, 51, 55, 56, 60, 61,
+    63, 65, 69, 70, 74, 75, 76, 77, 79
+]
+STOCKBOT_USER_AGENT = "9005 StockBot (Contact: NSwa9002@gmail.com)"
+
+# How much each census scale's weekly % change moves each commodity.
+COMMODITY_INFLUENCE = {
+    "crude_oil": {"20": 0.5, "26": 0.3, "1": 0.2, "76": 0.1, "7": -0.2, "63": -0.3, "51": -0.5},
+    "gold": {"74": 0.5, "45": 0.3, "65": 0.2, "4": 0.1, "51": -0.2, "79": -0.3, "77": -0.5},
+    "silver": {"74": 0.5, "13": 0.3, "33": 0.2, "65": 0.1, "51": -0.2, "79": -0.3, "77": -0.5},
+    "platinum": {"74": 0.5, "45": 0.3, "70": 0.2, "65": 0.1, "51": -0.2, "79": -0.3, "77": -0.5},
+    "copper": {"20": 0.5, "26": 0.3, "10": 0.2, "1": 0.1, "7": -0.3, "63": -0.5},
+    "corn": {"17": 0.5, "56": 0.3, "75": 0.2, "5": 0.1, "61": -0.2, "79": -0.3, "77": -0.5},
+    "wheat": {"17": 0.5, "56": 0.3, "75": 0.2, "5": 0.1, "61": -0.2, "79": -0.3, "77": -0.5},
+    "coffee_beans": {"40": 0.5, "55": 0.3, "60": 0.2, "6": 0.1, "79": -0.2, "61": -0.3, "77": -0.5},
+    "sugar": {"40": 0.5, "55": 0.3, "60": 0.2, "6": 0.1, "61": -0.2, "79": -0.3, "77": -0.5},
+    "wandwood": {"63": 0.5, "70": 0.3, "36": 0.2, "32": 0.1, "69": -0.2, "47": -0.3, "46": -0.5},
+}
+
+# Precomputed commodities x scales weight matrix (scales we don't fetch contribute 0).
+COMMODITY_NAMES = list(COMMODITY_INFLUENCE)
+COMMODITY_MATRIX = np.array([
+    [COMMODITY_INFLUENCE[name].get(str(scale), 0.0) for scale in CENSUS_SCALES]
+    for name in COMMODITY_NAMES
+])
+
+
+
+def _price_steps(counter: int) -> int:
+    """Price steps taken once the trade counter has reached `counter` (one per 100 trades)."""
+    return max(counter, 0) // 100
+
+
+def _sum_price_steps(first: int, last: int) -> int:
+    """sum(_price_steps(c) for c in range(first, last + 1)) in closed form."""
+    def prefix(n):
+        if n < 0:
+            return 0
+        q, r = divmod(n, 100)
+        return 100 * q * (q - 1) // 2 + q * (r + 1)
+    return prefix(last) - prefix(first - 1)
 
 
 class StockListView(View):
@@ -72,6 +126,294 @@ class StockListView(View):
 
 
 
+class PriceHistoryStore:
+    """
+    Append-only price history, one binary file per stock.
+
+    Each record is two native doubles (unix timestamp, price) written with
+    array('d'), so reading the last N points is a single seek + read instead
+    of deserializing the whole history out of Config.
+    """
+
+    RECORD_SIZE = array("d").itemsize * 2
+
+    def __init__(self, root: Path, max_points: int = HISTORY_MAX_POINTS):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_points = max_points
+
+    def _path(self, name: str) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", name.upper())
+        return self.root / f"{safe}.bin"
+
+    def count(self, name: str) -> int:
+        try:
+            return os.path.getsize(self._path(name)) // self.RECORD_SIZE
+        except FileNotFoundError:
+            return 0
+
+    def append(self, name: str, price: float, ts: Optional[float] = None):
+        self.extend(name, [price], ts=ts)
+
+    def extend(self, name: str, prices: List[float], ts: Optional[float] = None, step: float = 3600.0):
+        """Append prices; the last one is stamped `ts` (default now), earlier ones `step` seconds apart."""
+        if not prices:
+            return
+        end = time.time() if ts is None else ts
+        start = end - step * (len(prices) - 1)
+        buf = array("d")
+        for i, price in enumerate(prices):
+            buf.append(start + step * i)
+            buf.append(float(price))
+        path = self._path(name)
+        with open(path, "ab") as fh:
+            buf.tofile(fh)
+        if self.count(name) > self.max_points * 1.1:
+            self._compact(name)
+
+    def _compact(self, name: str):
+        """Trim a file back to max_points once it has grown 10% past the cap."""
+        ts, prices = self.tail(name, self.max_points)
+        buf = array("d")
+        for t, p in zip(ts, prices):
+            buf.append(t)
+            buf.append(p)
+        tmp = self._path(name).with_suffix(".tmp")
+        with open(tmp, "wb") as fh:
+            buf.tofile(fh)
+        os.replace(tmp, self._path(name))
+
+    def tail(self, name: str, n: int) -> Tuple[array, array]:
+        """Return (timestamps, prices) for the last `n` points."""
+        total = self.count(name)
+        n = min(n, total)
+        if n <= 0:
+            return array("d"), array("d")
+        buf = array("d")
+        with open(self._path(name), "rb") as fh:
+            fh.seek((total - n) * self.RECORD_SIZE)
+            buf.fromfile(fh, n * 2)
+        return buf[0::2], buf[1::2]
+
+    def prices(self, name: str, n: int) -> List[float]:
+        return self.tail(name, n)[1].tolist()
+
+    def drop(self, name: str):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+
+class CensusHistoryCache:
+    """
+    Per-scale census history for one region, persisted to a JSON file and
+    topped up incrementally: only points newer than the cached ones are
+    requested (`from=`). A local XML file can stand in for the API so
+    commodity pricing can be tested and benchmarked offline.
+    """
+
+    KEEP_POINTS = 64
+
+    def __init__(self, path: Path, region: str, scales: List[int]):
+        self.path = Path(path)
+        self.region = region
+        self.scales = [str(s) for s in scales]
+        self.series: Dict[str, List[List[float]]] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as fh:
+                    self.series = json.load(fh)
+            except (OSError, ValueError):
+                self.series = {}
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.series, fh)
+        os.replace(tmp, self.path)
+
+    def last_timestamp(self) -> int:
+        """Oldest 'latest point' across scales, so one request tops up every series."""
+        latest = [int(self.series[s][-1][0]) for s in self.scales if self.series.get(s)]
+        if len(latest) < len(self.scales):
+            return 0
+        return min(latest)
+
+    def add_point(self, scale_id, ts: int, score: float) -> bool:
+        """Append one point if it is newer than what the series already has."""
+        series = self.series.setdefault(str(scale_id), [])
+        if series and ts <= series[-1][0]:
+            return False
+        series.append([ts, score])
+        return True
+
+    def _trim(self):
+        for scale_id, series in self.series.items():
+            if len(series) > self.KEEP_POINTS:
+                self.series[scale_id] = series[-self.KEEP_POINTS:]
+
+    def ingest(self, xml_bytes: bytes) -> int:
+        """Merge <SCALE id><POINT><TIMESTAMP/><SCORE/></POINT></SCALE> points; returns how many were new."""
+        added = 0
+        scale_id = None
+        ts = score = None
+        for event, elem in ET.iterparse(io.BytesIO(xml_bytes), events=("start", "end")):
+            if event == "start":
+                if elem.tag == "SCALE":
+                    scale_id = elem.attrib.get("id")
+                continue
+            if elem.tag == "TIMESTAMP":
+                ts = int(elem.text)
+            elif elem.tag == "SCORE":
+                score = float(elem.text)
+            elif elem.tag == "POINT":
+                if scale_id is not None and ts is not None and score is not None:
+                    added += self.add_point(scale_id, ts, score)
+                ts = score = None
+                elem.clear()
+            elif elem.tag == "SCALE":
+                scale_id = None
+                elem.clear()
+        self._trim()
+        return added
+
+    async def refresh(self, fixture: Optional[str] = None, client=None, priority: str = "background") -> int:
+        """Fetch only new points through the NSApi `client` (or read `fixture` instead) and persist."""
+        if fixture:
+            with open(fixture, "rb") as fh:
+                added = self.ingest(fh.read())
+        else:
+            url = (
+                f"https://www.nationstates.net/cgi-bin/api.cgi?region={self.region}"
+                f"&q=census&mode=history&scale={'+'.join(self.scales)}"
+            )
+            since = self.last_timestamp()
+            if since:
+                url += f"&from={since + 1}"
+            added = 0
+            # Points are merged as the response streams in
+            async with client.stream(url=url, user_agent=STOCKBOT_USER_AGENT, priority=priority) as resp:
+                if resp.status != 200:
+                    return 0
+                async for point in client.iter_records(resp, "census"):
+                    added += self.add_point(point.scale, point.timestamp, point.score)
+            self._trim()
+        if added:
+            self.save()
+        return added
+
+    def percent_changes(self, lookback: int = 8) -> np.ndarray:
+        """% change between the point `lookback` back and the latest, per scale (0 when unknown)."""
+        out = np.zeros(len(self.scales))
+        for i, scale_id in enumerate(self.scales):
+            series = self.series.get(scale_id, [])
+            if len(series) >= lookback:
+                old_score = series[-lookback][1]
+                new_score = series[-1][1]
+                if old_score != 0:
+                    out[i] = ((new_score - old_score) / old_score) * 100
+        return out
+
+
+class MarketTickEngine:
+    """
+    Vectorized hourly price tick for every listed stock.
+
+    Prices, volatility bounds and a stock x tag weight matrix are packed into
+    NumPy arrays once, so a tick is a handful of array operations no matter
+    how many stocks are listed. step() is pure, which lets simulate() run
+    what-if hours without touching Config.
+    """
+
+    def __init__(self, names, prices, vol_lo, vol_hi, commodity, weights, tag_names, tag_values):
+        self.names = names
+        self.prices = prices
+        self.vol_lo = vol_lo
+        self.vol_hi = vol_hi
+        self.commodity = commodity
+        self.weights = weights
+        self.tag_names = tag_names
+        self.tag_values = tag_values
+
+    @classmethod
+    def from_stocks(cls, stocks: dict, tag_multipliers: dict) -> "MarketTickEngine":
+        listed = [(name, data) for name, data in stocks.items() if not data.get("delisted", False)]
+        names = [name for name, _ in listed]
+        tag_names = sorted(
+            set(tag_multipliers) | {tag for _, data in listed for tag in data.get("tags", {})}
+        )
+        tag_index = {tag: i for i, tag in enumerate(tag_names)}
+
+        prices = np.array([float(data["price"]) for _, data in listed], dtype=float)
+        vol_lo = np.full(len(listed), -2.0)
+        vol_hi = np.full(len(listed), 2.0)
+        commodity = np.zeros(len(listed), dtype=bool)
+        weights = np.zeros((len(listed), len(tag_names)))
+        for i, (_, data) in enumerate(listed):
+            vol = data.get("volatility")
+            if isinstance(vol, (list, tuple)) and len(vol) == 2:
+                vol_lo[i], vol_hi[i] = vol
+            commodity[i] = bool(data.get("commodity", False))
+            for tag, weight in data.get("tags", {}).items():
+                weights[i, tag_index[tag]] = weight
+        tag_values = np.array([float(tag_multipliers.get(tag) or 0) for tag in tag_names])
+        return cls(names, prices, vol_lo, vol_hi, commodity, weights, tag_names, tag_values)
+
+    @staticmethod
+    def market_change(last_day_trades: float) -> float:
+        """Market activity influence, as a fraction (clamped to -5%..+4%)."""
+        return max(-0.05, min(0.01 * (last_day_trades / 100000), 0.04))
+
+    @staticmethod
+    def decay_tags(tag_values: np.ndarray) -> np.ndarray:
+        """Vector form of _decay_tag_multipliers: halve the magnitude, then subtract 0.1pp."""
+        mag = np.abs(tag_values) / 2 - 0.1
+        return np.where(mag <= 0, 0.0, np.round(np.sign(tag_values) * mag, 4))
+
+    def step(self, prices: np.ndarray, tag_values: np.ndarray, market_change: float, rng) -> dict:
+        """
+        Compute one hour for every stock. Returns the new prices plus masks
+        for stocks that crashed and recovered (0.10 WC) or went bankrupt.
+        """
+        base_percent = rng.uniform(self.vol_lo, self.vol_hi)
+        tag_bonus = self.weights @ tag_values
+        total_percent = base_percent + tag_bonus + market_change * 100
+        new_prices = np.round(prices * (1 + total_percent / 100), 2)
+
+        new_prices = np.where(self.commodity, np.maximum(new_prices, 1.0), new_prices)
+        # A price of 0 means the stock already went bankrupt earlier in a simulate() run.
+        crashed = ~self.commodity & (new_prices <= 0.01) & (prices > 0)
+        coin = rng.random(len(prices)) < 0.5
+        recovered = crashed & coin
+        bankrupt = crashed & ~coin
+        new_prices = np.where(recovered, 0.10, np.maximum(new_prices, 0.01))
+        new_prices = np.where(bankrupt | (prices <= 0), 0.0, new_prices)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent_change = np.where(prices > 0, (new_prices - prices) / prices * 100, 0.0)
+        return {
+            "prices": new_prices,
+            "percent_change": percent_change,
+            "recovered": recovered,
+            "bankrupt": bankrupt,
+        }
+
+    def simulate(self, hours: int, last_day_trades: float = 0.0, rng=None) -> np.ndarray:
+        """Run `hours` ticks in memory. Returns an (hours + 1) x stocks price matrix."""
+        rng = rng or np.random.default_rng()
+        path = np.empty((hours + 1, len(self.names)))
+        path[0] = prices = self.prices
+        tag_values = self.tag_values
+        for hour in range(1, hours + 1):
+            # Trade volume only affects the first hour; the live tick resets it afterwards.
+            market_change = self.market_change(last_day_trades if hour == 1 else 0.0)
+            prices = self.step(prices, tag_values, market_change, rng)["prices"]
+            tag_values = self.decay_tags(tag_values)
+            path[hour] = prices
+        return path
+
+
 class StockMarket(commands.Cog):
     """
     StockMarket Commands:
@@ -133,17 +475,46 @@ class StockMarket(commands.Cog):
             stocks={},
             tags={},
             announcement_channel=None,
-            last_commodity_update=None
+            last_commodity_update=None,
+            census_fixture=None,  # Local census XML to price commodities offline
         )
         self.economy_config.register_user(tax_credit=0)
+        # Price history lives on disk; Config only keeps current price + metadata.
+        self.history = PriceHistoryStore(cog_data_path(self) / "price_history")
+        self.census = CensusHistoryCache(
+            cog_data_path(self) / "census_history.json", CENSUS_REGION, CENSUS_SCALES
+        )
 
         self.last_day_trades = 0.0  # ✅ Add this line
-
-        self.price_updater.start()
+        self._rng = np.random.default_rng()
 #move tax_credits to the economy config 
 
     def cog_unload(self):
         self.price_updater.cancel()
+
+    async def cog_load(self):
+        await self._migrate_config_history()
+        self.price_updater.start()
+
+    async def _migrate_config_history(self):
+        """One-time move of legacy per-stock `history` lists out of Config."""
+        async with self.config.stocks() as stocks:
+            for name, data in stocks.items():
+                legacy = data.pop("history", None)
+                if legacy and self.history.count(name) == 0:
+                    self.history.extend(name, legacy[-HISTORY_MAX_POINTS:])
+
+    def _nexus(self):
+        cog = self.bot.get_cog("NexusExchange")
+        if not cog:
+            raise RuntimeError("NexusExchange cog not found. Please load it so the Stock Market can use Wellcoins.")
+        return cog
+
+    def _ns(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so the Stock Market can reach NationStates.")
+        return cog.client
         
     @tasks.loop(hours=1)
     async def price_updater(self):
@@ -198,163 +569,38 @@ class StockMarket(commands.Cog):
         if now.hour != self._today_target_hour:
             return
     
-        # --- Fetch Census Scale History ---
-        scales = [
-            1, 4, 5, 6, 7, 10, 17, 20, 26, 32, 33,
-            36, 40, 45, 46, 47, 51, 55, 56, 60, 61,
-            63, 65, 69, 70, 74, 75, 76, 77, 79
-        ]
-
-        scale_param = "+".join(map(str, scales))
-        url = f"https://www.nationstates.net/cgi-bin/api.cgi?region=the_wellspring&q=census&mode=history&scale={scale_param}"
-        headers = {"User-Agent": "9005 StockBot (Contact: NSwa9002@gmail.com)"}
-    
-        percent_changes = {}
-    
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as resp:
-                text = await resp.text()
-                root = ET.fromstring(text)
-    
-                for scale in root.findall("CENSUS/SCALE"):
-                    scale_id = scale.attrib["id"]
-                    points = scale.findall("POINT")
-                    if len(points) >= 8:
-                        old_score = float(points[-8].find("SCORE").text)
-                        new_score = float(points[-1].find("SCORE").text)
-                        if old_score != 0:
-                            percent_change = ((new_score - old_score) / old_score) * 100
-                            percent_changes[scale_id] = percent_change
-    
-        commodity_influence = {
-                                  "crude_oil": {
-                                    "20": 0.5,  
-                                    "26": 0.3,  
-                                    "1": 0.2,   
-                                    "76": 0.1,  
-                                    "7": -0.2,  
-                                    "63": -0.3, 
-                                    "51": -0.5  
-                                  },
-                                  "gold": {
-                                    "74": 0.5, 
-                                    "45": 0.3,  
-                                    "65": 0.2,  
-                                    "4": 0.1,   
-                                    "51": -0.2, 
-                                    "79": -0.3, 
-                                    "77": -0.5  
-                                  },
-                                  "silver": {
-                                    "74": 0.5,  
-                                    "13": 0.3,
-                                    "33": 0.2,  
-                                    "65": 0.1,  
-                                    "51": -0.2, 
-                                    "79": -0.3, 
-                                    "77": -0.5  
-                                  },
-                                  "platinum": {
-                                    "74": 0.5,  
-                                    "45": 0.3,  
-                                    "70": 0.2,  
-                                    "65": 0.1,  
-                                    "51": -0.2, 
-                                    "79": -0.3, 
-                                    "77": -0.5  
-                                  },
-                                  "copper": {
-                                    "20": 0.5,  
-                                    "26": 0.3,  
-                                    "10": 0.2,  
-                                    "1": 0.1,   
-                                    "7": -0.3,  
-                                    "63": -0.5  
-                                  },
-                                  "corn": {
-                                    "17": 0.5,  
-                                    "56": 0.3,  
-                                    "75": 0.2,  
-                                    "5": 0.1,   
-                                    "61": -0.2, 
-                                    "79": -0.3, 
-                                    "77": -0.5  
-                                  },
-                                  "wheat": {
-                                    "17": 0.5,  
-                                    "56": 0.3,  
-                                    "75": 0.2,  
-                                    "5": 0.1,   
-                                    "61": -0.2, 
-                                    "79": -0.3, 
-                                    "77": -0.5  
-                                  },
-                                  "coffee_beans": {
-                                    "40": 0.5,  
-                                    "55": 0.3,  
-                                    "60": 0.2,  
-                                    "6": 0.1,   
-                                    "79": -0.2, 
-                                    "61": -0.3, 
-                                    "77": -0.5  
-                                  },
-                                  "sugar": {
-                                    "40": 0.5,  
-                                    "55": 0.3,  
-                                    "60": 0.2,  
-                                    "6": 0.1,   
-                                    "61": -0.2, 
-                                    "79": -0.3, 
-                                    "77": -0.5  
-                                  },
-                                  "wandwood": {
-                                    "63": 0.5,  
-                                    "70": 0.3,  
-                                    "36": 0.2,  
-                                    "32": 0.1,  
-                                    "69": -0.2, 
-                                    "47": -0.3, 
-                                    "46": -0.5  
-                                  }
-                                }
-
+        # --- Top up cached census history, then one matrix-vector product ---
+        fixture = await self.config.census_fixture()
+        await self.census.refresh(fixture, None if fixture else self._ns())
+        deltas = self.commodity_deltas()
     
         async with self.config.stocks() as stocks:
             for stock_name, data in stocks.items():
                 if not data.get("commodity", False):
                     continue
     
-                name_key = stock_name.lower().replace(" ", "_")
-                influences = commodity_influence.get(name_key)
-                if not influences:
+                percent_delta = deltas.get(stock_name.lower().replace(" ", "_"))
+                if percent_delta is None:
                     continue
     
-                # Calculate percent delta
-                percent_delta = sum(
-                    percent_changes.get(scale_id, 0) * weight for scale_id, weight in influences.items()
-                )
-    
-                # Clamp percent change between -5% and +5%
-                percent_delta = max(-5.0, min(percent_delta, 5.0))
-    
                 old_price = data["price"]
                 new_price = round(old_price * (1 + percent_delta / 100), 2)
                 new_price = max(1.0, new_price)
     
-                percent_change = ((new_price - old_price) / old_price) * 100 if old_price > 0 else 0
-               
-                if "history" not in data:
-                    data["history"] = []
-                data["history"].append(new_price)
-                if len(data["history"]) > 24 * 365 * 2:
-                    data["history"] = data["history"][-24 * 365 * 2:]
+                self.history.append(stock_name, new_price)
     
                 data["price"] = new_price
     
         await self.config.last_commodity_update.set(now.isoformat())
         await self.apply_daily_stock_price_update()
-    
+
+    def commodity_deltas(self) -> Dict[str, float]:
+        """Weekly census % changes through the influence matrix, clamped to ±5% per commodity."""
+        deltas = COMMODITY_MATRIX @ self.census.percent_changes(lookback=8)
+        return {name: float(d) for name, d in zip(COMMODITY_NAMES, np.clip(deltas, -5.0, 5.0))}
+
     async def apply_daily_stock_price_update(self):
+        ns = self._ns()
         async with self.config.stocks() as stocks:
             for stock_name, data in stocks.items():
                 if data.get("commodity", False):
@@ -375,133 +621,106 @@ class StockMarket(commands.Cog):
                     f"https://www.nationstates.net/cgi-bin/api.cgi?"
                     f"nation={nation}&q=census;scale={scale_param};mode=history"
                 )
-                headers = {"User-Agent": "9005 StockBot (Contact: NSwa9002@gmail.com)"}
-    
                 percent_changes = {}
                 percent_delta = 0.0  # Default percent delta
     
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, headers=headers) as resp:
-                        if resp.status == 404:
-                            # Nation does not exist -> penalize by -5%
-                            percent_delta = -5.0
-                        elif resp.status == 200:
-                            text = await resp.text()
-                            root = ET.fromstring(text)
-    
-                            for scale in root.findall("CENSUS/SCALE"):
-                                scale_id = scale.attrib["id"]
-                                points = scale.findall("POINT")
-                                if len(points) >= 8:
-                                    old_score = float(points[-8].find("SCORE").text)
-                                    new_score = float(points[-1].find("SCORE").text)
-                                    if old_score != 0:
-                                        percent_change = ((new_score - old_score) / old_score) * 100
-                                        percent_changes[scale_id] = percent_change
-    
-                            percent_delta = sum(
-                                percent_changes.get(scale_id, 0) * weight
-                                for scale_id, weight in influence.items()
-                            )
-                            # Clamp to -5% to +5%
-                            percent_delta = max(-5.0, min(percent_delta, 5.0))
-                        else:
-                            # For other HTTP errors, you could log or skip; here we skip update
-                            continue
+                scores: Dict[str, List[float]] = {}
+                async with ns.stream(url=url, user_agent=STOCKBOT_USER_AGENT, priority="background") as resp:
+                    status = resp.status
+                    if status == 200:
+                        async for point in ns.iter_records(resp, "census"):
+                            scores.setdefault(str(point.scale), []).append(point.score)
+
+                if status == 404:
+                    # Nation does not exist -> penalize by -5%
+                    percent_delta = -5.0
+                elif status == 200:
+                    for scale_id, points in scores.items():
+                        if len(points) >= 8:
+                            old_score = points[-8]
+                            new_score = points[-1]
+                            if old_score != 0:
+                                percent_change = ((new_score - old_score) / old_score) * 100
+                                percent_changes[scale_id] = percent_change
+    
+                    percent_delta = sum(
+                        percent_changes.get(scale_id, 0) * weight
+                        for scale_id, weight in influence.items()
+                    )
+                    # Clamp to -5% to +5%
+                    percent_delta = max(-5.0, min(percent_delta, 5.0))
+                else:
+                    # For other HTTP errors, you could log or skip; here we skip update
+                    continue
     
                 # --- Apply percent delta ---
                 old_price = data["price"]
                 new_price = round(old_price * (1 + percent_delta / 100), 2)
                 new_price = max(1.0, new_price)
     
-                if "history" not in data:
-                    data["history"] = []
-                data["history"].append(new_price)
-                if len(data["history"]) > 24 * 365 * 2:
-                    data["history"] = data["history"][-24 * 365 * 2:]
+                self.history.append(stock_name, new_price)
     
                 data["price"] = new_price
 
     
     async def recalculate_all_stock_prices(self):
+        announcements = []
         async with self.config.stocks() as stocks:
-            tag_multipliers = await self.config.tags()
-            to_delist = []
-            gainers = []
-    
-            for stock_name, data in stocks.items():
-                if data.get("delisted", False):
+            engine = MarketTickEngine.from_stocks(stocks, await self.config.tags())
+            market_change = engine.market_change(self.last_day_trades)
+            result = engine.step(engine.prices, engine.tag_values, market_change, self._rng)
+
+            buys = self._rng.integers(1, 100, len(engine.names))
+            sells = self._rng.integers(1, 100, len(engine.names))
+            for i, stock_name in enumerate(engine.names):
+                data = stocks[stock_name]
+                if result["bankrupt"][i]:
+                    data["delisted"] = True
+                    data["price"] = 0.0
+                    announcements.append(f"💀 **{stock_name}** has gone bankrupt and been delisted!")
                     continue
-    
-                old_price = data["price"]
-                tag_bonus = 0
-    
-                for tag, weight in data.get("tags", {}).items():
-                    flat_increase = tag_multipliers.get(tag, 0)
-                    tag_bonus += flat_increase * weight
-    
-                # Base percent change
-                if isinstance(data.get("volatility"), (list, tuple)) and len(data["volatility"]) == 2:
-                    base_percent = random.uniform(data["volatility"][0], data["volatility"][1])
-                else:
-                    base_percent = random.uniform(-2, 2)
-    
-                # Market activity influence
-                market_change = 0.01 * (self.last_day_trades / 100000)
-                market_change = max(-0.05, min(market_change, 0.04)) 
-    
-                # Final percent change calculation
-                total_percent_change = base_percent + tag_bonus + (market_change * 100)
-                new_price = round(old_price * (1 + total_percent_change / 100), 2)
-    
-                # Bankruptcy/delist logic
-                if data.get("commodity", False):
-                    new_price = max(1.0, new_price)
-                else:
-                    if new_price <= .01:
-                        if random.random() < 0.5:
-                            new_price = .10
-                            await self._announce_recovery(stock_name)
-                        else:
-                            to_delist.append(stock_name)
-                            await self._announce_bankruptcy(stock_name)
-                        continue
-    
-                new_price = max(0.01, new_price)
-    
-                # History tracking
-                if "history" not in data:
-                    data["history"] = []
-                data["history"].append(new_price)
-                if len(data["history"]) > 24 * 365 * 2:
-                    data["history"] = data["history"][-24 * 365 * 2:]
-    
-                # Save new price
+
+                new_price = round(float(result["prices"][i]), 2)
+                self.history.append(stock_name, new_price)
                 data["price"] = new_price
-                data["buys"] = random.randint(1, 99)
-                data["sells"] = random.randint(1, 99)
-    
-                # Track for top gainers
-                if old_price > 0:
-                    percent_change = ((new_price - old_price) / old_price) * 100
-                    if percent_change > 3:
-                        await self._announce_surge(stock_name, percent_change)
-                    gainers.append((stock_name, percent_change))
-    
+                data["buys"] = int(buys[i])
+                data["sells"] = int(sells[i])
+
+                if result["recovered"][i]:
+                    announcements.append(
+                        f"**{stock_name}** narrowly avoided bankruptcy and is now trading at **0.10 WC**!"
+                    )
+                elif result["percent_change"][i] > 3:
+                    announcements.append(
+                        f"🚀 **{stock_name}** surged by **{result['percent_change'][i]:,.2f}%** this hour!"
+                    )
+
             # Finalize delistings
             for stock_name, data in stocks.items():
                 if data.get("delisted", False):
                     data["price"] = 0.0
-    
-            for stock_name in to_delist:
-                if stock_name in stocks:
-                    stocks[stock_name]["delisted"] = True
-                    stocks[stock_name]["price"] = 0.0
-    
-            self.last_day_trades = 0
-            await self._decay_tag_multipliers()
 
-            
+        self.last_day_trades = 0
+        await self._decay_tag_multipliers()
+        await self._announce_batch(announcements)
+
+    async def _announce_batch(self, lines):
+        """Send every tick announcement as one message (split only at Discord's 2000-char cap)."""
+        if not lines:
+            return
+        channel_id = await self.config.announcement_channel()
+        channel = self.bot.get_channel(channel_id) if channel_id else None
+        if not channel:
+            return
+        chunk = ""
+        for line in lines:
+            if len(chunk) + len(line) + 1 > 2000:
+                await channel.send(chunk)
+                chunk = ""
+            chunk += line + "\n"
+        if chunk:
+            await channel.send(chunk)
+
     # Helper announcement methods
     async def _announce_surge(self, stock_name, percent_change):
         channel_id = await self.config.announcement_channel()
@@ -535,6 +754,7 @@ class StockMarket(commands.Cog):
         async with self.config.stocks() as stocks:
             if name in stocks:
                 return await ctx.send("Stock already exists.")
+            self.history.drop(name)
             stocks[name] = {
                 "price": round(starting_price, 2),
                 "tags": {},
@@ -572,7 +792,7 @@ class StockMarket(commands.Cog):
             tag_str = "\n".join(f"`{tag}` (weight {weight})" for tag, weight in tags.items())
             embed.add_field(name="🏷️ Tags", value=tag_str, inline=False)
 
-        history = stock.get("history", [])
+        history = self.history.prices(name, 2)
         if history and len(history) > 1 and history[-2] > 0:
             change = ((history[-1] - history[-2]) / history[-2]) * 100
             embed.add_field(name="Last Hour Change", value=f"{change:+,.2f}%", inline=True)
@@ -674,38 +894,99 @@ class StockMarket(commands.Cog):
         view.message = await ctx.send(embed=embed, view=view)
     
     def calculate_total_cost_for_buy(self,start_price: float, shares: int, buys: int, price_increase: float = .1):
-        total_cost = 0.0
-        current_price = start_price
-        simulated_buys = buys
+        """Cost of buying `shares` one at a time; the price steps up on every 100th buy. O(1)."""
         shares = int(shares)
-        for _ in range(shares):
-            if simulated_buys % 100 == 0 and simulated_buys > 0:
-                current_price += price_increase
-            total_cost += current_price
-            simulated_buys += 1
-    
-        return total_cost, current_price, simulated_buys
+        if shares <= 0:
+            return 0.0, start_price, buys
+        base = _price_steps(buys - 1)
+        steps = _sum_price_steps(buys, buys + shares - 1) - shares * base
+        total_cost = shares * start_price + price_increase * steps
+        current_price = start_price + price_increase * (_price_steps(buys + shares - 1) - base)
+        return total_cost, current_price, buys + shares
     
     
     def calculate_earnings_and_final_price(self, start_price: float, shares: int, sells: int, price_decrease: float = 0.1):
-        total_earnings = 0.0
-        current_price = start_price
-        simulated_sells = sells
+        """Earnings from selling `shares`; the price steps down on every 100th sell, floored at 0.01. O(1)."""
         shares = int(shares)
+        if shares <= 0:
+            return 0.0, start_price, sells
+        base = _price_steps(sells - 1)
+        # First step count at which the price would sit on the 0.01 floor
+        floor_steps = max(1, math.ceil((start_price - 0.01) / price_decrease - 1e-9))
+        unfloored = min(shares, 100 * (floor_steps + base) - sells)
     
-        for _ in range(shares):
-            # ↓ Apply price drop before the threshold, matching buy behavior
-            if simulated_sells % 100 == 0 and simulated_sells > 0:
-                current_price = max(0.01, current_price - price_decrease)
+        total_earnings = 0.0
+        if unfloored > 0:
+            steps = _sum_price_steps(sells, sells + unfloored - 1) - unfloored * base
+            total_earnings += unfloored * start_price - price_decrease * steps
+        total_earnings += (shares - max(unfloored, 0)) * 0.01
+    
+        final_steps = _price_steps(sells + shares - 1) - base
+        current_price = start_price if final_steps == 0 else max(0.01, start_price - price_decrease * final_steps)
+        return total_earnings, current_price, sells + shares
+    
+    
+    def max_shares_for_budget(self, start_price: float, budget: float, buys: int, price_increase: float = .1) -> int:
+        """Most shares `budget` can buy at the stepped buy price (binary search over the O(1) cost)."""
+        if budget <= 0 or start_price <= 0:
+            return 0
+        lo, hi = 0, int(budget // start_price) + 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.calculate_total_cost_for_buy(start_price, mid, buys, price_increase)[0] <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
     
-            total_earnings += current_price
-            simulated_sells += 1
     
-        return total_earnings, current_price, simulated_sells
-
-
-
-
+    @app_commands.command(name="quotestock", description="Preview the cost or payout of a trade without making it.")
+    @app_commands.describe(
+        name="The stock to quote",
+        side="Buy or sell",
+        shares="Number of shares (optional)",
+        wc_spend="Amount of WC to spend instead of share count (buy only, optional)"
+    )
+    @app_commands.choices(side=[
+        app_commands.Choice(name="buy", value="buy"),
+        app_commands.Choice(name="sell", value="sell"),
+    ])
+    @app_commands.autocomplete(name=stock_name_autocomplete)
+    async def quotestock(self, interaction: discord.Interaction, name: str, side: str, shares: int = None, wc_spend: float = None):
+        name = name.upper()
+        stock = (await self.config.stocks()).get(name)
+        if not stock or stock.get("delisted", False):
+            return await interaction.response.send_message("❌ This stock is not available for trading.", ephemeral=True)
+    
+        if side == "buy":
+            if wc_spend is not None:
+                if wc_spend <= 0:
+                    return await interaction.response.send_message("❗ `wc_spend` must be positive.", ephemeral=True)
+                shares = self.max_shares_for_budget(stock["price"], wc_spend, stock["buys"])
+            if not shares or shares <= 0:
+                return await interaction.response.send_message("❗ Please provide either `shares` or `wc_spend`.", ephemeral=True)
+            total_cost, new_price, _ = self.calculate_total_cost_for_buy(stock["price"], shares, stock["buys"])
+            balance = await self._nexus().get_balance(interaction.user)
+            msg = (
+                f"🧾 Buying {shares:,} shares of **{name}** would cost **{total_cost:,.2f} WC** "
+                f"(avg {total_cost / shares:,.2f}) and move the price to {new_price:,.2f}.\n"
+                f"You have {balance:,.2f} WC."
+            )
+        else:
+            if not shares or shares <= 0:
+                return await interaction.response.send_message("❗ Please provide a positive number of `shares`.", ephemeral=True)
+            earnings, new_price, _ = self.calculate_earnings_and_final_price(
+                stock["price"] - .01, shares, stock.get("sells", 0)
+            )
+            tax_credit = (await self.economy_config.user(interaction.user).tax_credit()) or 0
+            tax = max(0.0, earnings * .05 - tax_credit)
+            owned = (await self.config.user(interaction.user).stocks()).get(name, 0)
+            msg = (
+                f"🧾 Selling {shares:,} shares of **{name}** would pay **{earnings:,.2f} WC** "
+                f"(≈{tax:,.2f} WC tax) and move the price to {new_price:,.2f}.\n"
+                f"You own {owned:,} shares."
+            )
+        await interaction.response.send_message(msg, ephemeral=True)
 
     @app_commands.command(name="buystock", description="Buy shares of a stock.")
     @app_commands.describe(
@@ -728,8 +1009,7 @@ class StockMarket(commands.Cog):
             return await interaction.response.send_message("❌ This stock is not available for purchase.", ephemeral=True)
     
         price = stock["price"]
-        balance = await self.economy_config.user(user).master_balance()
-        price_increase = 1.0
+        balance = await self._nexus().get_balance(user)
         shares_bought = 0
         total_cost = 0.0
     
@@ -738,16 +1018,9 @@ class StockMarket(commands.Cog):
             if wc_spend <= 0:
                 return await interaction.response.send_message("❗ You are unable to buy negative shares", ephemeral=True)
 
-            test_price = price
-            test_buys = stock["buys"]
-            while True:
-                if test_buys % 100 == 0 and test_buys != 0:
-                    test_price += price_increase
-                if total_cost + test_price > wc_spend:
-                    break
-                total_cost += test_price
-                test_buys += 1
-                shares_bought += 1
+            shares_bought = self.max_shares_for_budget(price, wc_spend, stock["buys"])
+            if shares_bought == 0:
+                return await interaction.response.send_message("💸 That isn't enough WC for a single share.", ephemeral=True)
     
             total_cost, new_price, updated_buys = self.calculate_total_cost_for_buy(price, shares_bought, stock["buys"])
             stock["buys"] = updated_buys
@@ -775,7 +1048,10 @@ class StockMarket(commands.Cog):
             return await interaction.response.send_message(f"💸 You need {total_cost:,.2f} WC but only have {balance:,.2f} WC.", ephemeral=True)
     
         # Update user balance and portfolio
-        await self.economy_config.user(user).master_balance.set(balance - total_cost)
+        try:
+            await self._nexus().take_wellcoins(user, total_cost, force=False)
+        except ValueError:
+            return await interaction.response.send_message(f"💸 You need {total_cost:,.2f} WC but only have {await self._nexus().get_balance(user):,.2f} WC.", ephemeral=True)
     
         async with self.config.user(user).stocks() as owned:
             prev = owned.get(name, 0)
@@ -829,9 +1105,6 @@ class StockMarket(commands.Cog):
     
         # Handle delisted stocks
         if stock.get("delisted", False):
-            await self.economy_config.user(user).master_balance.set(
-                (await self.economy_config.user(user).master_balance())
-            )
             return await interaction.response.send_message(
                 f"📉 **{name}** is delisted. You sold {amount} shares for **0 WC**.", ephemeral=True
             )
@@ -861,7 +1134,6 @@ class StockMarket(commands.Cog):
         await self.config.stocks.set_raw(name, value=stock)
     
         # Apply earnings
-        balance = await self.economy_config.user(user).master_balance()
         tax_credit = await self.economy_config.user(user).tax_credit()
         tax = earnings * .05
         if tax >= tax_credit:
@@ -872,7 +1144,7 @@ class StockMarket(commands.Cog):
             tax = 0
             
         await self.economy_config.user(user).tax_credit.set(tax_credit)
-        await self.economy_config.user(user).master_balance.set(balance + earnings - tax)
+        await self._nexus().modify_wellcoins(user, earnings - tax, force=True, reason=f"sellstock:{name}")
         await self.config.tax.set((await self.config.tax()) + tax)
 
     
@@ -913,7 +1185,7 @@ class StockMarket(commands.Cog):
     async def regional_debt(self, ctx, payment: float = 0):
         """View or pay toward the region's collective debt or surplus."""
         user = ctx.author
-        balance = await self.economy_config.user(user).master_balance()
+        balance = await self._nexus().get_balance(user)
         tax = await self.config.tax()
         spent_tax = await self.config.spent_tax()
     
@@ -924,8 +1196,15 @@ class StockMarket(commands.Cog):
     
         # Handle payment if applicable
         if payment > 0:
+            paid = False
             if balance >= payment:
-                await self.economy_config.user(user).master_balance.set(balance - payment)
+                # The balance may have changed since it was read; the ledger rejects an overdraft.
+                try:
+                    await self._nexus().take_wellcoins(user, payment, force=False)
+                    paid = True
+                except ValueError:
+                    balance = await self._nexus().get_balance(user)
+            if paid:
                 await self.config.tax.set(tax + payment)
                 await self.economy_config.user(user).tax_credit.set(
                     (await self.economy_config.user(user).tax_credit()) + payment
@@ -1102,8 +1381,6 @@ class StockMarket(commands.Cog):
         if not stock:
             return await ctx.send("Stock not found.")
 
-        history = stock.get("history", [])
-
         range_map = {
             "day": 24,
             "week": 24 * 7,
@@ -1115,7 +1392,7 @@ class StockMarket(commands.Cog):
             return await ctx.send("Invalid range. Choose from: day, week, month, year.")
 
         points = range_map[range]
-        data = history[-points:] if len(history) > points else history
+        data = self.history.prices(name, points)
 
         plt.figure(figsize=(10, 4))
         plt.plot(data)
@@ -1303,11 +1580,113 @@ class StockMarket(commands.Cog):
     
         await ctx.send(file=discord.File(buf, filename="market_chart.png"))
 
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def simulatemarket(self, ctx, hours: int = 24):
+        """What-if run: simulate the market N hours ahead without saving anything."""
+        if not 1 <= hours <= 24 * 365:
+            return await ctx.send("❌ Hours must be between 1 and 8760.")
+
+        stocks = await self.config.stocks()
+        engine = MarketTickEngine.from_stocks(stocks, await self.config.tags())
+        if not engine.names:
+            return await ctx.send("📉 No active stocks to simulate.")
+
+        path = engine.simulate(hours, self.last_day_trades)
+        start, end = path[0], path[-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.where(start > 0, (end - start) / start * 100, 0.0)
+        order = np.argsort(change)
+        bankrupt = [name for name, price in zip(engine.names, end) if price <= 0]
+
+        embed = discord.Embed(
+            title=f"🔮 Market Simulation ({hours}h)",
+            description="Nothing was saved; prices, tags and holdings are untouched.",
+            color=discord.Color.purple()
+        )
+        embed.add_field(
+            name="📈 Top Gainers",
+            value="\n".join(f"**{engine.names[i]}**: {change[i]:+,.2f}%" for i in order[::-1][:5]),
+            inline=True
+        )
+        embed.add_field(
+            name="📉 Top Losers",
+            value="\n".join(f"**{engine.names[i]}**: {change[i]:+,.2f}%" for i in order[:5]),
+            inline=True
+        )
+        embed.add_field(
+            name="💀 Bankruptcies",
+            value=", ".join(bankrupt[:20]) + (f" (+{len(bankrupt) - 20} more)" if len(bankrupt) > 20 else "") if bankrupt else "None",
+            inline=False
+        )
+        embed.add_field(
+            name="📊 Average Price",
+            value=f"{start.mean():,.2f} → {end.mean():,.2f} WC",
+            inline=False
+        )
+
+        plt.figure(figsize=(10, 4))
+        plt.plot(path.mean(axis=1), color='purple')
+        plt.title(f"Simulated Market-Wide Average Price ({hours}h)")
+        plt.xlabel("Hours From Now")
+        plt.ylabel("Average Price")
+        plt.grid(True)
+
+        buf = io.BytesIO()
+        plt.savefig(buf, format='png')
+        buf.seek(0)
+        plt.close()
+
+        embed.set_image(url="attachment://market_simulation.png")
+        await ctx.send(embed=embed, file=discord.File(buf, filename="market_simulation.png"))
+
+    @commands.command()
+    @commands.is_owner()
+    async def setcensusfixture(self, ctx, *, path: str = None):
+        """Price commodities from a local census history XML file instead of the API (clear with no path)."""
+        if path:
+            if not os.path.isfile(path):
+                return await ctx.send("❌ File not found.")
+            await self.config.census_fixture.set(path)
+            await ctx.send(f"🧪 Commodity pricing will read census history from `{path}`.")
+        else:
+            await self.config.census_fixture.set(None)
+            await ctx.send("🌐 Commodity pricing will use the NationStates API.")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def commoditypreview(self, ctx, refresh: bool = True):
+        """Preview the next daily commodity move without changing any prices."""
+        start = time.perf_counter()
+        if refresh:
+            fixture = await self.config.census_fixture()
+            added = await self.census.refresh(fixture, None if fixture else self._ns(), priority="interactive")
+        else:
+            added = 0
+        deltas = self.commodity_deltas()
+        elapsed = (time.perf_counter() - start) * 1000
+
+        stocks = await self.config.stocks()
+        lines = []
+        for stock_name, data in sorted(stocks.items()):
+            if not data.get("commodity", False):
+                continue
+            percent_delta = deltas.get(stock_name.lower().replace(" ", "_"))
+            if percent_delta is None:
+                continue
+            new_price = max(1.0, round(data["price"] * (1 + percent_delta / 100), 2))
+            lines.append(f"`{stock_name}`: {data['price']:.2f} → {new_price:.2f} ({percent_delta:+.2f}%)")
+
+        embed = discord.Embed(title="🛢️ Commodity Preview", color=discord.Color.gold())
+        embed.description = "\n".join(lines) or "No commodity stocks match the influence table."
+        embed.set_footer(text=f"{added} new census points • computed in {elapsed:.1f} ms")
+        await ctx.send(embed=embed)
+
     @commands.command()
     async def markettrend(self, ctx, time_range: str = "month"):
         """Show the market-wide average stock price trend over time."""
         stocks = await self.config.stocks()
-        available_stocks = [data for data in stocks.values() if not data.get("delisted", False)]
+        available_stocks = [name for name, data in stocks.items() if not data.get("delisted", False)]
     
         if not available_stocks:
             return await ctx.send("📉 No active stocks to display.")
@@ -1324,17 +1703,18 @@ class StockMarket(commands.Cog):
     
         points = range_map[time_range]
         
-        # Build the average history
-        averaged_history = []
-        for i in range(points):
-            total = 0
-            count = 0
-            for stock in available_stocks:
-                history = stock.get("history", [])
-                if len(history) >= points - i:
-                    total += history[-(points - i)]
-                    count += 1
-            averaged_history.append(round(total / count, 2) if count else 0)
+        # Build the average history, aligning every stock's tail on the latest hour
+        totals = [0.0] * points
+        counts = [0] * points
+        for name in available_stocks:
+            history = self.history.prices(name, points)
+            offset = points - len(history)
+            for i, price in enumerate(history):
+                totals[offset + i] += price
+                counts[offset + i] += 1
+        averaged_history = [
+            round(total / count, 2) if count else 0 for total, count in zip(totals, counts)
+        ]
     
         if not any(averaged_history):
             return await ctx.send("⚠️ Not enough price history to generate market trend.")
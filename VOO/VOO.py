@@ -5,9 +5,9 @@ import asyncio
 import json
 import logging
 import re
-from collections import deque
+from collections import OrderedDict, deque
 from datetime import datetime, timezone, timedelta
-from typing import Deque, List, Optional
+from typing import Deque, Dict, List, Optional, Set
 import aiohttp
 from redbot.core import commands, Config, checks
 from redbot.core.bot import Red
@@ -19,7 +19,8 @@ from datetime import timedelta
 
 log = logging.getLogger("red.vigil_of_origins")
 
-FOUNDING_SSE_URL = "https://www.nationstates.net/api/founding+rmb+move"
+SSE_BUCKETS = ("founding", "rmb", "move")
+FOUNDING_SSE_URL = "https://www.nationstates.net/api/" + "+".join(SSE_BUCKETS)
 GENERATED_BY = "Vigil_of_origins___by_9005____instance_run_by_By_9005"
 MAX_TG_BATCH = 8
 REGION_RE = re.compile(r"region=([a-z0-9_]+)", re.I)
@@ -27,6 +28,18 @@ REGION_RE = re.compile(r"region=([a-z0-9_]+)", re.I)
 
 # Added the dash after the underscore
 NATION_RE = re.compile(r"nation=([a-z0-9_-]+)", re.I)
+NATION_TEXT_RE = re.compile(r"@@([a-z0-9_]+)@@", re.I)
+REGION_TEXT_RE = re.compile(r"%%([a-z0-9_]+)%%", re.I)
+MOVE_RE = re.compile(r"relocated from %%(.*?)%% to %%(.*?)%%")
+FLAG_RE = re.compile(r'src="([^"]+)"')
+POSTID_RE = re.compile(r"postid=(\d+)")
+QUOTE_RE = re.compile(r"\[quote=.*?;.*?\]")
+TRAILING_DIGITS_RE = re.compile(r"\d+$")
+ROMAN_SUFFIX_RE = re.compile(r"\s+(?:I{1,3}|IV|V|VI{0,3}|IX|X{1,3})$")
+
+# Foundings arrive in bursts during update; queue writes and control embed
+# edits wait this long so a burst collapses into one edit per guild.
+REFRESH_DEBOUNCE = 3.0
 
 def has_role(role_name: str):
     """Custom decorator to check if the author has a specific role by name."""
@@ -97,6 +110,17 @@ class VOO(commands.Cog):
         self.weekly_task: Optional[asyncio.Task] = None
         self._err_last_notice_ts: dict[int, int] = {}  # guild_id -> unix ts
 
+        # In-memory mirror of the global shared_queue: an ordered set, oldest
+        # first, newest at the tail (Recruit pops from the tail).
+        self.queue: "OrderedDict[str, None]" = OrderedDict()
+        self._queue_dirty = False
+        # guild_id -> {"log_channel", "region_filter", "blacklist"}; refreshed
+        # by the commands that change those settings.
+        self._routing: Dict[int, dict] = {}
+        self._blacklisted: Set[str] = set()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._panic_pending = False
+
         # 1. Register a global dictionary default for the shared queue
         default_global = {
             "shared_queue": []
@@ -153,7 +177,8 @@ class VOO(commands.Cog):
         self.bot.add_view(VOOControlView(self))
 
     async def cog_load(self):
-        # The queue automatically references config data now!
+        self.queue = OrderedDict.fromkeys(await self.config.shared_queue())
+        await self._load_routing()
         await self.start_listener()
         if self.weekly_task is None or self.weekly_task.done():
             self.weekly_task = asyncio.create_task(
@@ -163,6 +188,9 @@ class VOO(commands.Cog):
 
     async def cog_unload(self):
         await self.stop_listener()
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        await self._persist_queue_snapshot()
         if self.session:
             await self.session.close()
         if self.weekly_task and not self.weekly_task.done():
@@ -173,7 +201,7 @@ class VOO(commands.Cog):
                 pass
 
     def _get_nexus(self):
-    # NexusExchange must be loaded as a cog; exposes add_wellcoins(user, amount)
+    # NexusExchange must be loaded as a cog; exposes add_wellcoins(user, amount) and modify_wellcoins_bulk({uid: delta})
         return self.bot.get_cog("NexusExchange")
 
     async def _get_per_tg_reward(self, guild: discord.Guild, queue_len_before: int) -> int:
@@ -228,11 +256,81 @@ class VOO(commands.Cog):
         # "The East Pacific" -> "the_east_pacific"
         return re.sub(r"\s+", "_", r.strip().lower())
 
+    # ---------- Routing cache ----------
+    async def _load_routing(self, guild: Optional[discord.Guild] = None):
+        """(Re)load the per-guild RMB log and blacklist settings the SSE path reads."""
+        if guild is None:
+            all_guilds = await self.config.all_guilds()
+            self._routing = {gid: self._routing_entry(data) for gid, data in all_guilds.items()}
+        else:
+            self._routing[guild.id] = self._routing_entry(await self.config.guild(guild).all())
+        self._blacklisted = set().union(*(r["blacklist"] for r in self._routing.values()))
+
+    @staticmethod
+    def _routing_entry(data: dict) -> dict:
+        region_filter = data.get("rmb_region_filter")
+        return {
+            "log_channel": data.get("rmb_log_channel"),
+            "region_filter": region_filter.lower() if region_filter else None,
+            "blacklist": frozenset(data.get("region_blacklist") or ()),
+        }
+
+    def _log_channels(self, region: Optional[str]):
+        """RMB log channels whose region filter lets an event from `region` through."""
+        region = region.lower() if region else None
+        for guild in self.bot.guilds:
+            route = self._routing.get(guild.id)
+            if not route or not route["log_channel"]:
+                continue
+            if route["region_filter"] and route["region_filter"] != region:
+                continue
+            channel = guild.get_channel(route["log_channel"])
+            if channel:
+                yield channel
+
+    # ---------- Queue / embed refresh ----------
+    def _schedule_refresh(self):
+        """Coalesce queue writes and control-embed edits into one pass per burst."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._debounced_refresh(), name="VOO_Refresh")
+
+    async def _debounced_refresh(self):
+        await asyncio.sleep(REFRESH_DEBOUNCE)
+        # Anything arriving from here on schedules the next pass.
+        self._refresh_task = None
+        try:
+            await self._persist_queue_snapshot()
+            if self._panic_pending:
+                self._panic_pending = False
+                qlen = len(self.queue)
+                for guild in self.bot.guilds:
+                    await self._maybe_panic_on_rise(guild, qlen)
+            await self._refresh_all_embeds()
+        except Exception:
+            log.exception("VOO: debounced refresh failed")
+
 
     # ---------- SSE Listener ----------
+    def sse_subscription(self) -> dict:
+        """Let SSEHub feed us from its shared connection instead of our own."""
+        return {"buckets": SSE_BUCKETS, "handler": self.handle_sse_event}
+
+    def _sse_hub(self):
+        hub = self.bot.get_cog("SSEHub")
+        return hub if hub is not None and hub.is_feeding(self) else None
+
+    async def handle_sse_event(self, event):
+        self.last_event_at = datetime.now(timezone.utc)
+        await self._handle_event(event.data)
+
     async def start_listener(self):
         if self.listener_task and not self.listener_task.done():
             return
+        hub = self.bot.get_cog("SSEHub")
+        if hub is not None and await hub.register(self):
+            # The hub's shared connection carries our buckets.
+            await self._refresh_all_embeds()
+            return
         if not self.session or self.session.closed:
             self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None))
         self.listener_task = asyncio.create_task(self._run_listener(), name="VOO_SSE_Listener")
@@ -319,185 +417,148 @@ class VOO(commands.Cog):
         except json.JSONDecodeError:
             log.debug("Non-JSON data: %s", data_line)
             return
+        await self._handle_event(obj)
 
+    async def _handle_event(self, obj: dict):
         html = obj.get("htmlStr") or ""
         text = obj.get("str") or ""
         # Extract the raw message if it exists
         rmb_msg = obj.get("rmbMessage") or ""
-        is_founding_present = "founding" in obj.get("buckets")
-        is_move_present = "region:the_wellspring" in obj.get("buckets", []) and "move" in obj.get("buckets", [])
-     
+        buckets = obj.get("buckets") or []
+        is_founding_present = "founding" in buckets
+        is_move_present = "region:the_wellspring" in buckets and "move" in buckets
+
         m_n_html = NATION_RE.search(html)
-        m_n_text = re.search(r"@@([a-z0-9_]+)@@", text, re.I)
+        m_n_text = None if m_n_html else NATION_TEXT_RE.search(text)
         nation = (m_n_html.group(1) if m_n_html else (m_n_text.group(1) if m_n_text else None))
 
-        m_r_html = REGION_RE.search(html) if 'REGION_RE' in globals() else None
-        m_r_text = re.search(r"%%([a-z0-9_]+)%%", text, re.I)
+        m_r_html = REGION_RE.search(html)
+        m_r_text = None if m_r_html else REGION_TEXT_RE.search(text)
         region = (m_r_html.group(1) if m_r_html else (m_r_text.group(1) if m_r_text else None))
-        
+
         if not nation:
             return
 
         nation_clean = nation.lower()
 
         if is_move_present:
-            text = obj.get("str", "")
-            
             # Extract origin and destination regions using regex from the plain text string
             # Format: "@@nation@@ relocated from %%origin%% to %%destination%%"
-            move_match = re.search(r"relocated from %%(.*?)%% to %%(.*?)%%", text)
-            
+            move_match = MOVE_RE.search(text)
+
             if move_match:
                 origin_region = move_match.group(1)
                 dest_region = move_match.group(2)
             else:
                 origin_region = ""
                 dest_region = ""
-        
+
             # Check direction relative to "the_wellspring"
             is_moving_in = (dest_region == "the_wellspring")
             is_moving_out = (origin_region == "the_wellspring")
-        
+
             # Only proceed if The Wellspring is involved in either direction
             if is_moving_in or is_moving_out:
                 # Extract flag from HTML
-                flag_match = re.search(r'src="([^"]+)"', html)
+                flag_match = FLAG_RE.search(html)
                 flag_url = f"https://www.nationstates.net{flag_match.group(1)}" if flag_match else None
-                
+
                 formatted_nation = nation.replace('_', ' ').title()
                 nation_link = f"https://www.nationstates.net/nation={nation}"
-                
+
                 if is_moving_in:
                     embed = discord.Embed(
                         title=f"New Arrival: {formatted_nation}!",
                         description=f"[{formatted_nation}]({nation_link}) has just moved into **[The Wellspring](https://www.nationstates.net/region=the_wellspring)** from [{origin_region.replace('_', ' ').title()}](https://www.nationstates.net/region={origin_region}), welcome them home!",
                         color=discord.Color.green(),
                     )
-                    relevant_region = dest_region
                 else:
                     embed = discord.Embed(
                         title=f"Departure: {formatted_nation}",
                         description=f"[{formatted_nation}]({nation_link}) has moved out of **[The Wellspring](https://www.nationstates.net/region=the_wellspring)** to [{dest_region.replace('_', ' ').title()}](https://www.nationstates.net/region={dest_region}), farewell and safe travels!",
                         color=discord.Color.orange(),
                     )
-                    relevant_region = origin_region
-                
+
                 if flag_url:
                     embed.set_thumbnail(url=flag_url)
-                
+
                 embed.set_footer(text=f"Region Event: The Wellspring")
-        
-                for guild in self.bot.guilds:
-                    chan_id = await self.config.guild(guild).rmb_log_channel()
-                    guild_config = self.config.guild(guild)
-                    if chan_id:
-                        target_region = await guild_config.rmb_region_filter()
-                        
-                        # If target region filter is set, ensure it matches The Wellspring
-                        if target_region and target_region.lower() != "the_wellspring":
-                            continue
-        
-                        channel = guild.get_channel(chan_id)
-                        if channel:
-                            try:
-                                await channel.send(embed=embed)
-                            except Exception:
-                                pass
-                            
+
+                for channel in self._log_channels("the_wellspring"):
+                    try:
+                        await channel.send(embed=embed)
+                    except Exception:
+                        pass
+
         if rmb_msg:
+            channels = list(self._log_channels(region))
+            if channels:
+                post_match = POSTID_RE.search(html)
+                post_id = post_match.group(1) if post_match else None
+
+                # Construct the direct link (falls back to region link if post_id fails)
+                if post_id and region:
+                    msg_url = f"https://www.nationstates.net/region={region}/page=display_region_rmb?postid={post_id}#p{post_id}"
+                elif region:
+                    msg_url = f"https://www.nationstates.net/region={region}"
+                else:
+                    msg_url = None
 
-            post_match = re.search(r"postid=(\d+)", html)
-            post_id = post_match.group(1) if post_match else None
+                # 1. Extract flag from HTML
+                # Look for: src="/images/flags/uploads/darkening_empire__187828t2.png"
+                flag_match = FLAG_RE.search(html)
+                flag_url = f"https://www.nationstates.net{flag_match.group(1)}" if flag_match else None
 
+                # 2. Clean up BBCode slightly for Discord (NationStates specific)
+                clean_msg = rmb_msg.replace("[nation]", "**").replace("[/nation]", "**")
+                clean_msg = QUOTE_RE.sub("> ", clean_msg)
+                clean_msg = clean_msg.replace("[/quote]", "\n")
 
-            # Construct the direct link (falls back to region link if post_id fails)
-            if post_id and region:
-                msg_url = f"https://www.nationstates.net/region={region}/page=display_region_rmb?postid={post_id}#p{post_id}"
-            elif region:
-                msg_url = f"https://www.nationstates.net/region={region}"
-            else:
-                msg_url = None
+                embed = discord.Embed(
+                    title=f"New Message from {nation.replace('_', ' ').title()}",
+                    description=clean_msg[:2048], # Discord limit
+                    color=discord.Color.blue(),
+                    url=msg_url  # Now links directly to the message!
+                )
 
-            
-            # 1. Extract flag from HTML
-            # Look for: src="/images/flags/uploads/darkening_empire__187828t2.png"
-            flag_match = re.search(r'src="([^"]+)"', html)
-            flag_url = f"https://www.nationstates.net{flag_match.group(1)}" if flag_match else None
-
-            # 2. Clean up BBCode slightly for Discord (NationStates specific)
-            clean_msg = rmb_msg.replace("[nation]", "**").replace("[/nation]", "**")
-            clean_msg = re.sub(r"\[quote=.*?;.*?\]", "> ", clean_msg)
-            clean_msg = clean_msg.replace("[/quote]", "\n")
-
-            embed = discord.Embed(
-                title=f"New Message from {nation.replace('_', ' ').title()}",
-                description=clean_msg[:2048], # Discord limit
-                color=discord.Color.blue(),
-                url=msg_url  # Now links directly to the message!           
-            )
-            
-            if flag_url:
-                embed.set_thumbnail(url=flag_url)
-            if region:
-                embed.set_footer(text=f"Region: {region.replace('_', ' ').title()}")
-
-            for guild in self.bot.guilds:
-                chan_id = await self.config.guild(guild).rmb_log_channel()
-                guild_config = self.config.guild(guild)
-                if chan_id:
-                    # Check if this guild has a specific region filter
-                    target_region = await guild_config.rmb_region_filter()
-                    
-                     # If target_region is set, only proceed if it matches the current message
-                    if target_region and (not region or region.lower() != target_region.lower()):
-                        continue
+                if flag_url:
+                    embed.set_thumbnail(url=flag_url)
+                if region:
+                    embed.set_footer(text=f"Region: {region.replace('_', ' ').title()}")
 
-                    channel = guild.get_channel(chan_id)
-                    if channel:
-                        try:
-                            await channel.send(embed=embed)
-                        except Exception:
-                            pass
+                for channel in channels:
+                    try:
+                        await channel.send(embed=embed)
+                    except Exception:
+                        pass
         # --- END LOGGING LOGIC ---
         if not is_founding_present:
             return
 
-        if re.search(r"\d+$", nation_clean):
-            return
-            
-        if re.search(r"\s+(?:I{1,3}|IV|V|VI{0,3}|IX|X{1,3})$", nation_clean):
+        if TRAILING_DIGITS_RE.search(nation_clean):
             return
-        
-        if region:
-            region_norm = region.lower()
-            for guild in self.bot.guilds:
-                bl = await self.config.guild(guild).region_blacklist()
-                if region_norm in bl:
-                    return
-
-        
-
 
+        if ROMAN_SUFFIX_RE.search(nation_clean):
+            return
 
-        async with self.config.shared_queue() as shared_q:
-            if nation_clean in shared_q:
-                return
-            
-            shared_q.append(nation_clean)
-            current_q_len = len(shared_q)
+        if region and region.lower() in self._blacklisted:
+            return
 
-        # Triggers alerts and updates embeds for all guilds with the new queue length
-        for guild in self.bot.guilds:
-            await self._maybe_panic_on_rise(guild, current_q_len)
-            
-        await self._refresh_all_embeds()
-        
-        await self._persist_queue_snapshot()
-        await self._refresh_all_embeds()
+        if nation_clean in self.queue:
+            return
+        self.queue[nation_clean] = None
+        self._queue_dirty = True
+        # Panic alerts and embed edits go out once the burst settles.
+        self._panic_pending = True
+        self._schedule_refresh()
 
 
     async def _persist_queue_snapshot(self):
-        pass
+        """Write the in-memory queue back to the global shared_queue if it changed."""
+        if not self._queue_dirty:
+            return
+        self._queue_dirty = False
+        await self.config.shared_queue.set(list(self.queue))
 
     async def _get_user_agent_global(self) -> str:
         # Use first configured guild UA; if none, default
@@ -579,21 +640,18 @@ class VOO(commands.Cog):
             )
             return
 
-        # Atomic dequeue block from the cross-server shared queue
-        async with self.config.shared_queue() as shared_q:
-            qlen_before = len(shared_q)
-            if qlen_before == 0:
-                await interaction.response.send_message(
-                    "The queue is currently empty! Waiting for new nations...", 
-                    ephemeral=True
-                )
-                return
-                
-            # Grab up to MAX_TG_BATCH from the tail/end of the list (matching old deque queue pop architecture)
-            batch = []
-            for _ in range(min(MAX_TG_BATCH, qlen_before)):
-                if shared_q:
-                    batch.append(shared_q.pop())
+        # Dequeue from the cross-server shared queue; no await between check and pop.
+        qlen_before = len(self.queue)
+        if qlen_before == 0:
+            await interaction.response.send_message(
+                "The queue is currently empty! Waiting for new nations...", 
+                ephemeral=True
+            )
+            return
+
+        # Grab up to MAX_TG_BATCH from the tail/end of the queue (newest first)
+        batch = [self.queue.popitem()[0] for _ in range(min(MAX_TG_BATCH, qlen_before))]
+        self._queue_dirty = True
 
         # Construct comma-separated targets for NationStates URL parameters
         tgto = ",".join(batch)
@@ -692,7 +750,7 @@ class VOO(commands.Cog):
           amount=len(batch),
           debug=False
             )
-        await self._refresh_all_embeds()
+        self._schedule_refresh()
             
 
 
@@ -718,6 +776,7 @@ class VOO(commands.Cog):
         else:
             await self.config.guild(ctx.guild).rmb_log_channel.set(None)
             await ctx.send("RMB logging disabled.")
+        await self._load_routing(ctx.guild)
 
     @sseset.command(name="region")
     async def set_log_region(self, ctx, region_name: str = None):
@@ -734,6 +793,7 @@ class VOO(commands.Cog):
         else:
             await self.config.guild(ctx.guild).rmb_region_filter.set(None)
             await ctx.send("RMB region filter cleared. Logging all regions.")
+        await self._load_routing(ctx.guild)
 
     @voo_group.command(name="setchannel")
     async def set_channel(self, ctx: commands.Context, channel: Optional[discord.TextChannel] = None):
@@ -761,6 +821,9 @@ class VOO(commands.Cog):
     @voo_group.command(name="stop")
     async def stop_cmd(self, ctx: commands.Context):
         """Stop the SSE listener."""
+        if self._sse_hub():
+            await ctx.send("Events come from SSEHub's shared connection; unload SSEHub to manage VOO's own listener.")
+            return
         await self.stop_listener()
         await self._refresh_all_embeds()
 
@@ -769,7 +832,7 @@ class VOO(commands.Cog):
     @voo_group.command(name="queue")
     async def show_queue(self, ctx: commands.Context, peek: int = 10):
         """Show shared queue length and a peek at the upcoming nations."""
-        shared_q = await self.config.shared_queue()
+        shared_q = list(self.queue)
         qlen = len(shared_q)
         preview = shared_q[-max(0, min(peek, 25)):]  # grab upcoming from the tail end
         preview.reverse() # Reverse so tail end outputs sequentially
@@ -782,8 +845,9 @@ class VOO(commands.Cog):
     @voo_group.command(name="clearqueue")
     async def clear_queue(self, ctx: commands.Context):
         """Keep only the first 100 elements in the global shared queue and drop the rest."""
-        queue = await self.config.shared_queue()
-        await self.config.shared_queue.set(queue[-100:])
+        self.queue = OrderedDict.fromkeys(list(self.queue)[-100:])
+        self._queue_dirty = True
+        await self._persist_queue_snapshot()
         await self._refresh_all_embeds()
         await ctx.send("Global shared queue trimmed to the first 100 elements.")
 
@@ -805,9 +869,7 @@ class VOO(commands.Cog):
         if not isinstance(channel, (discord.TextChannel, discord.Thread)):
             return
 
-        # Fetch the shared queue from global config and determine its length
-        shared_q = await self.config.shared_queue()
-        qlen = len(shared_q)
+        qlen = len(self.queue)
         
         status = await self._get_status_text()
         reward, lvl_name, lvl_emoji, idx, total = await self._current_reward_and_defcon(guild, qlen)
@@ -864,7 +926,8 @@ class VOO(commands.Cog):
         return f"Last event: <t:{epoch}:R> (<t:{epoch}:F>)"
 
     async def _get_status_text(self) -> str:
-        on = self.listener_task and not self.listener_task.done()
+        hub = self._sse_hub()
+        on = (self.listener_task and not self.listener_task.done()) or (hub is not None and hub.connected)
         status = "🟢 SSE: **ON**" if on else "🔴 SSE: **OFF**"
         return f"{status}\n{self._last_event_markdown()}"
     
@@ -906,9 +969,7 @@ class VOO(commands.Cog):
         if not isinstance(channel, (discord.TextChannel, discord.Thread)):
             return
 
-        # Fetch the shared queue from global config and determine its length
-        shared_q = await self.config.shared_queue()
-        qlen = len(shared_q)
+        qlen = len(self.queue)
         
         status = await self._get_status_text()
         reward, lvl_name, lvl_emoji, idx, total = await self._current_reward_and_defcon(guild, qlen)
@@ -919,8 +980,8 @@ class VOO(commands.Cog):
         msg_id = await self.config.guild(guild).control_message_id()
         if msg_id:
             try:
-                msg = await channel.fetch_message(msg_id)
-                await msg.edit(embed=embed, view=view)
+                # Edit by id: one request per guild instead of fetch + edit.
+                await channel.get_partial_message(msg_id).edit(embed=embed, view=view)
                 return
             except Exception:
                 pass  # fall through to post if missing/deleted
@@ -967,6 +1028,7 @@ class VOO(commands.Cog):
                 await ctx.send(f"`{r}` is already blacklisted.")
                 return
             bl.append(r)
+        await self._load_routing(ctx.guild)
         await ctx.send(f"Added `{r}` to the regional blacklist.")
 
     @voo_blacklist.command(name="remove")
@@ -978,6 +1040,7 @@ class VOO(commands.Cog):
                 await ctx.send(f"`{r}` was not on the blacklist.")
                 return
             bl.remove(r)
+        await self._load_routing(ctx.guild)
         await ctx.send(f"Removed `{r}` from the regional blacklist.")
 
     @voo_group.command(name="testweeklypayout")
@@ -1007,6 +1070,7 @@ class VOO(commands.Cog):
     async def voo_blacklist_clear(self, ctx: commands.Context):
         """Clear the regional blacklist."""
         await self.config.guild(ctx.guild).region_blacklist.set([])
+        await self._load_routing(ctx.guild)
         await ctx.send("Cleared the regional blacklist.")
 
     async def _weekly_scheduler(self):
@@ -1157,21 +1221,18 @@ class VOO(commands.Cog):
         # Distribute Bank/Nexus currency ONLY to members present inside this server roster
         nexus = self._get_nexus()
         if nexus:
+            credits = {}
             for uid, cnt, pct, share, bonus in payouts:
-                member = guild.get_member(uid)
-                if not member:
+                if not guild.get_member(uid):
                     continue  # Handled safely when the loop hits their home server
-                
-                if share > 0:
-                    try:
-                        await nexus.add_wellcoins(member, float(share))
-                    except Exception:
-                        log.exception("Pot share payout failed for %s", member)
-                if bonus > 0:
-                    try:
-                        await nexus.add_wellcoins(member, float(bonus))
-                    except Exception:
-                        log.exception("Minimum payout failed for %s", member)
+                if share + bonus > 0:
+                    credits[uid] = float(share + bonus)
+            try:
+                _, failed = await nexus.modify_wellcoins_bulk(credits, reason="voo_weekly_payout")
+                for uid, err in failed.items():
+                    log.warning("Weekly payout failed for %s: %s", uid, err)
+            except Exception:
+                log.exception("Weekly payout failed for guild %s", guild.id)
 
         # Generate report text lines
         lines = []
@@ -1523,9 +1584,7 @@ class VOO(commands.Cog):
             except Exception:
                 pass
     
-        # Fetch the shared queue from global config and determine its length
-        shared_q = await self.config.shared_queue()
-        qlen = len(shared_q)
+        qlen = len(self.queue)
         
         status = await self._get_status_text()
         reward, lvl_name, lvl_emoji, idx, total = await self._current_reward_and_defcon(guild, qlen)
@@ -10,12 +10,12 @@ import re
 from textwrap import wrap
 from typing import Dict, List, Optional, Tuple
 
-import aiohttp
 import discord
 from redbot.core import commands, Config
 
 BASE = "https://www.nationstates.net"
 API = f"{BASE}/cgi-bin/api.cgi"
+DEFAULT_UA = "WellspringTools/1.0 (contact: you@example.com)"
 
 # Discord limits
 DISCORD_MAX_FIELD = 1024
@@ -26,6 +26,10 @@ DISCORD_MAX_EMBEDS_PER_MESSAGE = 10
 COLOR_GREEN = 0x2ECC71
 COLOR_RED = 0xE74C3C
 
+
+class NSRequestError(RuntimeError):
+    """NationStates answered with a non-200 status."""
+
 def bbcode_to_discord(text: str) -> str:
     """Convert basic BBCode to Discord markdown."""
     if not text:
@@ -126,17 +130,13 @@ class WAArchiver(commands.Cog):
             "discord_post_delay":.7
         }
         self.config.register_guild(**default_guild)
-        self._http: Optional[aiohttp.ClientSession] = None
 
-    # ------------- aiohttp session -------------
-    async def cog_load(self):
-        if self._http is None:
-            headers = {"User-Agent": "WellspringTools/1.0 (contact: you@example.com)"}
-            self._http = aiohttp.ClientSession(headers=headers)
-
-    async def cog_unload(self):
-        if self._http and not self._http.closed:
-            await self._http.close()
+    # ------------- shared NS client -------------
+    def _ns(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so WAArchiver can reach NationStates.")
+        return cog.client
 
     def _find_forum_tags(self, forum: discord.ForumChannel, wanted: List[str]) -> Dict[str, discord.ForumTag]:
         """Map wanted tag names (case-insensitive) to ForumTag objects if present."""
@@ -196,33 +196,13 @@ class WAArchiver(commands.Cog):
 
 
     # ------------- NS HTTP -------------
-    async def ns_get(self, guild: discord.Guild, params: Dict[str, str]) -> str:
-        """GET NationStates API with polite rate limiting."""
-        if self._http is None or self._http.closed:
-            await self.cog_load()
-
+    async def ns_get(self, guild: discord.Guild, params: Dict[str, str], priority: str = "interactive") -> str:
+        """GET NationStates API through the shared, rate-limited NSApi client."""
         ua = await self.config.guild(guild).ns_user_agent()
-        # Update UA per guild before request
-        self._http.headers.update({"User-Agent": ua})
-
-        async with self._http.get(API, params=params, timeout=30) as resp:
-            # Rate limiting guidance
-            try:
-                remaining = resp.headers.get("Ratelimit-Remaining")
-                reset_time = resp.headers.get("Ratelimit-Reset")
-                if remaining is not None and reset_time is not None:
-                    remaining_int = int(remaining) - 10
-                    reset_int = int(reset_time)
-                    wait_time = (reset_int / remaining_int) if remaining_int > 0 else reset_int
-                    if wait_time > 0:
-                        await asyncio.sleep(wait_time)
-                else:
-                    await asyncio.sleep(0.5)
-            except Exception:
-                await asyncio.sleep(0.5)
-
-            resp.raise_for_status()
-            return await resp.text()
+        resp = await self._ns().get(params, url=API, user_agent=ua or DEFAULT_UA, priority=priority)
+        if resp.status != 200:
+            raise NSRequestError(f"NationStates returned HTTP {resp.status}")
+        return resp.text()
 
     # ------------- NS parsing -------------
     async def get_last_resolution_id(self, guild: discord.Guild, council: int) -> int:
@@ -233,12 +213,12 @@ class WAArchiver(commands.Cog):
             raise RuntimeError(f"Could not parse lastresolution ID for council {council}")
         return int(m.group(1))
 
-    async def get_resolution_xml_el(self, guild: discord.Guild, council: int, resid: int):
+    async def get_resolution_xml_el(self, guild: discord.Guild, council: int, resid: int, priority: str = "interactive"):
         import xml.etree.ElementTree as ET
 
         try:
-            xml_text = await self.ns_get(guild, {"wa": str(council), "q": "resolution", "id": str(resid)})
-        except aiohttp.ClientResponseError:
+            xml_text = await self.ns_get(guild, {"wa": str(council), "q": "resolution", "id": str(resid)}, priority)
+        except NSRequestError:
             return None
         try:
             root = ET.fromstring(xml_text)
@@ -511,7 +491,7 @@ class WAArchiver(commands.Cog):
         delay = await self.config.guild(ctx.guild).discord_post_delay()
 
         while posted < count and resid > 0:
-            el = await self.get_resolution_xml_el(ctx.guild, council, resid)
+            el = await self.get_resolution_xml_el(ctx.guild, council, resid, priority="background")
             if el is None:
                 if cont:
                     resid -= 1
@@ -562,7 +542,7 @@ class WAArchiver(commands.Cog):
         delay = await self.config.guild(ctx.guild).discord_post_delay()
 
         while posted < count and resid > 0:
-            el = await self.get_resolution_xml_el(ctx.guild, council, resid)
+            el = await self.get_resolution_xml_el(ctx.guild, council, resid, priority="background")
             if el is None:
                 if cont:
                     resid -= 1
@@ -608,7 +588,7 @@ class WAArchiver(commands.Cog):
         # Go forward from last_posted + 1 up to latest
         posted = 0
         for resid in range(last_posted + 1, latest + 1):
-            el = await self.get_resolution_xml_el(ctx.guild, council, resid)
+            el = await self.get_resolution_xml_el(ctx.guild, council, resid, priority="background")
             if el is None:
                 continue
             try:
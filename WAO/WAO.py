@@ -15,6 +15,42 @@ log = logging.getLogger("red.wa_proposal_watcher")
 
 WA_BASE_URL = "https://www.nationstates.net/cgi-bin/api.cgi"
 
+VOTE_RE = re.compile(r"^(for|against|abstain)\b", re.IGNORECASE)
+VOTE_EMOJI = {"for": "🟢", "against": "🔴", "abstain": "⚪"}
+
+# Starter-embed tallies (and the stored votes) for a thread are written at most
+# once per this many seconds, so a vote rush becomes a handful of edits.
+TALLY_DEBOUNCE = 5.0
+
+
+class ThreadTally:
+    """Votes cast in one proposal thread, with running per-choice counts."""
+
+    __slots__ = ("votes", "counts", "embed", "task")
+
+    def __init__(self, votes: Dict[str, str]):
+        self.votes: Dict[str, str] = dict(votes)
+        self.counts: Dict[str, int] = {choice: 0 for choice in VOTE_EMOJI}
+        for choice in self.votes.values():
+            if choice in self.counts:
+                self.counts[choice] += 1
+        self.embed: Optional[discord.Embed] = None  # starter embed minus "Thread Votes"
+        self.task: Optional[asyncio.Task] = None    # pending debounced write
+
+    def cast(self, user_key: str, choice: str):
+        old = self.votes.get(user_key)
+        if old in self.counts:
+            self.counts[old] -= 1
+        self.votes[user_key] = choice
+        self.counts[choice] += 1
+
+    def percentages(self) -> Dict[str, float]:
+        total = len(self.votes)
+        return {
+            choice: round(count * 100.0 / total, 1) if total > 0 else 0.0
+            for choice, count in self.counts.items()
+        }
+
 
 class WAO(commands.Cog):
     """
@@ -64,16 +100,49 @@ class WAO(commands.Cog):
 
 
         self.session: Optional[ClientSession] = None
+        # thread_id -> {"guild_id", "council", "pid", "starter_message_id"} for
+        # every tracked proposal thread; built in cog_load and kept current by
+        # _create_thread_for_proposal and the dump command.
+        self._threads: Dict[int, Dict[str, Any]] = {}
+        # thread_id -> live tally, loaded from config on a thread's first vote.
+        self._tallies: Dict[int, ThreadTally] = {}
         self.check_proposals_loop.start()
 
     async def cog_load(self) -> None:
         if self.session is None:
             self.session = ClientSession()
+        for guild_id, data in (await self.config.all_guilds()).items():
+            for council, council_data in (data.get("proposals") or {}).items():
+                for pid, entry in council_data.items():
+                    if entry.get("thread_id"):
+                        self._index_thread(
+                            guild_id, council, pid, entry["thread_id"], entry.get("starter_message_id")
+                        )
 
-    def cog_unload(self) -> None:
+    async def cog_unload(self) -> None:
         self.check_proposals_loop.cancel()
+        # Write out votes still waiting on their debounce.
+        for thread_id, tally in list(self._tallies.items()):
+            if tally.task and not tally.task.done():
+                tally.task.cancel()
+                await self._save_votes(thread_id, tally)
         if self.session and not self.session.closed:
-            asyncio.create_task(self.session.close())
+            await self.session.close()
+
+    def _index_thread(
+        self,
+        guild_id: int,
+        council: str,
+        pid: str,
+        thread_id: int,
+        starter_message_id: Optional[int],
+    ):
+        self._threads[thread_id] = {
+            "guild_id": guild_id,
+            "council": str(council),
+            "pid": pid,
+            "starter_message_id": starter_message_id,
+        }
 
     async def _check_resolution_for_council(
         self,
@@ -193,23 +262,17 @@ class WAO(commands.Cog):
             dict with keys: id, name, category, proposed_by
             or None if no active resolution / parse failure.
         """
-        if self.session is None or self.session.closed:
-            self.session = ClientSession()
-
         params = {"wa": str(council), "q": "resolution"}
-        headers = {"User-Agent": user_agent}
-
-        async with self.session.get(
-            WA_BASE_URL, params=params, headers=headers
-        ) as resp:
-            text = await resp.text()
-            await self._handle_rate_limit(resp)
+        # Each guild's pass asks for the same council; NSApi's short cache answers the repeats
+        resp = await self._ns().get(
+            params, url=WA_BASE_URL, user_agent=user_agent, priority="background"
+        )
 
-            try:
-                root = ET.fromstring(text)
-            except ET.ParseError:
-                log.exception("Failed to parse WA resolution XML for council %s", council)
-                return None
+        try:
+            root = ET.fromstring(resp.body)
+        except ET.ParseError:
+            log.exception("Failed to parse WA resolution XML for council %s", council)
+            return None
 
         res_elem = root.find("RESOLUTION")
         if res_elem is None:
@@ -684,6 +747,11 @@ class WAO(commands.Cog):
                     )
 
         # Clear memory: proposals + votes; keep forum/webhook settings
+        for thread_id in [t for t, ref in self._threads.items() if ref["guild_id"] == guild.id]:
+            del self._threads[thread_id]
+            tally = self._tallies.pop(thread_id, None)
+            if tally and tally.task:
+                tally.task.cancel()
         await self.config.guild(guild).proposals.set({"1": {}, "2": {}})
         await self.config.guild(guild).votes.clear()
 
@@ -1122,6 +1190,7 @@ class WAO(commands.Cog):
         except Exception as e:
             log.exception("Failed to reserve IFV post in thread %s: %s", thread.id, e)
 
+        self._index_thread(forum.guild.id, str(council), proposal_id, thread.id, starter_message_id)
         return thread, starter_message_id, ifv_message_id
 
 
@@ -1203,23 +1272,16 @@ class WAO(commands.Cog):
         self, council: int, user_agent: str
     ) -> Dict[str, Dict[str, Any]]:
         """Fetch proposals for a WA council from NationStates API."""
-        if self.session is None or self.session.closed:
-            self.session = ClientSession()
-
         params = {"wa": str(council), "q": "proposals"}
-        headers = {"User-Agent": user_agent}
-
-        async with self.session.get(
-            WA_BASE_URL, params=params, headers=headers
-        ) as resp:
-            text = await resp.text()
-            await self._handle_rate_limit(resp)
+        resp = await self._ns().get(
+            params, url=WA_BASE_URL, user_agent=user_agent, priority="background"
+        )
 
-            try:
-                root = ET.fromstring(text)
-            except ET.ParseError:
-                log.exception("Failed to parse WA XML for council %s", council)
-                return {}
+        try:
+            root = ET.fromstring(resp.body)
+        except ET.ParseError:
+            log.exception("Failed to parse WA XML for council %s", council)
+            return {}
 
         proposals_elem = root.find("PROPOSALS")
         if proposals_elem is None:
@@ -1267,31 +1329,18 @@ class WAO(commands.Cog):
 
         return proposals
 
-    async def _handle_rate_limit(self, resp):
-        """Handle NationStates API rate limiting based on response headers."""
-        headers = resp.headers
-        try:
-            remaining_raw = headers.get("Ratelimit-Remaining")
-            reset_raw = headers.get("Ratelimit-Reset")
-            if remaining_raw is None or reset_raw is None:
-                return
-
-            remaining = int(remaining_raw)
-            reset_time = int(reset_raw)
-
-            remaining -= 10
-            if remaining > 0:
-                wait_time = reset_time / remaining
-            else:
-                wait_time = reset_time
-
-            if 0 < wait_time < 60:
-                await asyncio.sleep(wait_time)
-        except Exception:
-            return
+    def _ns(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so WAO can reach NationStates.")
+        return cog.client
 
     # -------------- VOTING IN THREADS --------------
 
+    def message_routes(self):
+        """Filters for MessageRouter: votes only arrive in tracked proposal threads."""
+        return [{"handler": self.on_message, "threads": True, "check": lambda m: m.channel.id in self._threads}]
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         """
@@ -1302,7 +1351,7 @@ class WAO(commands.Cog):
         - Record/update that user's vote for this thread.
         - React with a specific emoji.
         - Edit the message to include the current tally for this thread.
-        - Update the original embed with overall thread tallies.
+        - Update the original embed with overall thread tallies (debounced).
         """
         if message.author.bot:
             return
@@ -1313,19 +1362,16 @@ class WAO(commands.Cog):
         if guild is None:
             return
 
-        proposals = await self.config.guild(guild).proposals()
         thread_id = message.channel.id
-        is_tracked = False
+        if thread_id not in self._threads:
+            return
 
-        for council_data in proposals.values():
-            for entry in council_data.values():
-                if entry.get("thread_id") == thread_id:
-                    is_tracked = True
-                    break
-            if is_tracked:
-                break
+        text = message.content.strip()
+        if not text:
+            return
 
-        if not is_tracked:
+        m = VOTE_RE.match(text)
+        if not m:
             return
 
         voter_role_id = await self.config.guild(guild).voter_role_id()
@@ -1333,133 +1379,130 @@ class WAO(commands.Cog):
             if not any(r.id == voter_role_id for r in message.author.roles):
                 return
 
-        text = message.content.strip()
-        if not text:
-            return
+        choice = m.group(1).lower()
+        emoji = VOTE_EMOJI[choice]
 
-        m = re.match(r"^(for|against|abstain)\b", text, flags=re.IGNORECASE)
-        if not m:
-            return
+        tally = self._tallies.get(thread_id)
+        if tally is None:
+            stored = await self.config.guild(guild).votes.get_raw(str(thread_id), default={})
+            # Another vote may have loaded it while we awaited.
+            tally = self._tallies.setdefault(thread_id, ThreadTally(stored))
+        tally.cast(str(message.author.id), choice)
 
-        choice_raw = m.group(1).lower()
-        if choice_raw == "for":
-            choice = "for"
-            emoji = "🟢"
-        elif choice_raw == "against":
-            choice = "against"
-            emoji = "🔴"
-        else:
-            choice = "abstain"
-            emoji = "⚪"
+        counts = dict(tally.counts)
+        pcts = tally.percentages()
 
-        votes_conf = self.config.guild(guild).votes
-        async with votes_conf() as all_votes:
-            tkey = str(thread_id)
-            user_key = str(message.author.id)
-            thread_votes = all_votes.get(tkey, {})
-            thread_votes[user_key] = choice
-            all_votes[tkey] = thread_votes
+        try:
+            await message.add_reaction(emoji)
+        except Exception as e:
+            log.debug("Failed to add reaction to vote message: %s", e)
 
-            total = len(thread_votes)
-            for_count = sum(1 for v in thread_votes.values() if v == "for")
-            against_count = sum(1 for v in thread_votes.values() if v == "against")
-            abstain_count = sum(1 for v in thread_votes.values() if v == "abstain")
+        # Stored votes and the starter embed catch up once the rush settles.
+        if tally.task is None or tally.task.done():
+            tally.task = asyncio.create_task(self._flush_tally(message.channel, tally))
+
+        # Edit the vote message with its own tally line
+        base_content = message.content
+        marker = "\nVote tally:"
+        if "Vote tally:" in base_content:
+            base_content = base_content.split(marker)[0].rstrip()
 
-        def pct(count: int) -> float:
-            return round(count * 100.0 / total, 1) if total > 0 else 0.0
+        tally_line = (
+            f"\n\nVote tally: "
+            f"For {counts['for']} ({pcts['for']}%), "
+            f"Against {counts['against']} ({pcts['against']}%), "
+            f"Abstain {counts['abstain']} ({pcts['abstain']}%)"
+        )
+        new_content = base_content + tally_line
 
-        for_pct = pct(for_count)
-        against_pct = pct(against_count)
-        abstain_pct = pct(abstain_count)
+        if len(new_content) > 2000:
+            max_base = 2000 - len(tally_line) - 3
+            base_trim = base_content[:max_base] + "..."
+            new_content = base_trim + tally_line
 
         try:
-            await message.add_reaction(emoji)
+            await message.edit(content=new_content)
         except Exception as e:
-            log.debug("Failed to add reaction to vote message: %s", e)
+            log.debug("Failed to edit vote message for tally: %s", e)
 
-        # Update the starter embed with overall thread votes
+    async def _flush_tally(self, thread: discord.Thread, tally: ThreadTally):
+        await asyncio.sleep(TALLY_DEBOUNCE)
+        # Votes from here on schedule the next write.
+        tally.task = None
+        if self._tallies.get(thread.id) is not tally:
+            return  # dumped meanwhile
+        await self._save_votes(thread.id, tally)
         try:
-            guild_conf = self.config.guild(guild)
-            proposals = await guild_conf.proposals()
-            starter_message_id = None
-
-            for council_data in proposals.values():
-                for entry in council_data.values():
-                    if entry.get("thread_id") == thread_id:
-                        starter_message_id = entry.get("starter_message_id")
-                        break
-                if starter_message_id:
-                    break
+            await self._update_starter_embed(thread, tally)
+        except Exception as e:
+            log.debug("Failed to update starter embed votes: %s", e)
+
+    async def _save_votes(self, thread_id: int, tally: ThreadTally):
+        ref = self._threads.get(thread_id)
+        if ref is None:
+            return
+        try:
+            await self.config.guild_from_id(ref["guild_id"]).votes.set_raw(
+                str(thread_id), value=dict(tally.votes)
+            )
+        except Exception:
+            log.exception("Failed to save votes for thread %s", thread_id)
 
+    async def _update_starter_embed(self, thread: discord.Thread, tally: ThreadTally):
+        """Write the thread's overall tally into its starter embed."""
+        ref = self._threads.get(thread.id)
+        if ref is None:
+            return
+
+        if tally.embed is None:
+            # First edit for this thread: fetch the starter once and keep its
+            # embed, so later edits go straight out by message id.
             starter_msg: Optional[discord.Message] = None
+            starter_message_id = ref.get("starter_message_id")
 
             if starter_message_id:
                 try:
-                    starter_msg = await message.channel.fetch_message(starter_message_id)
+                    starter_msg = await thread.fetch_message(starter_message_id)
                 except discord.NotFound:
                     starter_msg = None
 
             # Fallback: find first message in thread and store it
             if starter_msg is None:
                 try:
-                    async for msg in message.channel.history(limit=1, oldest_first=True):
+                    async for msg in thread.history(limit=1, oldest_first=True):
                         starter_msg = msg
-                        starter_message_id = msg.id
                         break
                 except Exception:
                     starter_msg = None
 
-                if starter_msg and starter_message_id:
-                    for council_key, council_data in proposals.items():
-                        for pid, entry in council_data.items():
-                            if entry.get("thread_id") == thread_id:
-                                entry["starter_message_id"] = starter_message_id
-                    await guild_conf.proposals.set(proposals)
-
-            if starter_msg and starter_msg.embeds:
-                base_embed = starter_msg.embeds[0]
-                embed = base_embed.copy()
-
-                existing_fields = list(embed.fields)
-                embed.clear_fields()
-                for f in existing_fields:
-                    if f.name != "Thread Votes":
-                        embed.add_field(name=f.name, value=f.value, inline=f.inline)
-
-                votes_value = (
-                    f"For {for_count} ({for_pct}%)\n"
-                    f"Against {against_count} ({against_pct}%)\n"
-                    f"Abstain {abstain_count} ({abstain_pct}%)"
-                )
-                embed.add_field(name="Thread Votes", value=votes_value, inline=False)
-
-                await starter_msg.edit(embed=embed)
-        except Exception as e:
-            log.debug("Failed to update starter embed votes: %s", e)
+                if starter_msg:
+                    ref["starter_message_id"] = starter_msg.id
+                    await self.config.guild(thread.guild).proposals.set_raw(
+                        ref["council"], ref["pid"], "starter_message_id", value=starter_msg.id
+                    )
 
-        # Edit the vote message with its own tally line
-        base_content = message.content
-        marker = "\nVote tally:"
-        if "Vote tally:" in base_content:
-            base_content = base_content.split(marker)[0].rstrip()
+            if not starter_msg or not starter_msg.embeds:
+                return
 
-        tally_line = (
-            f"\n\nVote tally: "
-            f"For {for_count} ({for_pct}%), "
-            f"Against {against_count} ({against_pct}%), "
-            f"Abstain {abstain_count} ({abstain_pct}%)"
+            embed = starter_msg.embeds[0].copy()
+            existing_fields = list(embed.fields)
+            embed.clear_fields()
+            for f in existing_fields:
+                if f.name != "Thread Votes":
+                    embed.add_field(name=f.name, value=f.value, inline=f.inline)
+            tally.embed = embed
+
+        counts = tally.counts
+        pcts = tally.percentages()
+        embed = tally.embed.copy()
+        votes_value = (
+            f"For {counts['for']} ({pcts['for']}%)\n"
+            f"Against {counts['against']} ({pcts['against']}%)\n"
+            f"Abstain {counts['abstain']} ({pcts['abstain']}%)"
         )
-        new_content = base_content + tally_line
-
-        if len(new_content) > 2000:
-            max_base = 2000 - len(tally_line) - 3
-            base_trim = base_content[:max_base] + "..."
-            new_content = base_trim + tally_line
+        embed.add_field(name="Thread Votes", value=votes_value, inline=False)
 
-        try:
-            await message.edit(content=new_content)
-        except Exception as e:
-            log.debug("Failed to edit vote message for tally: %s", e)
+        await thread.get_partial_message(ref["starter_message_id"]).edit(embed=embed)
 
 
 async def setup(bot):
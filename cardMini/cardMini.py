@@ -11,6 +11,7 @@ import math
 import asyncio
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from datetime import timezone
 from collections import Counter
@@ -28,6 +29,339 @@ def is_owner_overridable():
         return False
     return commands.permissions_check(predicate)
 
+
+class GuildDB:
+    """
+    One guild's card game database.
+
+    Every call is queued onto a single worker thread that owns a persistent
+    WAL connection, so commands never block the event loop and the
+    read-modify-write updates (bank, stock, deck counts) can't interleave.
+    Statements are plain constant strings, so the connection's statement cache
+    keeps them prepared between calls.
+
+    Decks live in one ``decks`` table keyed by (ownerID, season, userID). The
+    old per-user ``deck_<id>`` tables are folded into it the first time a
+    guild's database is opened (tracked with ``PRAGMA user_version``).
+    """
+
+    SCHEMA_VERSION = 1
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS bank (
+            userID INTEGER,
+            cash REAL DEFAULT 0
+        )""",
+        """CREATE TABLE IF NOT EXISTS decks (
+            ownerID INTEGER NOT NULL,
+            userID INTEGER NOT NULL,
+            season TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (ownerID, season, userID)
+        )""",
+        "CREATE INDEX IF NOT EXISTS decks_card ON decks (season, userID)",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = None
+        self._cards = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cardMini-db")
+        # Queued first, so every later call runs against an opened, migrated db.
+        self._ready = self._pool.submit(self._open)
+
+    async def run(self, fn, *args):
+        """Run ``fn(*args)`` on the database thread."""
+        await asyncio.wrap_future(self._ready)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    def close(self):
+        self._pool.submit(self._close)
+        self._pool.shutdown(wait=False)
+
+    def _close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def _open(self):
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            for stmt in self.SCHEMA:
+                self.db.execute(stmt)
+            if self.db.execute("PRAGMA user_version").fetchone()[0] < 1:
+                self._migrate_v1()
+                self.db.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def _migrate_v1(self):
+        # bank had no key, so drop any duplicate rows before making userID unique
+        self.db.execute(
+            "DELETE FROM bank WHERE rowid NOT IN (SELECT MIN(rowid) FROM bank GROUP BY userID)"
+        )
+        self.db.execute("CREATE UNIQUE INDEX IF NOT EXISTS bank_user ON bank (userID)")
+        legacy = self.db.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'deck%'"
+        ).fetchall()
+        for (table,) in legacy:
+            owner = table[len("deck_"):]
+            if not table.startswith("deck_") or not owner.isdigit():
+                continue
+            self.db.execute(
+                f"""INSERT INTO decks (ownerID, userID, season, count)
+                    SELECT ?, userID, season, SUM(count) FROM "{table}"
+                    WHERE true GROUP BY userID, season
+                    ON CONFLICT (ownerID, season, userID)
+                    DO UPDATE SET count = count + excluded.count""",
+                (int(owner),),
+            )
+            self.db.execute(f'DROP TABLE "{table}"')
+
+    # ---- season tables ----
+
+    @staticmethod
+    def _table(name):
+        if not name.isidentifier():
+            raise sqlite3.OperationalError(f"no such table: {name}")
+        return name
+
+    def tables(self):
+        return [r[0] for r in self.db.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+
+    def seasons(self):
+        rows = self.db.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'Season_%'"
+        ).fetchall()
+        return [r[0] for r in rows if r[0].isidentifier()]
+
+    def _cards_sql(self):
+        # Every season table as one relation, for joining decks against card MV.
+        if self._cards is None:
+            parts = [
+                f"SELECT '{t}' AS season, userID, rarity, MV FROM {t}" for t in self.seasons()
+            ]
+            self._cards = " UNION ALL ".join(parts) or (
+                "SELECT NULL AS season, NULL AS userID, NULL AS rarity, NULL AS MV WHERE 0"
+            )
+        return self._cards
+
+    def create_season(self, series, rows):
+        self._table(series)
+        with self.db:
+            self.db.execute(f"""
+                CREATE TABLE IF NOT EXISTS {series} (
+                    userID INTEGER,
+                    name TEXT,
+                    season TEXT,
+                    rarity TEXT,
+                    MV REAL,
+                    Stock INTEGER
+                )
+            """)
+            self.db.executemany(
+                f"INSERT INTO {series} (userID, name, season, rarity, MV, Stock) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        self._cards = None
+
+    def delete_season(self, series):
+        self._table(series)
+        with self.db:
+            self.db.execute(f"DROP TABLE IF EXISTS {series}")
+            self.db.execute("DELETE FROM decks WHERE season = ?", (series,))
+        self._cards = None
+
+    def season_stats(self, series):
+        return self.db.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(MV), 0), COALESCE(SUM(stock), 0) FROM {self._table(series)}"
+        ).fetchone()
+
+    def set_stock(self, series, count):
+        with self.db:
+            self.db.execute(f'UPDATE "{self._table(series)}" SET Stock = ?', (count,))
+
+    def set_rarities(self, series, updates):
+        """updates: iterable of (MV, rarity, userID)."""
+        with self.db:
+            self.db.executemany(
+                f"UPDATE {self._table(series)} SET MV = ?, rarity = ? WHERE userID = ?", updates
+            )
+
+    def card(self, series, card_id):
+        return self.db.execute(
+            f"SELECT * FROM {self._table(series)} WHERE userID = ? AND season = ?", (card_id, series)
+        ).fetchone()
+
+    def card_id(self, series, name):
+        row = self.db.execute(
+            f"SELECT userID FROM {self._table(series)} WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def delete_card(self, series, card_id):
+        with self.db:
+            self.db.execute(
+                f"DELETE FROM {self._table(series)} WHERE season = ? AND userID = ?", (series, card_id)
+            )
+            self.db.execute("DELETE FROM decks WHERE season = ? AND userID = ?", (series, card_id))
+
+    def _gob_pack(self, series):
+        # Gob picks up one random card of the season.
+        self.db.execute(f"""
+            UPDATE {series} SET Stock = Stock + 1
+            WHERE rowid = (SELECT rowid FROM {series} ORDER BY RANDOM() LIMIT 1)
+        """)
+
+    # ---- bank ----
+
+    def bank(self, user_id):
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO bank (userID, cash) VALUES (?, 0)", (user_id,))
+        return self.db.execute("SELECT cash FROM bank WHERE userID = ?", (user_id,)).fetchone()[0]
+
+    def add_cash(self, user_id, amount):
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO bank (userID, cash) VALUES (?, 0)", (user_id,))
+            self.db.execute("UPDATE bank SET cash = cash + ? WHERE userID = ?", (amount, user_id))
+        return self.db.execute("SELECT cash FROM bank WHERE userID = ?", (user_id,)).fetchone()[0]
+
+    def set_cash(self, user_id, cash):
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO bank (userID, cash) VALUES (?, 0)", (user_id,))
+            self.db.execute("UPDATE bank SET cash = ? WHERE userID = ?", (cash, user_id))
+
+    def bank_leaderboard(self):
+        return self.db.execute("SELECT userID, cash FROM bank ORDER BY cash DESC").fetchall()
+
+    # ---- decks ----
+
+    def owned(self, owner_id, card_id, series):
+        row = self.db.execute(
+            "SELECT count FROM decks WHERE ownerID = ? AND season = ? AND userID = ?",
+            (owner_id, series, card_id),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _give(self, owner_id, card_id, series, count=1):
+        self.db.execute(
+            """INSERT INTO decks (ownerID, userID, season, count) VALUES (?, ?, ?, ?)
+               ON CONFLICT (ownerID, season, userID) DO UPDATE SET count = count + excluded.count""",
+            (owner_id, card_id, series, count),
+        )
+
+    def deck(self, owner_id):
+        """(userID, season, count, rarity, MV) for every card the owner holds."""
+        return self.db.execute(
+            f"""SELECT d.userID, d.season, d.count, c.rarity, c.MV
+                FROM decks d JOIN ({self._cards_sql()}) c
+                  ON c.season = d.season AND c.userID = d.userID
+                WHERE d.ownerID = ? AND d.count > 0
+                ORDER BY d.rowid""",
+            (owner_id,),
+        ).fetchall()
+
+    def deck_value(self, owner_id):
+        row = self.db.execute(
+            f"""SELECT COALESCE(SUM(d.count * c.MV), 0)
+                FROM decks d JOIN ({self._cards_sql()}) c
+                  ON c.season = d.season AND c.userID = d.userID
+                WHERE d.ownerID = ?""",
+            (owner_id,),
+        ).fetchone()
+        return round(row[0], 2)
+
+    def deck_leaderboard(self):
+        return self.db.execute(
+            f"""SELECT d.ownerID, ROUND(COALESCE(SUM(d.count * c.MV), 0), 2) AS dv
+                FROM decks d LEFT JOIN ({self._cards_sql()}) c
+                  ON c.season = d.season AND c.userID = d.userID
+                GROUP BY d.ownerID
+                ORDER BY dv DESC"""
+        ).fetchall()
+
+    def delete_deck(self, owner_id):
+        with self.db:
+            self.db.execute("DELETE FROM decks WHERE ownerID = ?", (owner_id,))
+            self.db.execute("DELETE FROM bank WHERE userID = ?", (owner_id,))
+
+    # ---- trades with Gob ----
+
+    def open_pack(self, owner_id, series):
+        """Draw a random card of the season into the owner's deck; returns (card, owned)."""
+        with self.db:
+            card = self.db.execute(
+                f"SELECT * FROM {self._table(series)} ORDER BY RANDOM() LIMIT 1"
+            ).fetchone()
+            if card is None:
+                return None, 0
+            self._give(owner_id, card[0], series)
+        return card, self.owned(owner_id, card[0], card[2])
+
+    def steal(self, owner_id):
+        """Gob takes a random stack from the owner's deck back into stock."""
+        with self.db:
+            row = self.db.execute(
+                "SELECT userID, season, count FROM decks WHERE ownerID = ? ORDER BY RANDOM() LIMIT 1",
+                (owner_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            card_id, series, count = row
+            self.db.execute(
+                "DELETE FROM decks WHERE ownerID = ? AND season = ? AND userID = ?",
+                (owner_id, series, card_id),
+            )
+            if series.isidentifier():
+                self._gob_pack(series)
+                self.db.execute(
+                    f"UPDATE {series} SET stock = stock + ? WHERE userID = ?", (count, card_id)
+                )
+        return row
+
+    def sell(self, owner_id, name, series, buy_mod):
+        """Returns (status, price); status is 'ok', 'no_card' or 'not_owned'."""
+        with self.db:
+            self._gob_pack(self._table(series))
+            row = self.db.execute(
+                f"SELECT userID, MV FROM {series} WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                return "no_card", 0
+            card_id, mv = row
+            if self.owned(owner_id, card_id, series) <= 0:
+                return "not_owned", 0
+            price = max(float(mv) * float(buy_mod), 0.01)
+            self.db.execute("INSERT OR IGNORE INTO bank (userID, cash) VALUES (?, 0)", (owner_id,))
+            self.db.execute("UPDATE bank SET cash = cash + ? WHERE userID = ?", (price, owner_id))
+            self._give(owner_id, card_id, series, -1)
+            self.db.execute(f"UPDATE {series} SET MV = ? WHERE userID = ?", (price, card_id))
+            self.db.execute(f"UPDATE {series} SET stock = stock + 1 WHERE name = ?", (name,))
+        return "ok", price
+
+    def buy(self, owner_id, name, series, sell_mod):
+        """Returns (status, price, stock_left); status is 'ok', 'no_card', 'no_stock' or 'no_funds'."""
+        with self.db:
+            self._gob_pack(self._table(series))
+            row = self.db.execute(
+                f"SELECT userID, MV, stock FROM {series} WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                return "no_card", 0, 0
+            card_id, mv, stock = row
+            if stock <= 0:
+                return "no_stock", 0, stock
+            price = round(float(mv) * float(sell_mod) + 0.01, 2)
+            self.db.execute("INSERT OR IGNORE INTO bank (userID, cash) VALUES (?, 0)", (owner_id,))
+            cash = self.db.execute("SELECT cash FROM bank WHERE userID = ?", (owner_id,)).fetchone()[0]
+            if cash < price:
+                return "no_funds", price, stock
+            self.db.execute("UPDATE bank SET cash = cash - ? WHERE userID = ?", (price, owner_id))
+            self._give(owner_id, card_id, series)
+            self.db.execute(f"UPDATE {series} SET MV = ? WHERE userID = ?", (price, card_id))
+            self.db.execute(f"UPDATE {series} SET stock = stock - 1 WHERE name = ?", (name,))
+        return "ok", price, stock - 1
+
+
 class cardMini(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -36,6 +370,12 @@ class cardMini(commands.Cog):
         self.steal_mod = 1
         self.cooldowns = {}  # Dictionary to store last execution time for each user
         self.payout_time=300
+        self._dbs = {}  # guild id -> GuildDB
+
+    async def cog_unload(self):
+        for db in self._dbs.values():
+            db.close()
+        self._dbs.clear()
 
     @commands.guild_only()
     @commands.admin_or_permissions(administrator=True)
@@ -166,38 +506,22 @@ class cardMini(commands.Cog):
     @commands.is_owner()
     async def list_tables(self, ctx):
         """List all tables in the database"""
-        # Get the server ID
-        server_id = str(ctx.guild.id)
-    
-        # Connect to the SQLite database for the server
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-    
-        conn = sqlite3.connect(db_path)
-    
-        # Retrieve table names from sqlite_master
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        table_names = cursor.fetchall()
-    
-        # Close the connection
-        conn.close()
-    
-        # Extract table names from the result
-        table_names = [table[0] for table in table_names]
-    
+        db = self._db(ctx.guild)
+        table_names = await db.run(db.tables)
+
         # Check if there are tables
         if not table_names:
             await ctx.send("No tables found in the database.")
             return
-    
+
         # Respond to the user with the list of table names
         table_list = "\n".join(table_names)
         await ctx.send(f"Tables in the database:\n```\n{table_list}\n```")
 
-    
+
 
     @commands.command(name='set_payout_time')
-    @commands.is_owner()    
+    @commands.is_owner()
     async def set_payout_time(self,ctx,time):
         """Sets the cooldown that gives money per message sent, starts at 300 ( 5 minutes)"""
         self.payout_time=time
@@ -208,27 +532,15 @@ class cardMini(commands.Cog):
     async def set_stock_command(self, ctx, series: str, count: int):
         try:
             series = f"Season_{series}"
-            server_id = str(ctx.guild.id)
-            db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
 
             # Validate and sanitize the table name before using it in the query
             if not series.isidentifier():
                 await ctx.send("Invalid table name")
                 return
 
-            # Connect to the SQLite database
-            db_path = os.path.join(data_manager.cog_data_path(self), f'{ctx.guild.id}.db')
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-
             # Update the stock for all rows in the specified table
-            cursor.execute(f'''
-                UPDATE "{series}"
-                SET Stock = ?
-            ''', (count,))
-
-            conn.commit()
-            conn.close()
+            db = self._db(ctx.guild)
+            await db.run(db.set_stock, series, count)
 
             await ctx.send(f"Stock set to {count} for all items in {series} table.")
         except Exception as e:
@@ -236,7 +548,7 @@ class cardMini(commands.Cog):
             await ctx.send("An error occurred while processing the command.")
 
 
-    
+
     @commands.command(name='updateNames')
     @commands.is_owner()
     async def updateNames(self,ctx):
@@ -248,39 +560,17 @@ class cardMini(commands.Cog):
             chunk = member_ids[i:i + chunk_size]
             formatted_ids = [f"<@{member_id}>" for member_id in chunk]
             await ctx.send(f"List of member IDs: {' '.join(formatted_ids)}")
-        
+
     @commands.command(name='DV_leaderboard', aliases=['DVL', 'leaderboard_DV','top'])
     async def DV_leaderboard(self, ctx, count: int = 10):
         """Displayes a leaderboard with whoever has the most Deck value {# per page} default 10"""
         if count > 20:
             count = 20
 
-        server_id = str(ctx.guild.id)
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-
         try:
-            # Connect to the SQLite database for the server
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-
-
-            # Get a list of all tables starting with 'deck_'
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'deck_%'")
-            deck_tables = cursor.fetchall()
-        
-            # Extract numbers from table names
-            deck_numbers = [int(re.search(r'\d+', table[0]).group()) for table in deck_tables]
-
-            DVs=[]
-            for each in deck_numbers:
-                DVs.append(self.getUserDV(server_id,each))
-
-            
-            # Fetch all rows from the bank table
-            dv_data = list(zip(deck_numbers, DVs))
-
-            # Sort users by DV in descending order
-            sorted_users = sorted(dv_data, key=lambda x: x[1], reverse=True)
+            # One aggregate over the decks table, already sorted by DV
+            db = self._db(ctx.guild)
+            sorted_users = await db.run(db.deck_leaderboard)
 
             # Slice the leaderboard based on the count
             paginated_leaderboard = [sorted_users[i:i + count] for i in range(0, len(sorted_users), count)]
@@ -291,11 +581,11 @@ class cardMini(commands.Cog):
             if total_pages == 0:
                 await ctx.send("No ones played! go open some cards!")
                 return
-            
+
             # Function to display the current page
             async def display_page():
                 embed = discord.Embed(title=f"DV Leaderboard - Page {current_page + 1}/{total_pages}",color=0xFFFFFF)
-                
+
                 for user_id, dv in paginated_leaderboard[current_page]:
                     user = self.bot.get_user(user_id)
                     if user:
@@ -339,39 +629,26 @@ class cardMini(commands.Cog):
 
         except sqlite3.OperationalError as e:
             await ctx.send(f"SQLite error: {e}")
-        finally:
-            # Close the connection
-            conn.close()
-        
-    
+
+
     @commands.command(name='bank_leaderboard',aliases=["BL","leaderboard_bank","bank_top","top_bank"])
     async def bank_leaderboard(self, ctx, count: int = 10):
         """Displayes a leaderboard with whoever has the most Deck value {# per page} default 10"""
 
         if count > 20:
             count = 20
-    
-        server_id = str(ctx.guild.id)
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-    
+
         try:
-            # Connect to the SQLite database for the server
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-    
-            # Fetch all rows from the bank table
-            cursor.execute(f"SELECT userID, cash FROM bank")
-            bank_data = cursor.fetchall()
-    
-            # Sort users by cash in descending order
-            sorted_users = sorted(bank_data, key=lambda x: x[1], reverse=True)
+            # Fetch all rows from the bank table, sorted by cash in descending order
+            db = self._db(ctx.guild)
+            sorted_users = await db.run(db.bank_leaderboard)
             if len(sorted_users) == 0:
                 await ctx.send("No users on the bank leaderboard")
                 return
-    
+
             # Slice the leaderboard based on the count
             leaderboard = sorted_users[:count]
-    
+
             # Display leaderboard
             embed = discord.Embed(title=f"Bank Leaderboard - Top {count}", color=0x00ff00)
             for user_id, cash in leaderboard:
@@ -382,35 +659,35 @@ class cardMini(commands.Cog):
                 else:
                     # If the user doesn't exist, display the user ID
                     embed.add_field(name=f"Unknown User ({user_id})", value=f"Bank Balance: {round(cash, 2)}", inline=False)
-    
+
             # Send the initial leaderboard
             message = await ctx.send(embed=embed)
-    
+
             # Add reactions for navigation
             await message.add_reaction('◀️')
             await message.add_reaction('▶️')
-    
+
             # Function to update the display based on reaction input
             def check(reaction, user):
                 return user == ctx.author and str(reaction.emoji) in ['◀️', '▶️']
-    
+
             current_page = 0
             total_pages = (len(sorted_users) + count - 1) // count  # Calculate total pages
-    
+
             while True:
                 try:
                     reaction, user = await self.bot.wait_for('reaction_add', timeout=30.0, check=check)
-    
+
                     if str(reaction.emoji) == '▶️' and current_page < total_pages - 1:
                         current_page += 1
                     elif str(reaction.emoji) == '◀️' and current_page > 0:
                         current_page -= 1
-    
+
                     # Update the message with the new page
                     start_idx = current_page * count
                     end_idx = (current_page + 1) * count
                     current_leaderboard = sorted_users[start_idx:end_idx]
-    
+
                     # Update the leaderboard
                     updated_embed = discord.Embed(title=f"Bank Leaderboard - Page {current_page + 1}/{total_pages}", color=0x00ff00)
                     for user_id, cash in current_leaderboard:
@@ -419,9 +696,9 @@ class cardMini(commands.Cog):
                             updated_embed.add_field(name=user.name, value=f"{user.mention} Bank Balance: {round(cash, 2)}", inline=False)
                         else:
                             updated_embed.add_field(name=f"Unknown User ({user_id})", value=f"Bank Balance: {round(cash, 2)}", inline=False)
-    
+
                     await message.edit(embed=updated_embed)
-    
+
                     # Remove the user's reaction
                     await message.remove_reaction(reaction, user)
                 except asyncio.TimeoutError:
@@ -432,12 +709,9 @@ class cardMini(commands.Cog):
                     break
         except sqlite3.OperationalError as e:
             await ctx.send(f"SQLite error: {e}")
-        finally:
-            # Close the connection
-            conn.close()
 
 
-        
+
     @commands.command(name='setOnSeason')
     @commands.is_owner()
     async def setOnSeason(self,ctx,series):
@@ -451,13 +725,13 @@ class cardMini(commands.Cog):
         file = os.path.join(data_manager.cog_data_path(self), 'on_season.txt')
         with open(file,"r+") as f:
             return f.read()
-            
+
     def get_off_season_chance(self):
         file = os.path.join(data_manager.cog_data_path(self), 'off_season_chance.txt')
         with open(file,"r+") as f:
             return f.read()
 
-    
+
     @commands.command(name='setOffSeasonChance')
     @commands.is_owner()
     async def setOffSeasonChance(self,ctx,percent):
@@ -470,65 +744,15 @@ class cardMini(commands.Cog):
         with open(file,"w") as f:
             f.write(str(percent))
         await ctx.send(f"Set off season chance to {percent}%")
-            
 
-    def getUserDV(self,server_id,userID):
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        
-        try:
-            # Connect to the SQLite database for the server
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-    
-            # Set the deck table
-            table_name = "deck_" + str(userID)
-            if not table_name.isidentifier():
-                return                                          
-            # Use a parameterized query to retrieve all elements from the table
-            query = f'SELECT * FROM {table_name}'
-            cursor.execute(query)
-            # Fetch all the rows from the result set
-            rows = cursor.fetchall()
-    
-            total_mv = 0  # Initialize total MV
-    
-            for row in rows:
-                # Use a parameterized query to retrieve MV directly
-                cursor.execute(f'SELECT MV FROM {row[1]} WHERE userID = ?', (row[0],))
-                row_mv = cursor.fetchone()
-    
-                if row_mv:
-                    total_mv += row_mv[0] * row[2]  # Accumulate total MV
-    
-            return round(total_mv, 2)
-    
-        except sqlite3.OperationalError as e:
-            if "no such table" in str(e):
-                return f"No cards in your deck, go open some!"
-            else:
-                return  f"SQLite error: {e}"
-        finally:
-            # Close the connection
-            conn.close()
-
-    def gob_pack(self,server_id,series):
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        if not series.isidentifier():
-            return
-        # Retrieve a random user from the specified series
-        # Update the Stock value of one random row
-        cursor.execute(f'''
-            UPDATE {series}
-            SET Stock = Stock + 1
-            ORDER BY RANDOM()
-            LIMIT 1
-        ''')
-        conn.commit()  # Commit the changes to the database
 
-        
+    def _db(self, guild) -> GuildDB:
+        """The guild's database, opened (and migrated) on first use."""
+        db = self._dbs.get(guild.id)
+        if db is None:
+            path = os.path.join(data_manager.cog_data_path(self), f'{guild.id}.db')
+            db = self._dbs[guild.id] = GuildDB(path)
+        return db
 
 
     def mentionToID(self,ctx,mention):
@@ -537,7 +761,7 @@ class cardMini(commands.Cog):
         if match:
             return int(match.group(1))
         # Check if it's a username
-        member = discord.utils.get(ctx.guild.members, name=mention) 
+        member = discord.utils.get(ctx.guild.members, name=mention)
         if member:
             return member.id
         return mention
@@ -550,8 +774,8 @@ class cardMini(commands.Cog):
             member = discord.utils.get(ctx.guild.members, id=user_id)
             if member:
                 return member.name
-        return mention        
-    
+        return mention
+
     @commands.command(name='set_rarities')
     @commands.is_owner()
     async def set_rarities(self, ctx, series, *mentions_and_rarities):
@@ -560,48 +784,41 @@ class cardMini(commands.Cog):
         if len(mentions_and_rarities) % 2 != 0:
             await ctx.send("Please provide a valid number of arguments (pairs of mention and rarity).")
             return
-    
-        server_id = str(ctx.guild.id)
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-    
-        try:
-            for i in range(0, len(mentions_and_rarities), 2):
-                mention = mentions_and_rarities[i]
-                rarity = mentions_and_rarities[i + 1]
-    
-                # Convert mention to user ID
-                try:
-                    user_id = int(mention.strip('<@!>'))
-                except ValueError:
-                    await ctx.send(f"Invalid mention: {mention}. Please use @mentions.")
-                    return
-    
-                # Validate rarity input
-                valid_rarities = ["mythic", "legendary", "epic", "ultra-rare", "rare", "uncommon", "common"]
-                if rarity.lower() not in valid_rarities:
-                    await ctx.send(f"Invalid rarity: {rarity}. Valid rarities are: {', '.join(valid_rarities)}")
-                    return
-    
-                # Update the MV in the series table
-                series_name = f"Season_{str(series)}"
 
-                if not series_name.isidentifier():
-                    return
-                
-                update_query = f"UPDATE {series_name} SET MV = ?, rarity = ? WHERE userID = ?"
-    
-                cursor.execute(update_query, (self.get_mv_from_rarity(rarity), rarity, user_id))
-                conn.commit()
-                await ctx.send(f"Updated rarity for user {user_id} to {rarity}.")
-    
+        # Update the MV in the series table
+        series_name = f"Season_{str(series)}"
+        if not series_name.isidentifier():
+            return
+
+        updates = []
+        for i in range(0, len(mentions_and_rarities), 2):
+            mention = mentions_and_rarities[i]
+            rarity = mentions_and_rarities[i + 1]
+
+            # Convert mention to user ID
+            try:
+                user_id = int(mention.strip('<@!>'))
+            except ValueError:
+                await ctx.send(f"Invalid mention: {mention}. Please use @mentions.")
+                return
+
+            # Validate rarity input
+            valid_rarities = ["mythic", "legendary", "epic", "ultra-rare", "rare", "uncommon", "common"]
+            if rarity.lower() not in valid_rarities:
+                await ctx.send(f"Invalid rarity: {rarity}. Valid rarities are: {', '.join(valid_rarities)}")
+                return
+
+            updates.append((self.get_mv_from_rarity(rarity), rarity, user_id))
+
+        try:
+            db = self._db(ctx.guild)
+            await db.run(db.set_rarities, series_name, updates)
         except sqlite3.Error as e:
             await ctx.send(f"SQLite error: {e}")
-    
-        finally:
-            # Close the connection
-            conn.close()
+            return
+
+        for _, rarity, user_id in updates:
+            await ctx.send(f"Updated rarity for user {user_id} to {rarity}.")
 
 
     def get_mv_from_rarity(self, rarity):
@@ -622,37 +839,27 @@ class cardMini(commands.Cog):
         else:
             return 0.01  # Default to Common if an invalid rarity is provided
 
-    
-   
+
+
     @commands.command(name='mine_salt',aliases=["mine","salt","work"])
     @commands.cooldown(1, 30, commands.BucketType.user)
     async def work(self,ctx):
         """Work and adds a small amount of bank to the user"""
-        server_id = str(ctx.guild.id)
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
         event_type = random.randint(1, 3)
-    
+
         if event_type == 1 or event_type == 2:
             # Give the user a random amount of money between 0.01 and 0.10
             amount = round(random.uniform(0.01, 0.10), 2)
-            # Get the user's current bank balance
-            user_bank = self.get_bank(server_id, str(ctx.author.id))
-    
-            # Update the bank balance with the reward
-            new_bank_total = user_bank + amount
-            cursor.execute('UPDATE bank SET cash = ? WHERE userID = ?', (new_bank_total, ctx.author.id))
-            conn.commit()           
-            await ctx.send(f"You received {amount} in your bank!")    
+            db = self._db(ctx.guild)
+            await db.run(db.add_cash, ctx.author.id, amount)
+            await ctx.send(f"You received {amount} in your bank!")
         elif event_type == 3:
             # Read a random line from the 'bad_stuff.txt' file
             current_directory = os.path.dirname(os.path.abspath(__file__))
 
             # Specify the file name
             file_name = 'bad_stuff.txt'
-            
+
             # Combine the directory and file name to get the full path
             file = os.path.join(current_directory, file_name)
             with open(file, 'r', encoding='utf-8') as file:
@@ -660,7 +867,7 @@ class cardMini(commands.Cog):
                 bad_stuff = random.choices(stuff)
             # Send the random line to the user
             await ctx.send(f"Uh oh! Instead of working... {bad_stuff[0]}")
-    
+
     @commands.command(name='set_sell_mod')
     @commands.is_owner()
     async def set_sell_mod(self,ctx,mod:float):
@@ -675,70 +882,17 @@ class cardMini(commands.Cog):
         self.buy_mod=mod
         await ctx.send(f"buy mod now set to {self.buy_mod}")
 
-        
-    def get_owned_count(self, id, season, server_id,user_id):
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        output=0
-        try:
-            table_name = "deck_"+str(user_id)
-            if not table_name.isidentifier():
-                # You should implement appropriate error handling here
-                return
-
-            query = f"SELECT count FROM {table_name} WHERE userID = ? AND season = ?"
-            cursor.execute(query, ( id, season))
-            
-            # Fetch the result of the query
-            result = cursor.fetchone()
-
-            return result
-        except sqlite3.OperationalError as e:
-            output=f"SQLite error: {e}"
-        finally:
-            # Close the cursor and connection
-            cursor.close()
-            conn.close()
-        return output
-        
-    @commands.command(name='view_card',aliases=["card_view"])
-    async def view_card(self,ctx,name,season):
-        """View's a given card {name} can be an username or mention {season} should just be the name after Season_"""
-        name = self.mentionToUser(ctx,name)
-        season = "Season_" + season
-        server_id = str(ctx.guild.id)
-
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        try:
-            if not season.isidentifier():
-                # You should implement appropriate error handling here
-                return
-            cursor.execute(f"SELECT userID FROM {season} WHERE name = ?", (name,))
-            userID = cursor.fetchone()
-        except sqlite3.OperationalError as e:
-            if "no such table" in str(e):
-                await ctx.send(f"No season found with name {season}")
-                return
-            else:
-                await ctx.send(f"SQLite error: {e}")
-                return
-
-        if not userID:
-            await ctx.send(f"No card found with the name '{name}' in season '{season}'")
-            return
-        
-
-        card = await self.display_card(userID[0],season,server_id)
-        owner_count = self.get_owned_count(userID[0],season,server_id,ctx.author.id)
 
-        #(ID, 'Season_1', 'Epic', 0.5, 10)
+    def card_embed(self, card, owned):
+        #(ID, name, 'Season_1', 'Epic', 0.5, 10)
         user = self.bot.get_user(card[0])
 
         card_rarity = card[3]
-        embed = discord.Embed(title=user.name)
+        try:
+            title_card = user.name
+        except AttributeError:
+            title_card = card[1]
+        embed = discord.Embed(title=title_card)
         if card_rarity == "Mythic":
             embed.color = 0xC30F0D
         elif card_rarity == "Legendary":
@@ -754,398 +908,170 @@ class cardMini(commands.Cog):
         elif card_rarity == "Common":
             embed.color = 0xABABAB
         else:
-                    # Handle the case when card_rarity is not one of the specified values
+            # Handle the case when card_rarity is not one of the specified values
             embed.color = 0xFFFFFF  # Set a default color or handle it accordingly
-                # Add fields to the embed
 
-        embed.add_field(name="Name", value=user.mention, inline=True)
+        # Add fields to the embed
+        embed.add_field(name="Name", value=user.mention if user else f"<@{card[0]}>", inline=True)
         embed.add_field(name="Season", value=card[2], inline=True)
         embed.add_field(name="Rarity", value=card[3], inline=True)
-        embed.add_field(name="MV", value=round(card[4],2), inline=True)
+        embed.add_field(name="MV", value=round(float(card[4]),2), inline=True)
         embed.add_field(name="Gob owns", value=card[5], inline=True)
-        if owner_count:
-            embed.add_field(name="You own", value=owner_count[0], inline=True)
-        else:
-            embed.add_field(name="You own", value=0, inline=True)
-
+        embed.add_field(name="You own", value=owned, inline=True)
         embed.add_field(name="Gob will buy for", value=round(float(card[4])*self.buy_mod,2), inline=True)
         embed.add_field(name="Gob will sell for", value=round(float(card[4])*self.sell_mod+.01,2), inline=True)
-            
+
         # Set the thumbnail to the user's avatar if available, otherwise use the default icon
-        avatar_url = user.avatar.url if user.avatar else user.default_avatar.url
-        embed.set_thumbnail(url=avatar_url)
+        if user:
+            avatar_url = user.avatar.url if user.avatar else user.default_avatar.url
+            embed.set_thumbnail(url=avatar_url)
+        return embed
 
-        await ctx.send(embed=embed)
-        
-    async def display_card(self,id,season,server_id):
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-                
-        result = ""
+    @commands.command(name='view_card',aliases=["card_view"])
+    async def view_card(self,ctx,name,season):
+        """View's a given card {name} can be an username or mention {season} should just be the name after Season_"""
+        name = self.mentionToUser(ctx,name)
+        season = "Season_" + season
+        if not season.isidentifier():
+            # You should implement appropriate error handling here
+            return
+
+        db = self._db(ctx.guild)
         try:
-            # Execute the query to retrieve table names
-            if not season.isidentifier():
-                # You should implement appropriate error handling here
-                return
-            cursor.execute(f'''SELECT * FROM {season} WHERE userID = ? AND season = ?''', ( id, season))
-                    
-            # Fetch all the table names from the result set
-            result = cursor.fetchone()
+            userID = await db.run(db.card_id, season, name)
         except sqlite3.OperationalError as e:
-            result= f"SQLite error: in display card {e}"
-        finally:
-            # Close the cursor and connection
-            cursor.close()
-            conn.close()
-                    
-            # Print the list of table names
-        return result
-
-
-    def get_bank(self,serverID,id):
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{serverID}.db')
-        try: 
-            # Connect to the SQLite database for the server
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(f'''
-                CREATE TABLE IF NOT EXISTS bank (
-                    userID INTEGER,
-                    cash REAL DEFAULT 0
-                )
-                        ''')
-            cursor.execute('SELECT cash FROM bank WHERE userID = ?', (id,))
-            result = cursor.fetchone()
-
-
-            if result is None:
-            # If ctx.author.id is not in the 'bank' table, insert with default cash value
-                cursor.execute('INSERT INTO bank (userID, cash) VALUES (?, 0)', (id,))
-                conn.commit()
-                return 0
+            if "no such table" in str(e):
+                await ctx.send(f"No season found with name {season}")
+                return
             else:
-                # If ctx.author.id is in the 'bank' table, return the cash value
-                return result[0]
+                await ctx.send(f"SQLite error: {e}")
+                return
 
+        if userID is None:
+            await ctx.send(f"No card found with the name '{name}' in season '{season}'")
+            return
 
-            #cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='bank_{id}'")
-            #rows = cursor.fetchone()
-                
-            return rows
+        card = await db.run(db.card, season, userID)
+        owner_count = await db.run(db.owned, ctx.author.id, userID, season)
+        await ctx.send(embed=self.card_embed(card, owner_count))
 
-        
-        except sqlite3.OperationalError as e:
-            if "no such table" in str(e):
-                return "No table found"
-            else:
-                return f"SQLite error: {e}"
-        finally:
-            # Close the connection
-            conn.close()
 
     @commands.command(name='sell_card')
     async def sell_card(self, ctx, name, series):
         """Sell's a card to Gob, {name} can be a username or mention {series} should be the words/numbers after Season_"""
-        server_id = str(ctx.guild.id)
         series = "Season_" + series
-        self.gob_pack(server_id,series)
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-    
-        try:
-            # Execute a SELECT query to find the row with the specified name in the given series
-            if not series.isidentifier():
-                # You should implement appropriate error handling here
-                return
-            cursor.execute(f'''
-                SELECT MV,stock FROM {series} WHERE name = ?
-            ''', (name,))
-    
-            # Fetch the result
-            MV = cursor.fetchone()
-    
-            cursor.execute(f"SELECT userID FROM {series} WHERE name = ?", (name,))
-            userID = cursor.fetchone()
-    
-            if MV:
-                # Check if the user has the card in their deck
-                table_name = "deck_" + str(ctx.author.id)
-                query = f"SELECT * FROM {table_name} WHERE userID = ? AND season = ?"
-                cursor.execute(query, (userID[0], series))
-                result = cursor.fetchone()
-    
-                if result and result[2] > 0:
-                    # Add the card's MV to the user's bank with the buy_mod multiplier
-                    sell_price = max(float(MV[0]) * float(self.buy_mod), 0.01)
-                    new_bank_total = self.get_bank(server_id, str(ctx.author.id)) + sell_price
-                    cursor.execute('UPDATE bank SET cash = ? WHERE userID = ?', (new_bank_total, ctx.author.id))
-                    conn.commit()
-    
-                    # Update the deck by decreasing the count
-                    new_count = result[2] - 1
-                    update_query = f"UPDATE {table_name} SET count = ? WHERE userID = ? AND season = ?"
-                    cursor.execute(update_query, (new_count, userID[0], series))
-                    conn.commit()
-
+        if not series.isidentifier():
+            # You should implement appropriate error handling here
+            return
 
-                    # Update the MV in the database
-                    # Use a try-except block for error handling
-                    try:
-                        if not series.isidentifier():
-                            return
-                        update_query = f"UPDATE {series} SET MV = ? WHERE userID = ?"
-                        
-                        cursor.execute(update_query, (max(float(MV[0]) * float(self.buy_mod), 0.01), userID[0]))
-                        conn.commit()
-
-                        # Update the stock count in the database
-                        update_stock_query = f"UPDATE {series} SET stock = ? WHERE name = ?"
-                        cursor.execute(update_stock_query, (MV[1] + 1, name))
-                        conn.commit()
-                    except sqlite3.Error as e:
-                        await ctx.send(f"SQLite error: {e}")
-    
-                    await ctx.send(f"You have successfully sold the card '{name}' from '{series}' for {sell_price:.2f}.")
-                else:
-                    await ctx.send(f"You don't have the card '{name}' in your deck.")
-            else:
-                await ctx.send(f"No data found for the card '{name}' in the series '{series}'.")
+        try:
+            db = self._db(ctx.guild)
+            status, sell_price = await db.run(db.sell, ctx.author.id, name, series, self.buy_mod)
         except sqlite3.OperationalError as e:
             await ctx.send(f"SQLite error: {e}")
-        finally:
-            # Close the connection
-            conn.close()
+            return
+
+        if status == "ok":
+            await ctx.send(f"You have successfully sold the card '{name}' from '{series}' for {sell_price:.2f}.")
+        elif status == "not_owned":
+            await ctx.send(f"You don't have the card '{name}' in your deck.")
+        else:
+            await ctx.send(f"No data found for the card '{name}' in the series '{series}'.")
 
 
 
     @commands.command(name='buy_card')
     async def buy_card(self, ctx, name, series):
         """Buy's a card to Gob, {name} can be a username or mention {series} should be the words/numbers after Season_"""
-
-        server_id = str(ctx.guild.id)
         series = "Season_" + series
-        self.gob_pack(server_id,series)
-
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
         if not series.isidentifier():
                 # You should implement appropriate error handling here
             return
-    
-        try:            
-            # Execute a SELECT query to find the row with the specified name in the given series
-            cursor.execute(f'''
-                SELECT MV,stock FROM {series} WHERE name = ?
-            ''', (name,))
-             
-            # Fetch the result
-            MV = cursor.fetchone()
 
-
-            
-            cursor.execute(f"SELECT userID FROM {series} WHERE name = ?", (name,))
-            userID = cursor.fetchone()
-
-            if not MV:
-                await ctx.send(f"No card found with name '{name}' in season '{series}'")
-                return
-                
-            if MV[1] <= 0:
-                await ctx.send("I don't have a copy of that card but sometimes when you try and open a pack I get a card!")
-                return
-               
-    
-            if MV:
-                # Check if the user has enough money in the bank to buy the card
-                user_bank = self.get_bank(server_id, str(ctx.author.id))
-                price = round(float(MV[0])*self.sell_mod+0.01,2)
-
-                if user_bank >= price:
-                    # Subtract the card's MV from the user's bank
-                    new_bank_total = user_bank - price
-                    cursor.execute('UPDATE bank SET cash = ? WHERE userID = ?', (new_bank_total, ctx.author.id))
-                    conn.commit()
-    
-                    # Add the purchased card to the user's deck
-                    table_name = "deck_" + str(ctx.author.id)
-                    
-                    if not table_name.isidentifier():
-                        return
-                    cursor.execute(f'''
-                        CREATE TABLE IF NOT EXISTS {table_name} (
-                            userID INTEGER ,
-                            season TEXT,
-                            count INTEGER
-                        )
-                    ''')
-                    # Execute the SQL query to check if the user and season combination already exists
-                    query = f"SELECT * FROM {table_name} WHERE userID = ? AND season = ?"
-                    cursor.execute(query, (userID[0], series))
-                    result2 = cursor.fetchone()
-
-                    if result2:
-                        # If the user and season combination exists, update the count
-                        new_count = result2[2] + 1
-                        if not table_name.isidentifier():
-                            return
-                        update_query = f"UPDATE {table_name} SET count = ? WHERE userID = ? AND season = ?"
-                        cursor.execute(update_query, (new_count, userID[0], series))
-                    else:
-                        # If the user and season combination doesn't exist, insert a new record
-                        if not table_name.isidentifier():
-                            return
-                        insert_query = f"INSERT INTO {table_name} (userID, season, count) VALUES (?, ?, ?)"
-                        cursor.execute(insert_query, (userID[0], series, 1))   
-                    # Commit the changes
-                    conn.commit()
-
-                    
-
-                    # Update the MV in the database
-                    if not series.isidentifier():
-                            return
-                    update_query = f"UPDATE {series} SET MV = ? WHERE userID = ?"
-                    
-                    # Use a try-except block for error handling
-                    try:
-                        cursor.execute(update_query, (price, userID[0]))
-                        conn.commit()
-
-
-                        # Update the stock count in the database
-                        update_stock_query = f"UPDATE {series} SET stock = ? WHERE name = ?"
-                        cursor.execute(update_stock_query, (MV[1] - 1, name))
-                        conn.commit()
-                    except sqlite3.Error as e:
-                        await ctx.send(f"SQLite error: {e}")
-
-                    finally:
-                        conn.close()
-
-
-
-
-    
-                    await ctx.send(f"You have successfully bought the card '{name}' from '{series}' for '{price}'. I have {MV[1]-1} copies left!")
-                else:
-                    await ctx.send(f"You don't have enough money in your bank to buy the card '{name}'.")
-            else:
-                await ctx.send(f"No data found for the card '{name}' in the series '{series}'.")
+        try:
+            db = self._db(ctx.guild)
+            status, price, stock = await db.run(db.buy, ctx.author.id, name, series, self.sell_mod)
         except sqlite3.OperationalError as e:
             await ctx.send(f"SQLite error: {e}")
-        finally:
-            # Close the connection
-            conn.close()
-            
+            return
+
+        if status == "no_card":
+            await ctx.send(f"No card found with name '{name}' in season '{series}'")
+        elif status == "no_stock":
+            await ctx.send("I don't have a copy of that card but sometimes when you try and open a pack I get a card!")
+        elif status == "no_funds":
+            await ctx.send(f"You don't have enough money in your bank to buy the card '{name}'.")
+        else:
+            await ctx.send(f"You have successfully bought the card '{name}' from '{series}' for '{price}'. I have {stock} copies left!")
+
 
     @commands.command(name='chk_bank',aliases=["view_bank"])
     async def chk_bank(self,ctx):
         """Checks your current bank total"""
-        server_id = str(ctx.guild.id)
-        await ctx.send(f"You have: {round(self.get_bank(server_id,ctx.author.id),2)} bank.")
+        db = self._db(ctx.guild)
+        await ctx.send(f"You have: {round(await db.run(db.bank, ctx.author.id),2)} bank.")
+
 
-        
     @commands.command(name='set_bank')
     @commands.is_owner()
-    async def set_bank(self,ctx,bank, acct: commands.MemberConverter):
+    async def set_bank(self,ctx,bank: float, acct: commands.MemberConverter):
         """Sets a user's bank total"""
-        server_id = str(ctx.guild.id)
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-
-        try: 
-            # Connect to the SQLite database for the server
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-           
+        try:
             # Update the bank value for the given user
-            cursor.execute('UPDATE bank SET cash = ? WHERE userID = ?', (bank, acct.id))
+            db = self._db(ctx.guild)
+            await db.run(db.set_cash, acct.id, bank)
             await ctx.send(f"new bank total is {bank}")
-            conn.commit()
         except sqlite3.OperationalError as e:
             await ctx.send(f"SQLite error: {e}")
-        finally:
-        # Close the connection
-            conn.close()
-        
+
     @commands.command(name='view_deck',aliases=["all_deck","deck"])
     async def view_deck(self,ctx, name: commands.MemberConverter="",count=10):
         """View your deck (or someone elses with {mention})"""
         if not name:
-            #set the deck table 
-            table_name = "deck_"+str(ctx.author.id)
-            Mname = ctx.author.mention
+            owner = ctx.author
         else:
-            table_name = "deck_"+str(name.id)
-            Mname = name.mention
-           
-        
+            owner = name
+        Mname = owner.mention
+
         if count > 20:
             count = 20
-        server_id = str(ctx.guild.id)
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        try: 
-            # Connect to the SQLite database for the server
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-
-
-
-            # Connect to the database
-            connection = sqlite3.connect(db_path)
-            cursor = connection.cursor()
-            if not table_name.isidentifier():
-                        return
-            # Use a parameterized query to retrieve all elements from the table
-            query = f'SELECT * FROM {table_name}'
-            cursor.execute(query)
-            # Fetch all the rows from the result set
-            rows = cursor.fetchall()
+        try:
+            # Every card in the deck with its current rarity and MV, in one query
+            db = self._db(ctx.guild)
+            rows = await db.run(db.deck, owner.id)
+            deck_value = await db.run(db.deck_value, owner.id)
 
             chunk_size = count
-            
+
             paginated_rows = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+            if not paginated_rows:
+                await ctx.send(f"No cards in your deck go open some!")
+                return
 
             # Initialize page counter and embed
             current_page = 0
-            total_pages = len(paginated_rows)            
+            total_pages = len(paginated_rows)
 
 
                         # Function to display the current page
             async def display_page():
-                embed = discord.Embed(title=f"Deck Information - Page {current_page + 1}/{total_pages}",description=f"{Mname}'s total DV: {self.getUserDV(server_id,ctx.author.id)}")
+                embed = discord.Embed(title=f"Deck Information - Page {current_page + 1}/{total_pages}",description=f"{Mname}'s total DV: {deck_value}")
 
                 total_mv = 0  # Initialize total MV
 
-                for row in paginated_rows[current_page]:
+                for card_id, season, owned, rarity, mv in paginated_rows[current_page]:
                     # Customize how you want to display each row in the embed
-                    user = self.bot.get_user(row[0])
+                    user = self.bot.get_user(card_id)
                     try:
                         name = user.name
                     except AttributeError:
                         name = user
 
-                    # Use a parameterized query to retrieve all elements from the table
-                    cursor.execute(f'SELECT * FROM {row[1]} WHERE userID = ?',(row[0],))                    
-                    # Fetch all the rows from the result set
-                    rowz = cursor.fetchall()
-
-                    # Update the parameterized query to retrieve MV directly
-                    cursor.execute(f'SELECT MV FROM {row[1]} WHERE userID = ?', (row[0],))
-                    row_mv = cursor.fetchone()
-        
-                    if row_mv:
-                        total_mv += row_mv[0] * row[2]  # Accumulate total MV
-
+                    total_mv += mv * owned  # Accumulate total MV
 
-                    sell_price = round(float(rowz[0][4])*self.sell_mod+0.01,2)
-                    buy_price = round(float(rowz[0][4])*self.buy_mod,2)
-                    if row[2] > 0:
-                        embed.add_field(name=f"Card name: {name} {row[1]}", value=f"You own: {row[2]} ID: <@{row[0]}> Rarity: {rowz[0][3]}\nMV: {round(rowz[0][4],2)} Buy price: {buy_price} Sell price: {sell_price}", inline=False)
+                    sell_price = round(float(mv)*self.sell_mod+0.01,2)
+                    buy_price = round(float(mv)*self.buy_mod,2)
+                    embed.add_field(name=f"Card name: {name} {season}", value=f"You own: {owned} ID: <@{card_id}> Rarity: {rarity}\nMV: {round(mv,2)} Buy price: {buy_price} Sell price: {sell_price}", inline=False)
                 embed.set_footer(text=f"Total MV of this page: {round(total_mv, 2)}")  # Display total MV in the footer
                 return embed
 
@@ -1181,13 +1107,7 @@ class cardMini(commands.Cog):
                     # Handle cancellation (optional)
                     break
         except sqlite3.OperationalError as e:
-            if "no such table" in str(e):
-                await ctx.send(f"No cards in your deck go open some!")
-            else:
-                await ctx.send(f"SQLite error: {e}")
-        finally:
-            # Close the connection
-            conn.close()    
+            await ctx.send(f"SQLite error: {e}")
 
 
     @commands.command(name='set_steal_chance')
@@ -1198,7 +1118,7 @@ class cardMini(commands.Cog):
             percent = 50
         self.steal_mod=percent
         await ctx.send(f"set_steal_chance set to {percent}")
-    
+
     @commands.command(name='open_pack',aliases=["open","random_user"])
     @commands.cooldown(1, 5, commands.BucketType.user)
     async def random_user(self, ctx):
@@ -1206,73 +1126,25 @@ class cardMini(commands.Cog):
 
         event_type = random.randint(1, 3)
         steal_chance = float(self.steal_mod)/100
+        db = self._db(ctx.guild)
 
         evil_num = random.random()
         if evil_num < steal_chance:
-            # Connect to the SQLite database for the server
-            # Get the server ID
-            server_id = str(ctx.guild.id)
-            # Connect to the SQLite database for the server
-            db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-    
-            # Retrieve a random user from the specified series
+            # Gob takes a random stack from the deck back into his stock
             try:
-                
-                cursor.execute(f'''
-                SELECT userID,season,count FROM deck_{ctx.author.id}
-                ORDER BY RANDOM()
-                LIMIT 1
-            ''')
-            # Fetch the result
-                result = cursor.fetchone()
-            except sqlite3.OperationalError:
-                result=""
+                result = await db.run(db.steal, ctx.author.id)
+            except sqlite3.Error as e:
+                await ctx.send(f"SQLite error: {e}")
+                return
 
             if result:
-
-                # Delete the random row
-                userID = result[0]
-                season = result[1]
-                cursor.execute(f'DELETE FROM deck_{ctx.author.id} WHERE userID = ? AND season = ?', (userID,season))
-            
-                # Commit the changes (optional, depends on your use case)
-                conn.commit()
-
-                server_id = str(ctx.guild.id)
-                series = season
-                self.gob_pack(server_id,series)
-        
-                db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-                conn = sqlite3.connect(db_path)
-                cursor = conn.cursor()
-
-                try:
-
-                    
-                    
-                    # Update the stock count in the database
-                    if not season.isidentifier():
-                            return
-                    update_stock_query = f"UPDATE {season} SET stock = stock + ? WHERE userID = ?"
-                    cursor.execute(update_stock_query, (result[2],userID,))
-                    conn.commit()
-                except sqlite3.Error as e:
-                    await ctx.send(f"SQLite error: {e}")
-
-                finally:
-                    conn.close()
-                uname = self.bot.get_user(result[0])
-
-                if result[2] == 0:
+                userID, season, stolen = result
+                if stolen == 0:
                     return
-                    
-                if result[2] == 1:
-                    await ctx.send(f"You know what, it's mine that's right I'm taking your {result[2]} copy of {uname.name} {season}.  If you want them back you have to buy them.")
-                else:
-                    await ctx.send(f"You know what, it's mine that's right I'm taking your {result[2]} copy of {uname.name} {season}.  If you want them back you have to buy them.")
 
+                uname = self.bot.get_user(userID)
+                uname = uname.name if uname else userID
+                await ctx.send(f"You know what, it's mine that's right I'm taking your {stolen} copy of {uname} {season}.  If you want them back you have to buy them.")
                 return
 
         if event_type == 2:
@@ -1288,191 +1160,55 @@ class cardMini(commands.Cog):
             # Send the random line to the user
             await ctx.send(f"{bad_stuff[0].strip()}")
             return
-            
-        
+
+
         random_number = random.random()
         if random_number < float(self.get_off_season_chance())/100:
-            season_tables=""
-            # Get the server ID
-            server_id = str(ctx.guild.id)
-            # Connect to the SQLite database for the server
-            db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-            conn = sqlite3.connect(db_path)
-            # Get a list of tables starting with "Season_"
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'Season_%'")
-            season_tables = cursor.fetchall()
-            # Close the connection
-            conn.close()
+            season_tables = await db.run(db.seasons)
             if not season_tables:
                 await ctx.send("No tables starting with 'Season_' found.")
                 return
             # Choose a random table from the list
-            series = random.choice(season_tables)[0]
+            series = random.choice(season_tables)
         else:
             series = "Season_"+self.get_on_season()
-        server_id = str(ctx.guild.id)
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        user_id = ctx.author.id
-         # Check if the deck table exists, and create it if not
-        deck_table_name = f'deck_{user_id}'
-    
-        try:
-            # Connect to the SQLite database for the server
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            if not series.isidentifier():
-                # You should implement appropriate error handling here
-                return 
-            # Retrieve a random user from the specified series
-            cursor.execute(f'''
-                SELECT * FROM {series}
-                ORDER BY RANDOM()
-                LIMIT 1
-            ''')
-            # Fetch the result
-            result = cursor.fetchone()
-    
-            if result:
-                cursor.execute(f'''
-                CREATE TABLE IF NOT EXISTS {deck_table_name} (
-                    userID INTEGER,
-                    season TEXT,
-                    count INTEGER
-                )
-                        ''')
-
-                # Execute the SQL query to check if the user and season combination already exists
-                query = f"SELECT * FROM {deck_table_name} WHERE userID = ? AND season = ?"
-                cursor.execute(query, (result[0], series))
-                result2 = cursor.fetchone()
-
-                if result2:
-                    # If the user and season combination exists, update the count
-                    new_count = result2[2] + 1
-                    update_query = f"UPDATE {deck_table_name} SET count = ? WHERE userID = ? AND season = ?"
-                    cursor.execute(update_query, (new_count, result[0], series))
-                else:
-                    # If the user and season combination doesn't exist, insert a new record
-                    insert_query = f"INSERT INTO {deck_table_name} (userID, season, count) VALUES (?, ?, ?)"
-                    cursor.execute(insert_query, (result[0], series, 1))   
-                # Commit the changes
-                conn.commit()
-                
-                card = await self.display_card(result[0],result[2],server_id)
-                owner_count = self.get_owned_count(result[0],result[2],server_id,ctx.author.id)
-
-                #(ID, 'Season_1', 'Epic', 0.5, 10)
-                user = self.bot.get_user(card[0])
-
-                card_rarity = card[3]
-                try:
-                    title_card = user.name
-                except AttributeError as e:
-                    title_card = user
-                embed = discord.Embed(title=title_card)
-                if card_rarity == "Mythic":
-                    embed.color = 0xC30F0D
-                elif card_rarity == "Legendary":
-                    embed.color = 0xFFEA7A
-                elif card_rarity == "Epic":
-                    embed.color = 0xE3B54F
-                elif card_rarity == "Ultra-Rare":
-                    embed.color = 0xCA5BEF
-                elif card_rarity == "Rare":
-                    embed.color = 0x008EC1
-                elif card_rarity == "Uncommon":
-                    embed.color = 0x00AA4C
-                elif card_rarity == "Common":
-                    embed.color = 0xABABAB
-                else:
-                    # Handle the case when card_rarity is not one of the specified values
-                    embed.color = 0xFFFFFF  # Set a default color or handle it accordingly
-                
-                # Rest of your code using the 'embed' variable...
-
-                # Add fields to the embed
+        if not series.isidentifier():
+            # You should implement appropriate error handling here
+            return
 
-                try:
-                    embed.add_field(name="Name", value=user.mention, inline=True)
-                except AttributeError:
-                    await ctx.send(user)
-                embed.add_field(name="Season", value=card[2], inline=True)
-                embed.add_field(name="Rarity", value=card[3], inline=True)
-                embed.add_field(name="MV", value=round(float(card[4]),2), inline=True)
-                embed.add_field(name="Gob owns", value=card[5], inline=True)
-                embed.add_field(name="You own", value=owner_count[0], inline=True)
-                embed.add_field(name="Gob will buy for", value=round(float(card[4])*self.buy_mod,2), inline=True)
-                embed.add_field(name="Gob will sell for", value=round(float(card[4])*self.sell_mod+.01,2), inline=True)
-            
-                # Set the thumbnail to the user's avatar if available, otherwise use the default icon
-                avatar_url = user.avatar.url if user.avatar else user.default_avatar.url
-                embed.set_thumbnail(url=avatar_url)
+        try:
+            # Draw a random card from the series into the user's deck
+            card, owner_count = await db.run(db.open_pack, ctx.author.id, series)
 
-                await ctx.send(embed=embed)
-            
-                
+            if card:
+                await ctx.send(embed=self.card_embed(card, owner_count))
             else:
                 await ctx.send(f"No data found for '{series}'")
-    
+
         except sqlite3.OperationalError as e:
             await ctx.send(f"Error: {e}. The specified series table '{series}' does not exist.")
 
-    
-        finally:
-            # Close the connection
-            conn.close()        
 
-    
     @commands.command(name='delete_deck')
     @commands.is_owner()
     async def delete_deck(self, ctx, deck: commands.MemberConverter):
         """Deletes a {mention} deck"""
-        server_id = str(ctx.guild.id)
+        db = self._db(ctx.guild)
+        await db.run(db.delete_deck, deck.id)
 
-        # Connect to the SQLite database for the server
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-
-        conn = sqlite3.connect(db_path)
-    
-        # Delete the table for the specified series
-        cursor = conn.cursor()
-        deck_name_id = f"deck_{deck.id}"
-        if not deck_name_id.isidentifier():
-            return
-        cursor.execute(f'''
-                DROP TABLE IF EXISTS {deck_name_id}
-            ''')
-        cursor.execute('DELETE FROM bank WHERE userID = ?', (deck.id,))
-        conn.commit()    
-        # Close the connection
-        conn.close()
-    
         # Respond to the user
         await ctx.send(f"{deck.mention}'s deck deleted! {deck.id}")
 
     @commands.command(name='list_season', aliases=["list_seasons"])
     async def list_series(self, ctx):
         """Lists all seasons"""
-        server_id = str(ctx.guild.id)
-
-        # Connect to the SQLite database for the server
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
+        db = self._db(ctx.guild)
 
         try:
-            # Connect to the database
-            connection = sqlite3.connect(db_path)
-            cursor = connection.cursor()
-
-            # Execute the query to retrieve table names
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'Season_%'")
-
-            # Fetch all the table names from the result set
-            table_names = cursor.fetchall()
-
-            # Close the cursor and connection
-            cursor.close()
-            connection.close()
+            table_names = await db.run(db.seasons)
+            if not table_names:
+                await ctx.send("No seasons found.")
+                return
 
             chunk_size = 10  # Set your desired chunk size for pagination
             paginated_tables = [table_names[i:i + chunk_size] for i in range(0, len(table_names), chunk_size)]
@@ -1486,9 +1222,9 @@ class cardMini(commands.Cog):
                 embed = discord.Embed(title=f"Seasons - Page {current_page + 1}/{total_pages}")
 
                 for table_name in paginated_tables[current_page]:
-                    stats = self.get_table_stats(table_name[0],server_id)
+                    stats = await db.run(db.season_stats, table_name)
                     # Customize how you want to display each table name in the embed
-                    embed.add_field(name=table_name[0], value=f"Total Cards: {stats[0]}, Total MV: {round(stats[1], 2)}, Total Cards Gob Owns: {stats[2]}")
+                    embed.add_field(name=table_name, value=f"Total Cards: {stats[0]}, Total MV: {round(stats[1], 2)}, Total Cards Gob Owns: {stats[2]}")
 
                 return embed
 
@@ -1526,75 +1262,33 @@ class cardMini(commands.Cog):
 
         except sqlite3.OperationalError as e:
             await ctx.send(f"SQLite error: {e}")
-        finally:
-            # Close the connection
-            connection.close()
 
     @commands.command(name='delete_card')
     @commands.is_owner()
     async def delete_card(self, ctx, user_id: int, series: str):
         """Delete a card from everyones deck and the game"""
-        # Get the server ID
         series = "Season_" + series
-        server_id = str(ctx.guild.id)
-    
-        # Connect to the SQLite database for the server
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-    
-        conn = sqlite3.connect(db_path)
-    
-        # Delete rows from tables starting with "deck_" where season matches the specified series and userID matches
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'deck_%'")
-        deck_tables = cursor.fetchall()
-
         if not series.isidentifier():
             return
-            
-        cursor.execute(f"DELETE FROM {series} WHERE season = ? AND userID = ?", (series, user_id))
-        for table in deck_tables:
-            deck_table_name = table[0]
-            cursor.execute(f"DELETE FROM {deck_table_name} WHERE season = ? AND userID = ?", (series, user_id))
-    
-        conn.commit()
-    
-        # Close the connection
-        conn.close()
-    
+
+        db = self._db(ctx.guild)
+        await db.run(db.delete_card, series, user_id)
+
         # Respond to the user
-        await ctx.send(f"Rows with userID {user_id} and season '{series}' deleted from 'deck_' tables!")
+        await ctx.send(f"Rows with userID {user_id} and season '{series}' deleted from decks!")
+
 
-    
     @commands.command(name='delete_series')
     @commands.is_owner()
     async def delete_series(self, ctx, series: str):
         """Delete a season so it no longer is in the game"""
-        # Get the server ID
         series = "Season_" + series
-        server_id = str(ctx.guild.id)
-
-        # Connect to the SQLite database for the server
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-
-        conn = sqlite3.connect(db_path)
-
-        # Delete the table for the specified series
-        cursor = conn.cursor()
-        cursor.execute(f'DROP TABLE IF EXISTS {series}')
-        conn.commit()
-
-        # Delete rows from tables starting with "deck_" where season matches the specified series
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'deck_%'")
-        deck_tables = cursor.fetchall()
-        
-        for table in deck_tables:
-            deck_table_name = table[0]
-            cursor.execute(f"DELETE FROM {deck_table_name} WHERE season = ?", (series,))
-        
-        conn.commit()
+        if not series.isidentifier():
+            return
 
-        # Close the connection
-        conn.close()
+        # Drop the season table and every deck entry for it
+        db = self._db(ctx.guild)
+        await db.run(db.delete_season, series)
 
         # Respond to the user
         await ctx.send(f"Series '{series}' deleted, and corresponding rows in deck tables!")
@@ -1710,29 +1404,11 @@ class cardMini(commands.Cog):
         rare_cutoff = max(rare_cutoff, ultra_rare_cutoff)
         uncommon_cutoff = max(uncommon_cutoff, rare_cutoff)
     
-        # --- DB setup ---
-        server_id = str(ctx.guild.id)
-        db_path = os.path.join(data_manager.cog_data_path(self), f"{server_id}.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-    
-        cursor.execute(f"""
-            CREATE TABLE IF NOT EXISTS {series_table} (
-                userID INTEGER,
-                name TEXT,
-                season TEXT,
-                rarity TEXT,
-                MV REAL,
-                Stock INTEGER
-            )
-        """)
-        conn.commit()
-    
-        # ---- Insert rows ----
+        # ---- Build rows ----
         user_data = {}
         season_value = series_table
-    
-        cursor.execute("BEGIN")
+        season_rows = []
+
         for i, r in enumerate(sorted_rows):
             if i < mythic_limit:
                 rarity, MV = "Mythic", 10
@@ -1760,59 +1436,29 @@ class cardMini(commands.Cog):
                 "message_count": r["message_count"],
             }
     
-            cursor.execute(
-                f"INSERT INTO {series_table} (userID, name, season, rarity, MV, Stock) VALUES (?, ?, ?, ?, ?, ?)",
-                (r["user_id"], name, season_value, rarity, MV, 10),
-            )
-    
-        conn.commit()
-        conn.close()
+            season_rows.append((r["user_id"], name, season_value, rarity, MV, 10))
+
+        # --- Insert in one transaction ---
+        db = self._db(ctx.guild)
+        await db.run(db.create_season, series_table, season_rows)
     
         await ctx.send(f"New season '{series_table}' started! User information stored from attached CSV post counts.")
         if ctx.author.id in user_data:
             await ctx.send(user_data[ctx.author.id])
         else:
             await ctx.send("Note: you weren't found in the CSV for this guild, so no entry was created for you.")
-
-    def get_table_stats(self, table_name,server_id):
-        try:
-            db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-
-            # Connect to the database
-            connection = sqlite3.connect(db_path)
-            cursor = connection.cursor()
     
-            # Count the number of rows in the table
-            if not table_name.isidentifier():
-                return
-            
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-            row_count = cursor.fetchone()[0]
-    
-            # Sum the 'MV' column
-            cursor.execute(f"SELECT SUM(MV) FROM {table_name}")
-            mv_sum = cursor.fetchone()[0] or 0  # If the result is None, default to 0
-    
-            # Sum the 'stock' column
-            cursor.execute(f"SELECT SUM(stock) FROM {table_name}")
-            stock_sum = cursor.fetchone()[0] or 0  # If the result is None, default to 0
-    
-            return row_count, mv_sum, stock_sum
-
-        except sqlite3.Error as e:
-            return ctx.send(f"SQLite error: {e}")
+    def message_routes(self):
+        """Filters for MessageRouter: only guild messages that start with a letter."""
+        return [{"handler": self.on_message, "check": lambda m: m.content[:1].isalpha()}]
 
-        finally:
-            # Close the connection
-            connection.close()
-    
     @commands.Cog.listener()
     async def on_message(self, message):
         # Check if the message is from a bot or in a DM (optional)
         if message.author.bot or not message.guild:
             return
             
-        first_char = message.content[0]
+        first_char = message.content[:1]
         if not first_char.isalpha():
             return
 
@@ -1839,17 +1485,5 @@ class cardMini(commands.Cog):
         # Give the user a random amount of money between 0.01 and 0.10
         amount = round(random.uniform(0.01, 0.10), 2)
 
-        # Get the user's current bank balance
-        user_bank = self.get_bank(server_id, user_id)
-
-        # Update the bank balance with the reward
-        new_bank_total = user_bank + amount
-
-        # Replace this with your actual database update logic
-        db_path = os.path.join(data_manager.cog_data_path(self), f'{server_id}.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute('UPDATE bank SET cash = ? WHERE userID = ?', (new_bank_total, user_id))
-        conn.commit()
-        conn.close()
-    
+        db = self._db(message.guild)
+        await db.run(db.add_cash, message.author.id, amount)
@@ -4,10 +4,14 @@
 # - Preserves Discord markdown as-is (bold, italics, code blocks, etc.)
 # - Includes attachments as URLs
 # - Supports: target channel (log a different channel than invocation), date range, chunking, off switch
+# - Streams each chunk to a spool file (plain or gzip, text or JSONL) instead of holding it in memory
+# - Reply previews come from messages already scanned; unknown ones are fetched a history page at a time
+# - Checkpoints after every uploaded chunk; interrupted exports resume on load or with /logchannelresume
 #
 # Commands:
-#   /logchannel [target] [start] [end] [chunk_size] [safety_limit]
+#   /logchannel [target] [start] [end] [chunk_size] [safety_limit] [fmt]
 #   /logchanneloff
+#   /logchannelresume
 #
 # Date formats (interpreted as UTC):
 #   YYYY-MM-DD
@@ -17,13 +21,23 @@
 
 from __future__ import annotations
 
-import io
+import asyncio
+import gzip
+import json
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Optional, Dict
+from pathlib import Path
+from typing import Optional, Dict, Iterable, List
 
 import discord
 from redbot.core import commands, Config
 from redbot.core.bot import Red
+from redbot.core.data_manager import cog_data_path
+
+
+EXPORT_FORMATS = ("txt", "txt.gz", "jsonl", "jsonl.gz")
+HISTORY_BATCH = 100       # messages formatted together; unresolved replies are looked up per batch
+REPLY_MAP_MAX = 50_000    # scanned messages remembered for reply previews
 
 
 def _parse_date(date_str: str) -> datetime:
@@ -37,6 +51,94 @@ def _parse_date(date_str: str) -> datetime:
     raise ValueError("Invalid date format.")
 
 
+def _preview(msg: discord.Message) -> tuple:
+    author = getattr(msg.author, "display_name", "Unknown User")
+    text = msg.clean_content or ""
+    # Truncate preview to keep the text file readable
+    return author, (text[:50] + "...") if len(text) > 50 else (text or "[Embed/Image]")
+
+
+class ReplyIndex:
+    """
+    message id -> (author, preview) for messages the export has already seen.
+
+    History is read oldest first, so most replies point at a message scanned
+    earlier. The rest are looked up with one history(around=...) page per
+    unresolved id, which also fills in that id's neighbours.
+    """
+
+    def __init__(self, maxlen: int = REPLY_MAP_MAX):
+        self.maxlen = maxlen
+        self._seen: "OrderedDict[int, tuple]" = OrderedDict()
+        self._missing: set = set()
+
+    def remember(self, msg: discord.Message) -> None:
+        self._seen[msg.id] = _preview(msg)
+        self._seen.move_to_end(msg.id)
+        while len(self._seen) > self.maxlen:
+            self._seen.popitem(last=False)
+
+    def get(self, message_id: int) -> Optional[tuple]:
+        return self._seen.get(message_id)
+
+    async def resolve(self, channel, message_ids: Iterable[int]) -> None:
+        for mid in sorted(set(message_ids)):
+            if mid in self._seen or mid in self._missing:
+                continue
+            try:
+                async for m in channel.history(limit=100, around=discord.Object(id=mid)):
+                    self.remember(m)
+            except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+                pass
+            if mid not in self._seen:
+                self._missing.add(mid)
+
+
+class ExportWriter:
+    """Streams one chunk to a spool file on disk; `fmt` picks text/JSONL and optional gzip."""
+
+    def __init__(self, path: Path, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        opener = gzip.open if fmt.endswith(".gz") else open
+        self._fh = opener(path, "wt", encoding="utf-8", errors="replace")
+
+    def write(self, record: dict) -> None:
+        if self.fmt.startswith("jsonl"):
+            self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            self._fh.write(_format_message_block(record))
+        self.count += 1
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def _format_message_block(rec: dict) -> str:
+    header = f"{rec['author']} ({rec['author_id']}) | {rec['created_at']} UTC\n"
+
+    reply_info = ""
+    reply = rec.get("reply_to")
+    if reply:
+        if reply.get("author") is not None:
+            reply_info = f"-> Replying to {reply['author']}: \"{reply['preview']}\"\n"
+        else:
+            reply_info = f"-> Replying to Message ID: {reply['id']} (Message Deleted or Inaccessible)\n"
+
+    block = header + reply_info + rec["content"] + "\n"
+
+    if rec["attachments"]:
+        block += f"[Attachments: {' '.join(rec['attachments'])}]\n"
+
+    if rec["stickers"]:
+        block += f"[Stickers: {' '.join(rec['stickers'])}]\n"
+
+    block += f"[Jump: {rec['jump_url']}]\n"
+    block += "-" * 60 + "\n"
+    return block
+
+
 class log(commands.Cog):
     __author__ = "ChatGPT"
     __version__ = "1.5.0"
@@ -44,77 +146,201 @@ class log(commands.Cog):
     def __init__(self, bot: Red):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=873214556122, force_registration=True)
-        self.config.register_channel(is_exporting=False)
+        # export: checkpoint of the running export, rewritten after each uploaded chunk
+        self.config.register_channel(is_exporting=False, export={})
 
         # Cancel flags keyed by INVOCATION channel id (where you run /logchannel)
         self._cancel_flags: Dict[int, bool] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._resume_task: Optional[asyncio.Task] = None
+        self.spool_dir = cog_data_path(self) / "exports"
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+
+    async def cog_load(self):
+        self._resume_task = asyncio.create_task(self._resume_interrupted())
+
+    def cog_unload(self):
+        # Checkpoints stay put, so cancelled exports pick up again on the next load
+        if self._resume_task:
+            self._resume_task.cancel()
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+    async def _resume_interrupted(self):
+        await self.bot.wait_until_ready()
+        for channel_id, data in (await self.config.all_channels()).items():
+            if not (data.get("is_exporting") and data.get("export")):
+                continue
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                await self.config.channel_from_id(channel_id).clear()
+                continue
+            self._start(channel, data["export"])
+
+    def _start(self, invocation_channel, job: dict) -> None:
+        if invocation_channel.id in self._tasks:
+            return
+        self._cancel_flags[invocation_channel.id] = False
+        self._tasks[invocation_channel.id] = asyncio.create_task(self._run_export(invocation_channel, job))
 
-    async def _format_message_block(self, msg: discord.Message) -> str:
-        author_display = getattr(msg.author, "display_name", msg.author.name)
-        author_id = msg.author.id
-
-        created_utc = (
-            msg.created_at.astimezone(timezone.utc)
-            .replace(tzinfo=None)
-            .isoformat(sep=" ", timespec="seconds")
-        )
-
-        header = f"{author_display} ({author_id}) | {created_utc} UTC\n"
-        
-        reply_info = ""
+    def _record(self, msg: discord.Message, replies: ReplyIndex) -> dict:
+        reply_to = None
         ref = msg.reference
-        
         if ref and ref.message_id:
-            # 1. Try to get it from the internal cache first
+            # Discord's cache, then messages this export already scanned or batch-fetched
             ref_obj = ref.cached_message
-            
-            # 2. If not in cache, try to fetch it from the API
-            if not ref_obj:
-                try:
-                    # We use the channel the current message is in
-                    ref_obj = await msg.channel.fetch_message(ref.message_id)
-                except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-                    ref_obj = None
-
-            if ref_obj:
-                ref_author = getattr(ref_obj.author, "display_name", "Unknown User")
-                # Truncate preview to keep the text file readable
-                preview = (ref_obj.clean_content[:50] + "...") if len(ref_obj.clean_content) > 50 else (ref_obj.clean_content or "[Embed/Image]")
-                reply_info = f"-> Replying to {ref_author}: \"{preview}\"\n"
-            else:
-                reply_info = f"-> Replying to Message ID: {ref.message_id} (Message Deleted or Inaccessible)\n"
+            found = _preview(ref_obj) if ref_obj else replies.get(ref.message_id)
+            reply_to = {"id": ref.message_id, "author": None, "preview": None}
+            if found:
+                reply_to["author"], reply_to["preview"] = found
+
+        return {
+            "id": msg.id,
+            "author": getattr(msg.author, "display_name", msg.author.name),
+            "author_id": msg.author.id,
+            "created_at": (
+                msg.created_at.astimezone(timezone.utc)
+                .replace(tzinfo=None)
+                .isoformat(sep=" ", timespec="seconds")
+            ),
+            "reply_to": reply_to,
+            "content": msg.clean_content or "",
+            "attachments": [a.url for a in msg.attachments],
+            "stickers": [f"{s.name}({s.id})" for s in (getattr(msg, "stickers", None) or [])],
+            "jump_url": msg.jump_url,
+        }
+
+    async def _write_batch(self, writer: ExportWriter, channel, batch: List[discord.Message], replies: ReplyIndex):
+        for m in batch:
+            replies.remember(m)
+        unresolved = [
+            m.reference.message_id
+            for m in batch
+            if m.reference and m.reference.message_id and not m.reference.cached_message
+            and replies.get(m.reference.message_id) is None
+            and m.reference.channel_id == channel.id
+        ]
+        if unresolved:
+            await replies.resolve(channel, unresolved)
+        for m in batch:
+            writer.write(self._record(m, replies))
+
+    async def _send_chunk(self, destination, job: dict, writer: ExportWriter) -> None:
+        writer.close()
+        filename = f"channel_log_{job['target_id']}_chunk{job['chunk_index']}.{job['fmt']}"
+        try:
+            await destination.send(
+                content=f"Uploaded chunk {job['chunk_index']} ({writer.count} messages) from <#{job['target_id']}>.",
+                file=discord.File(fp=str(writer.path), filename=filename),
+            )
+        finally:
+            writer.path.unlink(missing_ok=True)
 
-        content = msg.clean_content or ""
-        block = header + reply_info + content + "\n"
+    async def _run_export(self, invocation_channel, job: dict) -> None:
+        inv_id = invocation_channel.id
+        conf = self.config.channel(invocation_channel)
+        target_channel = self.bot.get_channel(job["target_id"])
+        spool = self.spool_dir / f"{inv_id}.part"
+        writer: Optional[ExportWriter] = None
+        finished = True
+
+        verb = "Resuming" if job["exported"] else "Starting"
+        status_msg = await invocation_channel.send(
+            f"{verb} export. Reading from <#{job['target_id']}> and uploading here.\n"
+            f"Range (UTC): start=`{job['start'] or 'None'}` end=`{job['end'] or 'None'}`\n"
+            f"Chunk size: `{job['chunk_size']}` | Safety limit: `{job['safety_limit']}` | Format: `{job['fmt']}`\n"
+            + (f"Already uploaded: `{job['exported']}` messages.\n" if job["exported"] else "")
+            + "Stop with `/logchanneloff`."
+        )
 
-        if msg.attachments:
-            urls = " ".join(a.url for a in msg.attachments)
-            block += f"[Attachments: {urls}]\n"
+        try:
+            if target_channel is None:
+                await status_msg.edit(content=f"Export stopped: <#{job['target_id']}> no longer exists.")
+                return
+            after = (
+                discord.Object(id=job["after_id"]) if job["after_id"]
+                else _parse_date(job["start"]).replace(tzinfo=timezone.utc) if job["start"] else None
+            )
+            before = _parse_date(job["end"]).replace(tzinfo=timezone.utc) if job["end"] else None
 
-        if getattr(msg, "stickers", None) and msg.stickers:
-            sticker_bits = " ".join(f"{s.name}({s.id})" for s in msg.stickers)
-            block += f"[Stickers: {sticker_bits}]\n"
+            replies = ReplyIndex()
+            writer = ExportWriter(spool, job["fmt"])
+            batch: List[discord.Message] = []
+            last_id = job["after_id"]
+            limit_hit = False
 
-        block += f"[Jump: {msg.jump_url}]\n"
-        block += "-" * 60 + "\n"
-        return block
+            async for msg in target_channel.history(limit=None, after=after, before=before, oldest_first=True):
+                if self._cancel_flags.get(inv_id):
+                    break
 
-    async def _send_chunk(
-        self,
-        ctx: commands.Context,
-        target_channel_id: int,
-        chunk_index: int,
-        chunk_count: int,
-        txt_text: str,
-    ) -> None:
-        filename = f"channel_log_{target_channel_id}_chunk{chunk_index}.txt"
-        data = txt_text.encode("utf-8", errors="replace")
-        file_obj = discord.File(fp=io.BytesIO(data), filename=filename)
-
-        await ctx.send(
-            content=f"Uploaded chunk {chunk_index} ({chunk_count} messages) from <#{target_channel_id}>.",
-            file=file_obj,
-        )
+                # Skip the invocation message if applicable (prefix usage only)
+                if msg.id == job.get("skip_id"):
+                    continue
+
+                batch.append(msg)
+                if job["safety_limit"] and job["exported"] + writer.count + len(batch) >= job["safety_limit"]:
+                    limit_hit = True
+                if len(batch) < HISTORY_BATCH and writer.count + len(batch) < job["chunk_size"] and not limit_hit:
+                    continue
+
+                await self._write_batch(writer, target_channel, batch, replies)
+                last_id = batch[-1].id
+                batch = []
+
+                if writer.count >= job["chunk_size"]:
+                    await self._send_chunk(invocation_channel, job, writer)
+                    job["exported"] += writer.count
+                    job["chunk_index"] += 1
+                    job["after_id"] = last_id
+                    await conf.export.set(job)
+                    writer = ExportWriter(spool, job["fmt"])
+
+                if limit_hit:
+                    break
+
+            if batch:
+                await self._write_batch(writer, target_channel, batch, replies)
+
+            cancelled = self._cancel_flags.get(inv_id, False)
+
+            if writer.count > 0:
+                await self._send_chunk(invocation_channel, job, writer)
+                job["exported"] += writer.count
+
+            if cancelled:
+                await status_msg.edit(
+                    content=f"Export stopped. Uploaded `{job['exported']}` messages from <#{job['target_id']}>."
+                )
+            else:
+                await status_msg.edit(
+                    content=f"Export complete. Uploaded `{job['exported']}` messages from <#{job['target_id']}>."
+                )
+
+        except asyncio.CancelledError:
+            # Cog unload / shutdown: leave is_exporting + checkpoint for the next load
+            finished = False
+            raise
+        except discord.Forbidden:
+            await status_msg.edit(content="I do not have permission to read message history in the target channel.")
+        except Exception as e:
+            # Keep the checkpoint so /logchannelresume can carry on from the last uploaded chunk
+            await conf.is_exporting.set(False)
+            finished = False
+            await status_msg.edit(
+                content=f"Export failed: `{type(e).__name__}: {e}`\n"
+                f"Uploaded `{job['exported']}` messages so far; `/logchannelresume` continues from there."
+            )
+        finally:
+            if writer is not None:
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+            spool.unlink(missing_ok=True)
+            if finished:
+                await conf.clear()
+            self._cancel_flags.pop(inv_id, None)
+            self._tasks.pop(inv_id, None)
 
     @commands.hybrid_command(name="logchannel")
     @commands.guild_only()
@@ -127,20 +353,20 @@ class log(commands.Cog):
         end: Optional[str] = None,
         chunk_size: int = 1000,
         safety_limit: int = 20000,
+        fmt: str = "txt",
     ):
         """
         Export messages from a TARGET channel (can differ from invocation channel),
-        filtered by an optional UTC date range, uploading a text file every `chunk_size` messages.
+        filtered by an optional UTC date range, uploading a file every `chunk_size` messages.
 
         Output uses msg.clean_content to make mentions look like Discord.
+        `fmt` is one of txt, txt.gz, jsonl or jsonl.gz.
         """
         invocation_channel = ctx.channel
         if not isinstance(invocation_channel, (discord.TextChannel, discord.Thread)):
             await ctx.send("Run this in a text channel or thread.")
             return
 
-        inv_id = invocation_channel.id
-
         if await self.config.channel(invocation_channel).is_exporting():
             await ctx.send("An export is already running here. Use `/logchanneloff` to stop it.")
             return
@@ -159,9 +385,9 @@ class log(commands.Cog):
         before_dt = None
         try:
             if start:
-                after_dt = _parse_date(start).replace(tzinfo=timezone.utc)
+                after_dt = _parse_date(start)
             if end:
-                before_dt = _parse_date(end).replace(tzinfo=timezone.utc)
+                before_dt = _parse_date(end)
         except ValueError:
             await ctx.send(
                 "Invalid date format. Use `YYYY-MM-DD` or `YYYY-MM-DD HH:MM` (seconds optional)."
@@ -172,92 +398,56 @@ class log(commands.Cog):
             await ctx.send("`end` must be after `start`.")
             return
 
+        fmt = fmt.lower()
+        if fmt not in EXPORT_FORMATS:
+            await ctx.send(f"Unknown format. Use one of: {', '.join(EXPORT_FORMATS)}.")
+            return
+
         if chunk_size < 1:
             chunk_size = 1000
         if chunk_size > 5000:
             chunk_size = 5000
 
-        # Start export
-        await self.config.channel(invocation_channel).is_exporting.set(True)
-        self._cancel_flags[inv_id] = False
-
-        status_msg = await ctx.send(
-            f"Starting export. Reading from <#{target_channel.id}> and uploading here.\n"
-            f"Range (UTC): start=`{start or 'None'}` end=`{end or 'None'}`\n"
-            f"Chunk size: `{chunk_size}` | Safety limit: `{safety_limit}`\n"
-            f"Stop with `/logchanneloff`."
-        )
-
-        exported_total = 0
-        chunk_index = 1
-        chunk_count = 0
-        buf = io.StringIO()
-
-        try:
-            async for msg in target_channel.history(
-                limit=None,
-                after=after_dt,
-                before=before_dt,
-                oldest_first=True,
-            ):
-                if self._cancel_flags.get(inv_id):
-                    break
-
-                # Skip the invocation message if applicable (prefix usage only)
-                if target_channel.id == inv_id and getattr(ctx, "message", None) and msg.id == ctx.message.id:
-                    continue
+        job = {
+            "target_id": target_channel.id,
+            "start": start,
+            "end": end,
+            "chunk_size": chunk_size,
+            "safety_limit": safety_limit,
+            "fmt": fmt,
+            "skip_id": getattr(getattr(ctx, "message", None), "id", None) if target_channel.id == invocation_channel.id else None,
+            "after_id": None,
+            "exported": 0,
+            "chunk_index": 1,
+        }
 
-                buf.write(await self._format_message_block(msg))       
-                chunk_count += 1
-                exported_total += 1
-
-                if chunk_count >= chunk_size:
-                    await self._send_chunk(
-                        ctx=ctx,
-                        target_channel_id=target_channel.id,
-                        chunk_index=chunk_index,
-                        chunk_count=chunk_count,
-                        txt_text=buf.getvalue(),
-                    )
-                    chunk_index += 1
-                    chunk_count = 0
-                    buf.close()
-                    buf = io.StringIO()
-
-                if safety_limit and exported_total >= safety_limit:
-                    break
-
-            cancelled = self._cancel_flags.get(inv_id, False)
-
-            if chunk_count > 0:
-                await self._send_chunk(
-                    ctx=ctx,
-                    target_channel_id=target_channel.id,
-                    chunk_index=chunk_index,
-                    chunk_count=chunk_count,
-                    txt_text=buf.getvalue(),
-                )
-
-            if cancelled:
-                await status_msg.edit(
-                    content=f"Export stopped. Uploaded `{exported_total}` messages from <#{target_channel.id}>."
-                )
-            else:
-                await status_msg.edit(
-                    content=f"Export complete. Uploaded `{exported_total}` messages from <#{target_channel.id}>."
-                )
-
-        except discord.Forbidden:
-            await status_msg.edit(content="I do not have permission to read message history in the target channel.")
-        except Exception as e:
-            await status_msg.edit(content=f"Export failed: `{type(e).__name__}: {e}`")
-        finally:
-            await self.config.channel(invocation_channel).is_exporting.set(False)
-            self._cancel_flags.pop(inv_id, None)
-            try:
-                buf.close()
-            except Exception:
-                pass
+        # Start export
+        conf = self.config.channel(invocation_channel)
+        await conf.is_exporting.set(True)
+        await conf.export.set(job)
+        self._start(invocation_channel, job)
+        if ctx.interaction:
+            await ctx.send("Export queued.", ephemeral=True)
+
+    @commands.hybrid_command(name="logchannelresume")
+    @commands.guild_only()
+    @commands.admin_or_permissions(manage_messages=True)
+    async def logchannelresume(self, ctx: commands.Context):
+        """
+        Resume a failed export from THIS invocation channel at its last uploaded chunk.
+        """
+        conf = self.config.channel(ctx.channel)
+        if await conf.is_exporting():
+            await ctx.send("An export is already running here. Use `/logchanneloff` to stop it.")
+            return
+        job = await conf.export()
+        if not job:
+            await ctx.send("There is no interrupted export to resume here.")
+            return
+        await conf.is_exporting.set(True)
+        self._start(ctx.channel, job)
+        if ctx.interaction:
+            await ctx.send("Export resumed.", ephemeral=True)
 
     @commands.hybrid_command(name="logchanneloff")
     @commands.guild_only()
@@ -277,6 +467,9 @@ class log(commands.Cog):
             return
 
         self._cancel_flags[inv_id] = True
+        if inv_id not in self._tasks:
+            # Flag left over from a crash with nothing running behind it
+            await self.config.channel(invocation_channel).clear()
         await ctx.send("Stopping export after the current batch…")
 
 
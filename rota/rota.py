@@ -94,7 +94,6 @@ class rota(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=9007)
-        USER_CONFIG = Config.get_conf(None, identifier=345678654456, force_registration=True)
         self.config.register_global(
             votes={}, last_activity=None, issue_id=None, nation="",
             password="", user_agent="rota by 9005", vote_active=False
@@ -329,19 +328,15 @@ class rota(commands.Cog):
             
             top_option = max(option_counts, key=option_counts.get)
             # Reward 100 wellcoins to those who voted for the winning option
+            nexus = self.bot.get_cog("NexusExchange")
             for user_id_str, voted_option in votes.items():
+                user = self.bot.get_user(int(user_id_str))
+                if not user or not nexus:
+                    continue
                 if voted_option == top_option:
-                    user = self.bot.get_user(int(user_id_str))
-                    if user:
-                        user_config = USER_CONFIG.get_user(user)
-                        current_balance = await user_config.master_balance()
-                        await user_config.master_balance.set(current_balance + 100)
+                    await nexus.add_wellcoins(user, 100)
                 else:
-                    user = self.bot.get_user(int(user_id_str))
-                    if user:
-                        user_config = USER_CONFIG.get_user(user)
-                        current_balance = await user_config.master_balance()
-                        await user_config.master_balance.set(current_balance + 10)
+                    await nexus.add_wellcoins(user, 10)
 
 
         await self.config.votes.clear()
@@ -1,10 +1,8 @@
-import aiohttp
 import xml.etree.ElementTree as ET
 from redbot.core import commands
 from redbot.core.commands import BucketType, Cooldown, CommandOnCooldown
 import discord
 import time
-import asyncio
 import csv
 import os
 from datetime import datetime
@@ -14,15 +12,6 @@ from discord import Embed, File
 tsv_file = "report.tsv"
 nation_password = None  # Global variable to store the nation password
 
-async def handle_rate_limit(response):
-    remaining = int(response.headers.get("Ratelimit-Remaining", 10))
-    reset_time = int(response.headers.get("Ratelimit-Reset", 30))
-
-    if remaining < 20:  # Threshold for remaining requests
-        wait_time = reset_time / max(remaining, 1)
-        print(f"Rate limit nearly reached. Sleeping for {wait_time} seconds...")
-        await asyncio.sleep(wait_time)
-
 def dynamic_cooldown(ctx):
     user_roles = [role.id for role in ctx.author.roles]
 
@@ -42,89 +31,105 @@ class sheets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    def _ns(self):
+        cog = self.bot.get_cog("NSApi")
+        if not cog:
+            raise RuntimeError("NSApi cog not found. Please load it so sheets can reach NationStates.")
+        return cog.client
+
+    def _cards(self):
+        # Optional: without CardQ every lookup goes to the API as before
+        cog = self.bot.get_cog("CardQ")
+        return cog.db if cog else None
+
     @commands.dynamic_cooldown(dynamic_cooldown, type=BucketType.user)
     @commands.command()
     async def request_card(self, ctx, card_id: int, *destination: str):
         destination = " ".join(destination)
         await ctx.send("Lets see if I can find that card one second!")
         user_agent = "9003"
-        headers = {"User-Agent": user_agent}
         global nation_password
         if not nation_password:
             await ctx.send("Please tell 9003 to set the nation password using the `set_password` command.")
             return
-        # Fetch card info from the NationStates API
+        # Check the local card database first so unknown ids and legendaries cost no API calls
+        cards = self._cards()
+        if cards and cards.has_season(3):
+            local = cards.card(card_id, 3)
+            if local is None:
+                await ctx.send(f"Card {card_id} does not exist in season 3.")
+                return
+            if (local["card_category"] or "").lower() == "legendary":
+                await ctx.send("Sorry you can't request legendarys!")
+                return
+        # Fetch card info (market value is live) from the NationStates API (shared, rate-limited client)
+        ns = self._ns()
         url = f"https://www.nationstates.net/cgi-bin/api.cgi?q=card+info;cardid={card_id};season=3"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers={"User-Agent": user_agent}) as response:
-                await handle_rate_limit(response)
-                if response.status != 200:
-                    await ctx.send(f"Failed to fetch card info. Status code: {response.status}")
-                    return
-                xml_content = await response.text()
-                card_info, MV = await self.parse_card_info(ctx, xml_content)
-                if card_info:
-                    await ctx.send(embed=card_info)
-
-                    # Gifting the card
-                    nation = "9006"  
-                    season = 3
-                    headers["X-Password"] = nation_password
-                    prepare_data = {
-                        "nation": nation,
-                        "c": "giftcard",
-                        "cardid": card_id,
-                        "season": season,
-                        "to": destination,
-                        "mode": "prepare"
-                    }
-
-                    async with session.post("https://www.nationstates.net/cgi-bin/api.cgi", headers=headers, data=prepare_data) as response:
-                        await handle_rate_limit(response)
-                        if response.status != 200:
-                            await ctx.send(f"Failed to prepare gift. Status code: {response.status} {await response.text()}")
-                            return
-
-                        response_text = await response.text()
-                        # Extract token from the response
-                        #await ctx.send(response_text)
-                        token_start = response_text.find("<SUCCESS>") + len("<SUCCESS>")
-                        token_end = response_text.find("</SUCCESS>")
-                        token = response_text[token_start:token_end].strip()
-
-                        # Extract pin from headers
-                        x_pin = response.headers.get("X-Pin")
-                        if not token or not x_pin:
-                            await ctx.send("Failed to retrieve token or pin.")
-                            return
-
-                        # Execute the gift
-                        headers["X-Pin"] = x_pin
-                        del headers["X-Password"]  # Remove X-Password for security
-                        execute_data = {
-                            "nation": nation,
-                            "c": "giftcard",
-                            "cardid": card_id,
-                            "season": season,
-                            "to": destination,
-                            "mode": "execute",
-                            "token": token
-                        }
-
-                        async with session.post("https://www.nationstates.net/cgi-bin/api.cgi", headers=headers, data=execute_data) as response:
-                            await handle_rate_limit(response)
-                            if response.status != 200:
-                                await ctx.send(f"Failed to execute gift. Status code: {response.status}")
-                                return
-                            if "<ERROR>" in await response.text():
-                                await ctx.send(await response.text())
-                                return
-                                
-                            await self.add_to_tsv(destination, card_id, 3 , MV)
-                            await ctx.send(f"Successfully gifted card {card_id} to {destination}!")
-                else:
-                    await ctx.send("Failed to parse card info.")
-                    await ctx.send(f"Raw XML content:\n```xml\n{xml_content}\n```")
+        response = await ns.get(url=url, user_agent=user_agent)
+        if response.status != 200:
+            await ctx.send(f"Failed to fetch card info. Status code: {response.status}")
+            return
+        xml_content = response.text()
+        card_info, MV = await self.parse_card_info(ctx, xml_content)
+        if card_info:
+            await ctx.send(embed=card_info)
+
+            # Gifting the card
+            nation = "9006"  
+            season = 3
+            headers = {"X-Password": nation_password}
+            prepare_data = {
+                "nation": nation,
+                "c": "giftcard",
+                "cardid": card_id,
+                "season": season,
+                "to": destination,
+                "mode": "prepare"
+            }
+
+            response = await ns.post(prepare_data, headers=headers, user_agent=user_agent)
+            if response.status != 200:
+                await ctx.send(f"Failed to prepare gift. Status code: {response.status} {response.text()}")
+                return
+
+            response_text = response.text()
+            # Extract token from the response
+            #await ctx.send(response_text)
+            token_start = response_text.find("<SUCCESS>") + len("<SUCCESS>")
+            token_end = response_text.find("</SUCCESS>")
+            token = response_text[token_start:token_end].strip()
+
+            # Extract pin from headers
+            x_pin = response.headers.get("X-Pin")
+            if not token or not x_pin:
+                await ctx.send("Failed to retrieve token or pin.")
+                return
+
+            # Execute the gift
+            headers = {"X-Pin": x_pin}  # X-Password not resent for security
+            execute_data = {
+                "nation": nation,
+                "c": "giftcard",
+                "cardid": card_id,
+                "season": season,
+                "to": destination,
+                "mode": "execute",
+                "token": token
+            }
+
+            response = await ns.post(execute_data, headers=headers, user_agent=user_agent)
+            if response.status != 200:
+                await ctx.send(f"Failed to execute gift. Status code: {response.status}")
+                return
+            if "<ERROR>" in response.text():
+                await ctx.send(response.text())
+                return
+                
+            await self.add_to_tsv(destination, card_id, 3 , MV)
+            await ctx.send(f"Successfully gifted card {card_id} to {destination}!")
+        else:
+            await ctx.send("Failed to parse card info.")
+            await ctx.send(f"Raw XML content:\n```xml\n{xml_content}\n```")
 
     async def parse_card_info(self, ctx, xml_content):
         try: